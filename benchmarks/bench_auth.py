@@ -0,0 +1,50 @@
+"""
+인증 오버헤드 벤치마크: 입력 이벤트당 추가 비용 (프레임 HMAC 봉인 + 검증)
+
+사용법:
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --iterations 200000
+"""
+
+import time
+import argparse
+from src.auth import derive_key, AuthSession
+from src.events import MouseMove, serialize_event
+
+
+def bench(batch_size: int, iterations: int) -> float:
+    """배치 크기별 이벤트당 봉인+검증 합계 시간 (마이크로초)"""
+    key = derive_key('benchmark')
+    sender = AuthSession(key, b'c' * 16, b's' * 16, is_server=False)
+    receiver = AuthSession(key, b'c' * 16, b's' * 16, is_server=True)
+
+    payload = b''.join(serialize_event(MouseMove(1000 + i, 500)) for i in range(batch_size))
+    frames = iterations // batch_size
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        receiver.opener.feed(sender.sealer.seal(payload))
+    elapsed = time.perf_counter() - start
+    return elapsed / (frames * batch_size) * 1e6
+
+
+def bench_serialize(iterations: int) -> float:
+    """비교 기준: 이벤트 하나 직렬화 시간 (마이크로초)"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        serialize_event(MouseMove(i, 500))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-event cost of authenticated framing")
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"serialize_event baseline : {bench_serialize(args.iterations):.2f} us/event")
+    for batch_size in (1, 4, 16, 64):
+        print(f"seal+open, batch of {batch_size:<3}: {bench(batch_size, args.iterations):.2f} us/event")
+
+
+if __name__ == "__main__":
+    main()
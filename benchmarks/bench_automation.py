@@ -0,0 +1,110 @@
+"""
+자동화 API 벤치마크: 루프백 KMPeer 두 개 사이에서 스크립트 입력 처리량
+- 이벤트마다 요청/응답 (비교 기준)과 큰 묶음 + 파이프라인(window) 스트리밍의 초당 이벤트 수
+- 수신측에 도착한 mouse_move 수 (스크립트 입력은 병합/버림 없이 모두 전달되어야 함)
+- --slow-receiver-us를 주면 수신측 디스패치를 느리게 해 TCP 창이 차게 만들고, 역압으로 송신 큐가 제한 안에 머물며
+  클라이언트가 수신 속도에 맞춰지는지 확인 (NetemProxy는 지연 큐에 무제한으로 받아 두므로 역압 확인에는 쓰지 않음)
+
+사용법:
+    python -m benchmarks.bench_automation
+    python -m benchmarks.bench_automation --events 200000 --batch 2000 --window 4
+    python -m benchmarks.bench_automation --slow-receiver-us 200 --events 20000
+"""
+
+import time
+import argparse
+from typing import List
+from benchmarks.harness import make_peer, wait_for
+from src.automation import AutomationClient, AutomationServer
+from src.metrics import MetricsRegistry
+
+
+def moves(start: int, count: int) -> List[list]:
+    return [['move', 100 + (start + i) % 1000, 500] for i in range(count)]
+
+
+def received_moves(peer) -> float:
+    return peer.m_events_received.get('mouse_move')
+
+
+def slow_receiver(peer, busy: float):
+    """수신 디스패치마다 busy초 동안 CPU를 써서 수신 소켓을 늦게 읽게 함"""
+    dispatch = peer._dispatch_event
+
+    def slow(event):
+        end = time.perf_counter() + busy
+        while time.perf_counter() < end:
+            pass
+        dispatch(event)
+
+    peer._dispatch_event = slow
+
+
+def run(label: str, client: AutomationClient, receiver, events: int, batch: int, window: int):
+    """events개를 batch개씩 보내고 (응답 기준 처리량, 수신 완료까지 처리량, 도착 수) 출력"""
+    before = received_moves(receiver)
+    start = time.perf_counter()
+    batches = (moves(offset, min(batch, events - offset)) for offset in range(0, events, batch))
+    sent = 0
+    errors = 0
+    if window <= 1:
+        responses = (client.send(events_batch) for events_batch in batches)
+    else:
+        responses = client.stream(batches, window=window)
+    for response in responses:
+        sent += response.get('sent', 0)
+        if not response.get('ok'):
+            errors += 1
+    acked = time.perf_counter() - start
+    wait_for(lambda: received_moves(receiver) - before >= sent, timeout=30)
+    delivered = time.perf_counter() - start
+    arrived = int(received_moves(receiver) - before)
+    print(f"{label:<26}: {sent / acked:9.0f} events/s queued  {arrived / delivered:9.0f} events/s delivered  "
+          f"arrived={arrived}/{events}  errors={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automation API scripted input throughput")
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=1000, help="events per request when streaming")
+    parser.add_argument('--window', type=int, default=8, help="requests in flight when streaming")
+    parser.add_argument('--single', type=int, default=2000, help="events sent one request each (baseline)")
+    parser.add_argument('--slow-receiver-us', type=float, default=0,
+                        help="busy time per received event on the receiver (fills the TCP window)")
+    parser.add_argument('--base-port', type=int, default=25000)
+    args = parser.parse_args()
+
+    # A: 서버 역할 (초기 제어권, 스크립트 입력을 보냄), B: 수신
+    a = make_peer(args.base_port)
+    b = make_peer(args.base_port + 1, remote_port=args.base_port)
+    if args.slow_receiver_us:
+        slow_receiver(b, args.slow_receiver_us / 1e6)
+    a.start()
+    time.sleep(0.2)
+    b.start()
+
+    token = 'bench'
+    server = AutomationServer(lambda: a, port=args.base_port + 2, token=token, registry=MetricsRegistry())
+    server.start()
+    try:
+        if wait_for(lambda: a.connected and b.connected and a.has_control, timeout=10) is None:
+            print("connection failed")
+            return
+        client = AutomationClient(server.port, token=token)
+        print(f"status: {client.status()}")
+
+        run("one request per event", client, b, args.single, 1, 1)
+        run(f"batch {args.batch}, window {args.window}", client, b, args.events, args.batch, args.window)
+        client.close()
+
+        print(f"sender queue high water={a.send_queue.high_water} (limit {a.send_queue.capacity // 2})  "
+              f"merged={a.m_send_merged.total():.0f}  dropped={a.m_send_dropped.total():.0f}")
+        print(f"time queueing incl. backpressure waits: {server.m_send_seconds.total():.2f}s")
+    finally:
+        server.stop()
+        b.stop()
+        a.stop()
+
+
+if __name__ == "__main__":
+    main()
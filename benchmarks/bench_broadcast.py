@@ -0,0 +1,129 @@
+"""
+브로드캐스트 서버 팬아웃 벤치마크: 클라이언트 수(1~50)에 따른 지연과 송신 비용
+- send_event 호출 시간/CPU: 입력 훅 스레드가 내는 비용 (클라이언트 수와 무관해야 함)
+- 서버 루프 CPU: 클라이언트별 send()를 하는 네트워크 루프 스레드의 이벤트당 CPU (Linux에서만 측정)
+
+사용법:
+    python -m benchmarks.bench_broadcast
+    python -m benchmarks.bench_broadcast --clients 1 10 50 --events 2000 --rate 1000
+"""
+
+import json
+import time
+import socket
+import argparse
+import selectors
+import threading
+from benchmarks.harness import percentiles, format_percentiles
+from src.server import KMBroadcastServer
+
+
+class _Readers:
+    """한 스레드에서 모든 클라이언트 소켓을 읽어 이벤트별 지연을 기록"""
+
+    def __init__(self, port: int, count: int):
+        self.selector = selectors.DefaultSelector()
+        self.latencies = []
+        self.buffers = {}
+        self.socks = []
+        for _ in range(count):
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.buffers[sock] = b''
+            self.socks.append(sock)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            for key, _ in self.selector.select(timeout=0.1):
+                sock = key.fileobj
+                try:
+                    data = sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                now = time.perf_counter()
+                buffer = self.buffers[sock] + data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    self.latencies.append(now - json.loads(line)['t'])
+                self.buffers[sock] = buffer
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        for sock in self.socks:
+            sock.close()
+
+
+def _thread_clock(thread):
+    """스레드 CPU 시계 ID (pthread_getcpuclockid가 없으면 None)"""
+    try:
+        return time.pthread_getcpuclockid(thread.ident)
+    except (AttributeError, OSError):
+        return None
+
+
+def run(port: int, clients: int, events: int, rate: float) -> dict:
+    server = KMBroadcastServer('127.0.0.1', port)
+    server.serve()
+    readers = _Readers(port, clients)
+    while len(server.clients) < clients:
+        time.sleep(0.01)
+
+    loop_clock = _thread_clock(server.loop_thread)
+    loop_start = time.clock_gettime(loop_clock) if loop_clock is not None else 0.0
+    send_times = []
+    cpu_start = time.thread_time()
+    interval = 1.0 / rate
+    next_time = time.perf_counter()
+    for seq in range(events):
+        start = time.perf_counter()
+        server.send_event({'type': 'mouse_move', 'x': seq, 'y': 0, 't': start})
+        send_times.append(time.perf_counter() - start)
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    cpu = time.thread_time() - cpu_start
+
+    deadline = time.time() + 5
+    while len(readers.latencies) < events * clients and time.time() < deadline:
+        time.sleep(0.01)
+    loop_cpu = time.clock_gettime(loop_clock) - loop_start if loop_clock is not None else None
+
+    readers.close()
+    server.stop()
+    return {
+        'latency': percentiles(readers.latencies),
+        'send': percentiles(send_times),
+        'cpu_per_event_us': cpu / events * 1e6,
+        'loop_cpu_per_event_us': loop_cpu / events * 1e6 if loop_cpu is not None else None,
+        'received': len(readers.latencies),
+        'expected': events * clients,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast server fan-out cost")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 25, 50])
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=1000)
+    parser.add_argument('--base-port', type=int, default=23800)
+    args = parser.parse_args()
+
+    for i, clients in enumerate(args.clients):
+        result = run(args.base_port + i, clients, args.events, args.rate)
+        print(f"\n== {clients} clients ==")
+        print(f"  delivery latency : {format_percentiles(result['latency'])}"
+              f"  ({result['received']}/{result['expected']} received)")
+        print(f"  send_event call  : {format_percentiles(result['send'])}")
+        print(f"  sender CPU       : {result['cpu_per_event_us']:.1f} us/event")
+        if result['loop_cpu_per_event_us'] is not None:
+            print(f"  server loop CPU  : {result['loop_cpu_per_event_us']:.1f} us/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+혼잡 적응 포인터 샘플링 벤치마크: 대역폭이 부족한 링크에서 network.adaptive_pointer 끈 경우/켠 경우 비교
+
+두 KMPeer를 NetemProxy(병목 버퍼 queue_kb)를 거쳐 연결하고, 링크 용량보다 빠르게 mouse_move를 보내면서
+주기적으로 키 누름/뗌을 섞는다.
+- mouse_move 지연 백분위수와 도착 수 (켠 경우 간격 안의 이동은 마지막 위치로 합쳐져 도착 수가 줄어듦)
+- 키 지연 백분위수 (키는 간격 제한을 받지 않으므로 켠 경우 링크 대기만큼 빨라져야 함)
+- 송신측 커널 송신 큐(SIOCOUTQ) 최대/중앙값, 마지막 전송률 제한
+
+사용법:
+    python -m benchmarks.bench_congestion
+    python -m benchmarks.bench_congestion --bandwidth-kbps 256 --rate 1000 --seconds 10
+    python -m benchmarks.bench_congestion --profile busy_wifi --bandwidth-kbps 0
+"""
+
+import time
+import argparse
+import threading
+from collections import deque
+from typing import Dict, List
+from benchmarks.harness import make_peer, wait_for, percentiles, format_percentiles, LatencyProbe
+from src.events import KeyEvent, KEYBOARD
+from src.netem import NetemProxy, load_profile
+
+
+class KeyProbe:
+    """송신측에서 넣은 키 이벤트가 수신측 디스패치에 도달할 때까지의 지연 (TCP 순서대로 FIFO 매칭)"""
+
+    def __init__(self, receiver):
+        self.sent_at = deque()
+        self.latencies: List[float] = []
+        dispatch = receiver._dispatch_event
+
+        def probe(event):
+            if event.code == KEYBOARD and self.sent_at:
+                self.latencies.append(time.perf_counter() - self.sent_at.popleft())
+            dispatch(event)
+
+        receiver._dispatch_event = probe
+
+    def send_keys(self, sender, stop: threading.Event, interval: float):
+        while not stop.wait(interval):
+            for pressed in (True, False):
+                self.sent_at.append(time.perf_counter())
+                sender._send_event(KeyEvent('a', pressed))
+
+
+def run(profile: dict, adaptive: bool, base_port: int, args) -> Dict:
+    port_a, port_b, port_proxy = base_port, base_port + 1, base_port + 2
+    proxy = NetemProxy(port_proxy, ('127.0.0.1', port_a), profile, seed=1)
+    proxy.start()
+
+    # A: 서버 역할 (초기 제어권, 송신), B: 프록시를 거쳐 A에 연결
+    a = make_peer(port_a, **{'network.adaptive_pointer': adaptive})
+    b = make_peer(port_b, remote_port=port_proxy)
+    moves = LatencyProbe(b)
+    keys = KeyProbe(b)
+    a.start()
+    time.sleep(0.2)
+    b.start()
+
+    result = {}
+    try:
+        if wait_for(lambda: a.connected and b.connected, timeout=10) is None:
+            result['error'] = "connection failed"
+            return result
+
+        stop = threading.Event()
+        queued: List[int] = []
+        rate_limits: List[float] = []
+
+        def sample():
+            while not stop.wait(0.01):
+                queued.append(a.m_send_queue.get())
+                rate_limits.append(a.m_pointer_rate.get())
+
+        threads = [threading.Thread(target=sample, daemon=True),
+                   threading.Thread(target=keys.send_keys, args=(a, stop, args.key_interval), daemon=True)]
+        for thread in threads:
+            thread.start()
+        moves.send_moves(a, int(args.rate * args.seconds), args.rate)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        # 키가 모두 도착하면 그 앞의 이동도 도착한 것 (합쳐진 이동은 도착하지 않음)
+        wait_for(lambda: not keys.sent_at, timeout=120, interval=0.05)
+
+        ordered = sorted(queued)
+        result['moves'] = percentiles(moves.latencies)
+        result['arrived'] = len(moves.latencies)
+        result['keys'] = percentiles(keys.latencies)
+        result['key_count'] = len(keys.latencies)
+        result['queued_max'] = ordered[-1] if ordered else 0
+        result['queued_p50'] = ordered[len(ordered) // 2] if ordered else 0
+        result['rate_limit_min'] = min((r for r in rate_limits if r), default=0.0)
+    finally:
+        a.stop()
+        b.stop()
+        proxy.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pointer latency on a congested link with and without pacing")
+    parser.add_argument('--profile', default='congested')
+    parser.add_argument('--profile-file', help="JSON file with additional profiles")
+    parser.add_argument('--bandwidth-kbps', type=float, default=160,
+                        help="override the profile bandwidth (0 keeps the profile value)")
+    parser.add_argument('--queue-kb', type=float, default=4, help="bottleneck buffer size")
+    parser.add_argument('--rate', type=float, default=1000, help="mouse_move events per second")
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--key-interval', type=float, default=0.1, help="seconds between key press/release pairs")
+    parser.add_argument('--base-port', type=int, default=25100)
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile, args.profile_file)
+    if args.bandwidth_kbps:
+        profile['bandwidth_kbps'] = args.bandwidth_kbps
+    profile['queue_kb'] = args.queue_kb
+    print(f"profile {profile['name']}: {profile['bandwidth_kbps']} kbit/s, {profile['latency_ms']}ms "
+          f"+/- {profile['jitter_ms']}ms, queue {profile['queue_kb']} KB; {args.rate:.0f} moves/s for {args.seconds}s")
+
+    for i, adaptive in enumerate((False, True)):
+        result = run(profile, adaptive, args.base_port + i * 10, args)
+        print(f"\n== adaptive_pointer={adaptive} ==")
+        if 'error' in result:
+            print(f"  {result['error']}")
+            continue
+        print(f"  move latency : {format_percentiles(result['moves'])}  "
+              f"(arrived {result['arrived']}/{int(args.rate * args.seconds)})")
+        print(f"  key latency  : {format_percentiles(result['keys'])}  ({result['key_count']} events)")
+        print(f"  kernel send queue: p50={result['queued_p50']} max={result['queued_max']} bytes  "
+              f"lowest rate limit={result['rate_limit_min']:.0f} Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+프로세스 간 이벤트 전달 비용: 공유 메모리 링(EventRing) vs multiprocessing.Pipe(피클링)
+자식 프로세스가 받은 이벤트를 그대로 돌려보내고 왕복 시간을 측정한다.
+
+사용법:
+    python -m benchmarks.bench_event_ring
+    python -m benchmarks.bench_event_ring --events 20000 --burst 8
+"""
+
+import time
+import argparse
+import multiprocessing
+from benchmarks.harness import percentiles, format_percentiles
+from src.event_ring import EventRing, MOVE, QUIT
+
+
+def _ring_echo(inbound: EventRing, outbound: EventRing):
+    try:
+        while True:
+            if not inbound.wait(1.0):
+                continue
+            for record in inbound.pop_all():
+                if record[0] == QUIT:
+                    return
+                outbound.push(*record)
+    finally:
+        inbound.close()
+        outbound.close()
+
+
+def _pipe_echo(conn):
+    while True:
+        event = conn.recv()
+        if event is None:
+            return
+        conn.send(event)
+
+
+def bench_ring(events: int, burst: int) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    to_child, from_child = EventRing(), EventRing()
+    child = ctx.Process(target=_ring_echo, args=(to_child, from_child), daemon=True)
+    child.start()
+
+    latencies = []
+    for seq in range(0, events, burst):
+        start = time.perf_counter()
+        for i in range(burst):
+            to_child.push(MOVE, x=seq + i, y=0)
+        received = 0
+        while received < burst:
+            from_child.wait(1.0)
+            received += len(from_child.pop_all())
+        latencies.append((time.perf_counter() - start) / burst)
+
+    to_child.push(QUIT, block=True)
+    child.join(2.0)
+    to_child.close()
+    from_child.close()
+    return percentiles(latencies)
+
+
+def bench_pipe(events: int, burst: int) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe()
+    child = ctx.Process(target=_pipe_echo, args=(child_conn,), daemon=True)
+    child.start()
+
+    latencies = []
+    for seq in range(0, events, burst):
+        start = time.perf_counter()
+        for i in range(burst):
+            parent_conn.send({'type': 'mouse_move', 'x': seq + i, 'y': 0})
+        for _ in range(burst):
+            parent_conn.recv()
+        latencies.append((time.perf_counter() - start) / burst)
+
+    parent_conn.send(None)
+    child.join(2.0)
+    return percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-process event hand-off cost")
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--burst', type=int, default=1, help="events written before waiting for the echoes")
+    args = parser.parse_args()
+
+    print(f"round trip per event ({args.events} events, burst {args.burst})")
+    print(f"  shared-memory ring : {format_percentiles(bench_ring(args.events, args.burst))}")
+    print(f"  pipe (pickle)      : {format_percentiles(bench_pipe(args.events, args.burst))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+이벤트 모델 벤치마크: dict 이벤트(이전 방식)와 타입별 __slots__ 이벤트 + 재사용 풀 비교
+- 송신 큐에 쌓인 이벤트 하나가 차지하는 메모리 블록/바이트 (tracemalloc)
+- 캡처 -> 직렬화 -> 역직렬화 -> 디스패치 전체 경로의 이벤트당 시간, 캡처측 객체 생성 수,
+  GC 세대별 실행 횟수와 멈춤 시간 (GC는 살아남은 객체 수로 실행되므로 송신 큐가 밀릴 때(--batch 크게) 차이가 남)
+
+사용법:
+    python -m benchmarks.bench_events
+    python -m benchmarks.bench_events --events 500000 --batch 8
+"""
+
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+from src.events import (EventDecoder, KeyEvent, MovePool, MouseButton, MouseMove, serialize_event,
+                        MOUSE_MOVE, MOUSE_BUTTON, KEYBOARD)
+
+# 이동 이벤트 사이에 섞는 클릭/키 비율 (이벤트 N개마다 1개)
+OTHER_EVERY = 50
+
+
+class _Sink:
+    """디스패치 결과를 받아 최적화로 사라지지 않게 하는 대상"""
+
+    def __init__(self):
+        self.x = 0
+        self.other = 0
+        self.created = 0  # 캡처측에서 새로 만든 이벤트 객체 수
+
+
+def legacy_pipeline(events: int, batch_size: int, sink: _Sink):
+    """이전 방식: 이벤트마다 dict 생성, json 직렬화/역직렬화, 문자열 type 비교"""
+    batch = []
+    sink.created = events
+    for seq in range(events):
+        if seq % OTHER_EVERY == 0:
+            batch.append({'type': 'keyboard', 'key': 'a', 'pressed': True})
+        else:
+            batch.append({'type': 'mouse_move', 'x': seq & 1023, 'y': 500})
+        if len(batch) < batch_size:
+            continue
+
+        data = b''.join((json.dumps(event) + '\n').encode('utf-8') for event in batch)
+        batch = []
+        for line in data.split(b'\n'):
+            if not line:
+                continue
+            event = json.loads(line.decode('utf-8'))
+            event_type = event.get('type')
+            if event_type == 'mouse_move':
+                sink.x = event['x']
+            elif event_type == 'keyboard' or event_type == 'mouse_button':
+                sink.other += 1
+
+
+def typed_pipeline(events: int, batch_size: int, sink: _Sink):
+    """현재 방식: mouse_move는 풀에서 재사용, 수신은 디코더의 타입별 인스턴스 재사용, 정수 코드 비교"""
+    pool = MovePool()
+    decoder = EventDecoder()
+    batch = []
+    keys = 0
+    for seq in range(events):
+        if seq % OTHER_EVERY == 0:
+            batch.append(KeyEvent('a', True))
+            keys += 1
+        else:
+            batch.append(pool.acquire(seq & 1023, 500))
+        if len(batch) < batch_size:
+            continue
+
+        data = b''.join(serialize_event(event) for event in batch)
+        for event in batch:
+            pool.release(event)
+        batch = []
+        for line in data.split(b'\n'):
+            if not line:
+                continue
+            event = decoder.decode(line)
+            code = event.code
+            if code == MOUSE_MOVE:
+                sink.x = event.x
+            elif code == KEYBOARD or code == MOUSE_BUTTON:
+                sink.other += 1
+    sink.created = pool.created + keys
+
+
+def queued_footprint(make: Callable[[int], object], count: int = 10000) -> Dict[str, float]:
+    """송신 큐에 count개가 쌓였을 때 이벤트당 메모리 블록 수/바이트"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    queued = [make(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del queued
+    # 리스트 자체(포인터 배열)는 제외
+    return {'blocks': blocks / count, 'bytes': (size - 8 * count) / count}
+
+
+def run_pipeline(pipeline: Callable, events: int, batch_size: int) -> Dict[str, float]:
+    """gc.callbacks로 세대별 GC 실행 횟수와 멈춤 시간을 재면서 파이프라인 실행"""
+    collections = [0, 0, 0]
+    pauses: List[float] = []
+    started = [0.0]
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            started[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - started[0])
+            collections[info['generation']] += 1
+
+    sink = _Sink()
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    try:
+        start = time.perf_counter()
+        pipeline(events, batch_size, sink)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    return {
+        'us_per_event': elapsed / events * 1e6,
+        'created_per_event': sink.created / events,
+        'gen0': collections[0], 'gen1': collections[1], 'gen2': collections[2],
+        'gc_per_10k': sum(collections) / events * 10000,
+        'pause_total_ms': sum(pauses) * 1000,
+        'pause_max_ms': max(pauses) * 1000 if pauses else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocation and GC cost of dict vs typed events")
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=4, help="events per send batch")
+    args = parser.parse_args()
+
+    print("queued event footprint (per event)")
+    footprints = {
+        'dict mouse_move': lambda i: {'type': 'mouse_move', 'x': i, 'y': 500},
+        'MouseMove': lambda i: MouseMove(i, 500),
+        'dict mouse_button': lambda i: {'type': 'mouse_button', 'x': i, 'y': 500, 'button': 'Button.left',
+                                        'pressed': True},
+        'MouseButton': lambda i: MouseButton(i, 500, 'Button.left', True),
+    }
+    for name, make in footprints.items():
+        result = queued_footprint(make)
+        print(f"  {name:<18}: {result['blocks']:.2f} blocks  {result['bytes']:.0f} bytes")
+
+    print(f"\ncapture -> serialize -> decode -> dispatch ({args.events} events, batch {args.batch})")
+    for name, pipeline in (('dict', legacy_pipeline), ('typed+pool', typed_pipeline)):
+        result = run_pipeline(pipeline, args.events, args.batch)
+        print(f"  {name:<10}: {result['us_per_event']:.2f} us/event  "
+              f"new objects={result['created_per_event']:.3f}/event  "
+              f"gc gen0/1/2={result['gen0']}/{result['gen1']}/{result['gen2']} "
+              f"({result['gc_per_10k']:.2f} per 10k events)  "
+              f"pause total={result['pause_total_ms']:.2f}ms max={result['pause_max_ms']:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
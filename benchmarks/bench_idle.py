@@ -0,0 +1,107 @@
+"""
+유휴 상태 깨어남 벤치마크: 연결 대기/연결 후 입력 없음/검색 수신 중 스레드별 초당 깨어남 횟수
+/proc/self/task/<tid>/status의 문맥 전환 횟수(voluntary + nonvoluntary)로 측정 (Linux 전용)
+
+사용법:
+    python -m benchmarks.bench_idle
+    python -m benchmarks.bench_idle --window 10 --multipath
+"""
+
+import os
+import time
+import argparse
+import threading
+from typing import Dict, Tuple
+from benchmarks.harness import make_peer, wait_for
+from src.discovery import NetworkDiscovery
+
+
+def _task_switches() -> Dict[int, int]:
+    """스레드(tid)별 누적 문맥 전환 횟수"""
+    result = {}
+    for tid in os.listdir('/proc/self/task'):
+        try:
+            with open(f'/proc/self/task/{tid}/status') as f:
+                total = 0
+                for line in f:
+                    if line.startswith(('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches')):
+                        total += int(line.split()[1])
+                result[int(tid)] = total
+        except OSError:
+            continue  # 측정 중에 끝난 스레드
+    return result
+
+
+def measure(window: float) -> Tuple[float, Dict[str, float]]:
+    """window초 동안 메인 스레드를 제외한 스레드의 초당 깨어남 횟수 (합계, 스레드 이름별)"""
+    names = {t.native_id: t.name for t in threading.enumerate()}
+    main_tid = threading.main_thread().native_id
+    before = _task_switches()
+    time.sleep(window)
+    after = _task_switches()
+
+    per_thread = {}
+    for tid, count in after.items():
+        if tid == main_tid or tid not in before:
+            continue
+        rate = (count - before[tid]) / window
+        name = names.get(tid, str(tid))
+        per_thread[name] = per_thread.get(name, 0.0) + rate
+    return sum(per_thread.values()), per_thread
+
+
+def report(label: str, window: float):
+    total, per_thread = measure(window)
+    print(f"{label:<28}: {total:6.2f} wakeups/s")
+    for name, rate in sorted(per_thread.items(), key=lambda item: -item[1]):
+        if rate > 0:
+            print(f"    {name:<24} {rate:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Idle wakeups per second (Linux)")
+    parser.add_argument('--window', type=float, default=5.0, help="measurement window per scenario (s)")
+    parser.add_argument('--multipath', action='store_true', help="enable multipath (path probe thread)")
+    parser.add_argument('--base-port', type=int, default=24800)
+    args = parser.parse_args()
+
+    if not os.path.isdir('/proc/self/task'):
+        print("/proc/self/task is not available; this benchmark requires Linux")
+        return
+
+    port_a, port_b = args.base_port, args.base_port + 1
+    options = {'network.multipath': args.multipath}
+
+    # 1) 연결 대기 (remote 없음)
+    a = make_peer(port_a, **options)
+    a.start()
+    time.sleep(0.5)
+    report("listening, disconnected", args.window)
+
+    # 2) 연결 후 입력 없음
+    b = make_peer(port_b, remote_port=port_a, **options)
+    b.start()
+    try:
+        if wait_for(lambda: a.connected and b.connected, timeout=10) is None:
+            print("connection failed")
+            return
+        time.sleep(0.5)
+        report("connected, idle", args.window)
+    finally:
+        b.stop()
+        a.stop()
+    time.sleep(0.5)
+    report("after stop", args.window)
+
+    # 3) 검색 브로드캐스트 수신 대기
+    discovery = NetworkDiscovery(port=args.base_port + 2)
+    discovery.start_listening()
+    time.sleep(0.2)
+    report("discovery listening", args.window)
+    start = time.perf_counter()
+    discovery.stop_listening()
+    print(f"discovery stop took {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
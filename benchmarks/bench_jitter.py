@@ -0,0 +1,118 @@
+"""
+수신측 지터 버퍼 벤치마크: 일정한 간격으로 보낸 mouse_move가 수신측에서 얼마나 고르게 주입되는지 비교
+
+NetemProxy로 지터를 넣은 링크에서 지터 버퍼를 끈 경우/켠 경우의
+주입 간격 편차(송신 간격 대비)와 송신 -> 주입 지연을 출력한다.
+
+사용법:
+    python -m benchmarks.bench_jitter --profile office_wifi
+    python -m benchmarks.bench_jitter --profile busy_wifi --rate 125 --seconds 5 --max-delay-ms 60
+"""
+
+import time
+import argparse
+import statistics
+from benchmarks.harness import make_peer, wait_for, percentiles, format_percentiles
+from src.netem import NetemProxy, load_profile
+
+
+class _Recorder:
+    """mouse.Controller 대신 주입 시각과 위치를 기록"""
+
+    def __init__(self):
+        self.moves = []
+
+    @property
+    def position(self):
+        return self.moves[-1][1] if self.moves else (0, 0)
+
+    @position.setter
+    def position(self, pos):
+        self.moves.append((time.perf_counter(), pos))
+
+
+def run(profile: dict, base_port: int, rate: float, seconds: float, jitter: bool, max_delay_ms: float) -> dict:
+    port_a, port_b, port_proxy = base_port, base_port + 1, base_port + 2
+    proxy = NetemProxy(port_proxy, ('127.0.0.1', port_a), profile, seed=1)
+    proxy.start()
+
+    a = make_peer(port_a)
+    b = make_peer(port_b, remote_port=port_proxy, **{
+        'jitter_buffer.enabled': jitter,
+        'jitter_buffer.max_delay_ms': max_delay_ms,
+    })
+    recorder = _Recorder()
+    b.mouse_controller = recorder
+
+    a.start()
+    time.sleep(0.2)
+    b.start()
+    try:
+        if wait_for(lambda: a.connected and b.connected and a.remote_timestamps == jitter, timeout=10) is None:
+            return {'error': "connection failed"}
+
+        # 송신: 화면 안쪽에서 x를 10씩 늘리며 rate Hz로 전송 ((x, y)로 송신 시각을 찾음)
+        sent_at = {}
+        interval = 1.0 / rate
+        count = int(rate * seconds)
+        next_time = time.perf_counter()
+        for i in range(count):
+            x, y = 100 + (i % 150) * 10, 300 + (i // 150) % 400
+            sent_at[(x, y)] = time.perf_counter()
+            a._on_move(x, y)
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        time.sleep(0.5 + max_delay_ms / 1000.0)
+
+        # 보간 위치는 송신 샘플이 아니므로 지연 계산에서 제외 (송신 큐에서 병합된 위치를 보간으로 복원한 경우는 포함)
+        moves, seen = [], set()
+        for t, pos in recorder.moves:
+            if pos in sent_at and pos not in seen:
+                seen.add(pos)
+                moves.append((t, pos))
+        gaps = [t1 - t0 for (t0, _), (t1, _) in zip(moves, moves[1:])]
+        latencies = [t - sent_at[pos] for t, pos in moves]
+        return {
+            'injected': len(moves),
+            'sent': count,
+            'gap_stdev_ms': statistics.pstdev(gaps) * 1000 if gaps else 0.0,
+            'gap': percentiles(gaps),
+            'latency': percentiles(latencies),
+            'interpolated': b.m_jitter_interpolated.get(),
+            'late': b.m_jitter_late.get(),
+        }
+    finally:
+        a.stop()
+        b.stop()
+        proxy.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pointer smoothness with and without the jitter buffer")
+    parser.add_argument('--profile', default='office_wifi')
+    parser.add_argument('--profile-file')
+    parser.add_argument('--rate', type=float, default=125, help="mouse_move events per second")
+    parser.add_argument('--seconds', type=float, default=4)
+    parser.add_argument('--max-delay-ms', type=float, default=40)
+    parser.add_argument('--base-port', type=int, default=24200)
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile, args.profile_file)
+    print(f"profile {profile['name']}: {args.rate:.0f} Hz, send interval {1000 / args.rate:.2f}ms")
+    for i, jitter in enumerate((False, True)):
+        result = run(profile, args.base_port + i * 3, args.rate, args.seconds, jitter, args.max_delay_ms)
+        print(f"\n== jitter buffer {'on' if jitter else 'off'} ==")
+        if 'error' in result:
+            print(f"  {result['error']}")
+            continue
+        print(f"  injected        : {result['injected']}/{result['sent']}")
+        print(f"  injection gap   : stdev={result['gap_stdev_ms']:.3f}ms  {format_percentiles(result['gap'])}")
+        print(f"  send -> inject  : {format_percentiles(result['latency'])}")
+        if jitter:
+            print(f"  interpolated={result['interpolated']}  late={result['late']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+네트워크 조건 프로파일별 KMPeer 지연/제어권 전환 벤치마크
+
+두 KMPeer를 루프백에서 NetemProxy를 거쳐 연결하고, 프로파일마다
+mouse_move 지연 백분위수와 제어권 전환(handoff) 시간을 출력한다.
+
+사용법:
+    python -m benchmarks.bench_netem --profile office_wifi
+    python -m benchmarks.bench_netem --profile all --events 2000 --rate 500
+"""
+
+import time
+import argparse
+from benchmarks.harness import make_peer, wait_for, percentiles, format_percentiles, LatencyProbe
+from src.netem import NetemProxy, PROFILES, load_profile
+
+
+def run_profile(profile: dict, base_port: int, events: int, rate: float, handoffs: int) -> dict:
+    port_a, port_b, port_proxy = base_port, base_port + 1, base_port + 2
+
+    proxy = NetemProxy(port_proxy, ('127.0.0.1', port_a), profile, seed=1)
+    proxy.start()
+
+    # A: 서버 역할 (초기 제어권), B: 프록시를 거쳐 A에 연결
+    a = make_peer(port_a)
+    a.layout_position = 'right'
+    b = make_peer(port_b, remote_port=port_proxy)
+    b.layout_position = 'left'
+    probe = LatencyProbe(b)
+
+    a.start()
+    time.sleep(0.2)
+    b.start()
+
+    result = {'profile': profile['name']}
+    try:
+        if wait_for(lambda: a.connected and b.connected, timeout=10) is None:
+            result['error'] = "connection failed"
+            return result
+
+        probe.send_moves(a, events, rate)
+        probe.received.wait(timeout=30)
+        result['latency'] = percentiles(probe.latencies)
+        result['lost'] = events - len(probe.latencies)
+
+        # 제어권 전환 왕복: A -> B -> A
+        handoff_times = []
+        for _ in range(handoffs):
+            time.sleep(0.55)  # 전환 쿨다운
+            start = time.perf_counter()
+            a._on_move(a.screen_map.local_bounds[2] - 1, 500)
+            if wait_for(lambda: b.has_control, timeout=10) is None:
+                break
+            handoff_times.append(time.perf_counter() - start)
+
+            time.sleep(0.55)
+            start = time.perf_counter()
+            b._on_move(0, 500)
+            if wait_for(lambda: a.has_control, timeout=10) is None:
+                break
+            handoff_times.append(time.perf_counter() - start)
+
+        result['handoff'] = percentiles(handoff_times)
+        result['handoffs_completed'] = len(handoff_times)
+    finally:
+        a.stop()
+        b.stop()
+        proxy.stop()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KMPeer latency under emulated network conditions")
+    parser.add_argument('--profile', default='all', help="profile name or 'all'")
+    parser.add_argument('--profile-file', help="JSON file with additional profiles")
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=500, help="mouse_move events per second")
+    parser.add_argument('--handoffs', type=int, default=5, help="A->B->A handoff round trips")
+    parser.add_argument('--base-port', type=int, default=23400)
+    args = parser.parse_args()
+
+    names = sorted(PROFILES) if args.profile == 'all' else [args.profile]
+    for i, name in enumerate(names):
+        profile = load_profile(name, args.profile_file)
+        result = run_profile(profile, args.base_port + i * 10, args.events, args.rate, args.handoffs)
+
+        print(f"\n== {name} ==")
+        if 'error' in result:
+            print(f"  {result['error']}")
+            continue
+        print(f"  move latency : {format_percentiles(result['latency'])}  (lost {result['lost']})")
+        print(f"  handoff      : {format_percentiles(result['handoff'])}  "
+              f"({result['handoffs_completed']}/{args.handoffs * 2} completed)")
+
+
+if __name__ == "__main__":
+    main()
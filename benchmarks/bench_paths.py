@@ -0,0 +1,110 @@
+"""
+다중 경로 벤치마크: 인터페이스별 경로를 NetemProxy 두 개(127.0.0.2 / 127.0.0.3)로 흉내 내고
+연결 경쟁으로 고른 경로, 경로 품질 저하 후 전환까지 걸린 시간, 전환 전후 mouse_move 지연을 출력한다.
+
+사용법:
+    python -m benchmarks.bench_paths
+    python -m benchmarks.bench_paths --fast lan --slow vpn --degrade congested --probe-ms 200
+"""
+
+import time
+import argparse
+from benchmarks.harness import make_peer, wait_for, percentiles, format_percentiles, LatencyProbe
+from src.netem import NetemProxy, load_profile
+
+FAST_HOST = '127.0.0.2'
+SLOW_HOST = '127.0.0.3'
+
+
+def keep_active(sender, until, rate: float = 100, timeout: float = 30.0):
+    """until()이 참이 될 때까지 mouse_move를 계속 보냄 (경로 측정은 입력이 오가는 동안에만 실행됨)"""
+    start = time.perf_counter()
+    seq = 0
+    while time.perf_counter() - start < timeout:
+        if until():
+            return time.perf_counter() - start
+        sender._on_move(1200 + seq % 100, 300)
+        seq += 1
+        time.sleep(1.0 / rate)
+    return None
+
+
+def measure(probe: LatencyProbe, sender, events: int, rate: float) -> str:
+    # 이전 측정에서 합쳐지거나 유실된 시퀀스는 버리고 새로 측정
+    probe.sent_at.clear()
+    probe.latencies = []
+    probe.received.clear()
+    probe.expected = 0
+    probe.send_moves(sender, events, rate)
+    probe.received.wait(timeout=10)
+    return f"{format_percentiles(percentiles(probe.latencies))}  lost={events - len(probe.latencies)}"
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection racing and live path switching")
+    parser.add_argument('--fast', default='lan', help="profile of the initially faster path")
+    parser.add_argument('--slow', default='vpn', help="profile of the slower path")
+    parser.add_argument('--degrade', default='congested', help="profile applied to the fast path mid-run")
+    parser.add_argument('--probe-ms', type=float, default=200)
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=200)
+    parser.add_argument('--base-port', type=int, default=24700)
+    args = parser.parse_args()
+
+    port_a, port_b, port_proxy = args.base_port, args.base_port + 1, args.base_port + 2
+    fast = NetemProxy(port_proxy, ('127.0.0.1', port_a), load_profile(args.fast), listen_host=FAST_HOST, seed=1)
+    slow = NetemProxy(port_proxy, ('127.0.0.1', port_a), load_profile(args.slow), listen_host=SLOW_HOST, seed=2)
+    fast.start()
+    slow.start()
+
+    options = {'network.multipath': True, 'network.path_probe_ms': args.probe_ms}
+    a = make_peer(port_a, **options)
+    # B는 느린 경로를 먼저 알고 있음 (연결 경쟁으로 빠른 경로가 선택돼야 함)
+    b = make_peer(port_b, remote_port=port_proxy, **options,
+                  **{'remote.ip': SLOW_HOST, 'remote.addresses': [FAST_HOST]})
+    # 실제 인터페이스 주소로 프록시를 우회하지 않도록 추가 주소는 알리지 않음
+    a.local_addresses = []
+    b.local_addresses = []
+    probe = LatencyProbe(b)
+
+    a.start()
+    time.sleep(0.2)
+    b.start()
+    try:
+        connect_time = wait_for(lambda: a.connected and b.connected, timeout=10)
+        if connect_time is None:
+            print("connection failed")
+            return
+        wait_for(lambda: len(b.links) == 2, timeout=5)
+        print(f"connected in {connect_time * 1000:.1f}ms via {b.send_link.address} ({len(b.links)} paths)")
+
+        # 경로별 RTT가 측정될 때까지 입력을 보내며 대기
+        warmup_end = time.perf_counter() + args.probe_ms / 1000.0 * 5
+        keep_active(a, lambda: time.perf_counter() >= warmup_end)
+        for path in b.path_info():
+            print(f"  {path['address']}: rtt={path['rtt_ms']}ms{'  (active)' if path['active'] else ''}")
+        print(f"  move latency        : {measure(probe, a, args.events, args.rate)}")
+
+        active = b.send_link
+        proxy = fast if active.address == FAST_HOST else slow
+        proxy.profile.update(load_profile(args.degrade))
+        degrade_start = time.perf_counter()
+        print(f"\n{active.address} degraded to '{args.degrade}'")
+        switched = keep_active(a, lambda: b.send_link is not active and a.send_link is not None and
+                               a.send_link.key == b.send_link.key)
+        if switched is None:
+            print("  no path switch within 30s")
+        else:
+            print(f"  switched to {b.send_link.address} after {(time.perf_counter() - degrade_start) * 1000:.0f}ms")
+        print(f"  move latency        : {measure(probe, a, args.events, args.rate)}")
+        print(f"  path switches       : A={a.m_path_switches.get()} B={b.m_path_switches.get()}")
+    finally:
+        a.stop()
+        b.stop()
+        fast.stop()
+        slow.stop()
+
+
+if __name__ == "__main__":
+    main()
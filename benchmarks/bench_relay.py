@@ -0,0 +1,177 @@
+"""
+relay 벤치마크: 루프백에서 직접 연결과 relay 경유(splice / 버퍼 복사)를 비교
+- 작은 메시지 왕복 시간과 relay가 한 방향에 더하는 지연 ((경유 RTT - 직접 RTT) / 2)
+- 대량 전송 처리량
+- KMPeer 두 개를 relay로만 연결했을 때의 mouse_move 지연과 세션별 전달량
+
+사용법:
+    python -m benchmarks.bench_relay
+    python -m benchmarks.bench_relay --count 20000 --bulk-mb 256 --base-port 24900
+"""
+
+import time
+import socket
+import argparse
+import threading
+from typing import Callable, List, Tuple
+from benchmarks.harness import make_peer, wait_for, percentiles, format_percentiles, LatencyProbe
+from src.metrics import MetricsRegistry
+from src.relay import RelayServer, request_relay
+
+SESSION = 'bench'
+
+
+def _recv_exact(sock: socket.socket, size: int, buffer: bytearray) -> bool:
+    view = memoryview(buffer)[:size]
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            return False
+        received += count
+    return True
+
+
+def _nodelay(sock: socket.socket) -> socket.socket:
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def direct_pair() -> Tuple[socket.socket, socket.socket]:
+    """루프백 직접 TCP 연결 한 쌍"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    client = socket.create_connection(server.getsockname())
+    accepted, _ = server.accept()
+    server.close()
+    return _nodelay(client), _nodelay(accepted)
+
+
+def relay_pair(relay: RelayServer) -> Tuple[socket.socket, socket.socket]:
+    """relay를 거친 TCP 연결 한 쌍 (같은 세션 이름으로 합류)"""
+    first = socket.create_connection(('127.0.0.1', relay.port))
+    second = socket.create_connection(('127.0.0.1', relay.port))
+    roles = {}
+    waiter = threading.Thread(target=lambda: roles.setdefault('first', request_relay(first, SESSION)))
+    waiter.start()
+    time.sleep(0.05)  # 먼저 온 쪽이 대기 목록에 등록되도록
+    roles['second'] = request_relay(second, SESSION)
+    waiter.join()
+    return _nodelay(first), _nodelay(second)
+
+
+def ping_pong(pair: Tuple[socket.socket, socket.socket], count: int, size: int) -> List[float]:
+    """size 바이트 메시지 왕복 시간 (초)"""
+    client, server = pair
+    payload = b'x' * size
+
+    def echo():
+        buffer = bytearray(size)
+        while _recv_exact(server, size, buffer):
+            server.sendall(buffer)
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    buffer = bytearray(size)
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.sendall(payload)
+        if not _recv_exact(client, size, buffer):
+            break
+        samples.append(time.perf_counter() - start)
+    client.close()
+    thread.join(timeout=2)
+    server.close()
+    return samples
+
+
+def bulk(pair: Tuple[socket.socket, socket.socket], total: int) -> float:
+    """total 바이트를 한 방향으로 보낸 처리량 (MB/s)"""
+    sender, receiver = pair
+    chunk = b'\0' * (256 * 1024)
+    done = threading.Event()
+
+    def drain():
+        buffer = bytearray(256 * 1024)
+        received = 0
+        while received < total:
+            count = receiver.recv_into(buffer)
+            if not count:
+                break
+            received += count
+        done.set()
+
+    threading.Thread(target=drain, daemon=True).start()
+    start = time.perf_counter()
+    sent = 0
+    while sent < total:
+        sender.sendall(chunk)
+        sent += len(chunk)
+    done.wait(timeout=60)
+    elapsed = time.perf_counter() - start
+    sender.close()
+    receiver.close()
+    return total / elapsed / 1e6
+
+
+def raw_benchmarks(args, make_pair: Callable, label: str, baseline: float = 0.0) -> float:
+    stats = percentiles(ping_pong(make_pair(), args.count, args.size))
+    added = f"  added per direction p50={(stats['p50'] - baseline) / 2 * 1000:.1f}us" if baseline else ''
+    print(f"{label:<14} rtt {format_percentiles(stats)}{added}")
+    print(f"{'':<14} bulk {bulk(make_pair(), args.bulk_mb * 1024 * 1024):.0f} MB/s")
+    return stats['p50']
+
+
+def peer_latency(args, relay: RelayServer) -> None:
+    """relay로만 연결된 KMPeer 두 개의 mouse_move 지연"""
+    options = {'relay.address': f'127.0.0.1:{relay.port}', 'relay.session': SESSION}
+    a = make_peer(args.base_port, **options)
+    b = make_peer(args.base_port + 1, **options)
+    a.start()
+    b.start()
+    try:
+        if wait_for(lambda: a.connected and b.connected, timeout=10) is None:
+            print("peers did not connect through the relay")
+            return
+        sender, receiver = (a, b) if a.has_control else (b, a)
+        probe = LatencyProbe(receiver)
+        probe.send_moves(sender, args.events, args.rate)
+        probe.received.wait(timeout=3)  # 송신 큐에서 합쳐진 이동은 도착하지 않음
+        print(f"peers via relay  mouse_move {format_percentiles(percentiles(probe.latencies))}  "
+              f"lost={args.events - len(probe.latencies)}  paths={sender.path_info()}")
+    finally:
+        b.stop()
+        a.stop()
+    time.sleep(0.2)
+    for session in relay.sessions():
+        print(f"  session #{session['session']} {session['addresses']} bytes={session['bytes']} "
+              f"chunks={session['chunks']} duration={session['duration_s']}s active={session['active']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay forwarding latency and throughput on loopback")
+    parser.add_argument('--count', type=int, default=5000, help="ping-pong round trips per mode")
+    parser.add_argument('--size', type=int, default=64, help="ping-pong message size (bytes)")
+    parser.add_argument('--bulk-mb', type=int, default=64)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--rate', type=float, default=500)
+    parser.add_argument('--base-port', type=int, default=24900)
+    args = parser.parse_args()
+
+    baseline = raw_benchmarks(args, direct_pair, "direct")
+    for use_splice in (True, False):
+        relay = RelayServer(port=0, use_splice=use_splice, registry=MetricsRegistry())
+        relay.start()
+        try:
+            raw_benchmarks(args, lambda: relay_pair(relay), "relay splice" if relay.use_splice else "relay copy",
+                           baseline)
+            if use_splice:
+                peer_latency(args, relay)
+        finally:
+            relay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+벤치마크 공통 도구: 루프백에서 KMPeer 두 개를 연결하고 이벤트 지연을 측정
+실제 마우스/키보드는 건드리지 않도록 컨트롤러는 비활성화하고, 리스너는 OS 훅 없이 스레드만 도는
+FakeListener로 바꿔 제어권 전환 때의 리스너 시작/중지 경로는 그대로 실행한다.
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional
+from src.events import MOUSE_MOVE
+from src.metrics import MetricsRegistry
+from src.peer import KMPeer
+
+
+class FakeListener(threading.Thread):
+    """pynput Listener와 같은 인터페이스(start/stop/join)의 가짜 리스너. emit()으로 콜백에 입력을 넣음"""
+
+    # 전체 시작/중지 횟수 (리스너 교체가 실제로 일어나는지 확인용)
+    starts = 0
+    stops = 0
+
+    def __init__(self, **callbacks):
+        super().__init__(daemon=True)
+        self.callbacks = callbacks
+        self.stop_event = threading.Event()
+
+    def start(self):
+        FakeListener.starts += 1
+        super().start()
+
+    def run(self):
+        self.stop_event.wait()
+
+    def stop(self):
+        if not self.stop_event.is_set():
+            FakeListener.stops += 1
+            self.stop_event.set()
+
+    def emit(self, name: str, *args) -> bool:
+        callback = self.callbacks.get(name)
+        if callback is None or self.stop_event.is_set():
+            return False
+        callback(*args)
+        return True
+
+
+class FakeInputBackend:
+    """KMPeer.listener_backends 자리에 넣는 mouse/keyboard 모듈 대용"""
+    Listener = FakeListener
+
+
+def emit(peer: KMPeer, name: str, *args) -> bool:
+    """실행 중인 가짜 리스너의 콜백(name: on_move/on_press 등)으로 입력 전달. 리스너가 없으면 False"""
+    listener = peer.keyboard_listener if name in ('on_press', 'on_release') else peer.mouse_listener
+    return isinstance(listener, FakeListener) and listener.emit(name, *args)
+
+
+def active_listeners() -> int:
+    """아직 중지되지 않은 가짜 리스너 스레드 수"""
+    return sum(1 for thread in threading.enumerate()
+               if isinstance(thread, FakeListener) and not thread.stop_event.is_set())
+
+
+class DictConfig:
+    """ConfigManager와 같은 get/set 인터페이스의 메모리 설정 (파일 저장 없음)"""
+
+    def __init__(self, values: Dict):
+        self.values = dict(values)
+
+    def get(self, key_path: str, default=None):
+        return self.values.get(key_path, default)
+
+    def set(self, key_path: str, value):
+        self.values[key_path] = value
+
+
+def make_peer(listen_port: int, remote_port: Optional[int] = None, **overrides) -> KMPeer:
+    """컨트롤러가 비활성화되고 가짜 리스너를 쓰는 벤치마크용 KMPeer 생성"""
+    values = {
+        'network.port': listen_port,
+        'remote.port': remote_port or 0,
+        'remote.ip': '127.0.0.1' if remote_port else '',
+        'local.screen_width': 1920,
+        'local.screen_height': 1080,
+        'remote.screen_width': 1920,
+        'remote.screen_height': 1080,
+        # 루프백 측정이 다른 인터페이스 경로로 바뀌지 않도록 단일 경로
+        'network.multipath': False,
+    }
+    values.update(overrides)
+
+    peer = KMPeer(DictConfig(values), MetricsRegistry())
+    peer.mouse_controller = None
+    peer.keyboard_controller = None
+    peer.listener_backends = (FakeInputBackend, FakeInputBackend)
+    return peer
+
+
+class LatencyProbe:
+    """
+    송신측 mouse_move의 (x, y) 좌표를 시퀀스 번호로 사용해 수신측 디스패치까지의 지연을 측정
+    """
+
+    def __init__(self, receiver: KMPeer):
+        self.sent_at: Dict[tuple, float] = {}
+        self.latencies: List[float] = []
+        self.received = threading.Event()
+        self.expected = 0
+
+        dispatch = receiver._dispatch_event
+
+        def probe(event):
+            if event.code == MOUSE_MOVE:
+                sent = self.sent_at.pop((event.x, event.y), None)
+                if sent is not None:
+                    self.latencies.append(time.perf_counter() - sent)
+                    if len(self.latencies) >= self.expected:
+                        self.received.set()
+            dispatch(event)
+
+        receiver._dispatch_event = probe
+
+    def send_moves(self, sender: KMPeer, count: int, rate: float, y: int = 500):
+        """count개의 mouse_move를 rate(Hz)로 전송"""
+        self.expected += count
+        interval = 1.0 / rate
+        next_time = time.perf_counter()
+        for seq in range(count):
+            # 경계 감지를 피하도록 화면 안쪽 좌표 (송신 큐에서 합쳐져 도착하지 않는 좌표가 있어도 겹치지 않게 y까지 사용)
+            position = (100 + seq % 1000, y + (seq // 1000) % 200)
+            while position in self.sent_at:
+                time.sleep(0.0005)
+            self.sent_at[position] = time.perf_counter()
+            sender._on_move(*position)
+
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def wait_for(predicate, timeout: float = 5.0, interval: float = 0.001) -> Optional[float]:
+    """predicate가 참이 될 때까지 대기, 걸린 시간 반환 (타임아웃시 None)"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if predicate():
+            return time.perf_counter() - start
+        time.sleep(interval)
+    return None
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """밀리초 단위 백분위수"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        result[f'p{p}'] = ordered[index] * 1000
+    result['max'] = ordered[-1] * 1000
+    return result
+
+
+def format_percentiles(stats: Dict[str, float]) -> str:
+    return '  '.join(f"{k}={v:.3f}ms" for k, v in stats.items()) if stats else 'no samples'
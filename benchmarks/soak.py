@@ -0,0 +1,289 @@
+"""
+장시간 soak 테스트: 루프백의 KMPeer 두 개에 합성 입력을 계속 보내며 자원/지연 변화를 추적
+
+샘플 주기마다 RSS, tracemalloc 상위 할당 위치, 스레드 수, 열린 fd 수, mouse_move 지연 백분위수를 기록하고
+워밍업 이후 첫 샘플(기준값)보다 설정한 임계값 이상 늘어나면 실패(종료 코드 1)한다.
+
+사용법:
+    python -m benchmarks.soak --duration 3600 --sample-interval 60
+    python -m benchmarks.soak --duration 120 --sample-interval 10 --report soak.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+from benchmarks import harness
+from benchmarks.harness import FakeListener, active_listeners, emit, make_peer, wait_for, percentiles, format_percentiles
+from src.events import MOUSE_MOVE
+
+
+def rss_bytes() -> Optional[int]:
+    """현재 RSS (Linux /proc, 그 외에는 최대 RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+def open_fds() -> Optional[int]:
+    for path in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+class _SoakProbe:
+    """
+    mouse_move 좌표(x, y)를 시퀀스로 사용하는 지연 측정
+    송신 큐에서 병합된 이벤트는 도착하지 않으므로 오래된 항목은 주기적으로 정리한다.
+    """
+
+    def __init__(self, receiver):
+        self.sent_at: Dict[tuple, float] = {}
+        self.latencies: List[float] = []
+        self.seq = 0
+        self.lock = threading.Lock()
+
+        dispatch = receiver._dispatch_event
+
+        def probe(event):
+            if event.code == MOUSE_MOVE:
+                with self.lock:
+                    sent = self.sent_at.pop((event.x, event.y), None)
+                if sent is not None:
+                    self.latencies.append(time.perf_counter() - sent)
+            dispatch(event)
+
+        receiver._dispatch_event = probe
+
+    def next_position(self):
+        # 경계 감지를 피하도록 화면 안쪽 좌표만 사용
+        seq = self.seq
+        self.seq += 1
+        return 100 + seq % 1000, 100 + (seq // 1000) % 800
+
+    def send(self, sender, x: int, y: int):
+        with self.lock:
+            self.sent_at[(x, y)] = time.perf_counter()
+        if not emit(sender, 'on_move', x, y):
+            # 제어권 전환 중이라 리스너가 없음 (실제 훅도 이 입력을 받지 않음)
+            with self.lock:
+                self.sent_at.pop((x, y), None)
+
+    def take_window(self, max_age: float = 5.0) -> List[float]:
+        """구간 지연 목록을 꺼내고 도착하지 않은(병합된) 오래된 항목 정리"""
+        cutoff = time.perf_counter() - max_age
+        with self.lock:
+            self.sent_at = {k: t for k, t in self.sent_at.items() if t >= cutoff}
+            window, self.latencies = self.latencies, []
+        return window
+
+
+class SoakTest:
+    """두 peer를 연결한 채로 합성 입력(이동/키/스크롤/제어권 전환)을 반복하며 샘플링"""
+
+    def __init__(self, args):
+        self.args = args
+        self.samples: List[dict] = []
+        self.baseline: Optional[dict] = None
+        self.baseline_snapshot = None
+        self.violations: List[str] = []
+
+    def run(self) -> bool:
+        args = self.args
+        tracemalloc.start(args.traceback_depth)
+
+        a = make_peer(args.base_port)
+        a.layout_position = 'right'
+        b = make_peer(args.base_port + 1, remote_port=args.base_port)
+        b.layout_position = 'left'
+        probe = _SoakProbe(b)
+
+        a.start()
+        time.sleep(0.2)
+        b.start()
+        try:
+            if wait_for(lambda: a.connected and b.connected, timeout=10) is None:
+                print("Soak: peers failed to connect")
+                return False
+
+            start = time.perf_counter()
+            next_sample = start + args.sample_interval
+            next_handoff = start + args.handoff_interval
+            while time.perf_counter() - start < args.duration:
+                self._drive_one_second(a, probe)
+
+                if args.handoff_interval and time.perf_counter() >= next_handoff:
+                    self._handoff_round_trip(a, b)
+                    next_handoff += args.handoff_interval
+
+                if time.perf_counter() >= next_sample:
+                    next_sample += args.sample_interval
+                    sample = self._sample(time.perf_counter() - start, probe.take_window(), a, b)
+                    if not self._check(sample) and args.fail_fast:
+                        break
+        finally:
+            a.stop()
+            b.stop()
+            tracemalloc.stop()
+
+        return not self.violations
+
+    def _drive_one_second(self, a, probe: _SoakProbe):
+        """1초 동안 rate Hz로 mouse_move, 사이사이 키 입력/스크롤/클릭 (모두 A의 리스너 콜백으로)"""
+        rate = self.args.rate
+        interval = 1.0 / rate
+        next_time = time.perf_counter()
+        for i in range(int(rate)):
+            x, y = probe.next_position()
+            probe.send(a, x, y)
+            if i % 50 == 0:
+                emit(a, 'on_press', 'a')
+                emit(a, 'on_release', 'a')
+                emit(a, 'on_scroll', x, y, 0, 1)
+            if i % 200 == 0:
+                emit(a, 'on_click', x, y, 'Button.left', True)
+                emit(a, 'on_click', x, y, 'Button.left', False)
+
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    @staticmethod
+    def _handoff_round_trip(a, b):
+        """제어권 A -> B -> A (가짜 리스너 시작/중지와 키 정리 경로)"""
+        time.sleep(0.55)  # 전환 쿨다운
+        emit(a, 'on_move', a.screen_map.local_bounds[2] - 1, 500)
+        if wait_for(lambda: b.has_control, timeout=5) is None:
+            return
+        time.sleep(0.55)
+        emit(b, 'on_move', 0, 500)
+        wait_for(lambda: a.has_control and a.mouse_listener is not None, timeout=5)
+
+    def _sample(self, elapsed: float, latencies: List[float], a, b) -> dict:
+        # soak 자체가 보관하는 샘플/지연 목록은 제외하고 KMPeer 쪽 할당만 본다
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, harness.__file__),
+        ))
+        traced = sum(stat.size for stat in snapshot.statistics('filename'))
+        sample = {
+            'elapsed': round(elapsed, 1),
+            'rss': rss_bytes(),
+            'traced': traced,
+            'threads': threading.active_count(),
+            # 제어권이 있는 쪽의 mouse/keyboard 2개만 살아 있어야 함
+            'listeners': active_listeners(),
+            'listener_starts': FakeListener.starts,
+            'fds': open_fds(),
+            'latency': percentiles(latencies),
+            'events': len(latencies),
+            'connected': a.connected and b.connected,
+            'top': [str(stat) for stat in snapshot.statistics('lineno')[:self.args.top]],
+        }
+        self.samples.append(sample)
+
+        if len(self.samples) == self.args.warmup + 1:
+            self.baseline = sample
+            self.baseline_snapshot = snapshot
+        elif self.baseline_snapshot is not None:
+            sample['top_growth'] = [str(stat) for stat in
+                                    snapshot.compare_to(self.baseline_snapshot, 'lineno')[:self.args.top]]
+
+        rss = f"{sample['rss'] / 2 ** 20:.1f}MB" if sample['rss'] is not None else 'n/a'
+        print(f"[{sample['elapsed']:>7.0f}s] rss={rss}  traced={traced / 2 ** 20:.2f}MB  "
+              f"threads={sample['threads']}  listeners={sample['listeners']}/{sample['listener_starts']}  "
+              f"fds={sample['fds']}  events={sample['events']}  "
+              f"{format_percentiles(sample['latency'])}")
+        return sample
+
+    def _check(self, sample: dict) -> bool:
+        """기준값 대비 변화가 임계값 안인지 확인"""
+        base = self.baseline
+        if base is None or sample is base:
+            return True
+
+        args = self.args
+        problems = []
+        if not sample['connected']:
+            problems.append("peers disconnected")
+        if sample['listeners'] > 2:
+            problems.append(f"{sample['listeners']} listeners running (stopped listeners leaked)")
+        if sample['rss'] is not None and base['rss'] is not None:
+            growth = (sample['rss'] - base['rss']) / 2 ** 20
+            if growth > args.max_rss_growth_mb:
+                problems.append(f"RSS grew {growth:.1f}MB (limit {args.max_rss_growth_mb}MB)")
+        growth = (sample['traced'] - base['traced']) / 2 ** 20
+        if growth > args.max_traced_growth_mb:
+            problems.append(f"traced memory grew {growth:.2f}MB (limit {args.max_traced_growth_mb}MB)")
+        if sample['threads'] - base['threads'] > args.max_thread_growth:
+            problems.append(f"threads {base['threads']} -> {sample['threads']}")
+        if sample['fds'] is not None and base['fds'] is not None and \
+                sample['fds'] - base['fds'] > args.max_fd_growth:
+            problems.append(f"open fds {base['fds']} -> {sample['fds']}")
+        p99, base_p99 = sample['latency'].get('p99'), base['latency'].get('p99')
+        if p99 is not None and base_p99 is not None and \
+                p99 > max(base_p99 * args.max_p99_ratio, base_p99 + args.p99_floor_ms):
+            problems.append(f"p99 latency {base_p99:.3f}ms -> {p99:.3f}ms")
+
+        for problem in problems:
+            message = f"at {sample['elapsed']:.0f}s: {problem}"
+            self.violations.append(message)
+            print(f"DRIFT {message}")
+        if problems and sample.get('top_growth'):
+            print("  top allocation growth since baseline:")
+            for line in sample['top_growth']:
+                print(f"    {line}")
+        return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running KMPeer soak test with drift detection")
+    parser.add_argument('--duration', type=float, default=3600, help="seconds")
+    parser.add_argument('--sample-interval', type=float, default=60, help="seconds between samples")
+    parser.add_argument('--warmup', type=int, default=1, help="samples to skip before taking the baseline")
+    parser.add_argument('--rate', type=float, default=200, help="mouse_move events per second")
+    parser.add_argument('--handoff-interval', type=float, default=10, help="seconds between handoff round trips (0 = off)")
+    parser.add_argument('--top', type=int, default=5, help="tracemalloc entries to record")
+    parser.add_argument('--traceback-depth', type=int, default=1)
+    parser.add_argument('--max-rss-growth-mb', type=float, default=20)
+    parser.add_argument('--max-traced-growth-mb', type=float, default=5)
+    parser.add_argument('--max-thread-growth', type=int, default=2)
+    parser.add_argument('--max-fd-growth', type=int, default=4)
+    parser.add_argument('--max-p99-ratio', type=float, default=3.0)
+    parser.add_argument('--p99-floor-ms', type=float, default=5.0, help="ignore p99 increases smaller than this")
+    parser.add_argument('--fail-fast', action='store_true', help="stop at the first drift")
+    parser.add_argument('--report', help="write samples and violations to this JSON file")
+    parser.add_argument('--base-port', type=int, default=23900)
+    args = parser.parse_args()
+
+    soak = SoakTest(args)
+    ok = soak.run()
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'ok': ok, 'violations': soak.violations, 'samples': soak.samples}, f, indent=2)
+
+    print("Soak passed" if ok else f"Soak FAILED ({len(soak.violations)} drift violations)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,75 @@
 """
 KM-Share - Keyboard & Mouse Sharing
 Mouse without Borders 스타일의 KM 공유 애플리케이션
+
+사용법:
+    python km_share.py                      # GUI 모드
+    python km_share.py --daemon             # 헤드리스 데몬 모드 (Tk 미사용)
+    python km_share.py --relay              # 다른 서브넷의 peer 사이 연결 중계 (입력 캡처 없음)
+    python km_share.py --ctl status         # 실행 중인 데몬에 제어 명령 전송
+    python km_share.py --ctl layout left
 """
 
 import sys
-from src.gui import main
+import json
+import argparse
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="KM-Share - Keyboard & Mouse Sharing")
+    parser.add_argument('--daemon', action='store_true', help="run headless without the Tk GUI")
+    parser.add_argument('--relay', action='store_true', help="run as a relay between peers on different subnets")
+    parser.add_argument('--no-autostart', action='store_true', help="daemon: wait for a 'start' command")
+    parser.add_argument('--config', default='km_share_config.json', help="config file path")
+    parser.add_argument('--control-socket',
+                        help="daemon control socket path (default: $XDG_RUNTIME_DIR/km_share.sock, "
+                             "else km_share.sock in the per-user config directory)")
+    parser.add_argument('--ctl', nargs='+', metavar='CMD',
+                        help="send a command to a running daemon (status|start|stop|layout POS|remote IP|discover|peers|metrics|instrument|profile|tracemalloc [start|stop]|shutdown)")
+    return parser.parse_args(argv)
+
+
+def run_ctl(args) -> int:
+    from src.daemon import default_control_socket, send_control_command
+
+    cmd, *rest = args.ctl
+    request = {'cmd': cmd}
+    if cmd == 'layout' and rest:
+        request['position'] = rest[0]
+    elif cmd == 'remote' and rest:
+        request['ip'] = rest[0]
+    elif cmd in ('instrument', 'profile', 'tracemalloc') and rest:
+        request['action'] = rest[0]
+
+    socket_path = args.control_socket or default_control_socket()
+    try:
+        response = send_control_command(request, socket_path)
+    except OSError as e:
+        print(f"Failed to reach daemon at {socket_path}: {e}")
+        return 1
+    except ValueError as e:
+        print(f"Invalid reply from daemon at {socket_path}: {e}")
+        return 1
+
+    if cmd == 'metrics' and response.get('ok'):
+        print(response['metrics'], end='')
+    else:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    return 0 if response.get('ok') else 1
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+
+    if args.ctl:
+        sys.exit(run_ctl(args))
+    elif args.relay:
+        # 입력 캡처/주입 모듈을 로드하지 않음
+        from src.relay import main as relay_main
+        relay_main(args.config)
+    elif args.daemon:
+        # Tk를 로드하지 않도록 데몬 모듈만 import
+        from src.daemon import main as daemon_main
+        sys.exit(daemon_main(args.control_socket, args.config, autostart=not args.no_autostart))
+    else:
+        from src.gui import main
+        main(args.control_socket)
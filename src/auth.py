@@ -0,0 +1,201 @@
+import os
+import hmac
+import json
+import struct
+import socket
+import hashlib
+from typing import Optional, Tuple
+
+# 사전 공유 키 유도 파라미터 (연결마다가 아니라 시작할 때 한 번만 계산)
+KDF_SALT = b'km-share-psk-v1'
+KDF_ITERATIONS = 100000
+
+NONCE_SIZE = 16
+MAC_SIZE = 16  # HMAC-SHA256 앞 16바이트
+MAX_FRAME_SIZE = 1 << 20
+HANDSHAKE_TIMEOUT = 3.0
+
+
+class AuthenticationError(Exception):
+    """핸드셰이크 실패 또는 프레임 MAC 검증 실패"""
+
+
+def derive_key(psk: str) -> bytes:
+    """사전 공유 키 문자열에서 마스터 키 유도"""
+    return hashlib.pbkdf2_hmac('sha256', psk.encode('utf-8'), KDF_SALT, KDF_ITERATIONS)
+
+
+def _mac(key: bytes, *parts: bytes) -> bytes:
+    return hmac.new(key, b''.join(parts), hashlib.sha256).digest()
+
+
+class FrameSealer:
+    """송신 방향: 페이로드(이벤트 묶음)를 시퀀스 번호 + MAC 헤더가 붙은 프레임으로 감쌈"""
+
+    def __init__(self, key: bytes):
+        self._base = hmac.new(key, digestmod=hashlib.sha256)
+        self.seq = 0
+
+    def seal(self, payload: bytes) -> bytes:
+        """프레임 형식: b'#<seq> <len> <mac hex>\\n' + payload (호출자가 직렬화해야 함)"""
+        seq = self.seq
+        self.seq += 1
+        mac = self._base.copy()
+        mac.update(struct.pack('>Q', seq))
+        mac.update(payload)
+        header = b'#%x %d %s\n' % (seq, len(payload), mac.hexdigest()[:MAC_SIZE * 2].encode('ascii'))
+        return header + payload
+
+
+class FrameOpener:
+    """수신 방향: 스트림에서 프레임을 잘라내고 MAC/시퀀스를 검증해 페이로드를 반환"""
+
+    def __init__(self, key: bytes):
+        self._base = hmac.new(key, digestmod=hashlib.sha256)
+        self.seq = 0
+        self.buffer = b''
+
+    def feed(self, data: bytes) -> bytes:
+        """수신 데이터를 넣고 검증된 페이로드를 이어붙여 반환 (검증 실패시 AuthenticationError)"""
+        self.buffer += data
+        payloads = []
+
+        while True:
+            newline = self.buffer.find(b'\n')
+            if newline < 0:
+                if len(self.buffer) > 128:
+                    raise AuthenticationError("Frame header too long")
+                break
+
+            header = self.buffer[:newline]
+            try:
+                if not header.startswith(b'#'):
+                    raise ValueError
+                seq_hex, length, mac_hex = header[1:].split(b' ')
+                seq, length = int(seq_hex, 16), int(length)
+            except ValueError:
+                raise AuthenticationError("Malformed frame header")
+
+            if length > MAX_FRAME_SIZE:
+                raise AuthenticationError("Frame too large")
+
+            end = newline + 1 + length
+            if len(self.buffer) < end:
+                break
+
+            payload = self.buffer[newline + 1:end]
+            if seq != self.seq:
+                raise AuthenticationError(f"Unexpected frame sequence {seq} (expected {self.seq})")
+
+            mac = self._base.copy()
+            mac.update(struct.pack('>Q', seq))
+            mac.update(payload)
+            if not hmac.compare_digest(mac.hexdigest()[:MAC_SIZE * 2].encode('ascii'), mac_hex):
+                raise AuthenticationError("Frame MAC mismatch")
+
+            self.seq += 1
+            self.buffer = self.buffer[end:]
+            payloads.append(payload)
+
+        return b''.join(payloads)
+
+
+class AuthSession:
+    """핸드셰이크로 합의된 방향별 프레임 키"""
+
+    def __init__(self, master_key: bytes, client_nonce: bytes, server_nonce: bytes, is_server: bool):
+        c2s = _mac(master_key, b'c2s', client_nonce, server_nonce)
+        s2c = _mac(master_key, b's2c', client_nonce, server_nonce)
+        send_key, recv_key = (s2c, c2s) if is_server else (c2s, s2c)
+        self.sealer = FrameSealer(send_key)
+        self.opener = FrameOpener(recv_key)
+
+
+class _LineReader:
+    """핸드셰이크용 줄 단위 읽기 (남은 바이트는 보존)"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = b''
+
+    def read_message(self) -> dict:
+        while b'\n' not in self.buffer:
+            data = self.sock.recv(1024)
+            if not data:
+                raise AuthenticationError("Connection closed during handshake")
+            self.buffer += data
+            if len(self.buffer) > 4096:
+                raise AuthenticationError("Handshake message too long")
+
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        try:
+            return json.loads(line.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise AuthenticationError("Malformed handshake message")
+
+
+def _send_message(sock: socket.socket, message: dict):
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def _expect(message: dict, msg_type: str, *fields: str) -> Tuple[bytes, ...]:
+    if message.get('type') != msg_type:
+        raise AuthenticationError(f"Expected {msg_type}, got {message.get('type')}")
+    try:
+        return tuple(bytes.fromhex(message[field]) for field in fields)
+    except (KeyError, TypeError, ValueError):
+        raise AuthenticationError(f"Malformed {msg_type}")
+
+
+def perform_handshake(sock: socket.socket, master_key: bytes, is_server: bool,
+                      timeout: float = HANDSHAKE_TIMEOUT) -> Tuple[AuthSession, bytes]:
+    """
+    사전 공유 키 기반 상호 챌린지-응답 핸드셰이크
+    client -> server: auth_hello(Nc)
+    server -> client: auth_challenge(Ns, HMAC(k, 'server' | Nc | Ns))
+    client -> server: auth_response(HMAC(k, 'client' | Ns | Nc))
+    server -> client: auth_ok
+    반환: (세션, 핸드셰이크 후 이미 수신된 바이트)
+    """
+    previous_timeout = sock.gettimeout()
+    sock.settimeout(timeout)
+    reader = _LineReader(sock)
+    try:
+        if is_server:
+            client_nonce, = _expect(reader.read_message(), 'auth_hello', 'nonce')
+            server_nonce = os.urandom(NONCE_SIZE)
+            _send_message(sock, {
+                'type': 'auth_challenge',
+                'nonce': server_nonce.hex(),
+                'mac': _mac(master_key, b'server', client_nonce, server_nonce).hex(),
+            })
+            client_mac, = _expect(reader.read_message(), 'auth_response', 'mac')
+            if not hmac.compare_digest(client_mac, _mac(master_key, b'client', server_nonce, client_nonce)):
+                raise AuthenticationError("Peer failed authentication")
+            _send_message(sock, {'type': 'auth_ok'})
+        else:
+            client_nonce = os.urandom(NONCE_SIZE)
+            _send_message(sock, {'type': 'auth_hello', 'nonce': client_nonce.hex()})
+            server_nonce, server_mac = _expect(reader.read_message(), 'auth_challenge', 'nonce', 'mac')
+            if not hmac.compare_digest(server_mac, _mac(master_key, b'server', client_nonce, server_nonce)):
+                raise AuthenticationError("Peer failed authentication")
+            _send_message(sock, {
+                'type': 'auth_response',
+                'mac': _mac(master_key, b'client', server_nonce, client_nonce).hex(),
+            })
+            _expect(reader.read_message(), 'auth_ok')
+    except socket.timeout:
+        raise AuthenticationError("Handshake timed out")
+    finally:
+        try:
+            sock.settimeout(previous_timeout)
+        except OSError:
+            pass
+
+    return AuthSession(master_key, client_nonce, server_nonce, is_server), reader.buffer
+
+
+def load_master_key(config) -> Optional[bytes]:
+    """설정의 security.psk에서 마스터 키 유도 (설정되지 않으면 None)"""
+    psk = config.get('security.psk', '')
+    return derive_key(psk) if psk else None
@@ -0,0 +1,341 @@
+import hmac
+import json
+import time
+import socket
+import logging
+import threading
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from src.events import Event, KeyEvent, MouseButton, MouseScroll, TextEvent
+from src.log import get_logger, log_limited
+from src.metrics import REGISTRY, MetricsRegistry
+
+log = get_logger('automation')
+
+# 스크립트의 버튼 이름 -> 직렬화된 버튼 이름
+BUTTON_NAMES = {
+    'left': 'Button.left',
+    'right': 'Button.right',
+    'middle': 'Button.middle',
+}
+
+
+# HTTP 요청 줄의 메서드 (브라우저가 보낸 요청은 본문을 해석하지 않고 끊음)
+HTTP_METHODS = frozenset((b'GET', b'POST', b'PUT', b'DELETE', b'HEAD', b'OPTIONS', b'PATCH', b'CONNECT', b'TRACE'))
+
+
+def looks_like_http(line: bytes) -> bool:
+    """HTTP 요청 줄 또는 헤더처럼 보이는 줄인지"""
+    return line.split(b' ', 1)[0].upper() in HTTP_METHODS or b' HTTP/' in line
+
+
+class _ClientState:
+    """연결 하나의 상태 (클릭/스크롤 위치로 쓰는 마지막 이동 좌표, 인증 여부)"""
+
+    def __init__(self, authenticated: bool = False):
+        self.authenticated = authenticated
+        self.x = 0
+        self.y = 0
+
+
+def build_segments(items: list, state: _ClientState, peer) -> List[Tuple[List[Event], float]]:
+    """
+    요청의 events를 (이벤트 목록, 이어서 기다릴 초) 구간으로 변환. 하나라도 잘못되면 아무것도 보내지 않도록 먼저 전부 검사
+    - ["move", x, y]: 로컬 화면 좌표 (실제 입력과 같은 방식으로 상대 화면에 매핑)
+    - ["button", "left", true|false], ["click", "left"]: 누름/뗌, 누름+뗌
+    - ["scroll", dx, dy]
+    - ["key", "a" | "Key.enter", true|false], ["tap", key]: 누름/뗌, 누름+뗌
+    - ["text", "문자열"]: 상대가 text 이벤트를 지원하지 않으면 문자별 키 입력
+    - ["wait", ms]: 앞의 이벤트를 보낸 뒤 대기
+    """
+    if not isinstance(items, list):
+        raise ValueError("events must be a list")
+
+    segments: List[Tuple[List[Event], float]] = []
+    events: List[Event] = []
+    pool = peer.move_pool
+    timestamps = peer.remote_timestamps
+    for index, item in enumerate(items):
+        try:
+            op = item[0]
+            if op == 'move':
+                state.x, state.y = int(item[1]), int(item[2])
+                events.append(pool.acquire(state.x, state.y, round(time.perf_counter(), 4) if timestamps else None))
+            elif op == 'button' or op == 'click':
+                button = BUTTON_NAMES.get(item[1], item[1])
+                if button not in peer.BUTTONS:
+                    raise ValueError(f"unknown button {item[1]!r}")
+                if op == 'button':
+                    events.append(MouseButton(state.x, state.y, button, bool(item[2])))
+                else:
+                    events.append(MouseButton(state.x, state.y, button, True))
+                    events.append(MouseButton(state.x, state.y, button, False))
+            elif op == 'scroll':
+                events.append(MouseScroll(state.x, state.y, float(item[1]), float(item[2])))
+            elif op == 'key' or op == 'tap':
+                key = item[1]
+                if not isinstance(key, str) or not key:
+                    raise ValueError("key must be a non-empty string")
+                if op == 'key':
+                    events.append(KeyEvent(key, bool(item[2])))
+                else:
+                    events.append(KeyEvent(key, True))
+                    events.append(KeyEvent(key, False))
+            elif op == 'text':
+                text = item[1]
+                if not isinstance(text, str):
+                    raise ValueError("text must be a string")
+                if peer.remote_text:
+                    events.append(TextEvent(text))
+                else:
+                    for ch in text:
+                        events.append(KeyEvent(ch, True))
+                        events.append(KeyEvent(ch, False))
+            elif op == 'wait':
+                segments.append((events, max(0.0, float(item[1])) / 1000.0))
+                events = []
+            else:
+                raise ValueError(f"unknown op {op!r}")
+        except (IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"event {index}: {e}")
+    if events:
+        segments.append((events, 0.0))
+    return segments
+
+
+class AutomationServer:
+    """
+    스크립트 입력 주입용 localhost API (QA 자동화 등, 물리 마우스 없이 같은 채널로 원격 조작)
+    줄 단위 JSON 요청으로 입력 시퀀스 묶음을 받아 현재 peer의 송신 경로(KMPeer.send_scripted)로 전달한다.
+
+    요청: {"id": 1, "events": [["move", 100, 200], ["click", "left"], ["wait", 10], ["text", "hello"]]}
+          {"id": 2, "cmd": "status"}, 연결마다 첫 요청은 {"cmd": "auth", "token": "..."}
+    응답: {"id": 1, "ok": true, "sent": 4} (묶음이 송신 큐에 모두 들어간 뒤, 요청 순서대로)
+
+    토큰이 없으면 시작하지 않고, JSON이 아닌 줄(HTTP 요청 등)이 오면 바로 연결을 끊는다
+    (웹 페이지가 브라우저를 통해 localhost 포트로 본문을 보내는 공격 차단).
+
+    응답을 기다리지 않고 요청을 이어 보내도 된다. 현재 묶음을 큐에 넣은 뒤에야 다음 줄을 읽으므로
+    송신 큐/소켓이 막히면 TCP 흐름 제어로 클라이언트가 블로킹된다 (역압).
+    """
+
+    # 송신 큐가 비워지기를 기다리는 최대 시간 (초, 넘으면 보낸 개수와 함께 오류 응답)
+    SEND_TIMEOUT = 5.0
+    # 요청 한 줄 최대 크기
+    MAX_LINE = 4 * 1024 * 1024
+
+    def __init__(self, get_peer: Callable[[], Optional[object]], port: int = 0, token: str = '',
+                 registry: MetricsRegistry = REGISTRY):
+        self.get_peer = get_peer
+        self.port = port
+        self.token = token
+
+        self.running = False
+        self.server_socket: Optional[socket.socket] = None
+        self.connections: List[socket.socket] = []
+        self.lock = threading.Lock()
+
+        self.m_events = registry.counter('km_automation_events_total', "Scripted events handed to the send path")
+        self.m_requests = registry.counter('km_automation_requests_total', "Automation API requests by result",
+                                           label='result')
+        self.m_send_seconds = registry.counter('km_automation_send_seconds_total',
+                                               "Time spent queueing scripted events, including backpressure waits")
+
+    @classmethod
+    def from_config(cls, config, get_peer: Callable[[], Optional[object]],
+                    registry: MetricsRegistry = REGISTRY) -> 'AutomationServer':
+        return cls(get_peer, port=config.get('automation.port', 0), token=config.get('automation.token', ''),
+                   registry=registry)
+
+    def start(self):
+        """localhost 수신 시작 (port가 0이면 비활성화, 토큰이 없으면 시작하지 않음)"""
+        if not self.port:
+            return
+        if not self.token:
+            log.error("automation.token is not set; automation API disabled")
+            return
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            # localhost 전용
+            server_socket.bind(('127.0.0.1', self.port))
+            server_socket.listen(4)
+        except OSError as e:
+            log.error("Failed to start automation API on port %d: %s", self.port, e)
+            server_socket.close()
+            return
+        self.port = server_socket.getsockname()[1]
+        self.server_socket = server_socket
+        self.running = True
+        threading.Thread(target=self._accept_loop, args=(server_socket,), daemon=True).start()
+        log.info("Automation API listening on 127.0.0.1:%d", self.port)
+
+    def stop(self):
+        self.running = False
+        server_socket, self.server_socket = self.server_socket, None
+        with self.lock:
+            sockets = ([server_socket] if server_socket is not None else []) + self.connections
+            self.connections = []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _accept_loop(self, server_socket: socket.socket):
+        """블로킹 accept (폴링 없음, stop()이 소켓을 닫아 깨움)"""
+        while self.running:
+            try:
+                conn, _ = server_socket.accept()
+            except OSError:
+                break
+            with self.lock:
+                self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        """연결 하나: 요청을 한 줄씩 처리하고 순서대로 응답"""
+        state = _ClientState()
+        reader = conn.makefile('rb', buffering=256 * 1024)
+        try:
+            while self.running:
+                line = reader.readline(self.MAX_LINE + 1)
+                if not line:
+                    break
+                if len(line) > self.MAX_LINE:
+                    conn.sendall(b'{"ok": false, "error": "request too large"}\n')
+                    break
+                if not line.strip():
+                    continue
+                if looks_like_http(line):
+                    self.m_requests.inc(label_value='rejected')
+                    log_limited(log, logging.WARNING, 'automation_http', "Rejected HTTP request on automation API")
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be an object")
+                except ValueError as e:
+                    # 잘못된 줄 뒤의 내용은 해석하지 않음
+                    self.m_requests.inc(label_value='rejected')
+                    conn.sendall((json.dumps({'ok': False, 'error': f"Invalid JSON: {e}"}) + '\n').encode('utf-8'))
+                    break
+                response = self.handle_request(request, state)
+                if 'id' in request:
+                    response['id'] = request['id']
+                self.m_requests.inc(label_value='ok' if response.get('ok') else 'error')
+                conn.sendall((json.dumps(response) + '\n').encode('utf-8'))
+                if not state.authenticated:
+                    break
+        except OSError as e:
+            if self.running:
+                log_limited(log, logging.WARNING, 'automation_conn', "Automation connection error: %s", e)
+        finally:
+            with self.lock:
+                if conn in self.connections:
+                    self.connections.remove(conn)
+            reader.close()
+            conn.close()
+
+    def handle_request(self, request: dict, state: _ClientState) -> dict:
+        """요청 하나 처리 (이벤트 묶음이면 모두 송신 큐에 넣은 뒤 반환)"""
+        cmd = request.get('cmd', 'send')
+        if cmd == 'auth':
+            state.authenticated = hmac.compare_digest(str(request.get('token', '')).encode('utf-8'),
+                                                      self.token.encode('utf-8'))
+            return {'ok': state.authenticated} if state.authenticated else {'ok': False, 'error': "Bad token"}
+        if not state.authenticated:
+            return {'ok': False, 'error': "Authentication required"}
+
+        peer = self.get_peer()
+        if cmd == 'status':
+            send_queue = peer.send_queue if peer is not None else None
+            return {
+                'ok': True,
+                'connected': bool(peer and peer.connected),
+                'has_control': bool(peer and peer.has_control),
+                'queue': len(send_queue) if send_queue is not None else 0,
+            }
+        if cmd != 'send':
+            return {'ok': False, 'error': f"Unknown command: {cmd}"}
+
+        if peer is None or not peer.connected:
+            return {'ok': False, 'error': "Not connected", 'sent': 0}
+        if not peer.has_control:
+            # 상대는 제어권을 넘겨준 쪽의 입력만 처리함
+            return {'ok': False, 'error': "Remote screen is not active (local peer does not hold control)", 'sent': 0}
+        try:
+            segments = build_segments(request.get('events'), state, peer)
+        except ValueError as e:
+            return {'ok': False, 'error': str(e), 'sent': 0}
+
+        sent = 0
+        start = time.perf_counter()
+        for events, wait in segments:
+            if events:
+                queued = peer.send_scripted(events, timeout=self.SEND_TIMEOUT)
+                sent += queued
+                if queued < len(events):
+                    self._account(sent, start)
+                    return {'ok': False, 'error': "Send path blocked or disconnected", 'sent': sent}
+            if wait:
+                time.sleep(wait)
+        self._account(sent, start)
+        return {'ok': True, 'sent': sent}
+
+    def _account(self, sent: int, start: float):
+        self.m_events.inc(sent)
+        self.m_send_seconds.inc(time.perf_counter() - start)
+
+
+class AutomationClient:
+    """
+    자동화 API 클라이언트 (스크립트/벤치마크용)
+    stream()은 응답을 기다리지 않고 최대 window개 요청을 앞서 보내므로 왕복 지연과 관계없이 큰 묶음이 계속 흐른다.
+    """
+
+    def __init__(self, port: int, host: str = '127.0.0.1', token: str = '', timeout: float = 30.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile('rb')
+        self.next_id = 0
+        if token:
+            response = self.request_raw({'cmd': 'auth', 'token': token})
+            if not response.get('ok'):
+                raise PermissionError(response.get('error', "authentication failed"))
+
+    def request_raw(self, request: dict) -> dict:
+        self.sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        return self._read()
+
+    def send(self, events: list) -> dict:
+        """묶음 하나를 보내고 응답까지 대기"""
+        self.next_id += 1
+        return self.request_raw({'id': self.next_id, 'events': events})
+
+    def status(self) -> dict:
+        return self.request_raw({'cmd': 'status'})
+
+    def stream(self, batches: Iterable[list], window: int = 8) -> Iterator[dict]:
+        """묶음들을 파이프라인으로 보내고 응답을 요청 순서대로 내줌"""
+        in_flight = deque()
+        for events in batches:
+            if len(in_flight) >= window:
+                in_flight.popleft()
+                yield self._read()
+            self.next_id += 1
+            in_flight.append(self.next_id)
+            self.sock.sendall((json.dumps({'id': self.next_id, 'events': events}) + '\n').encode('utf-8'))
+        while in_flight:
+            in_flight.popleft()
+            yield self._read()
+
+    def _read(self) -> dict:
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("automation API closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
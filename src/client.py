@@ -2,6 +2,9 @@ import socket
 import json
 from pynput import mouse, keyboard
 from src.events import deserialize_event
+from src.log import configure_logging, get_logger
+
+log = get_logger('client')
 
 class KMClient:
     def __init__(self, host, port):
@@ -13,7 +16,7 @@ class KMClient:
 
     def start(self):
         self.client_socket.connect((self.host, self.port))
-        print(f"Connected to server at {self.host}:{self.port}")
+        log.info("Connected to server at %s:%s", self.host, self.port)
 
         buffer = b''
         while True:
@@ -31,9 +34,9 @@ class KMClient:
                             event = deserialize_event(line)
                             self.handle_event(event)
                         except json.JSONDecodeError as e:
-                            print(f"JSON decode error: {e}, data: {line}")
+                            log.warning("JSON decode error: %s, data: %r", e, line)
             except socket.error as e:
-                print(f"Socket error: {e}")
+                log.warning("Socket error: %s", e)
                 break
 
     def handle_event(self, event):
@@ -70,6 +73,8 @@ class KMClient:
                     self.keyboard_controller.release(key)
 
 if __name__ == "__main__":
+    configure_logging()
+
     # Load config
     try:
         with open('config.json', 'r') as f:
@@ -78,7 +83,7 @@ if __name__ == "__main__":
         host = server_config.get('host', 'localhost')
         port = server_config.get('port', 12345)
     except (FileNotFoundError, json.JSONDecodeError):
-        print("Using default config: localhost:12345")
+        log.info("Using default config: localhost:12345")
         host = 'localhost'
         port = 12345
 
@@ -3,6 +3,9 @@ import os
 import platform
 from typing import Dict, Any
 from screeninfo import get_monitors
+from src.log import get_logger
+
+log = get_logger('config')
 
 class ConfigManager:
     """설정 저장 및 불러오기를 관리하는 클래스"""
@@ -18,7 +21,7 @@ class ConfigManager:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except Exception as e:
-                print(f"Failed to load config: {e}")
+                log.warning("Failed to load config %s: %s", self.config_path, e)
 
         # 기본 설정 반환
         return self.get_default_config()
@@ -29,7 +32,7 @@ class ConfigManager:
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, indent=2, ensure_ascii=False)
         except Exception as e:
-            print(f"Failed to save config: {e}")
+            log.warning("Failed to save config %s: %s", self.config_path, e)
 
     def get_default_config(self) -> Dict[str, Any]:
         """기본 설정 반환"""
@@ -44,6 +47,7 @@ class ConfigManager:
             },
             'remote': {
                 'ip': '',
+                'addresses': [],  # ip 외에 연결을 경쟁시킬 상대 주소 (유선/Wi-Fi/VPN 등)
                 'port': 12345,
                 'name': '',
                 'os': '',
@@ -57,11 +61,69 @@ class ConfigManager:
                 'edge_detection': True,
                 'auto_switch': True,
                 'hide_cursor': True,
-                'share_clipboard': False
+                'share_clipboard': False,
+                'scroll_frame_ms': 16,  # 이 간격 안의 스크롤 이벤트는 합쳐서 전송
+                'input_process': False  # 입력 캡처/주입을 별도 프로세스에서 실행 (공유 메모리 링으로 연결)
+            },
+            'keyboard': {
+                'receiver_repeat': True,  # 키 반복을 수신측에서 생성 (OS 반복 입력은 전송하지 않음)
+                'repeat_delay_ms': 500,
+                'repeat_interval_ms': 33,
+                'repeat_timeout_ms': 2500,  # release 유실 대비 안전 타임아웃
+                'text_events': True  # ASCII 밖의 문자 키 입력은 키 단위 대신 text 이벤트로 전송 (상대가 지원할 때만)
             },
             'network': {
                 'discovery_enabled': True,
-                'port': 12345
+                'port': 12345,
+                'send_queue_size': 256,  # 초과시 오래된 mouse_move부터 버림 (키/버튼은 버리지 않음)
+                'peer_cache': 'km_share_peers.json',  # 알려진 peer 캐시 (상대 경로는 사용자 설정 디렉터리 기준, 비어있으면 비활성화)
+                'multipath': True,  # 상대의 모든 인터페이스 주소로 연결하고 RTT가 가장 낮은 경로 사용
+                'race_stagger_ms': 250,  # 주소별 연결 시도 시작 간격
+                'path_probe_ms': 1000,  # 경로가 둘 이상일 때 RTT 측정 주기
+                'path_switch_ratio': 1.5,  # 다른 경로의 RTT가 이 배수 이상 낮으면 전환
+                'adaptive_pointer': True,  # 송신 경로가 혼잡하면 mouse_move 전송률을 낮춤 (키/버튼은 그대로)
+                'pointer_target_ms': 30,  # 커널 송신 큐 + RTT 증가로 추정한 지연이 이 값을 넘으면 간격을 늘림
+                'pointer_min_hz': 15  # 혼잡할 때도 유지하는 최소 mouse_move 전송률
+            },
+            'jitter_buffer': {
+                'enabled': False,  # 수신한 mouse_move를 송신 간격대로 일정하게 재생 (약간의 지연 추가)
+                'min_delay_ms': 0,
+                'max_delay_ms': 40,
+                'percentile': 95,  # 최근 지연 변동의 이 백분위수를 재생 지연으로 사용
+                'interpolate_ms': 8  # 샘플 간격이 벌어지면 이 간격으로 중간 위치 보간
+            },
+            'security': {
+                'psk': ''  # 양쪽 peer에 같은 값을 설정하면 인증 + 프레임 HMAC 사용
+            },
+            'relay': {
+                'address': '',  # 경유할 relay (host 또는 host:port, 비어있으면 직접 연결만)
+                'session': '',  # relay에서 상대를 찾는 이름 (비어있으면 psk에서 유도)
+                'port': 24850,  # --relay로 실행할 때 수신 포트
+                'max_sessions': 64,
+                'splice': True  # Linux에서 os.splice로 커널 안에서 전달
+            },
+            'automation': {
+                'port': 0,  # 스크립트 입력 API (127.0.0.1 에만 바인드, 0이면 비활성화)
+                'token': ''  # 필수: 연결마다 첫 요청으로 인증 (비어있으면 API를 시작하지 않음)
+            },
+            'metrics': {
+                'http_port': 0,  # 0이면 비활성화 (127.0.0.1 에만 바인드)
+                'stats_file': '',  # 비어있으면 비활성화
+                'stats_interval': 10
+            },
+            'diagnostics': {
+                'instrument': False,  # 콜백 소요 시간 계측
+                'stall_threshold_ms': 20,
+                'output_dir': '.',  # cProfile/tracemalloc 결과 저장 위치
+                'perf_panel': False,  # GUI 성능 패널 표시
+                'perf_panel_ms': 500  # 성능 패널 갱신 주기 (패널이 보일 때만 동작)
+            },
+            'logging': {
+                'level': 'INFO',  # DEBUG/INFO/WARNING/ERROR
+                'file': '',  # 비어있으면 stdout만 사용
+                'format': 'text',  # text 또는 json (한 줄에 JSON 하나)
+                'rate_limit': 10,  # 같은 메시지 키는 rate_interval초마다 이 개수까지만 출력
+                'rate_interval': 10
             }
         }
 
@@ -80,18 +142,18 @@ class ConfigManager:
                 total_width = max_x - min_x
                 total_height = max_y - min_y
 
-                print(f"Detected {len(monitors)} monitor(s)")
-                print(f"Total virtual screen: {total_width}x{total_height}")
+                log.info("Detected %d monitor(s), total virtual screen %dx%d", len(monitors), total_width, total_height)
 
                 return {
                     'width': total_width,
-                    'height': total_height
+                    'height': total_height,
+                    'monitors': [{'x': m.x, 'y': m.y, 'width': m.width, 'height': m.height} for m in monitors]
                 }
         except Exception as e:
-            print(f"Failed to get screen info: {e}")
+            log.warning("Failed to get screen info: %s", e)
 
         # 기본값
-        return {'width': 1920, 'height': 1080}
+        return {'width': 1920, 'height': 1080, 'monitors': []}
 
     def get(self, key_path: str, default=None):
         """중첩된 키 경로로 값 가져오기 (예: 'local.name')"""
@@ -122,11 +184,15 @@ class ConfigManager:
         screen_info = self.get_screen_info()
         self.set('local.screen_width', screen_info['width'])
         self.set('local.screen_height', screen_info['height'])
+        self.set('local.monitors', screen_info['monitors'])
 
     def update_remote_from_discovery(self, ip: str, peer_info: Dict):
         """검색된 peer 정보로 원격 설정 업데이트"""
         self.set('remote.ip', ip)
+        self.set('remote.addresses', peer_info.get('addresses', []))
         self.set('remote.name', peer_info.get('name', ''))
         self.set('remote.os', peer_info.get('os', ''))
         self.set('remote.screen_width', peer_info.get('screen_width', 1920))
         self.set('remote.screen_height', peer_info.get('screen_height', 1080))
+        # 모니터 배치는 연결 시 screen_info로 다시 받음
+        self.set('remote.monitors', [])
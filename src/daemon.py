@@ -0,0 +1,522 @@
+import os
+import json
+import stat
+import signal
+import socket
+import threading
+import platform
+from typing import Optional
+from src.automation import AutomationServer
+from src.config_manager import ConfigManager
+from src.discovery import NetworkDiscovery
+from src.log import configure_logging, get_logger, shutdown_logging
+from src.metrics import REGISTRY, MetricsExporter
+from src.peer import KMPeer
+from src.peer_cache import PeerCache, user_data_dir
+from src.profiling import INSTRUMENTATION
+
+log = get_logger('daemon')
+
+CONTROL_SOCKET_NAME = 'km_share.sock'
+
+
+def default_control_socket() -> str:
+    """사용자 전용 제어 소켓 경로 ($XDG_RUNTIME_DIR, 없으면 사용자 설정 디렉터리. 모두가 쓸 수 있는 /tmp는 쓰지 않음)"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, CONTROL_SOCKET_NAME)
+    return os.path.join(user_data_dir(), CONTROL_SOCKET_NAME)
+
+
+def socket_owned(socket_path: str) -> bool:
+    """경로가 현재 사용자 소유의 소켓인지 (다른 사용자가 미리 만든 소켓에 붙거나 지우지 않도록)"""
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+    return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+
+
+class KMShareDaemon:
+    """
+    GUI 없이 KMPeer + NetworkDiscovery를 실행하는 헤드리스 데몬
+    Unix 도메인 제어 소켓으로 status/start/stop/layout 등의 명령을 받음
+    'subscribe' 연결에는 공유/연결/제어권 상태가 바뀔 때마다 상태 줄을 보냄 (GUI가 폴링하지 않도록)
+    """
+
+    # 검색 명령 시 브로드캐스트 지속 시간 (초)
+    DISCOVERY_DURATION = 5
+    # 제어 연결 유휴 제한 시간 (초, 요청을 보내지 않는 클라이언트가 스레드를 붙잡지 않도록)
+    CONTROL_TIMEOUT = 30
+    # 제어 요청 한 줄 최대 크기 (bytes)
+    MAX_REQUEST = 64 * 1024
+
+    def __init__(self, config: ConfigManager, socket_path: Optional[str] = None):
+        self.config = config
+        self.socket_path = socket_path or default_control_socket()
+
+        self.peer_cache = PeerCache.from_config(config)
+        self.discovery = NetworkDiscovery(peer_cache=self.peer_cache)
+        self.peer: Optional[KMPeer] = None
+        # 제어 연결마다 스레드가 따로 돌므로 self.peer 확인/변경은 이 잠금 안에서
+        self.peer_lock = threading.Lock()
+        self.metrics_exporter = MetricsExporter.from_config(config)
+        # 스크립트 입력 API (현재 peer로 전달)
+        self.automation = AutomationServer.from_config(config, lambda: self.peer)
+
+        self.control_socket = None
+        self.control_thread = None
+        # 상태 구독 연결과 마지막으로 보낸 상태
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+        self._published_state = None
+        self.shutdown_event = threading.Event()
+
+        # 검색 상태
+        self.discovery_stop = threading.Event()
+        self.discovery_thread = None
+
+        self.commands = {
+            'status': self._cmd_status,
+            'start': self._cmd_start,
+            'stop': self._cmd_stop,
+            'layout': self._cmd_layout,
+            'remote': self._cmd_remote,
+            'discover': self._cmd_discover,
+            'peers': self._cmd_peers,
+            'metrics': self._cmd_metrics,
+            'instrument': self._cmd_instrument,
+            'profile': self._cmd_profile,
+            'tracemalloc': self._cmd_tracemalloc,
+            'shutdown': self._cmd_shutdown,
+        }
+
+    def run(self, autostart: bool = True) -> bool:
+        """데몬 실행 (shutdown 요청까지 블로킹, 다른 데몬이 실행 중이면 바로 False 반환)"""
+        configure_logging(self.config)
+        self.config.set('local.name', platform.node())
+        self.config.set('local.os', platform.system())
+        self.config.update_local_screen_info()
+
+        if not self._start_control_socket():
+            shutdown_logging()
+            return False
+        self.metrics_exporter.start()
+        self.automation.start()
+        INSTRUMENTATION.configure(self.config)
+
+        if autostart and self._has_remote():
+            self.start_sharing()
+
+        # 캐시된 peer로 연결하는 동안 백그라운드 검색으로 캐시 갱신
+        if self.peer_cache is not None and self.config.get('network.discovery_enabled', True):
+            self._cmd_discover({})
+
+        try:
+            signal.signal(signal.SIGINT, lambda *_: self.shutdown_event.set())
+            signal.signal(signal.SIGTERM, lambda *_: self.shutdown_event.set())
+        except ValueError:
+            pass  # 메인 스레드가 아닌 경우
+        INSTRUMENTATION.install_signal_handlers()
+
+        log.info("KM-Share daemon running")
+        # 타이머 없이 종료 요청까지 대기
+        self.shutdown_event.wait()
+        self.close()
+        return True
+
+    def close(self):
+        """데몬 종료"""
+        self.stop_sharing()
+        self.discovery_stop.set()
+        self.discovery.stop_listening()
+        self.metrics_exporter.stop()
+        self.automation.stop()
+        if self.peer_cache is not None:
+            self.peer_cache.flush()
+
+        with self.subscribers_lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for conn in subscribers:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if self.control_socket:
+            # close만으로는 accept 중인 스레드가 깨어나지 않아 소켓이 계속 연결을 받음
+            try:
+                self.control_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self.control_socket.close()
+            except:
+                pass
+            self.control_socket = None
+
+        if self.control_thread is not None and socket_owned(self.socket_path):
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+        log.info("KM-Share daemon stopped")
+        shutdown_logging()
+
+    def start_sharing(self) -> bool:
+        """공유 시작"""
+        with self.peer_lock:
+            if self.peer:
+                return False
+
+            peer = KMPeer(self.config, peer_cache=self.peer_cache)
+            peer.on_connection_changed = self._on_connection_changed
+            peer.on_control_changed = self._on_control_changed
+            peer.start()
+            self.peer = peer
+        self._publish_state()
+        return True
+
+    def stop_sharing(self) -> bool:
+        """공유 중지"""
+        with self.peer_lock:
+            if not self.peer:
+                return False
+
+            self.peer.stop()
+            self.peer = None
+        self._publish_state()
+        return True
+
+    def _on_connection_changed(self, connected: bool):
+        log.info("Connected to remote peer!" if connected else "Disconnected from remote peer")
+        self._publish_state()
+
+    def _on_control_changed(self, has_control: bool):
+        log.info("Control: LOCAL" if has_control else "Control: REMOTE")
+        self._publish_state()
+
+    def _state(self) -> dict:
+        """구독자에게 보내는 상태 (peer 스레드 콜백에서도 호출하므로 peer_lock을 잡지 않음)"""
+        peer = self.peer
+        return {
+            'event': 'status',
+            'running': peer is not None,
+            'connected': bool(peer and peer.connected),
+            'has_control': peer.has_control if peer else True,
+        }
+
+    def _publish_state(self):
+        """상태가 바뀌었으면 모든 구독자에게 전송 (블로킹하지 않음, 받지 못하는 구독자는 끊음)"""
+        with self.subscribers_lock:
+            state = self._state()
+            if state == self._published_state:
+                return
+            self._published_state = state
+            data = (json.dumps(state) + '\n').encode('utf-8')
+            for conn in list(self.subscribers):
+                try:
+                    sent = conn.send(data, socket.MSG_DONTWAIT)
+                except OSError:
+                    sent = 0
+                if sent < len(data):
+                    self.subscribers.remove(conn)
+                    try:
+                        conn.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+    def _subscribe(self, conn: socket.socket):
+        """연결을 상태 구독자로 등록하고 현재 상태를 바로 보냄 (등록과 첫 전송 사이에 변경이 끼지 않도록 잠금 안에서)"""
+        # 구독 연결은 요청을 보내지 않으므로 유휴 제한 없이 클라이언트가 닫을 때까지 유지
+        conn.settimeout(None)
+        with self.subscribers_lock:
+            state = self._state()
+            conn.sendall((json.dumps(dict(state, ok=True)) + '\n').encode('utf-8'))
+            self._published_state = state
+            self.subscribers.append(conn)
+
+    def _unsubscribe(self, conn: socket.socket):
+        with self.subscribers_lock:
+            if conn in self.subscribers:
+                self.subscribers.remove(conn)
+
+    def _start_control_socket(self) -> bool:
+        """Unix 도메인 제어 소켓 시작 (같은 경로에서 다른 데몬이 응답하면 False)"""
+        if not hasattr(socket, 'AF_UNIX'):
+            log.warning("Unix domain sockets are not supported on this platform; control socket disabled")
+            return True
+
+        if os.path.lexists(self.socket_path):
+            if not socket_owned(self.socket_path):
+                log.error("Control socket path %s exists and is not a socket owned by this user", self.socket_path)
+                return False
+            if daemon_running(self.socket_path):
+                log.error("Another KM-Share daemon is already listening on %s", self.socket_path)
+                return False
+            # 비정상 종료로 남은 소켓 파일
+            try:
+                os.unlink(self.socket_path)
+            except OSError as e:
+                log.error("Failed to remove stale control socket %s: %s", self.socket_path, e)
+                return False
+
+        try:
+            os.makedirs(os.path.dirname(self.socket_path) or '.', mode=0o700, exist_ok=True)
+        except OSError as e:
+            log.error("Failed to create control socket directory for %s: %s", self.socket_path, e)
+            return False
+
+        self.control_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # bind가 만드는 소켓 파일이 처음부터 소유자 전용이 되도록 (bind 후 chmod 사이의 틈 없음)
+        old_umask = os.umask(0o177)
+        try:
+            self.control_socket.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.control_socket.listen(4)
+
+        self.control_thread = threading.Thread(target=self._control_loop, daemon=True)
+        self.control_thread.start()
+        log.info("Control socket listening on %s", self.socket_path)
+        return True
+
+    def _control_loop(self):
+        """제어 소켓 연결 수락 루프 (블로킹 accept, 연결마다 스레드)"""
+        while not self.shutdown_event.is_set():
+            try:
+                conn, _ = self.control_socket.accept()
+            except OSError:
+                break  # 소켓이 닫힘
+
+            conn.settimeout(self.CONTROL_TIMEOUT)
+            threading.Thread(target=self._serve_control_connection, args=(conn,), daemon=True).start()
+
+    def _serve_control_connection(self, conn: socket.socket):
+        try:
+            self._handle_control_connection(conn)
+        except socket.timeout:
+            pass  # 유휴 클라이언트
+        except Exception as e:
+            log.warning("Control connection error: %s", e)
+        finally:
+            self._unsubscribe(conn)
+            conn.close()
+
+    def _handle_control_connection(self, conn: socket.socket):
+        """제어 연결 하나를 처리 (JSON + newline 구분자)"""
+        buffer = b''
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                break
+
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    response = {'ok': False, 'error': f"Invalid JSON: {e}"}
+                else:
+                    if isinstance(request, dict) and request.get('cmd') == 'subscribe':
+                        self._subscribe(conn)
+                        continue
+                    response = self.handle_command(request)
+                conn.sendall((json.dumps(response) + '\n').encode('utf-8'))
+
+            if len(buffer) > self.MAX_REQUEST:
+                conn.sendall((json.dumps({'ok': False, 'error': "Request too large"}) + '\n').encode('utf-8'))
+                break
+
+    def handle_command(self, request) -> dict:
+        """제어 명령 처리"""
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "Request must be a JSON object"}
+        handler = self.commands.get(request.get('cmd'))
+        if not handler:
+            return {'ok': False, 'error': f"Unknown command: {request.get('cmd')}"}
+
+        try:
+            return handler(request)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def _cmd_status(self, request: dict) -> dict:
+        with self.peer_lock:
+            peer = self.peer
+            return {
+                'ok': True,
+                'running': peer is not None,
+                'connected': bool(peer and peer.connected),
+                'has_control': peer.has_control if peer else True,
+                'remote_ip': peer.remote_ip if peer else self.config.get('remote.ip', ''),
+                'rtt_ms': round(peer.rtt * 1000, 3) if peer and peer.rtt else None,
+                'paths': peer.path_info() if peer else [],
+                'layout': self.config.get('layout.position', 'right'),
+            }
+
+    def _has_remote(self) -> bool:
+        """설정된 원격 IP/relay나 캐시된 마지막 연결 peer가 있는지"""
+        return bool(self.config.get('remote.ip') or self.config.get('relay.address')
+                    or (self.peer_cache is not None and self.peer_cache.last_good()))
+
+    def _cmd_start(self, request: dict) -> dict:
+        if not self._has_remote():
+            return {'ok': False, 'error': "No remote IP or relay configured"}
+        return {'ok': True, 'started': self.start_sharing()}
+
+    def _cmd_stop(self, request: dict) -> dict:
+        return {'ok': True, 'stopped': self.stop_sharing()}
+
+    def _cmd_layout(self, request: dict) -> dict:
+        position = request.get('position')
+        if position not in ('left', 'right', 'top', 'bottom'):
+            return {'ok': False, 'error': f"Invalid position: {position}"}
+
+        with self.peer_lock:
+            self.config.set('layout.position', position)
+            if self.peer:
+                self.peer.layout_position = position
+        return {'ok': True, 'layout': position}
+
+    def _cmd_remote(self, request: dict) -> dict:
+        ip = (request.get('ip') or '').strip()
+        if not ip:
+            return {'ok': False, 'error': "Missing ip"}
+
+        peers = self.discovery.get_discovered_peers()
+        if ip in peers:
+            self.config.update_remote_from_discovery(ip, peers[ip])
+        else:
+            self.config.set('remote.ip', ip)
+        return {'ok': True, 'remote_ip': ip}
+
+    def _cmd_discover(self, request: dict) -> dict:
+        if self.discovery_thread and self.discovery_thread.is_alive():
+            return {'ok': True, 'searching': True}
+
+        self.discovery_stop.clear()
+        self.discovery.start_listening()
+        self.discovery_thread = threading.Thread(target=self._discovery_loop, daemon=True)
+        self.discovery_thread.start()
+        return {'ok': True, 'searching': True}
+
+    def _cmd_peers(self, request: dict) -> dict:
+        return {
+            'ok': True,
+            'peers': self.discovery.get_discovered_peers(),
+            'cached': self.peer_cache.snapshot() if self.peer_cache is not None else {},
+        }
+
+    def _cmd_metrics(self, request: dict) -> dict:
+        return {'ok': True, 'metrics': REGISTRY.render_prometheus()}
+
+    def _cmd_instrument(self, request: dict) -> dict:
+        enabled = request.get('action', 'start') != 'stop'
+        INSTRUMENTATION.set_enabled(enabled)
+        return {'ok': True, 'instrument': enabled, 'stalls': list(INSTRUMENTATION.stalls)}
+
+    def _cmd_profile(self, request: dict) -> dict:
+        if request.get('action', 'start') == 'stop':
+            return {'ok': True, 'path': INSTRUMENTATION.stop_profiling()}
+        INSTRUMENTATION.start_profiling()
+        return {'ok': True}
+
+    def _cmd_tracemalloc(self, request: dict) -> dict:
+        if request.get('action', 'start') == 'stop':
+            return {'ok': True, 'path': INSTRUMENTATION.stop_tracemalloc()}
+        INSTRUMENTATION.start_tracemalloc()
+        return {'ok': True}
+
+    def _cmd_shutdown(self, request: dict) -> dict:
+        self.shutdown_event.set()
+        return {'ok': True}
+
+    def _discovery_loop(self):
+        """DISCOVERY_DURATION 동안 주기적으로 브로드캐스트 후 수신 중지"""
+        for _ in range(self.DISCOVERY_DURATION):
+            self.discovery.broadcast_presence(
+                self.config.get('local.name', ''),
+                self.config.get('local.os', ''),
+                self.config.get('local.screen_width', 1920),
+                self.config.get('local.screen_height', 1080)
+            )
+            if self.discovery_stop.wait(1):
+                break
+
+        self.discovery.stop_listening()
+        log.info("Discovery completed. Found %d peers.", len(self.discovery.get_discovered_peers()))
+
+
+def send_control_command(request: dict, socket_path: Optional[str] = None, timeout: float = 5.0) -> dict:
+    """실행 중인 데몬에 제어 명령을 보내고 응답 반환 (GUI/CLI 클라이언트용, 다른 사용자 소유 소켓이면 PermissionError)"""
+    socket_path = socket_path or default_control_socket()
+    if os.path.lexists(socket_path) and not socket_owned(socket_path):
+        raise PermissionError(f"{socket_path} is not a socket owned by this user")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+
+        buffer = b''
+        while b'\n' not in buffer:
+            data = sock.recv(4096)
+            if not data:
+                raise ConnectionError("daemon closed the connection without a reply")
+            buffer += data
+        return json.loads(buffer.split(b'\n', 1)[0].decode('utf-8'))
+    finally:
+        sock.close()
+
+
+def open_status_subscription(socket_path: Optional[str] = None, timeout: float = 5.0) -> socket.socket:
+    """
+    데몬 상태 구독 연결 (GUI용): 첫 줄은 현재 상태, 이후 상태가 바뀔 때마다 한 줄씩 옴
+    반환된 소켓은 블로킹 모드 (읽는 스레드는 변경이 있을 때만 깨어남), 닫으면 구독 종료
+    """
+    socket_path = socket_path or default_control_socket()
+    if os.path.lexists(socket_path) and not socket_owned(socket_path):
+        raise PermissionError(f"{socket_path} is not a socket owned by this user")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps({'cmd': 'subscribe'}) + '\n').encode('utf-8'))
+        sock.settimeout(None)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def daemon_running(socket_path: Optional[str] = None, timeout: float = 1.0) -> bool:
+    """제어 소켓에서 데몬이 연결을 받는지 (GUI가 클라이언트로 붙을지 판단할 때도 사용, 현재 사용자 소유 소켓만)"""
+    socket_path = socket_path or default_control_socket()
+    if not hasattr(socket, 'AF_UNIX') or not socket_owned(socket_path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def main(socket_path: Optional[str] = None, config_path: str = 'km_share_config.json',
+         autostart: bool = True) -> int:
+    daemon = KMShareDaemon(ConfigManager(config_path), socket_path)
+    return 0 if daemon.run(autostart=autostart) else 1
+
+
+if __name__ == "__main__":
+    main()
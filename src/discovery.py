@@ -1,74 +1,317 @@
 import socket
 import json
+import heapq
+import logging
 import threading
 import time
-from typing import List, Dict, Callable
+from collections import deque
+from typing import List, Dict, Callable, Optional, Tuple
+from src.log import get_logger, log_limited
+from src.metrics import REGISTRY, MetricsRegistry
+from src.peer_cache import PeerCache
+
+log = get_logger('discovery')
+
+
+def get_local_ips() -> List[str]:
+    """로컬 IP 주소 목록 가져오기 (127.0.0.1 포함)"""
+    local_ips = ['127.0.0.1']
+    try:
+        # 기본 경로의 송신 주소 (패킷은 보내지 않음)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.connect(('10.255.255.255', 1))
+            local_ips.append(sock.getsockname()[0])
+        finally:
+            sock.close()
+    except OSError:
+        pass
+
+    try:
+        # 모든 네트워크 인터페이스의 IP 가져오기
+        hostname = socket.gethostname()
+        ip = socket.gethostbyname(hostname)
+        if ip not in local_ips:
+            local_ips.append(ip)
+
+        # 추가로 모든 인터페이스 확인
+        import netifaces
+        for iface in netifaces.interfaces():
+            addrs = netifaces.ifaddresses(iface)
+            if netifaces.AF_INET in addrs:
+                for addr in addrs[netifaces.AF_INET]:
+                    ip = addr.get('addr')
+                    if ip and ip not in local_ips:
+                        local_ips.append(ip)
+    except:
+        pass
+
+    return local_ips
+
+
+# 상대가 알린 인터페이스 주소를 받아들이는 최대 개수 (검색 응답/hello는 인증되지 않을 수 있음)
+MAX_ADVERTISED_ADDRESSES = 8
+
+
+def advertised_ips(local_ips: List[str]) -> List[str]:
+    """상대가 연결을 시도할 수 있는 주소 (루프백 제외)"""
+    return [ip for ip in local_ips if not ip.startswith('127.')][:MAX_ADVERTISED_ADDRESSES]
+
+
+def sanitize_addresses(addresses) -> List[str]:
+    """
+    상대/검색 응답/캐시에서 온 주소 목록 검사: 표준 표기 IPv4 문자열만, 루프백/미지정/멀티캐스트/브로드캐스트 제외,
+    중복 제거 후 MAX_ADVERTISED_ADDRESSES개까지 (연결 시도와 캐시 저장 전에 사용)
+    """
+    if not isinstance(addresses, list):
+        return []
+    result = []
+    for address in addresses:
+        if not isinstance(address, str):
+            continue
+        try:
+            packed = socket.inet_aton(address)
+        except OSError:
+            continue
+        # inet_aton은 '10.1', '0x7f.1' 같은 축약형도 받으므로 표준 표기와 같은 것만
+        if socket.inet_ntoa(packed) != address or packed[0] in (0, 127) or packed[0] >= 224 or address in result:
+            continue
+        result.append(address)
+        if len(result) >= MAX_ADVERTISED_ADDRESSES:
+            break
+    return result
+
+
+class PeerRegistry:
+    """
+    스레드 안전한 peer 목록
+    - TTL 만료는 최소 힙으로 처리 (전체 스캔 없음, peer당 힙 항목 하나)
+    - 만료 스레드가 힙 맨 앞의 만료 시각까지 기다렸다가 제거하고 on_removed(ips)를 호출
+      (누가 목록을 조회하지 않아도 사라진 peer가 빠짐, peer가 없으면 타이머 없이 대기)
+    - 변경마다 버전을 올리고 (버전, 종류, ip) 변경 기록을 남겨 GUI가 차이만 반영할 수 있게 함
+    """
+
+    ADDED = 'added'
+    UPDATED = 'updated'
+    REMOVED = 'removed'
+
+    def __init__(self, ttl: float = 30.0, history: int = 1024,
+                 on_removed: Optional[Callable[[List[str]], None]] = None):
+        self.ttl = ttl
+        self.on_removed = on_removed
+        self.peers: Dict[str, Dict] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.version = 0
+        self.changes = deque(maxlen=history)  # (version, kind, ip)
+        self.lock = threading.Condition()
+        self.expiry_thread = None
+
+    def update(self, ip: str, info: Dict) -> Optional[str]:
+        """peer 정보 갱신. 목록에 변화가 있으면 ADDED/UPDATED, TTL만 연장되면 None"""
+        with self.lock:
+            old = self.peers.get(ip)
+            self.peers[ip] = info
+
+            if old is None:
+                # 연장은 힙에 넣지 않고 만료 시점에 timestamp를 다시 확인해 재등록
+                heapq.heappush(self.expiry_heap, (info['timestamp'] + self.ttl, ip))
+                if self.expiry_thread is None:
+                    self.expiry_thread = threading.Thread(target=self._expiry_loop, daemon=True)
+                    self.expiry_thread.start()
+                self.lock.notify()
+                kind = self.ADDED
+            elif any(old.get(k) != info.get(k) for k in info if k != 'timestamp'):
+                kind = self.UPDATED
+            else:
+                return None
+
+            self._record(kind, ip)
+            return kind
+
+    def _record(self, kind: str, ip: str):
+        self.version += 1
+        self.changes.append((self.version, kind, ip))
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """TTL이 지난 peer 제거 (힙 맨 앞만 확인), 제거한 ip 반환"""
+        now = time.time() if now is None else now
+        with self.lock:
+            removed = self._expire_locked(now)
+        if removed and self.on_removed:
+            self.on_removed(removed)
+        return removed
+
+    def _expire_locked(self, now: float) -> List[str]:
+        heap = self.expiry_heap
+        removed = []
+        while heap and heap[0][0] <= now:
+            expires_at, ip = heapq.heappop(heap)
+            info = self.peers.get(ip)
+            if info is None:
+                continue
+            deadline = info['timestamp'] + self.ttl
+            if deadline <= now:
+                del self.peers[ip]
+                self._record(self.REMOVED, ip)
+                removed.append(ip)
+            else:
+                # 이후 브로드캐스트로 연장됨: 새 만료 시각으로 다시 등록
+                heapq.heappush(heap, (deadline, ip))
+        return removed
+
+    def _expiry_loop(self):
+        """힙 맨 앞의 만료 시각까지 대기 후 제거 (시계는 peer timestamp와 같은 time.time)"""
+        while True:
+            with self.lock:
+                heap = self.expiry_heap
+                if not heap:
+                    self.lock.wait()
+                    continue
+                now = time.time()
+                if heap[0][0] > now:
+                    self.lock.wait(heap[0][0] - now)
+                    continue
+                removed = self._expire_locked(now)
+            if removed and self.on_removed:
+                try:
+                    self.on_removed(removed)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'discovery_expire', "Peer removal callback error: %s", e)
+
+    def get(self, ip: str) -> Optional[Dict]:
+        with self.lock:
+            return self.peers.get(ip)
+
+    def __len__(self):
+        return len(self.peers)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.lock:
+            return dict(self.peers)
+
+    def changes_since(self, version: int):
+        """
+        version 이후의 변경 (현재 버전, added, updated, removed) 반환
+        각 목록은 [(ip, info)], removed는 [ip]. 기록이 잘려 나갔으면 added에 전체 목록을 담고 resync=True
+        """
+        with self.lock:
+            if version == self.version:
+                return self.version, [], [], [], False
+
+            oldest = self.changes[0][0] if self.changes else self.version + 1
+            if version + 1 < oldest:
+                return self.version, list(self.peers.items()), [], [], True
+
+            latest: Dict[str, str] = {}
+            for change_version, kind, ip in self.changes:
+                if change_version <= version:
+                    continue
+                previous = latest.get(ip)
+                if previous == self.ADDED and kind == self.REMOVED:
+                    del latest[ip]  # 추가됐다가 바로 제거됨
+                elif previous == self.ADDED:
+                    continue
+                elif previous == self.REMOVED and kind == self.ADDED:
+                    latest[ip] = self.UPDATED
+                else:
+                    latest[ip] = kind
+
+            added = [(ip, self.peers[ip]) for ip, kind in latest.items() if kind == self.ADDED]
+            updated = [(ip, self.peers[ip]) for ip, kind in latest.items() if kind == self.UPDATED]
+            removed = [ip for ip, kind in latest.items() if kind == self.REMOVED]
+            return self.version, added, updated, removed, False
+
 
 class NetworkDiscovery:
     """네트워크에서 다른 KM-Share 인스턴스를 찾는 클래스"""
 
     BROADCAST_PORT = 12346
     MAGIC_STRING = "KM_SHARE_DISCOVERY"
+    # 이 시간(초) 동안 브로드캐스트가 없으면 목록에서 제거
+    PEER_TTL = 30
 
-    def __init__(self, port: int = BROADCAST_PORT):
+    def __init__(self, port: int = BROADCAST_PORT, registry: Optional[MetricsRegistry] = None,
+                 peer_cache: Optional[PeerCache] = None):
         self.port = port
-        self.discovered_peers: Dict[str, Dict] = {}  # {ip: {name, os, screen_res}}
+        # 발견/변경된 peer를 디스크 캐시에도 기록 (다음 실행 시 바로 연결)
+        self.peer_cache = peer_cache
+        self.m_packets = (registry or REGISTRY).counter('km_discovery_packets_total',
+                                                        "Discovery packets by direction", label='direction')
+        self.peers = PeerRegistry(ttl=self.PEER_TTL, on_removed=self._on_peers_removed)  # {ip: {name, os, screen_res}}
         self.running = False
         self.listen_thread = None
+        self.listen_socket: Optional[socket.socket] = None
         self.callbacks: List[Callable] = []
-        self.local_ips = self._get_local_ips()
-
-    def _get_local_ips(self) -> List[str]:
-        """로컬 IP 주소 목록 가져오기"""
-        local_ips = ['127.0.0.1']
-        try:
-            # 모든 네트워크 인터페이스의 IP 가져오기
-            hostname = socket.gethostname()
-            local_ips.append(socket.gethostbyname(hostname))
-
-            # 추가로 모든 인터페이스 확인
-            import netifaces
-            for iface in netifaces.interfaces():
-                addrs = netifaces.ifaddresses(iface)
-                if netifaces.AF_INET in addrs:
-                    for addr in addrs[netifaces.AF_INET]:
-                        ip = addr.get('addr')
-                        if ip and ip not in local_ips:
-                            local_ips.append(ip)
-        except:
-            pass
-
-        return local_ips
+        self.removed_callbacks: List[Callable] = []
+        self.local_ips = get_local_ips()
 
     def add_callback(self, callback: Callable):
         """새 peer 발견시 호출될 콜백 추가"""
         self.callbacks.append(callback)
 
+    def add_removed_callback(self, callback: Callable):
+        """TTL이 지나 peer가 목록에서 빠질 때 호출될 콜백 추가 (인자: ip 목록, 만료 스레드에서 호출)"""
+        self.removed_callbacks.append(callback)
+
+    def _on_peers_removed(self, ips: List[str]):
+        for callback in self.removed_callbacks:
+            callback(ips)
+
     def start_listening(self):
         """브로드캐스트 수신 시작"""
         if self.running:
             return
+        # 이전 수신 스레드가 아직 포트를 잡고 있으면 끝날 때까지 대기 (같은 포트를 두 번 바인드하지 않도록)
+        if self.listen_thread is not None and self.listen_thread.is_alive():
+            self.listen_thread.join(timeout=2)
+
+        # stop_listening()이 바로 불려도 깨울 소켓이 있도록 바인드는 호출한 스레드에서
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(('', self.port))
+        except OSError as e:
+            sock.close()
+            log.error("Failed to listen for discovery broadcasts on port %d: %s", self.port, e)
+            return
+        self.listen_socket = sock
 
         self.running = True
-        self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.listen_thread = threading.Thread(target=self._listen_loop, args=(sock,), daemon=True)
         self.listen_thread.start()
 
     def stop_listening(self):
-        """브로드캐스트 수신 중지"""
+        """
+        브로드캐스트 수신 중지: 블로킹 recvfrom을 자기 포트로 보낸 깨우기 데이터그램으로 깨움
+        (Linux는 shutdown()으로도 깨지만 Windows는 그렇지 않음). 소켓은 수신 스레드가 닫음
+        """
         self.running = False
-        if self.listen_thread:
+        sock, self.listen_socket = self.listen_socket, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # 연결되지 않은 UDP 소켓은 ENOTCONN (Linux에서는 그래도 recvfrom이 깨어남)
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as waker:
+                    waker.sendto(b'', ('127.0.0.1', self.port))
+            except OSError:
+                pass
+        if self.listen_thread is not None:
             self.listen_thread.join(timeout=2)
+            if self.listen_thread.is_alive():
+                log.warning("Discovery listener did not stop; port %d may still be bound", self.port)
 
-    def _listen_loop(self):
+    def _listen_loop(self, sock: socket.socket):
         """브로드캐스트 메시지 수신 루프"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.bind(('', self.port))
-        sock.settimeout(1.0)
 
+        # 블로킹 recvfrom (폴링 없음, stop_listening()이 깨움)
         while self.running:
             try:
                 data, addr = sock.recvfrom(1024)
+                if not self.running:
+                    break
+                self.m_packets.inc(label_value='rx')
                 message = json.loads(data.decode('utf-8'))
 
                 if message.get('magic') == self.MAGIC_STRING:
@@ -83,21 +326,23 @@ class NetworkDiscovery:
                         'os': message.get('os', 'Unknown'),
                         'screen_width': message.get('screen_width', 0),
                         'screen_height': message.get('screen_height', 0),
+                        'addresses': sanitize_addresses(message.get('addresses')),
                         'timestamp': time.time()
                     }
 
-                    # 새로운 peer이거나 정보가 업데이트된 경우
-                    if peer_ip not in self.discovered_peers:
-                        self.discovered_peers[peer_ip] = peer_info
+                    change = self.peers.update(peer_ip, peer_info)
+                    if change and self.peer_cache is not None:
+                        self.peer_cache.remember(peer_ip, peer_info)
+
+                    # 새로운 peer인 경우 콜백 호출
+                    if change == PeerRegistry.ADDED:
                         for callback in self.callbacks:
                             callback(peer_ip, peer_info)
-                    else:
-                        self.discovered_peers[peer_ip] = peer_info
 
-            except socket.timeout:
-                continue
             except Exception as e:
-                print(f"Discovery listen error: {e}")
+                if not self.running:
+                    break
+                log_limited(log, logging.WARNING, 'discovery_listen', "Discovery listen error: %s", e)
 
         sock.close()
 
@@ -108,7 +353,9 @@ class NetworkDiscovery:
             'name': name,
             'os': os_name,
             'screen_width': screen_width,
-            'screen_height': screen_height
+            'screen_height': screen_height,
+            # 모든 인터페이스 주소 (상대가 인터페이스별로 연결을 경쟁시킴)
+            'addresses': advertised_ips(self.local_ips)
         }
 
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -117,18 +364,27 @@ class NetworkDiscovery:
         try:
             data = json.dumps(message).encode('utf-8')
             sock.sendto(data, ('<broadcast>', self.port))
+            self.m_packets.inc(label_value='tx')
         except Exception as e:
-            print(f"Broadcast error: {e}")
+            log_limited(log, logging.WARNING, 'discovery_broadcast', "Broadcast error: %s", e)
         finally:
             sock.close()
 
     def get_discovered_peers(self) -> Dict[str, Dict]:
-        """발견된 peer 목록 반환"""
-        # 30초 이상 오래된 peer는 제거
-        current_time = time.time()
-        expired = [ip for ip, info in self.discovered_peers.items()
-                   if current_time - info['timestamp'] > 30]
-        for ip in expired:
-            del self.discovered_peers[ip]
-
-        return self.discovered_peers.copy()
+        """발견된 peer 목록 반환 (복사본)"""
+        self.peers.expire()
+        return self.peers.snapshot()
+
+    def get_peer(self, ip: str) -> Optional[Dict]:
+        """peer 하나의 정보 반환"""
+        self.peers.expire()
+        return self.peers.get(ip)
+
+    def peer_count(self) -> int:
+        self.peers.expire()
+        return len(self.peers)
+
+    def changes_since(self, version: int):
+        """version 이후의 peer 목록 변경 (PeerRegistry.changes_since 참고)"""
+        self.peers.expire()
+        return self.peers.changes_since(version)
@@ -0,0 +1,189 @@
+import time
+import struct
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+# 레코드 종류 (캡처 링: 입력 프로세스 -> 네트워크 프로세스)
+MOVE = 1
+CLICK = 2
+SCROLL = 3
+PRESS = 4
+RELEASE = 5
+
+# 레코드 종류 (주입 링: 네트워크 프로세스 -> 입력 프로세스)
+MOVE_TO = 1
+BUTTON = 2
+SCROLL_BY = 3
+KEY = 4
+TYPE = 5
+CAPTURE_START = 10
+CAPTURE_STOP = 11
+QUIT = 12
+
+# 고정 크기 레코드: kind, flag, x, y, dx, dy, text(키/버튼 이름, utf-8)
+RECORD = struct.Struct('<BBxxiidd44s')
+TEXT_SIZE = 44
+Record = Tuple[int, int, int, int, float, float, str]
+
+# 헤더 (u64 슬롯): head(생산자만 씀), tail(소비자만 씀), sleeping, dropped
+# memoryview('Q')의 원소 대입은 정렬된 8바이트 한 번의 쓰기라 다른 프로세스가 중간 값을 읽지 않음
+# (struct.pack_into는 바이트 단위로 써서 자리올림 순간에 잘못된 값이 보일 수 있음)
+HEAD = 0
+TAIL = 1
+SLEEPING = 2
+DROPPED = 3
+HEADER_SIZE = 64
+
+
+class EventRing:
+    """
+    multiprocessing.shared_memory 위의 단일 생산자/단일 소비자 링 버퍼
+    - 레코드는 고정 크기 struct라 직렬화/피클링 없이 공유 메모리에 바로 씀
+    - 소비자가 잠들어 있을 때만 파이프로 깨움 (바쁜 동안에는 시스템 콜 없음)
+    - 가득 차면 push()가 False를 반환하고 dropped를 증가 (이동처럼 최신 값만 의미 있는 레코드)
+    - block=True(키/버튼 등 잃으면 안 되는 레코드)면 소비자가 자리를 비울 때까지 대기하고,
+      BLOCK_TIMEOUT 동안 비지 않으면(소비자가 멈춤) 그때만 버림
+    - 생산자 프로세스 안에서는 여러 스레드가 push할 수 있음 (프로세스 내부 잠금)
+    """
+
+    # block=True push가 자리를 기다리는 최대 시간 (초) / 재시도 간격 상한 (초)
+    BLOCK_TIMEOUT = 1.0
+    BLOCK_BACKOFF_MAX = 0.005
+
+    def __init__(self, capacity: int = 1024, name: Optional[str] = None, doorbell=None, spin: float = 0.0):
+        self.capacity = capacity
+        # 잠들기 전에 바쁘게 확인하는 시간 (초). 코어가 여럿이면 연속 입력 중 파이프 깨우기를 줄임
+        self.spin = spin
+        size = HEADER_SIZE + capacity * RECORD.size
+        self.owner = name is None
+        # spawn/fork 자식은 부모의 resource_tracker를 공유하므로 해제는 생성한 쪽(unlink)에서만
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.buf = self.shm.buf
+        if self.owner:
+            self.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self.header = self.buf[:HEADER_SIZE].cast('Q')
+
+        # 깨우기용 파이프 (reader, writer)
+        self.doorbell = doorbell or multiprocessing.Pipe(duplex=False)
+        self.push_lock = threading.Lock()
+
+    def __getstate__(self):
+        # 다른 프로세스에는 이름과 파이프만 넘기고 그쪽에서 다시 연결
+        return {'capacity': self.capacity, 'name': self.shm.name, 'doorbell': self.doorbell, 'spin': self.spin}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'], name=state['name'], doorbell=state['doorbell'], spin=state['spin'])
+
+    @property
+    def dropped(self) -> int:
+        return self.header[DROPPED]
+
+    def __len__(self):
+        header = self.header
+        return header[HEAD] - header[TAIL]
+
+    def push(self, kind: int, flag: int = 0, x: int = 0, y: int = 0, dx: float = 0.0, dy: float = 0.0,
+             text: str = '', block: bool = False) -> bool:
+        """레코드 추가 (생산자 전용). block이면 가득 찼을 때 자리가 날 때까지 대기"""
+        deadline = None
+        backoff = 0.0
+        while True:
+            with self.push_lock:
+                if self.buf is None:
+                    return False  # 닫힌 링
+                if self._try_push(kind, flag, x, y, dx, dy, text):
+                    return True
+                now = time.perf_counter()
+                if deadline is None:
+                    deadline = now + self.BLOCK_TIMEOUT
+                if not block or now >= deadline:
+                    self.header[DROPPED] += 1
+                    return False
+            # 잠금 밖에서 대기 (다른 스레드의 push가 막히지 않도록), 코어가 하나뿐이어도 소비자가 실행되게 양보
+            time.sleep(backoff)
+            backoff = min(self.BLOCK_BACKOFF_MAX, backoff * 2 or 0.0001)
+
+    def _try_push(self, kind, flag, x, y, dx, dy, text) -> bool:
+        """push_lock을 잡은 상태에서 호출. 가득 찼으면 False"""
+        header = self.header
+        head = header[HEAD]
+        if head - header[TAIL] >= self.capacity:
+            return False
+
+        offset = HEADER_SIZE + (head % self.capacity) * RECORD.size
+        RECORD.pack_into(self.buf, offset, kind, flag, int(x), int(y), dx, dy, text.encode('utf-8')[:TEXT_SIZE])
+        # 레코드를 다 쓴 뒤에 head를 올려야 소비자가 완성된 레코드만 읽음
+        header[HEAD] = head + 1
+
+        if header[SLEEPING]:
+            try:
+                self.doorbell[1].send_bytes(b'\0')
+            except (OSError, ValueError):
+                pass
+        return True
+
+    def pop_all(self) -> List[Record]:
+        """쌓인 레코드를 모두 꺼냄 (소비자 전용)"""
+        header = self.header
+        tail = header[TAIL]
+        head = header[HEAD]
+        records = []
+        while tail < head:
+            offset = HEADER_SIZE + (tail % self.capacity) * RECORD.size
+            kind, flag, x, y, dx, dy, text = RECORD.unpack_from(self.buf, offset)
+            records.append((kind, flag, x, y, dx, dy, text.rstrip(b'\0').decode('utf-8', 'replace')))
+            tail += 1
+        header[TAIL] = tail
+        return records
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        레코드가 들어올 때까지 대기 (소비자 전용). 레코드가 있으면 True
+        sleeping 플래그와 head 확인이 프로세스 간에 재배치될 수 있어 timeout을 안전망으로 둠
+        """
+        if len(self):
+            return True
+
+        deadline = time.perf_counter() + self.spin
+        while time.perf_counter() < deadline:
+            if len(self):
+                return True
+            time.sleep(0)  # 코어가 하나뿐이어도 생산자가 실행될 수 있게 양보
+
+        reader = self.doorbell[0]
+        self.header[SLEEPING] = 1
+        try:
+            if len(self):
+                return True
+            if reader.poll(timeout):
+                # 쌓인 깨우기 신호 비우기
+                while reader.poll(0):
+                    reader.recv_bytes()
+        except (OSError, EOFError):
+            pass
+        finally:
+            self.header[SLEEPING] = 0
+        return len(self) > 0
+
+    def wake(self):
+        """대기 중인 소비자를 레코드 없이 깨움 (종료 시)"""
+        try:
+            self.doorbell[1].send_bytes(b'\0')
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        with self.push_lock:
+            if self.buf is None:
+                return
+            self.header.release()
+            self.buf = None
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except (OSError, BufferError):
+            pass
+
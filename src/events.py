@@ -1,7 +1,225 @@
 import json
+from collections import deque
+from typing import Dict, Optional
+
+# 이벤트 종류 코드 (디스패치/송신 큐에서 문자열 대신 정수로 비교)
+MESSAGE = 0  # 제어 메시지 (screen_info, hello, path, ping 등): 필드를 dict로 보관
+MOUSE_MOVE = 1
+MOUSE_BUTTON = 2
+MOUSE_SCROLL = 3
+KEYBOARD = 4
+TEXT = 5
+KEY_HELD = 6
+
+_str = json.dumps
+_BOOL = ('false', 'true')
+
+
+class Event:
+    """입력 이벤트 공통 베이스 (__slots__ 고정 필드, 정수 종류 코드)"""
+    __slots__ = ()
+    code = MESSAGE
+    name = ''
+
+    def encode(self) -> str:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.encode()})"
+
+
+class MouseMove(Event):
+    __slots__ = ('x', 'y', 't')
+    code = MOUSE_MOVE
+    name = 'mouse_move'
+
+    def __init__(self, x, y, t: Optional[float] = None):
+        self.x = x
+        self.y = y
+        self.t = t  # 송신 시각 (수신측 지터 버퍼용, 상대가 요청했을 때만)
+
+    def encode(self) -> str:
+        if self.t is None:
+            return '{"type": "mouse_move", "x": %r, "y": %r}' % (self.x, self.y)
+        return '{"type": "mouse_move", "x": %r, "y": %r, "t": %r}' % (self.x, self.y, self.t)
+
+
+class MouseButton(Event):
+    __slots__ = ('x', 'y', 'button', 'pressed')
+    code = MOUSE_BUTTON
+    name = 'mouse_button'
+
+    def __init__(self, x, y, button: str, pressed: bool):
+        self.x = x
+        self.y = y
+        self.button = button
+        self.pressed = pressed
+
+    def encode(self) -> str:
+        return '{"type": "mouse_button", "x": %r, "y": %r, "button": %s, "pressed": %s}' % (
+            self.x, self.y, _str(self.button), _BOOL[bool(self.pressed)])
+
+
+class MouseScroll(Event):
+    __slots__ = ('x', 'y', 'dx', 'dy')
+    code = MOUSE_SCROLL
+    name = 'mouse_scroll'
+
+    def __init__(self, x, y, dx, dy):
+        self.x = x
+        self.y = y
+        self.dx = dx
+        self.dy = dy
+
+    def encode(self) -> str:
+        return '{"type": "mouse_scroll", "x": %r, "y": %r, "dx": %r, "dy": %r}' % (self.x, self.y, self.dx, self.dy)
+
+
+class KeyEvent(Event):
+    __slots__ = ('key', 'pressed', 'repeat')
+    code = KEYBOARD
+    name = 'keyboard'
+
+    def __init__(self, key: str, pressed: bool, repeat: bool = False):
+        self.key = key
+        self.pressed = pressed
+        self.repeat = repeat  # 수신측에서 키 반복 생성
+
+    def encode(self) -> str:
+        if self.repeat:
+            return '{"type": "keyboard", "key": %s, "pressed": %s, "repeat": true}' % (
+                _str(self.key), _BOOL[bool(self.pressed)])
+        return '{"type": "keyboard", "key": %s, "pressed": %s}' % (_str(self.key), _BOOL[bool(self.pressed)])
+
+
+class TextEvent(Event):
+    __slots__ = ('text',)
+    code = TEXT
+    name = 'text'
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def encode(self) -> str:
+        return '{"type": "text", "text": %s}' % _str(self.text)
+
+
+class KeyHeld(Event):
+    __slots__ = ('key',)
+    code = KEY_HELD
+    name = 'key_held'
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def encode(self) -> str:
+        return '{"type": "key_held", "key": %s}' % _str(self.key)
+
+
+# 이 버전이 보내고 처리하는 제어 메시지 종류 (메트릭 라벨은 이 안에서만, 나머지는 'other')
+MESSAGE_TYPES = frozenset(('hello', 'ping', 'pong', 'path', 'screen_info', 'control_transfer'))
+
+
+class Message(Event):
+    """드물게 오가는 제어 메시지 (필드 구성이 메시지마다 달라 dict로 보관)"""
+    __slots__ = ('name', 'fields')
+
+    def __init__(self, name: str, fields: Optional[Dict] = None):
+        self.name = name
+        self.fields = fields if fields is not None else {}
+
+    def get(self, key: str, default=None):
+        return self.fields.get(key, default)
+
+    def encode(self) -> str:
+        return json.dumps(dict(self.fields, type=self.name))
+
+
+class MovePool:
+    """
+    송신측 MouseMove 재사용 풀
+    송신 큐에서 병합/버림되거나 전송이 끝난 이벤트를 돌려받아 다음 캡처에 다시 씀.
+    deque의 append/pop은 원자적이라 입력 훅 스레드와 송신 스레드가 잠금 없이 공유한다.
+    """
+
+    def __init__(self, size: int = 64):
+        self.free = deque(maxlen=size)
+        self.created = 0  # 풀이 비어 새로 만든 객체 수
+
+    def acquire(self, x, y, t: Optional[float] = None) -> MouseMove:
+        try:
+            event = self.free.pop()
+        except IndexError:
+            self.created += 1
+            return MouseMove(x, y, t)
+        event.x = x
+        event.y = y
+        event.t = t
+        return event
+
+    def release(self, event: Event):
+        """더 이상 참조하지 않는 이벤트 반환 (MouseMove가 아니면 무시)"""
+        if event.code == MOUSE_MOVE:
+            self.free.append(event)
+
+
+class EventDecoder:
+    """
+    수신 라인을 타입별 이벤트 객체로 변환
+    입력 이벤트는 타입별로 인스턴스 하나를 재사용하므로 반환값은 다음 decode() 전까지만 유효하다
+    (수신 스레드마다 디코더 하나, 디스패치 중에 이벤트를 보관하지 말 것).
+    """
+
+    def __init__(self):
+        self.move = MouseMove(0, 0)
+        self.button = MouseButton(0, 0, '', False)
+        self.scroll = MouseScroll(0, 0, 0, 0)
+        self.key = KeyEvent('', False)
+        self.text = TextEvent('')
+        self.held = KeyHeld('')
+
+    def decode(self, data: bytes) -> Event:
+        fields = json.loads(data)
+        if not isinstance(fields, dict):
+            raise ValueError("event is not an object")
+        event_type = fields.pop('type', None)
+        if event_type == 'mouse_move':
+            event = self.move
+            event.x = fields['x']
+            event.y = fields['y']
+            event.t = fields.get('t')
+        elif event_type == 'keyboard':
+            event = self.key
+            event.key = fields['key']
+            event.pressed = fields['pressed']
+            event.repeat = fields.get('repeat', False)
+        elif event_type == 'mouse_button':
+            event = self.button
+            event.x = fields['x']
+            event.y = fields['y']
+            event.button = fields['button']
+            event.pressed = fields['pressed']
+        elif event_type == 'mouse_scroll':
+            event = self.scroll
+            event.x = fields['x']
+            event.y = fields['y']
+            event.dx = fields['dx']
+            event.dy = fields['dy']
+        elif event_type == 'text':
+            event = self.text
+            event.text = fields['text']
+        elif event_type == 'key_held':
+            event = self.held
+            event.key = fields['key']
+        else:
+            return Message(str(event_type), fields)
+        return event
+
 
 def serialize_event(event):
-    """Serializes an event dictionary to a JSON string with newline delimiter."""
+    """Serializes an event (typed event or dictionary) to a JSON string with newline delimiter."""
+    if isinstance(event, Event):
+        return (event.encode() + '\n').encode('utf-8')
     return (json.dumps(event) + '\n').encode('utf-8')
 
 def deserialize_event(data):
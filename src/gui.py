@@ -1,15 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import os
+import json
+import socket
 import threading
 import time
+from collections import deque
+from typing import Optional
+from src.automation import AutomationServer
 from src.config_manager import ConfigManager
+from src.daemon import daemon_running, default_control_socket, open_status_subscription, send_control_command
 from src.discovery import NetworkDiscovery
+from src.log import CallbackHandler, configure_logging, shutdown_logging
+from src.metrics import MetricsExporter
 from src.peer import KMPeer
+from src.peer_cache import PeerCache
+from src.perf_monitor import PerfSampler, format_ms, format_rate
+from src.profiling import INSTRUMENTATION
 
 class KMShareGUI:
     """KM-Share GUI 애플리케이션"""
 
-    def __init__(self):
+    # GUI 갱신 주기 (ms) - 20Hz
+    GUI_TICK_MS = 50
+    # 파일 핸들러가 없는 Tk(Windows)에서 다른 스레드의 갱신 요청을 확인하는 주기 (ms, 이 경우만 유휴 중에도 깨어남)
+    WAKE_POLL_MS = 250
+    # 로그 위젯/버퍼에 유지할 최대 줄 수
+    LOG_MAX_LINES = 500
+    # 성능 패널 스파크라인 크기 (px)
+    SPARK_WIDTH = 240
+    SPARK_HEIGHT = 44
+
+    def __init__(self, control_socket: Optional[str] = None):
         self.root = tk.Tk()
         self.root.title("KM-Share - Keyboard & Mouse Sharing")
         self.root.geometry("750x750")
@@ -19,16 +41,61 @@ class KMShareGUI:
         self.config = ConfigManager()
 
         # 네트워크 검색
-        self.discovery = NetworkDiscovery()
-        self.discovery.add_callback(self._on_peer_discovered)
+        # 알려진 peer 캐시 (검색 결과와 연결 기록을 저장, 시작 시 바로 연결하는 데 사용)
+        self.peer_cache = PeerCache.from_config(self.config)
+        self.discovery = NetworkDiscovery(peer_cache=self.peer_cache)
+        # peer 목록에 반영된 registry 버전과 리스트박스 행 순서의 ip, ip -> 행 번호
+        self.peers_version = 0
+        self.peer_ips = []
+        self.peer_rows = {}
+        # TTL이 지나 빠진 peer를 목록에서 지우도록 만료 스레드가 tick을 요청
+        self.discovery.add_removed_callback(lambda ips: self._wake())
 
         # P2P peer
         self.peer = None
 
+        # 제어 소켓에서 데몬이 실행 중이면 peer를 직접 만들지 않고 데몬의 클라이언트로 동작
+        control_socket = control_socket or default_control_socket()
+        self.control_socket = control_socket if daemon_running(control_socket) else None
+        # 데몬 상태 구독 연결 (백그라운드 스레드가 읽고 변경이 오면 self-pipe로 GUI tick 요청)
+        self._daemon_sock = None
+        self._daemon_state = None
+        self._closing = False
+
+        # 메트릭 노출 / 스크립트 입력 API (설정된 경우에만, 데몬에 붙은 경우에는 데몬이 담당)
+        self.metrics_exporter = MetricsExporter.from_config(self.config)
+        self.automation = AutomationServer.from_config(self.config, lambda: self.peer)
+        if self.control_socket is None:
+            self.metrics_exporter.start()
+            self.automation.start()
+
+        # 콜백 계측 (SIGUSR1: cProfile, SIGUSR2: tracemalloc)
+        INSTRUMENTATION.configure(self.config)
+        INSTRUMENTATION.install_signal_handlers()
+
         # 주기적 브로드캐스트 스레드
         self.broadcast_thread = None
         self.broadcast_running = False
 
+        # GUI tick에서 일괄 처리할 대기 로그 (링 버퍼, 가득 차면 오래된 줄부터 버림)
+        self._pending_logs = deque(maxlen=self.LOG_MAX_LINES)
+        # GUI tick에서 반영할 상태 변경 ('connected'|'control'|'daemon', 값), 스레드 간 교환은 deque의 원자적 append/popleft로
+        self._pending_states = deque()
+        self._tick_id = None
+        # 다른 스레드가 tick을 요청했는지 (중복 요청 방지)
+        self._tick_requested = False
+        # 다른 스레드가 메인 루프를 깨우는 self-pipe (Windows에서는 None, 요청 플래그 주기 확인)
+        self._wake_r = self._wake_w = None
+        self._wake_poll_id = None
+
+        # 성능 패널 (보이는 동안에만 고정 주기로 peer 카운터를 샘플링)
+        self.perf_sampler = PerfSampler()
+        self.perf_interval_ms = max(100, int(self.config.get('diagnostics.perf_panel_ms', 500)))
+        self._perf_id = None
+
+        # 로그 출력은 백그라운드 스레드에서 (경고 이상은 로그 창에도 표시)
+        configure_logging(self.config, [CallbackHandler(self.log)])
+
         # GUI 생성
         self._create_widgets()
         self._load_config_to_gui()
@@ -36,6 +103,27 @@ class KMShareGUI:
         # 종료 핸들러
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        # GUI 갱신은 변경이 생겼을 때만 (유휴 상태에서는 타이머 없음)
+        # 다른 스레드는 Tk를 호출하지 않고 self-pipe에 1바이트를 써서 메인 루프를 깨움
+        try:
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+            self.root.tk.createfilehandler(self._wake_r, tk.READABLE, self._on_wake)
+        except (AttributeError, OSError, tk.TclError):
+            # Windows Tk에는 파일 핸들러가 없음: 요청 플래그를 주기적으로 확인
+            self._close_wake_pipe()
+            self._wake_poll_id = self.root.after(self.WAKE_POLL_MS, self._poll_wake)
+        self._tick_id = self.root.after(self.GUI_TICK_MS, self._gui_tick)
+
+        if self.control_socket is not None:
+            self.log(f"Attached to KM-Share daemon at {self.control_socket}")
+            threading.Thread(target=self._watch_daemon, daemon=True).start()
+
+        # 캐시된 peer가 있으면 백그라운드 검색으로 주소/화면 정보 갱신
+        if self.peer_cache is not None and len(self.peer_cache) and self.config.get('network.discovery_enabled', True):
+            self._start_discovery()
+
     def _create_widgets(self):
         """GUI 위젯 생성"""
 
@@ -88,10 +176,20 @@ class KMShareGUI:
         manual_frame.pack(fill=tk.X, pady=5)
 
         ttk.Label(manual_frame, text="Manual IP:").pack(side=tk.LEFT, padx=5)
-        self.manual_ip_var = tk.StringVar(value=self.config.get('remote.ip', ''))
+        self.manual_ip_var = tk.StringVar(value=self.config.get('remote.ip', '') or self._cached_peer_ip())
         ttk.Entry(manual_frame, textvariable=self.manual_ip_var, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(manual_frame, text="Connect", command=self._connect_manual).pack(side=tk.LEFT)
 
+        # 사전 공유 키 (양쪽 peer에 같은 값)
+        ttk.Label(manual_frame, text="Shared Key:").pack(side=tk.LEFT, padx=(15, 5))
+        self.psk_var = tk.StringVar(value=self.config.get('security.psk', ''))
+        ttk.Entry(manual_frame, textvariable=self.psk_var, width=16, show='*').pack(side=tk.LEFT)
+
+        # 다른 서브넷의 peer와 연결할 때 경유할 relay (host:port)
+        ttk.Label(manual_frame, text="Relay:").pack(side=tk.LEFT, padx=(15, 5))
+        self.relay_var = tk.StringVar(value=self.config.get('relay.address', ''))
+        ttk.Entry(manual_frame, textvariable=self.relay_var, width=18).pack(side=tk.LEFT)
+
         # 화면 배치 선택
         layout_frame = ttk.LabelFrame(self.root, text="Screen Layout", padding=10)
         layout_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -124,9 +222,40 @@ class KMShareGUI:
                         variable=self.hide_cursor_var,
                         command=self._on_feature_changed).pack(anchor=tk.W)
 
+        # 진단 (계측/프로파일링)
+        diagnostics_frame = ttk.LabelFrame(self.root, text="Diagnostics", padding=10)
+        diagnostics_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.instrument_var = tk.BooleanVar(value=INSTRUMENTATION.enabled)
+        ttk.Checkbutton(diagnostics_frame, text="Instrument Callbacks",
+                        variable=self.instrument_var,
+                        command=self._on_instrument_changed).pack(side=tk.LEFT, padx=5)
+
+        self.profile_button = ttk.Button(diagnostics_frame, text="Start cProfile", command=self._toggle_profiling)
+        self.profile_button.pack(side=tk.LEFT, padx=5)
+
+        self.tracemalloc_button = ttk.Button(diagnostics_frame, text="Start tracemalloc",
+                                             command=self._toggle_tracemalloc)
+        self.tracemalloc_button.pack(side=tk.LEFT, padx=5)
+
+        self.perf_panel_var = tk.BooleanVar(value=self.config.get('diagnostics.perf_panel', False))
+        ttk.Checkbutton(diagnostics_frame, text="Performance Panel",
+                        variable=self.perf_panel_var,
+                        command=self._on_perf_panel_changed).pack(side=tk.LEFT, padx=5)
+
+        # 성능 패널 (체크했을 때만 표시)
+        self.perf_frame = ttk.LabelFrame(self.root, text="Performance", padding=10)
+        self.perf_var = tk.StringVar(value="Not running")
+        ttk.Label(self.perf_frame, textvariable=self.perf_var, font=('Courier', 9),
+                  justify=tk.LEFT).pack(side=tk.LEFT, anchor=tk.W)
+        self.spark_canvas = tk.Canvas(self.perf_frame, width=self.SPARK_WIDTH, height=self.SPARK_HEIGHT,
+                                      background='white', highlightthickness=0)
+        self.spark_canvas.pack(side=tk.RIGHT, padx=5)
+
         # 하단: 상태 및 제어
         control_frame = ttk.Frame(self.root, padding=10)
         control_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.control_frame = control_frame
 
         # 상태 표시
         self.status_var = tk.StringVar(value="Disconnected")
@@ -153,6 +282,9 @@ class KMShareGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=6, state=tk.DISABLED)
         self.log_text.pack(fill=tk.BOTH, expand=True)
 
+        if self.perf_panel_var.get():
+            self.perf_frame.pack(fill=tk.X, padx=10, pady=5, before=self.control_frame)
+
     def _load_config_to_gui(self):
         """설정을 GUI에 로드"""
         # 로컬 정보를 자동으로 갱신
@@ -168,11 +300,15 @@ class KMShareGUI:
             f"{self.config.get('local.screen_width')}x{self.config.get('local.screen_height')}"
         )
 
+    def _cached_peer_ip(self) -> str:
+        """캐시에서 마지막으로 연결에 성공한 peer 주소"""
+        last_good = self.peer_cache.last_good() if self.peer_cache is not None else None
+        return last_good[0] if last_good else ''
+
     def _start_discovery(self):
         """네트워크 검색 시작"""
         self.log("Starting network discovery...")
         self.discovery_status_var.set("Searching...")
-        self.peers_listbox.delete(0, tk.END)
 
         self.discovery.start_listening()
 
@@ -188,8 +324,9 @@ class KMShareGUI:
         """네트워크 검색 중지"""
         self.broadcast_running = False
         self.discovery.stop_listening()
-        self.discovery_status_var.set(f"Found {len(self.discovery.get_discovered_peers())} peers")
-        self.log(f"Discovery completed. Found {len(self.discovery.get_discovered_peers())} peers.")
+        count = self.discovery.peer_count()
+        self.discovery_status_var.set(f"Found {count} peers")
+        self.log(f"Discovery completed. Found {count} peers.")
 
     def _broadcast_loop(self):
         """주기적으로 브로드캐스트"""
@@ -202,21 +339,46 @@ class KMShareGUI:
             )
             time.sleep(1)
 
-    def _on_peer_discovered(self, ip: str, peer_info: dict):
-        """Peer 발견시 호출"""
-        self.root.after(0, lambda: self._add_peer_to_list(ip, peer_info))
-
-    def _add_peer_to_list(self, ip: str, peer_info: dict):
-        """Peer를 리스트에 추가"""
-        peer_str = f"{ip} - {peer_info['name']} ({peer_info['os']}) [{peer_info['screen_width']}x{peer_info['screen_height']}]"
+    @staticmethod
+    def _format_peer(ip: str, peer_info: dict) -> str:
+        return f"{ip} - {peer_info['name']} ({peer_info['os']}) [{peer_info['screen_width']}x{peer_info['screen_height']}]"
 
-        # 중복 확인
-        for i in range(self.peers_listbox.size()):
-            if self.peers_listbox.get(i).startswith(ip):
-                return
+    def _apply_peer_changes(self):
+        """마지막으로 반영한 버전 이후의 peer 변경분만 리스트박스에 반영"""
+        version, added, updated, removed, resync = self.discovery.changes_since(self.peers_version)
+        if version == self.peers_version:
+            return
+        self.peers_version = version
+
+        if resync:
+            self.peers_listbox.delete(0, tk.END)
+            self.peer_ips = []
+            self.peer_rows = {}
+
+        # 뒤쪽 행부터 지워 앞 행 번호가 바뀌지 않게 하고, 행 번호는 한 번만 다시 계산
+        rows = sorted((self.peer_rows[ip] for ip in removed if ip in self.peer_rows), reverse=True)
+        for index in rows:
+            self.log(f"Peer expired: {self.peer_ips[index]}")
+            self.peers_listbox.delete(index)
+            del self.peer_ips[index]
+        if rows:
+            self.peer_rows = {ip: index for index, ip in enumerate(self.peer_ips)}
+
+        for ip, peer_info in updated:
+            index = self.peer_rows.get(ip)
+            if index is not None:
+                self.peers_listbox.delete(index)
+                self.peers_listbox.insert(index, self._format_peer(ip, peer_info))
+            else:
+                added.append((ip, peer_info))
 
-        self.peers_listbox.insert(tk.END, peer_str)
-        self.log(f"Discovered peer: {peer_str}")
+        for ip, peer_info in added:
+            peer_str = self._format_peer(ip, peer_info)
+            self.peers_listbox.insert(tk.END, peer_str)
+            self.peer_rows[ip] = len(self.peer_ips)
+            self.peer_ips.append(ip)
+            if not resync:
+                self.log(f"Discovered peer: {peer_str}")
 
     def _on_peer_selected(self, event):
         """리스트에서 peer 선택시"""
@@ -224,15 +386,16 @@ class KMShareGUI:
         if not selection:
             return
 
-        peer_str = self.peers_listbox.get(selection[0])
-        ip = peer_str.split(' - ')[0]
+        ip = self.peer_ips[selection[0]]
 
         # 설정 업데이트
-        peers = self.discovery.get_discovered_peers()
-        if ip in peers:
-            self.config.update_remote_from_discovery(ip, peers[ip])
+        peer_info = self.discovery.get_peer(ip)
+        if peer_info:
+            self.config.update_remote_from_discovery(ip, peer_info)
             self.manual_ip_var.set(ip)
             self.log(f"Selected peer: {ip}")
+            if self.control_socket is not None:
+                self._daemon_command({'cmd': 'remote', 'ip': ip})
 
     def _connect_manual(self):
         """수동 IP로 연결"""
@@ -243,6 +406,8 @@ class KMShareGUI:
 
         self.config.set('remote.ip', ip)
         self.log(f"Manual IP set to: {ip}")
+        if self.control_socket is not None:
+            self._daemon_command({'cmd': 'remote', 'ip': ip})
 
     def _on_layout_changed(self):
         """화면 배치 변경시"""
@@ -252,25 +417,209 @@ class KMShareGUI:
 
         if self.peer:
             self.peer.layout_position = layout
+        elif self.control_socket is not None:
+            self._daemon_command({'cmd': 'layout', 'position': layout})
 
     def _on_feature_changed(self):
         """기능 옵션 변경시"""
         self.config.set('features.edge_detection', self.edge_detection_var.get())
         self.config.set('features.hide_cursor', self.hide_cursor_var.get())
 
+    def _on_instrument_changed(self):
+        """콜백 계측 토글"""
+        enabled = self.instrument_var.get()
+        INSTRUMENTATION.set_enabled(enabled)
+        self.config.set('diagnostics.instrument', enabled)
+        self.log(f"Callback instrumentation {'enabled' if enabled else 'disabled'}")
+
+    def _on_perf_panel_changed(self):
+        """성능 패널 표시 토글"""
+        enabled = self.perf_panel_var.get()
+        self.config.set('diagnostics.perf_panel', enabled)
+        if enabled:
+            self.perf_frame.pack(fill=tk.X, padx=10, pady=5, before=self.control_frame)
+            self.perf_sampler.reset()
+            self._schedule_perf()
+        else:
+            self.perf_frame.pack_forget()
+            if self._perf_id is not None:
+                self.root.after_cancel(self._perf_id)
+                self._perf_id = None
+
+    def _schedule_perf(self):
+        """성능 패널 갱신 예약 (패널이 보이고 peer가 실행 중일 때만)"""
+        if self._perf_id is None and self.perf_panel_var.get() and self.peer is not None:
+            self._perf_id = self.root.after(self.perf_interval_ms, self._perf_tick)
+
+    def _perf_tick(self):
+        """peer 카운터를 한 번 샘플링해 성능 패널 갱신"""
+        self._perf_id = None
+        peer = self.peer
+        if peer is None or not self.perf_panel_var.get():
+            return
+
+        stats = self.perf_sampler.sample(peer)
+        self.perf_var.set(
+            f"Events  {format_rate(stats['events_sent'])} out  {format_rate(stats['events_received'])} in\n"
+            f"Bytes   {format_rate(stats['bytes_sent'], 'B')} out  {format_rate(stats['bytes_received'], 'B')} in\n"
+            f"RTT     {format_ms(stats['rtt'])}  (p50 {format_ms(stats['rtt_p50'])}  "
+            f"p90 {format_ms(stats['rtt_p90'])}  p99 {format_ms(stats['rtt_p99'])})\n"
+            f"Queue   {stats['queue_events']} events, {stats['queue_bytes']:.0f} B in kernel\n"
+            f"Handoff {format_ms(stats['last_handoff'])} (last)")
+        self._draw_sparkline()
+        self._schedule_perf()
+
+    def _draw_sparkline(self):
+        """최근 초당 이벤트 수(파랑)와 RTT(주황) 추이를 각각 최대값 기준으로 그림"""
+        canvas = self.spark_canvas
+        canvas.delete('all')
+        for values, color in ((self.perf_sampler.event_rates, 'blue'),
+                              (self.perf_sampler.rtt_samples, 'orange')):
+            if len(values) < 2:
+                continue
+            peak = max(values) or 1.0
+            step = self.SPARK_WIDTH / (self.perf_sampler.history - 1)
+            offset = self.SPARK_WIDTH - step * (len(values) - 1)
+            points = []
+            for index, value in enumerate(values):
+                points.append(offset + index * step)
+                points.append(self.SPARK_HEIGHT - 2 - (self.SPARK_HEIGHT - 4) * value / peak)
+            canvas.create_line(*points, fill=color)
+
+    def _toggle_profiling(self):
+        """cProfile 샘플링 시작/중지"""
+        if INSTRUMENTATION.profiling:
+            self.profile_button.config(text="Start cProfile")
+            try:
+                path = INSTRUMENTATION.stop_profiling()
+            except OSError as e:
+                self.log(f"cProfile stopped, failed to write stats: {e}")
+                return
+            self.log(f"cProfile stopped: {path or 'no samples'}")
+        else:
+            INSTRUMENTATION.start_profiling()
+            self.instrument_var.set(True)
+            self.profile_button.config(text="Stop cProfile")
+            self.log("cProfile started")
+
+    def _toggle_tracemalloc(self):
+        """tracemalloc 샘플링 시작/중지"""
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            self.tracemalloc_button.config(text="Start tracemalloc")
+            try:
+                path = INSTRUMENTATION.stop_tracemalloc()
+            except OSError as e:
+                self.log(f"tracemalloc stopped, failed to write snapshot: {e}")
+                return
+            self.log(f"tracemalloc stopped: {path}")
+        else:
+            INSTRUMENTATION.start_tracemalloc()
+            self.tracemalloc_button.config(text="Stop tracemalloc")
+            self.log("tracemalloc started")
+
+    def _daemon_command(self, request: dict):
+        """데몬에 제어 명령 전송 (Tk 스레드를 막지 않도록 별도 스레드에서, 결과 상태는 구독 연결로 옴)"""
+        threading.Thread(target=self._send_daemon_command, args=(request,), daemon=True).start()
+
+    def _send_daemon_command(self, request: dict):
+        try:
+            response = send_control_command(request, self.control_socket, timeout=1.0)
+        except (OSError, ValueError) as e:
+            self.log(f"Daemon not reachable at {self.control_socket}: {e}")
+            return
+        if not response.get('ok'):
+            self.log(f"Daemon rejected '{request.get('cmd')}': {response.get('error')}")
+
+    def _watch_daemon(self):
+        """데몬 상태 구독 (백그라운드 스레드, 블로킹 recv라 상태가 바뀔 때만 깨어남)"""
+        try:
+            sock = open_status_subscription(self.control_socket)
+        except OSError as e:
+            self.log(f"Daemon not reachable at {self.control_socket}: {e}")
+            self._pending_states.append(('daemon', None))
+            self._wake()
+            return
+
+        self._daemon_sock = sock
+        buffer = b''
+        try:
+            while not self._closing:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    try:
+                        status = json.loads(line.decode('utf-8'))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        continue
+                    if isinstance(status, dict) and status.get('event') == 'status':
+                        self._pending_states.append(('daemon', status))
+                        self._wake()
+        except OSError:
+            pass
+        finally:
+            self._daemon_sock = None
+            sock.close()
+
+        if not self._closing:
+            self.log(f"Lost connection to KM-Share daemon at {self.control_socket}")
+            self._pending_states.append(('daemon', None))
+            self._wake()
+
+    def _apply_daemon_state(self, status):
+        """구독으로 받은 데몬 상태를 GUI에 반영 (GUI tick에서, None이면 연결 끊김)"""
+        if status is None:
+            self._daemon_state = None
+            self.status_var.set("Daemon unavailable")
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.DISABLED)
+            return
+
+        running = bool(status.get('running'))
+        state = (running, bool(status.get('connected')), bool(status.get('has_control', True)))
+        if state == self._daemon_state:
+            return
+        if self._daemon_state is not None and state[1] != self._daemon_state[1]:
+            self.log("Connected to remote peer!" if state[1] else "Disconnected from remote peer")
+        self._daemon_state = state
+        self.status_var.set("Connected" if state[1] else ("Connecting..." if running else "Disconnected"))
+        self.control_status_var.set("Local Control" if state[2] else "Remote Control")
+        self.start_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.stop_button.config(state=tk.NORMAL if running else tk.DISABLED)
+
     def _start_sharing(self):
         """공유 시작"""
-        if not self.config.get('remote.ip'):
-            messagebox.showwarning("Warning", "Please select or enter a remote IP address")
+        if self.control_socket is not None:
+            # 데몬은 자신의 설정 파일로 연결 (원격 IP/배치는 선택할 때 이미 전달됨)
+            self.log("Starting KM-Share daemon sharing...")
+            self._daemon_command({'cmd': 'start'})
+            return
+
+        relay = self.relay_var.get().strip()
+        if relay != self.config.get('relay.address', ''):
+            self.config.set('relay.address', relay)
+        if not self.config.get('remote.ip') and not self._cached_peer_ip() and not relay:
+            messagebox.showwarning("Warning", "Please select or enter a remote IP address or relay")
             return
 
         self.log("Starting KM-Share...")
 
+        psk = self.psk_var.get()
+        if psk != self.config.get('security.psk', ''):
+            self.config.set('security.psk', psk)
+        if not psk:
+            self.log("Warning: no shared key set; connections are not authenticated")
+
         # P2P peer 생성 및 시작
-        self.peer = KMPeer(self.config)
+        self.peer = KMPeer(self.config, peer_cache=self.peer_cache)
         self.peer.on_connection_changed = self._on_connection_changed
         self.peer.on_control_changed = self._on_control_changed
         self.peer.start()
+        self.perf_sampler.reset()
+        self._schedule_perf()
 
         # 버튼 상태 변경
         self.start_button.config(state=tk.DISABLED)
@@ -282,6 +631,10 @@ class KMShareGUI:
         """공유 중지"""
         self.log("Stopping KM-Share...")
 
+        if self.control_socket is not None:
+            self._daemon_command({'cmd': 'stop'})
+            return
+
         if self.peer:
             self.peer.stop()
             self.peer = None
@@ -294,59 +647,147 @@ class KMShareGUI:
         self.control_status_var.set("Local Control")
 
     def _on_connection_changed(self, connected: bool):
-        """연결 상태 변경시"""
-        def update():
-            if connected:
-                self.status_var.set("Connected")
-                self.log("Connected to remote peer!")
-            else:
-                self.status_var.set("Disconnected")
-                self.log("Disconnected from remote peer")
-
-        self.root.after(0, update)
+        """연결 상태 변경시 (GUI tick에서 반영)"""
+        self._pending_states.append(('connected', connected))
+        self.log("Connected to remote peer!" if connected else "Disconnected from remote peer")
 
     def _on_control_changed(self, has_control: bool):
-        """제어권 변경시"""
-        def update():
-            if has_control:
-                self.control_status_var.set("Local Control")
-                self.log("Control: LOCAL")
+        """제어권 변경시 (GUI tick에서 반영)"""
+        self._pending_states.append(('control', has_control))
+        self.log("Control: LOCAL" if has_control else "Control: REMOTE")
+
+    def log(self, message: str):
+        """로그 메시지 추가 (어느 스레드에서든 호출 가능, GUI tick에서 일괄 출력)"""
+        self._pending_logs.append(f"[{time.strftime('%H:%M:%S')}] {message}\n")
+        self._wake()
+
+    def _wake(self):
+        """
+        GUI tick 요청 (어느 스레드에서든 호출 가능, 블로킹하지 않음)
+        Tk는 호출하지 않고 플래그를 세운 뒤 self-pipe에 1바이트를 씀 (event_generate는 메인 루프가
+        처리할 때까지 호출 스레드를 막으므로 로그 출력 스레드/종료 처리와 교착될 수 있음)
+        """
+        if self._tick_requested:
+            return
+        self._tick_requested = True
+        wake_w = self._wake_w
+        if wake_w is not None:
+            try:
+                os.write(wake_w, b'\0')
+            except OSError:
+                pass  # 파이프가 가득 참 (이미 깨우는 중) 또는 종료 중
+
+    def _on_wake(self, fd=None, mask=None):
+        """tick 예약 (GUI_TICK_MS 동안 쌓인 변경을 한 번에 반영)"""
+        if fd is not None:
+            try:
+                os.read(fd, 4096)
+            except OSError:
+                pass
+        if self._tick_id is None:
+            self._tick_id = self.root.after(self.GUI_TICK_MS, self._gui_tick)
+
+    def _poll_wake(self):
+        """파일 핸들러가 없을 때: 다른 스레드가 남긴 갱신 요청 확인"""
+        self._wake_poll_id = self.root.after(self.WAKE_POLL_MS, self._poll_wake)
+        if self._tick_requested:
+            self._on_wake()
+
+    def _close_wake_pipe(self):
+        wake_r, wake_w = self._wake_r, self._wake_w
+        self._wake_r = self._wake_w = None
+        for fd in (wake_r, wake_w):
+            if fd is not None:
+                os.close(fd)
+
+    def _gui_tick(self):
+        """대기 중인 로그와 상태 변경을 한 번에 반영"""
+        self._tick_id = None
+        self._tick_requested = False
+
+        # 순서대로 적용하므로 마지막 변경이 남음 (tick 도중 들어온 변경은 다음 tick에서)
+        while self._pending_states:
+            try:
+                kind, value = self._pending_states.popleft()
+            except IndexError:
+                break
+            if kind == 'connected':
+                self.status_var.set("Connected" if value else "Disconnected")
+            elif kind == 'daemon':
+                self._apply_daemon_state(value)
             else:
-                self.control_status_var.set("Remote Control")
-                self.log("Control: REMOTE")
+                self.control_status_var.set("Local Control" if value else "Remote Control")
 
-        self.root.after(0, update)
+        self._apply_peer_changes()
 
-    def log(self, message: str):
-        """로그 메시지 추가"""
-        def add_log():
+        lines = []
+        while self._pending_logs:
+            try:
+                lines.append(self._pending_logs.popleft())
+            except IndexError:
+                break
+
+        if lines:
             self.log_text.config(state=tk.NORMAL)
-            self.log_text.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] {message}\n")
+            self.log_text.insert(tk.END, ''.join(lines[-self.LOG_MAX_LINES:]))
+
+            # 위젯에는 마지막 LOG_MAX_LINES 줄만 유지
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > self.LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{line_count - self.LOG_MAX_LINES + 1}.0')
+
             self.log_text.see(tk.END)
             self.log_text.config(state=tk.DISABLED)
 
-        if threading.current_thread() != threading.main_thread():
-            self.root.after(0, add_log)
-        else:
-            add_log()
+        # 검색 중에는 peer 목록 변경을 반영하도록 계속 갱신
+        if self.broadcast_running:
+            self._tick_id = self.root.after(self.GUI_TICK_MS, self._gui_tick)
 
     def _on_closing(self):
         """윈도우 종료시"""
+        if self._tick_id:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
+        if self._perf_id is not None:
+            self.root.after_cancel(self._perf_id)
+            self._perf_id = None
+        if self._wake_poll_id is not None:
+            self.root.after_cancel(self._wake_poll_id)
+            self._wake_poll_id = None
+        # 데몬에 붙은 경우 창을 닫아도 데몬의 공유는 계속됨 (구독 연결만 끊음)
+        self._closing = True
+        daemon_sock = self._daemon_sock
+        if daemon_sock is not None:
+            try:
+                daemon_sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._wake_r is not None:
+            self.root.tk.deletefilehandler(self._wake_r)
+
         if self.peer:
             self.peer.stop()
 
         self.discovery.stop_listening()
         self.broadcast_running = False
+        self.metrics_exporter.stop()
+        self.automation.stop()
+        if self.peer_cache is not None:
+            self.peer_cache.flush()
 
         self.root.destroy()
 
     def run(self):
-        """GUI 실행"""
-        self.root.mainloop()
+        """GUI 실행 (로그 출력 스레드는 메인 루프가 끝난 뒤 정리)"""
+        try:
+            self.root.mainloop()
+        finally:
+            shutdown_logging()
+            self._close_wake_pipe()
 
 
-def main():
-    app = KMShareGUI()
+def main(control_socket: Optional[str] = None):
+    app = KMShareGUI(control_socket)
     app.run()
 
 
@@ -0,0 +1,276 @@
+import os
+import logging
+import threading
+import multiprocessing
+from typing import Callable, Dict
+from src.log import get_logger, log_limited
+from src.event_ring import (EventRing, TEXT_SIZE, MOVE, CLICK, SCROLL, PRESS, RELEASE,
+                            MOVE_TO, BUTTON, SCROLL_BY, KEY, TYPE, CAPTURE_START, CAPTURE_STOP, QUIT)
+
+log = get_logger('input_process')
+
+# 링 대기의 안전망 타임아웃 (초). 입력이 없을수록 두 배씩 늘려 유휴 상태에서 거의 깨어나지 않음
+IDLE_WAIT_MIN = 0.5
+IDLE_WAIT_MAX = 4.0
+
+
+class _RingMouse:
+    """주입 링에 기록하는 mouse.Controller 대용 (position/press/release/scroll, 이동 외에는 버리지 않음)"""
+
+    def __init__(self, ring: EventRing):
+        self.ring = ring
+        self._position = (0, 0)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, pos):
+        self._position = pos
+        self.ring.push(MOVE_TO, x=pos[0], y=pos[1])
+
+    def press(self, button):
+        self.ring.push(BUTTON, 1, text=str(button), block=True)
+
+    def release(self, button):
+        self.ring.push(BUTTON, 0, text=str(button), block=True)
+
+    def scroll(self, dx, dy):
+        self.ring.push(SCROLL_BY, dx=dx, dy=dy, block=True)
+
+
+class _RingKeyboard:
+    """주입 링에 기록하는 keyboard.Controller 대용 (press/release/type, 가득 차면 자리가 날 때까지 대기)"""
+
+    def __init__(self, ring: EventRing):
+        self.ring = ring
+
+    def press(self, key):
+        self.ring.push(KEY, 1, text=str(key), block=True)
+
+    def release(self, key):
+        self.ring.push(KEY, 0, text=str(key), block=True)
+
+    def type(self, text):
+        # 레코드의 text 칸(TEXT_SIZE 바이트)에 맞게 문자 경계에서 나눠 기록
+        chunk, size = [], 0
+        for ch in text:
+            n = len(ch.encode('utf-8'))
+            if size + n > TEXT_SIZE:
+                self.ring.push(TYPE, text=''.join(chunk), block=True)
+                chunk, size = [], 0
+            chunk.append(ch)
+            size += n
+        if chunk:
+            self.ring.push(TYPE, text=''.join(chunk), block=True)
+
+
+class InputProcess:
+    """
+    입력 캡처/주입 전용 프로세스
+    pynput 훅과 컨트롤러를 별도 프로세스에서 실행해 GUI/네트워크/JSON 처리와 GIL을 공유하지 않게 한다.
+    - 캡처 링: 입력 프로세스의 리스너 -> 이 프로세스의 펌프 스레드 -> KMPeer의 _on_move 등
+    - 주입 링: KMPeer가 mouse/keyboard 대용 객체로 주입 -> 입력 프로세스의 컨트롤러
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capture_ring = EventRing(capacity)
+        self.inject_ring = EventRing(capacity)
+        self.mouse = _RingMouse(self.inject_ring)
+        self.keyboard = _RingKeyboard(self.inject_ring)
+
+        self.process = None
+        self.pump_thread = None
+        self.running = False
+        self.handlers: Dict[int, Callable] = {}
+
+    def start(self, on_move: Callable, on_click: Callable, on_scroll: Callable,
+              on_press: Callable, on_release: Callable):
+        """입력 프로세스와 캡처 펌프 스레드 시작 (콜백 인자는 pynput 리스너와 같음, 키는 문자열)"""
+        if self.running:
+            return
+
+        self.handlers = {
+            MOVE: lambda r: on_move(r[2], r[3]),
+            CLICK: lambda r: on_click(r[2], r[3], r[6], bool(r[1])),
+            SCROLL: lambda r: on_scroll(r[2], r[3], r[4], r[5]),
+            PRESS: lambda r: on_press(r[6]) if r[6] else None,
+            RELEASE: lambda r: on_release(r[6]) if r[6] else None,
+        }
+
+        # 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+        ctx = multiprocessing.get_context('spawn')
+        self.process = ctx.Process(target=run_input_process, name='km-share-input', daemon=True,
+                                   args=(self.capture_ring, self.inject_ring, os.getpid()))
+        self.process.start()
+        log.info("Input process started (pid %d)", self.process.pid)
+
+        self.running = True
+        self.pump_thread = threading.Thread(target=self._pump_loop, daemon=True)
+        self.pump_thread.start()
+
+    def start_capture(self):
+        self.inject_ring.push(CAPTURE_START, block=True)
+
+    def stop_capture(self):
+        self.inject_ring.push(CAPTURE_STOP, block=True)
+
+    def stop(self):
+        """프로세스/펌프 종료 후 공유 메모리 링 해제 (시작하지 않았어도 링은 __init__에서 만들어졌으므로 해제)"""
+        if self.running:
+            self.running = False
+            self.inject_ring.push(QUIT, block=True)
+            self.capture_ring.wake()
+
+            if self.process:
+                self.process.join(2.0)
+                if self.process.is_alive():
+                    self.process.terminate()
+                self.process = None
+            if self.pump_thread:
+                self.pump_thread.join(1.0)
+                self.pump_thread = None
+
+        self.capture_ring.close()
+        self.inject_ring.close()
+
+    def _pump_loop(self):
+        ring = self.capture_ring
+        idle_wait = IDLE_WAIT_MIN
+        while self.running:
+            if not ring.wait(idle_wait):
+                idle_wait = min(idle_wait * 2, IDLE_WAIT_MAX)
+                continue
+            idle_wait = IDLE_WAIT_MIN
+            for record in ring.pop_all():
+                handler = self.handlers.get(record[0])
+                if handler:
+                    try:
+                        handler(record)
+                    except Exception as e:
+                        log_limited(log, logging.WARNING, 'input_handler', "Input event handler error: %s", e)
+
+
+class _InputWorker:
+    """입력 프로세스 본체: 리스너 캡처 + 주입 링 처리"""
+
+    def __init__(self, capture_ring: EventRing, inject_ring: EventRing):
+        from pynput import mouse, keyboard
+        self.mouse = mouse
+        self.keyboard = keyboard
+        self.capture_ring = capture_ring
+        self.inject_ring = inject_ring
+
+        self.mouse_controller = mouse.Controller()
+        self.keyboard_controller = keyboard.Controller()
+        self.mouse_listener = None
+        self.keyboard_listener = None
+
+    @staticmethod
+    def _key_str(key) -> str:
+        try:
+            return key.char or ''
+        except AttributeError:
+            return str(key)
+
+    def _resolve_key(self, key_str: str):
+        if key_str.startswith('Key.'):
+            return getattr(self.keyboard.Key, key_str[4:], None)
+        return key_str or None
+
+    def start_capture(self):
+        if self.mouse_listener or self.keyboard_listener:
+            return
+
+        # 이동만 가득 찼을 때 버림 (다음 이동이 최신 위치를 다시 알림), 버튼/키/스크롤은 자리가 날 때까지 대기
+        push = self.capture_ring.push
+        try:
+            self.mouse_listener = self.mouse.Listener(
+                on_move=lambda x, y: push(MOVE, x=x, y=y),
+                on_click=lambda x, y, button, pressed: push(CLICK, int(pressed), x, y, text=str(button), block=True),
+                on_scroll=lambda x, y, dx, dy: push(SCROLL, x=x, y=y, dx=dx, dy=dy, block=True),
+            )
+            self.keyboard_listener = self.keyboard.Listener(
+                on_press=lambda key: push(PRESS, text=self._key_str(key), block=True),
+                on_release=lambda key: push(RELEASE, text=self._key_str(key), block=True),
+            )
+            self.mouse_listener.start()
+            self.keyboard_listener.start()
+        except Exception as e:
+            log.error("Failed to start listeners in input process: %s", e)
+            self.stop_capture()
+
+    def stop_capture(self):
+        for listener in (self.mouse_listener, self.keyboard_listener):
+            if listener:
+                try:
+                    listener.stop()
+                except Exception as e:
+                    log.warning("Error stopping listener: %s", e)
+        self.mouse_listener = None
+        self.keyboard_listener = None
+
+    def inject(self, record) -> bool:
+        """주입 레코드 하나 처리. QUIT이면 False"""
+        kind, flag, x, y, dx, dy, text = record
+        try:
+            if kind == MOVE_TO:
+                self.mouse_controller.position = (x, y)
+            elif kind == BUTTON:
+                button = getattr(self.mouse.Button, text.split('.')[-1], None)
+                if button:
+                    if flag:
+                        self.mouse_controller.press(button)
+                    else:
+                        self.mouse_controller.release(button)
+            elif kind == SCROLL_BY:
+                self.mouse_controller.scroll(dx, dy)
+            elif kind == KEY:
+                key = self._resolve_key(text)
+                if key:
+                    if flag:
+                        self.keyboard_controller.press(key)
+                    else:
+                        self.keyboard_controller.release(key)
+            elif kind == TYPE:
+                self.keyboard_controller.type(text)
+            elif kind == CAPTURE_START:
+                self.start_capture()
+            elif kind == CAPTURE_STOP:
+                self.stop_capture()
+            elif kind == QUIT:
+                return False
+        except Exception as e:
+            log_limited(log, logging.WARNING, 'inject_error', "Input process injection error: %s", e)
+        return True
+
+    def run(self, parent_pid: int):
+        ring = self.inject_ring
+        idle_wait = IDLE_WAIT_MIN
+        try:
+            while True:
+                if not ring.wait(idle_wait):
+                    # 부모가 비정상 종료하면 같이 종료
+                    if os.getppid() != parent_pid:
+                        return
+                    idle_wait = min(idle_wait * 2, IDLE_WAIT_MAX)
+                    continue
+                idle_wait = IDLE_WAIT_MIN
+                for record in ring.pop_all():
+                    if not self.inject(record):
+                        return
+        finally:
+            self.stop_capture()
+            self.capture_ring.close()
+            ring.close()
+
+
+def run_input_process(capture_ring: EventRing, inject_ring: EventRing, parent_pid: int):
+    """입력 프로세스 진입점 (spawn으로 실행)"""
+    try:
+        worker = _InputWorker(capture_ring, inject_ring)
+    except Exception as e:
+        log.error("Failed to initialize input process: %s", e)
+        return
+    worker.run(parent_pid)
@@ -0,0 +1,172 @@
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+from src.log import get_logger, log_limited
+from src.metrics import Counter
+
+log = get_logger('jitter_buffer')
+
+
+class JitterBuffer:
+    """
+    수신측 mouse_move 재생 버퍼
+    송신측 타임스탬프(t)로 이벤트 간격을 복원해 일정한 지연(target)만큼 늦춰 주입한다.
+    - 송신/수신 시계 차이는 (도착 시각 - t)의 최솟값으로 추정 (창 단위로 갱신해 시계 드리프트 허용)
+    - target은 최근 지연 변동의 백분위수로 min_delay ~ max_delay 사이에서 조정
+    - 샘플 간격이 interpolate_step보다 벌어지면 중간 위치를 채워 넣고, 이미 늦은 샘플은 바로 주입
+    """
+
+    # 지연 변동 표본 수 / target 재계산 주기 (표본 수 기준)
+    WINDOW = 256
+    RECOMPUTE_EVERY = 16
+    # 시계 차이 추정 창 (초)
+    OFFSET_WINDOW = 10.0
+    # 이 시간 이상 움직임이 없으면 새 움직임으로 보고 보간하지 않음 (초)
+    IDLE_GAP = 0.1
+
+    def __init__(self, inject: Callable[[int, int], None], min_delay: float = 0.0, max_delay: float = 0.04,
+                 percentile: float = 95, interpolate_step: float = 0.008,
+                 late: Optional[Counter] = None, interpolated: Optional[Counter] = None):
+        self.inject = inject
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.percentile = percentile
+        self.interpolate_step = interpolate_step
+        self.late = late or Counter('jitter_late', "Samples that arrived after their playout time")
+        self.interpolated = interpolated or Counter('jitter_interpolated', "Interpolated pointer positions")
+
+        self.queue = deque()  # (송신 시각, x, y)
+        self.last = None  # 마지막으로 주입한 (송신 시각, x, y)
+        self.target = min_delay
+
+        # 시계 차이: 현재 창과 이전 창의 최솟값
+        self.offset_min = None
+        self.prev_offset_min = None
+        self.offset_window_start = 0.0
+        self.variation = deque(maxlen=self.WINDOW)
+        self.samples_since_recompute = 0
+
+        self.cond = threading.Condition()
+        # flush와 재생 스레드의 주입 순서 보장 (flush 이후 오래된 위치가 주입되지 않도록)
+        self.inject_lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    @property
+    def offset(self) -> float:
+        if self.prev_offset_min is None:
+            return self.offset_min
+        return min(self.offset_min, self.prev_offset_min)
+
+    def push(self, sent_at: float, x: int, y: int):
+        """수신한 mouse_move 추가 (수신 스레드)"""
+        now = time.perf_counter()
+        transit = now - sent_at
+        with self.cond:
+            if self.offset_min is None or now - self.offset_window_start >= self.OFFSET_WINDOW:
+                self.prev_offset_min = self.offset_min
+                self.offset_min = transit
+                self.offset_window_start = now
+            elif transit < self.offset_min:
+                self.offset_min = transit
+
+            # max_delay를 넘는 지연(재전송 등)은 어차피 흡수할 수 없으므로 target 추정에서 제외
+            variation = transit - self.offset
+            if variation <= self.max_delay:
+                self.variation.append(variation)
+                self.samples_since_recompute += 1
+                if self.samples_since_recompute >= self.RECOMPUTE_EVERY:
+                    self.samples_since_recompute = 0
+                    self._recompute_target()
+
+            self.queue.append((sent_at, x, y))
+            if not self.running:
+                self.running = True
+                self.thread = threading.Thread(target=self._playout_loop, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def _recompute_target(self):
+        ordered = sorted(self.variation)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+        self.target = min(max(ordered[index], self.min_delay), self.max_delay)
+
+    def flush(self):
+        """대기 중인 움직임을 건너뛰고 마지막 위치를 바로 주입 (클릭/키 입력 전에 호출)"""
+        with self.inject_lock:
+            with self.cond:
+                if not self.queue:
+                    return
+                point = self.queue[-1]
+                self.queue.clear()
+                self.last = point
+            self._inject(point)
+
+    def reset(self):
+        """대기 중인 움직임 폐기 (제어권 전환/연결 종료)"""
+        with self.inject_lock, self.cond:
+            self.queue.clear()
+            self.last = None
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.queue.clear()
+            self.cond.notify()
+
+    def _inject(self, point):
+        try:
+            self.inject(point[1], point[2])
+        except Exception as e:
+            log_limited(log, logging.WARNING, 'inject_move', "Failed to move mouse: %s", e)
+
+    def _plan(self, now: float):
+        """다음에 주입할 (위치, 큐에서 꺼낼지 여부, 남은 대기 시간). 대기 시간이 0보다 크면 아직 주입하지 않음"""
+        sent_at, x, y = self.queue[0]
+        offset = self.offset + self.target
+        due = sent_at + offset
+
+        last = self.last
+        step = self.interpolate_step
+        if step and last:
+            gap = sent_at - last[0]
+            # 간격이 step의 1.5배 이하면 다음 샘플과 거의 같은 위치라 보간하지 않음
+            if step * 1.5 < gap < self.IDLE_GAP and now - due < step:
+                # 다음 샘플까지 간격이 벌어짐: step 간격으로 중간 위치를 채움
+                t = last[0] + step
+                ratio = step / gap
+                point = (t, int(round(last[1] + (x - last[1]) * ratio)), int(round(last[2] + (y - last[2]) * ratio)))
+                return point, False, t + offset - now
+
+        return (sent_at, x, y), True, due - now
+
+    def _playout_loop(self):
+        while True:
+            with self.cond:
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.running:
+                    return
+
+                wait = self._plan(time.perf_counter())[2]
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+
+            with self.inject_lock:
+                with self.cond:
+                    if not self.queue:
+                        continue
+                    point, consume, wait = self._plan(time.perf_counter())
+                    if wait > 0:
+                        continue
+                    if consume:
+                        self.queue.popleft()
+                        if -wait > self.interpolate_step:
+                            self.late.inc()
+                    else:
+                        self.interpolated.inc()
+                    self.last = point
+                self._inject(point)
@@ -0,0 +1,224 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict
+from src.log import get_logger, log_limited
+
+log = get_logger('key_repeat')
+
+# 자동 반복하지 않는 키 (수정자/토글 키)
+NON_REPEATING_KEYS = frozenset(
+    'Key.' + name for name in (
+        'shift', 'shift_l', 'shift_r', 'ctrl', 'ctrl_l', 'ctrl_r', 'alt', 'alt_l', 'alt_r', 'alt_gr',
+        'cmd', 'cmd_l', 'cmd_r', 'caps_lock', 'num_lock', 'scroll_lock', 'menu',
+    )
+)
+
+
+# 눌려 있으면 문자 입력이 아니라 단축키로 보는 수정자 (Shift/AltGr은 문자 입력에 사용)
+SHORTCUT_MODIFIERS = frozenset(
+    'Key.' + name for name in ('ctrl', 'ctrl_l', 'ctrl_r', 'alt', 'alt_l', 'alt_r', 'cmd', 'cmd_l', 'cmd_r')
+)
+
+
+def is_repeating_key(key_str: str) -> bool:
+    return bool(key_str) and key_str not in NON_REPEATING_KEYS
+
+
+def is_text_char(key_str: str) -> bool:
+    """
+    키 하나로 재현할 수 없는 문자 (ASCII 밖의 출력 가능한 문자 하나)
+    키 콜백이 넘기는 키 입력 하나의 문자일 뿐 IME 조합 결과(확정 문자열)는 아님 (pynput은 조합 결과를 받지 못함)
+    """
+    return len(key_str) == 1 and ord(key_str) > 127 and key_str.isprintable()
+
+
+class KeyHeldSender:
+    """
+    송신측 키 유지 신호
+    반복 키가 눌려 있는 동안 키마다 interval 간격으로 send(key_str)를 호출한다.
+    OS 자동 반복 콜백에 기대지 않으므로 반복이 꺼져 있거나 첫 반복 전(repeat delay)에도 수신측
+    안전 타임아웃에 걸리지 않는다. 스레드는 처음 키가 눌릴 때 시작하고, 눌린 키가 없으면 타이머 없이 대기.
+    """
+
+    def __init__(self, send: Callable[[str], None], interval: float = 1.0):
+        self.send = send
+        self.interval = interval
+        self.keys: Dict[str, float] = {}  # {key_str: 다음 유지 신호 시각}
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def press(self, key_str: str) -> bool:
+        """키 눌림. 새로 눌린 키면 True (이미 눌린 키면 OS 자동 반복)"""
+        with self.cond:
+            if key_str in self.keys:
+                return False
+            self.keys[key_str] = time.perf_counter() + self.interval
+            if not self.running:
+                self.running = True
+                self.thread = threading.Thread(target=self._loop, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+        return True
+
+    def release(self, key_str: str):
+        with self.cond:
+            self.keys.pop(key_str, None)
+
+    def clear(self):
+        """눌린 키 모두 잊음 (제어권 전환/연결 종료시)"""
+        with self.cond:
+            self.keys.clear()
+
+    def stop(self):
+        with self.cond:
+            self.keys.clear()
+            self.running = False
+            self.cond.notify()
+
+    def _loop(self):
+        while True:
+            due = []
+            with self.cond:
+                if not self.running:
+                    return
+                if not self.keys:
+                    self.cond.wait()
+                    continue
+                now = time.perf_counter()
+                for key_str, next_time in self.keys.items():
+                    if now >= next_time:
+                        due.append(key_str)
+                        self.keys[key_str] = now + self.interval
+                if not due:
+                    self.cond.wait(max(0.0, min(self.keys.values()) - now))
+                    continue
+
+            for key_str in due:
+                try:
+                    self.send(key_str)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'key_held', "Failed to send key_held: %s", e)
+
+
+class _HeldKey:
+    __slots__ = ('key', 'next_fire', 'last_seen')
+
+    def __init__(self, key, next_fire: float, last_seen: float):
+        self.key = key
+        self.next_fire = next_fire
+        self.last_seen = last_seen
+
+
+class KeyRepeater:
+    """
+    수신측 키 자동 반복
+    눌린 키를 release가 올 때까지 설정된 지연/간격으로 로컬에서 반복 입력한다.
+    release가 유실된 경우를 대비해 송신측 유지 신호(key_held)가 timeout 동안 없으면 키를 뗀다.
+    """
+
+    def __init__(self, press: Callable, release: Callable, delay: float = 0.5, interval: float = 0.033,
+                 timeout: float = 2.5):
+        self.press = press
+        self.release = release
+        self.delay = delay
+        self.interval = interval
+        self.timeout = timeout
+
+        self.held: Dict[str, _HeldKey] = {}
+        self.cond = threading.Condition()
+        # key_up 이후에 반복 입력이 끼어들어 키가 눌린 채로 남지 않도록 주입을 직렬화
+        self.inject_lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.timeouts = 0  # 안전 타임아웃으로 뗀 횟수
+
+    def key_down(self, key_str: str, key):
+        """키 눌림 (이미 눌린 키면 유지 신호로 처리)"""
+        now = time.perf_counter()
+        with self.cond:
+            held = self.held.get(key_str)
+            if held:
+                held.last_seen = now
+                return
+            self.held[key_str] = _HeldKey(key, now + self.delay, now)
+            if not self.running:
+                self.running = True
+                self.thread = threading.Thread(target=self._repeat_loop, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def keep_alive(self, key_str: str):
+        """송신측에서 키가 아직 눌려 있다는 신호"""
+        with self.cond:
+            held = self.held.get(key_str)
+            if held:
+                held.last_seen = time.perf_counter()
+
+    def key_up(self, key_str: str) -> bool:
+        """반복 중지. 반복 중이던 키였으면 True (반환 후에는 해당 키의 반복 입력이 없음)"""
+        with self.inject_lock, self.cond:
+            return self.held.pop(key_str, None) is not None
+
+    def release_all(self):
+        """모든 반복 중지 후 키를 뗌 (제어권 전환/연결 종료시)"""
+        with self.inject_lock, self.cond:
+            held, self.held = list(self.held.values()), {}
+            self.cond.notify()
+
+        for h in held:
+            try:
+                self.release(h.key)
+            except Exception as e:
+                log_limited(log, logging.WARNING, 'key_release', "Failed to release key: %s", e)
+
+    def stop(self):
+        """반복 스레드 종료"""
+        self.release_all()
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def _repeat_loop(self):
+        while True:
+            fire = []
+            expired = []
+            with self.cond:
+                if not self.running:
+                    return
+
+                now = time.perf_counter()
+                for key_str, h in list(self.held.items()):
+                    if now - h.last_seen > self.timeout:
+                        del self.held[key_str]
+                        expired.append(h)
+                    elif now >= h.next_fire:
+                        h.next_fire = max(h.next_fire + self.interval, now)
+                        fire.append((key_str, h))
+
+                if not fire and not expired:
+                    if self.held:
+                        wake = min(min(h.next_fire for h in self.held.values()),
+                                   min(h.last_seen for h in self.held.values()) + self.timeout)
+                        self.cond.wait(max(0.0, wake - now))
+                    else:
+                        self.cond.wait()
+                    continue
+
+            for key_str, h in fire:
+                with self.inject_lock:
+                    if self.held.get(key_str) is not h:
+                        continue  # 그 사이 release 됨
+                    try:
+                        self.press(h.key)
+                    except Exception as e:
+                        log_limited(log, logging.WARNING, 'key_repeat', "Failed to repeat key: %s", e)
+
+            for h in expired:
+                self.timeouts += 1
+                log.warning("Key release not received in time, releasing %s", h.key)
+                try:
+                    self.release(h.key)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'key_release', "Failed to release key: %s", e)
@@ -0,0 +1,198 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Callable, Dict, List, Optional
+
+ROOT_LOGGER = 'km_share'
+
+
+def get_logger(name: str) -> logging.Logger:
+    """km_share 하위 로거 (예: get_logger('peer') -> km_share.peer)"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+class RateLimiter:
+    """
+    메시지 키별 전송 제한: interval초마다 키당 burst개까지만 통과
+    막힌 개수는 다음에 통과하는 같은 키의 메시지에 요약으로 붙인다.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 10.0):
+        self.burst = burst
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.windows: Dict[str, list] = {}  # {key: [창 시작 시각, 통과 수, 억제 수]}
+
+    def allow(self, key: str):
+        """(통과 여부, 요약으로 보고할 억제 수)"""
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                return True, suppressed
+            if window[1] < self.burst:
+                window[1] += 1
+                suppressed, window[2] = window[2], 0
+                return True, suppressed
+            window[2] += 1
+            return False, 0
+
+    def take_pending(self) -> Dict[str, int]:
+        """아직 보고되지 않은 억제 수를 꺼냄 (종료 시 요약용)"""
+        with self.lock:
+            pending = {key: window[2] for key, window in self.windows.items() if window[2]}
+            for window in self.windows.values():
+                window[2] = 0
+        return pending
+
+
+RATE_LIMITER = RateLimiter()
+
+
+def log_limited(logger: logging.Logger, level: int, key: str, msg: str, *args, **kwargs):
+    """
+    키별 전송 제한이 걸린 로그 (입력/수신 스레드 등 hot path용)
+    레벨이 꺼져 있으면 레벨 확인만 하고 반환한다. 메시지 포맷은 백그라운드 스레드에서 수행.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    allowed, suppressed = RATE_LIMITER.allow(key)
+    if not allowed:
+        return
+    extra = kwargs.pop('extra', None) or {}
+    extra['key'] = key
+    if suppressed:
+        extra['suppressed'] = suppressed
+    logger.log(level, msg, *args, extra=extra, **kwargs)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    호출 스레드에서는 레코드를 큐에 넣기만 함 (기본 QueueHandler는 여기서 메시지를 포맷함)
+    큐가 가득 차면 버리고 개수만 센다.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, fmt: str = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'):
+        super().__init__(fmt)
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f" (suppressed {suppressed} similar messages)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 하나 (ts, level, logger, msg, key, suppressed, fields)"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for name in ('key', 'suppressed', 'fields'):
+            value = getattr(record, name, None)
+            if value:
+                entry[name] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class CallbackHandler(logging.Handler):
+    """포맷한 메시지를 콜백으로 전달 (GUI 로그 창 등, 출력 스레드에서 호출됨)"""
+
+    def __init__(self, callback: Callable[[str], None], level: int = logging.WARNING):
+        super().__init__(level)
+        self.callback = callback
+        self.setFormatter(TextFormatter('%(levelname)s %(name)s: %(message)s'))
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[_DeferredQueueHandler] = None
+
+
+def configure_logging(config=None, extra_handlers: Optional[List[logging.Handler]] = None):
+    """
+    km_share 로거 설정 (logging.level/file/format/rate_limit/rate_interval)
+    실제 출력(stdout/파일/extra_handlers)은 QueueListener의 백그라운드 스레드에서 수행
+    """
+    global _listener, _queue_handler
+    get = config.get if config is not None else (lambda key, default=None: default)
+
+    shutdown_logging()
+
+    RATE_LIMITER.burst = get('logging.rate_limit', 10)
+    RATE_LIMITER.interval = get('logging.rate_interval', 10)
+
+    formatter = JsonFormatter() if get('logging.format', 'text') == 'json' else TextFormatter()
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = get('logging.file', '')
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    handlers.extend(extra_handlers or ())
+
+    _queue_handler = _DeferredQueueHandler(queue.Queue(maxsize=10000))
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [_queue_handler]
+    root.setLevel(getattr(logging, str(get('logging.level', 'INFO')).upper(), logging.INFO))
+    root.propagate = False
+
+
+def shutdown_logging():
+    """남은 억제 요약을 남기고 백그라운드 출력 스레드 종료 (대기 중인 로그는 모두 출력)"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    for key, count in RATE_LIMITER.take_pending().items():
+        logger.warning("suppressed %d '%s' messages", count, key, extra={'key': key})
+    if _queue_handler.dropped:
+        logger.warning("dropped %d log records (queue full)", _queue_handler.dropped)
+
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logger.removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,275 @@
+import os
+import bisect
+import socket
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Sequence
+from src.log import get_logger, log_limited
+
+log = get_logger('metrics')
+
+
+def escape_label(value) -> str:
+    """Prometheus 텍스트 포맷 라벨 값 이스케이프 (역슬래시, 큰따옴표, 줄바꿈)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metric:
+    """메트릭 공통 기반 클래스"""
+
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._lock = threading.Lock()
+
+    def _label_str(self, label_value, extra: str = '') -> str:
+        parts = []
+        if self.label and label_value is not None:
+            parts.append(f'{self.label}="{escape_label(label_value)}"')
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._render_samples())
+        return '\n'.join(lines) + '\n'
+
+    def _render_samples(self):
+        return []
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (라벨 하나 지원)"""
+
+    TYPE = 'counter'
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None):
+        super().__init__(name, help_text, label)
+        self.values: Dict[Optional[str], float] = {}
+
+    def inc(self, amount: float = 1, label_value: Optional[str] = None):
+        with self._lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def get(self, label_value: Optional[str] = None) -> float:
+        return self.values.get(label_value, 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self.values.values())
+
+    def _render_samples(self):
+        with self._lock:
+            items = list(self.values.items())
+        return [f"{self.name}{self._label_str(label)} {value}" for label, value in items]
+
+
+class Gauge(_Metric):
+    """현재 값 게이지 (직접 set 하거나 스크레이프 시점에 함수로 계산)"""
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, help_text: str, func: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text)
+        self.value = 0
+        self.func = func
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, func: Optional[Callable[[], float]]):
+        self.func = func
+
+    def get(self) -> float:
+        if self.func:
+            try:
+                return self.func()
+            except Exception:
+                return 0
+        return self.value
+
+    def _render_samples(self):
+        return [f"{self.name} {self.get()}"]
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램 (라벨 하나 지원)"""
+
+    TYPE = 'histogram'
+
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 label: Optional[str] = None):
+        super().__init__(name, help_text, label)
+        self.buckets = tuple(sorted(buckets))
+        # {label: [bucket counts..., +Inf count, sum]}
+        self.values: Dict[Optional[str], list] = {}
+
+    def observe(self, value: float, label_value: Optional[str] = None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self.values.get(label_value)
+            if counts is None:
+                counts = self.values[label_value] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def count(self, label_value: Optional[str] = None) -> int:
+        counts = self.values.get(label_value)
+        return sum(counts[:-1]) if counts else 0
+
+    def _render_samples(self):
+        with self._lock:
+            items = [(label, list(counts)) for label, counts in self.values.items()]
+
+        lines = []
+        for label, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                le_label = 'le="%s"' % le
+                lines.append(f"{self.name}_bucket{self._label_str(label, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(label)} {counts[-1]}")
+            lines.append(f"{self.name}_count{self._label_str(label)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 레지스트리 (같은 이름은 같은 객체를 반환)"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str, label: Optional[str] = None) -> Counter:
+        return self._get_or_create(Counter, name, help_text, label)
+
+    def gauge(self, name: str, help_text: str, func: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, help_text)
+        if func:
+            gauge.set_function(func)
+        return gauge
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+                  label: Optional[str] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets, label)
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 포맷으로 출력"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return ''.join(metric.render() for metric in metrics)
+
+
+# 프로세스 기본 레지스트리
+REGISTRY = MetricsRegistry()
+
+
+class MetricsExporter:
+    """레지스트리를 localhost HTTP 포트 또는 주기적으로 갱신되는 파일로 노출"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, http_port: int = 0,
+                 stats_file: str = '', interval: float = 10.0):
+        self.registry = registry
+        self.http_port = http_port
+        self.stats_file = stats_file
+        self.interval = interval
+
+        self.http_server = None
+        self.http_thread = None
+        self.file_thread = None
+        self.stop_event = threading.Event()
+
+    @classmethod
+    def from_config(cls, config, registry: MetricsRegistry = REGISTRY) -> 'MetricsExporter':
+        return cls(
+            registry,
+            http_port=config.get('metrics.http_port', 0),
+            stats_file=config.get('metrics.stats_file', ''),
+            interval=config.get('metrics.stats_interval', 10.0),
+        )
+
+    def start(self):
+        if self.http_port:
+            registry = self.registry
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path not in ('/', '/metrics'):
+                        self.send_error(404)
+                        return
+                    body = registry.render_prometheus().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            try:
+                # localhost 전용
+                self.http_server = ThreadingHTTPServer(('127.0.0.1', self.http_port), Handler)
+                self.stop_event.clear()
+                self.http_thread = threading.Thread(target=self._http_loop, daemon=True)
+                self.http_thread.start()
+                log.info("Metrics available at http://127.0.0.1:%d/metrics", self.http_port)
+            except OSError as e:
+                log.error("Failed to start metrics server on port %d: %s", self.http_port, e)
+                self.http_server = None
+
+        if self.stats_file:
+            self.stop_event.clear()
+            self.file_thread = threading.Thread(target=self._file_loop, daemon=True)
+            self.file_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.http_server:
+            # 블로킹 대기 중인 요청 루프를 소켓 shutdown으로 깨움
+            try:
+                self.http_server.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.http_server.server_close()
+            self.http_server = None
+        if self.stats_file:
+            self.write_stats_file()
+
+    def write_stats_file(self):
+        """통계 파일을 원자적으로 다시 쓰기"""
+        tmp_path = self.stats_file + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.registry.render_prometheus())
+            os.replace(tmp_path, self.stats_file)
+        except Exception as e:
+            log_limited(log, logging.WARNING, 'stats_file', "Failed to write stats file %s: %s", self.stats_file, e)
+
+    def _http_loop(self):
+        """요청이 올 때까지 블로킹 (serve_forever는 0.5초마다 깨어나 종료 요청을 확인함)"""
+        server = self.http_server
+        while not self.stop_event.is_set():
+            try:
+                server.handle_request()
+            except (OSError, ValueError):
+                break
+
+    def _file_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.write_stats_file()
@@ -0,0 +1,363 @@
+"""
+로컬 네트워크 조건 에뮬레이터 (테스트용 TCP/UDP 프록시)
+
+두 KMPeer 사이(루프백)에 두고 지연, 지터, 대역폭 제한(병목 버퍼 크기), 패킷 손실, (UDP) 순서 뒤바뀜을 주입한다.
+
+사용법:
+    python -m src.netem --listen 12350 --target 127.0.0.1:12345 --profile office_wifi
+    python -m src.netem --listen 12350 --target 127.0.0.1:12345 --profile-file my_profiles.json --profile lab
+"""
+
+import json
+import heapq
+import random
+import socket
+import argparse
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from src.log import configure_logging, get_logger
+
+log = get_logger('netem')
+
+# 기본 프로파일 (지연/지터: ms, 대역폭: kbit/s, 0이면 무제한)
+PROFILES: Dict[str, Dict] = {
+    'lan': {'latency_ms': 0.2, 'jitter_ms': 0.1, 'bandwidth_kbps': 0, 'loss': 0.0, 'reorder': 0.0},
+    'office_wifi': {'latency_ms': 3, 'jitter_ms': 4, 'bandwidth_kbps': 20000, 'loss': 0.005, 'reorder': 0.01},
+    'busy_wifi': {'latency_ms': 8, 'jitter_ms': 15, 'bandwidth_kbps': 5000, 'loss': 0.02, 'reorder': 0.03},
+    'vpn': {'latency_ms': 25, 'jitter_ms': 5, 'bandwidth_kbps': 10000, 'loss': 0.002, 'reorder': 0.0},
+    'congested': {'latency_ms': 40, 'jitter_ms': 30, 'bandwidth_kbps': 512, 'loss': 0.01, 'reorder': 0.02,
+                  'queue_kb': 32},
+}
+
+PROFILE_DEFAULTS = {
+    'latency_ms': 0.0,
+    'jitter_ms': 0.0,
+    'bandwidth_kbps': 0,
+    'loss': 0.0,
+    'reorder': 0.0,
+    # TCP는 손실 시 재전송되므로 손실 대신 재전송 지연(최소 RTO)으로 모델링
+    'tcp_retransmit_ms': 200,
+    # TCP 병목 버퍼 크기 (KB, 0이면 무제한): 차면 읽기를 멈추고 수신 버퍼도 줄여 송신측 커널 큐에 역압이 걸리게 함
+    'queue_kb': 0,
+}
+
+
+def load_profile(name: str, profile_file: Optional[str] = None) -> Dict:
+    """이름으로 프로파일 로드 (profile_file의 JSON {name: {...}}이 기본 프로파일보다 우선)"""
+    profiles = dict(PROFILES)
+    if profile_file:
+        with open(profile_file, 'r', encoding='utf-8') as f:
+            profiles.update(json.load(f))
+
+    if name not in profiles:
+        raise ValueError(f"Unknown profile: {name} (available: {', '.join(sorted(profiles))})")
+
+    profile = dict(PROFILE_DEFAULTS)
+    profile.update(profiles[name])
+    profile['name'] = name
+    return profile
+
+
+class _DelayLine:
+    """릴리스 시각까지 데이터를 붙잡아 두었다가 순서대로 내보내는 지연 큐"""
+
+    def __init__(self, profile: Dict, send, ordered: bool, rng: random.Random):
+        self.profile = profile
+        self.send = send
+        self.ordered = ordered
+        self.rng = rng
+
+        self.heap = []
+        self.seq = 0
+        self.last_release = 0.0
+        self.wire_free_at = 0.0
+        # 릴리스 전 바이트 수 (queue_limit을 넘으면 push()가 블로킹)
+        self.queue_limit = int(profile['queue_kb'] * 1024) if ordered else 0
+        self.queued = 0
+        self.cond = threading.Condition()
+        self.closed = False
+        self.draining = False
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def push(self, data: bytes) -> bool:
+        """데이터를 지연 큐에 넣음 (손실로 버려지거나 닫혔으면 False)"""
+        p = self.profile
+        if self.queue_limit:
+            with self.cond:
+                while self.queued >= self.queue_limit and not self.closed:
+                    self.cond.wait()
+        if self.closed:
+            return False
+        now = time.perf_counter()
+
+        delay = max(0.0, self.rng.gauss(p['latency_ms'], p['jitter_ms'])) / 1000.0
+
+        if p['loss'] and self.rng.random() < p['loss']:
+            if not self.ordered:
+                return False
+            delay += p['tcp_retransmit_ms'] / 1000.0
+
+        if not self.ordered and p['reorder'] and self.rng.random() < p['reorder']:
+            # 다음 패킷들이 앞질러 가도록 추가 지연
+            delay += max(p['latency_ms'], p['jitter_ms'], 1.0) / 1000.0 * 2
+
+        release = now + delay
+
+        # 대역폭 제한: 직렬화 시간만큼 회선 점유
+        if p['bandwidth_kbps']:
+            start = max(now, self.wire_free_at)
+            self.wire_free_at = start + len(data) * 8 / (p['bandwidth_kbps'] * 1000.0)
+            release = max(release, self.wire_free_at)
+
+        # TCP는 바이트 순서를 유지
+        if self.ordered:
+            release = max(release, self.last_release)
+            self.last_release = release
+
+        with self.cond:
+            heapq.heappush(self.heap, (release, self.seq, data))
+            self.seq += 1
+            self.queued += len(data)
+            self.cond.notify()
+        return True
+
+    def close(self):
+        """남은 데이터를 버리고 즉시 종료"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def drain(self):
+        """이미 넣은 데이터를 릴리스 시각에 모두 내보낼 때까지 대기한 뒤 종료"""
+        with self.cond:
+            self.draining = True
+            self.cond.notify_all()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.closed:
+                    if self.heap:
+                        wait = self.heap[0][0] - time.perf_counter()
+                        if wait <= 0:
+                            break
+                        self.cond.wait(wait)
+                    elif self.draining:
+                        return
+                    else:
+                        self.cond.wait()
+                if self.closed:
+                    return
+                _, _, data = heapq.heappop(self.heap)
+                self.queued -= len(data)
+                if self.queue_limit:
+                    self.cond.notify_all()
+
+            try:
+                self.send(data)
+            except OSError:
+                # 대상이 끊김: push()에서 빈 자리를 기다리는 펌프가 영원히 막히지 않도록 닫고 깨움
+                with self.cond:
+                    self.closed = True
+                    self.heap.clear()
+                    self.queued = 0
+                    self.cond.notify_all()
+                return
+
+
+class _TcpSession:
+    """프록시가 중계하는 TCP 연결 한 쌍 (방향마다 펌프 스레드와 지연 큐 하나)"""
+
+    def __init__(self, client: socket.socket, upstream: socket.socket):
+        self.sockets = [client, upstream]
+        self.lines = []
+        self.pumps = 2  # 실행 중인 펌프 스레드 수
+
+
+class NetemProxy:
+    """지연/손실을 주입하는 TCP 또는 UDP 프록시"""
+
+    def __init__(self, listen_port: int, target: Tuple[str, int], profile: Dict,
+                 protocol: str = 'tcp', listen_host: str = '127.0.0.1', seed: Optional[int] = None):
+        self.listen_addr = (listen_host, listen_port)
+        self.target = target
+        self.profile = profile
+        self.protocol = protocol
+        self.rng = random.Random(seed)
+
+        self.running = False
+        self.sock = None
+        self.thread = None
+        self.lines = []
+        self.sockets = []
+        self.lock = threading.Lock()  # TCP 세션이 끝날 때 lines/sockets 정리
+        self.bytes_forwarded = 0
+        self.packets_dropped = 0
+
+    def start(self):
+        self.running = True
+        if self.protocol == 'udp':
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind(self.listen_addr)
+            self.thread = threading.Thread(target=self._udp_loop, daemon=True)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind(self.listen_addr)
+            self.sock.listen(8)
+            self.thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.thread.start()
+        log.info("netem [%s] %s %s:%d -> %s:%d", self.profile['name'], self.protocol,
+                 self.listen_addr[0], self.listen_addr[1], self.target[0], self.target[1])
+
+    def stop(self):
+        self.running = False
+        with self.lock:
+            sockets, lines = list(self.sockets), list(self.lines)
+        for s in [self.sock] + sockets:
+            try:
+                s.close()
+            except OSError:
+                pass
+        for line in lines:
+            line.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+
+            try:
+                upstream = socket.create_connection(self.target)
+            except OSError as e:
+                log.warning("Failed to connect to target %s:%d: %s", self.target[0], self.target[1], e)
+                client.close()
+                continue
+
+            for s in (client, upstream):
+                s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self.profile['queue_kb']:
+                    # 프록시 수신 버퍼가 병목 대기를 숨기지 않도록
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(self.profile['queue_kb'] * 1024))
+            session = _TcpSession(client, upstream)
+            pumps = []
+            for src, dst in ((client, upstream), (upstream, client)):
+                line = _DelayLine(self.profile, dst.sendall, ordered=True, rng=self.rng)
+                session.lines.append(line)
+                pumps.append(threading.Thread(target=self._tcp_pump, args=(src, dst, line, session), daemon=True))
+            with self.lock:
+                self.sockets += session.sockets
+                self.lines += session.lines
+            for pump in pumps:
+                pump.start()
+
+    def _tcp_pump(self, src: socket.socket, dst: socket.socket, line: _DelayLine, session: _TcpSession):
+        eof = False
+        while self.running:
+            try:
+                data = src.recv(65536)
+            except OSError:
+                break
+            if not data:
+                eof = True
+                break
+            self.bytes_forwarded += len(data)
+            if not line.push(data):
+                break  # 지연 큐가 닫힘 (대상으로 보내기 실패)
+
+        if eof:
+            # 지연 중인 데이터를 모두 보낸 뒤 FIN만 전달 (반대 방향은 상대가 닫을 때까지 계속 중계)
+            line.drain()
+            try:
+                dst.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+        else:
+            # 오류/종료: 양쪽을 끊어 반대 방향 펌프도 깨움
+            line.close()
+            for s in (src, dst):
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._tcp_pump_done(session)
+
+    def _tcp_pump_done(self, session: _TcpSession):
+        """펌프 하나 종료. 마지막이면 세션의 소켓/지연 큐를 닫고 목록에서 제거"""
+        with self.lock:
+            session.pumps -= 1
+            if session.pumps > 0:
+                return
+            self.sockets = [s for s in self.sockets if s not in session.sockets]
+            self.lines = [line for line in self.lines if line not in session.lines]
+        for line in session.lines:
+            line.close()
+        for s in session.sockets:
+            s.close()
+
+    def _udp_loop(self):
+        upstreams: Dict[Tuple[str, int], socket.socket] = {}
+        to_target: Dict[Tuple[str, int], _DelayLine] = {}
+
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except OSError:
+                break
+
+            if addr not in upstreams:
+                upstream = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                upstream.connect(self.target)
+                upstreams[addr] = upstream
+                to_target[addr] = _DelayLine(self.profile, upstream.send, ordered=False, rng=self.rng)
+                back = _DelayLine(self.profile, lambda d, a=addr: self.sock.sendto(d, a), ordered=False, rng=self.rng)
+                with self.lock:
+                    self.sockets.append(upstream)
+                    self.lines += [to_target[addr], back]
+                threading.Thread(target=self._udp_return, args=(upstream, back), daemon=True).start()
+
+            self.bytes_forwarded += len(data)
+            if not to_target[addr].push(data):
+                self.packets_dropped += 1
+
+    def _udp_return(self, upstream: socket.socket, line: _DelayLine):
+        while self.running:
+            try:
+                data = upstream.recv(65536)
+            except OSError:
+                break
+            self.bytes_forwarded += len(data)
+            if not line.push(data):
+                self.packets_dropped += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KM-Share network condition emulator")
+    parser.add_argument('--listen', type=int, required=True, help="local port to listen on")
+    parser.add_argument('--target', required=True, help="HOST:PORT to forward to")
+    parser.add_argument('--profile', default='office_wifi')
+    parser.add_argument('--profile-file', help="JSON file with additional profiles")
+    parser.add_argument('--udp', action='store_true', help="proxy UDP instead of TCP")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    configure_logging()
+
+    host, port = args.target.rsplit(':', 1)
+    proxy = NetemProxy(args.listen, (host, int(port)), load_profile(args.profile, args.profile_file),
+                       protocol='udp' if args.udp else 'tcp', seed=args.seed)
+    proxy.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        proxy.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import time
+import errno
+import socket
+import selectors
+import threading
+from typing import Callable, Iterable, List, Optional
+from src.events import Event, Message, serialize_event
+
+# connect_ex가 연결 진행 중이라는 의미로 돌려주는 값 (Windows는 WSAEWOULDBLOCK)
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+
+class PeerLink:
+    """
+    peer와의 TCP 연결 하나 (상대 인터페이스 주소마다 하나씩 생길 수 있음)
+    - key: 연결을 건 쪽의 node id와 번호 (양쪽이 같은 연결을 같은 이름으로 부름)
+    - rtt: ping/pong 왕복 시간의 EWMA (초)
+    - 송신은 send_lock 안에서만 (인증 프레임 시퀀스 번호 순서 보장)
+    """
+
+    RTT_ALPHA = 0.3
+
+    def __init__(self, sock: socket.socket, session, pending: bytes, outgoing: bool, address: str,
+                 relayed: bool = False):
+        self.sock = sock
+        self.session = session
+        self.pending = pending  # 핸드셰이크 중 함께 수신된 바이트
+        self.outgoing = outgoing
+        self.address = address
+        self.relayed = relayed  # relay를 거친 연결 (address는 relay 주소)
+        self.key: Optional[str] = None
+        self.remote_node: Optional[str] = None
+        self.remote_port = 0
+        self.addresses: List[str] = []
+        self.rtt: Optional[float] = None
+        self.bytes_sent = 0  # 이 경로로 쓴 누적 바이트 (송신 지연 추정용)
+        self.ping_outstanding: Optional[float] = None  # 응답을 받지 못한 가장 오래된 ping 송신 시각
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+    def __repr__(self):
+        rtt = f"{self.rtt * 1000:.2f}ms" if self.rtt is not None else '?'
+        return f"PeerLink({self.address}, {self.key}, rtt={rtt})"
+
+    def send_events(self, events: Iterable[Event]) -> int:
+        """이벤트를 한 프레임으로 전송하고 보낸 바이트 수 반환"""
+        data = b''.join(serialize_event(event) for event in events)
+        with self.send_lock:
+            if self.session:
+                data = self.session.sealer.seal(data)
+            self.sock.sendall(data)
+            self.bytes_sent += len(data)
+        return len(data)
+
+    def ping(self, now: float):
+        if self.ping_outstanding is None:
+            self.ping_outstanding = now
+        self.send_events((Message('ping', {'t': now}),))
+
+    def observe_rtt(self, sample: float):
+        self.ping_outstanding = None
+        self.rtt = sample if self.rtt is None else self.rtt + self.RTT_ALPHA * (sample - self.rtt)
+
+    def effective_rtt(self, now: float, timeout: float) -> float:
+        """경로 비교용 RTT (측정 전이거나 pong이 timeout 이상 없으면 무한대)"""
+        if self.closed or self.rtt is None:
+            return float('inf')
+        if self.ping_outstanding is not None and now - self.ping_outstanding > timeout:
+            return float('inf')
+        return self.rtt
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def race_connect(addresses: Iterable[str], port: int, on_connected: Callable[[socket.socket, str, float], None],
+                 stagger: float = 0.25, timeout: float = 5.0,
+                 should_stop: Optional[Callable[[], bool]] = None) -> int:
+    """
+    happy eyeballs 방식 연결 경쟁
+    addresses 순서대로 stagger 간격을 두고 연결을 시작하고(앞선 시도가 실패하면 바로 다음 주소),
+    연결되는 대로 on_connected(sock, address, connect_time)을 호출한다. 느린 주소를 기다리지 않고
+    첫 연결을 바로 넘기며, 나머지도 timeout까지 계속 시도한다. 성공한 연결 수 반환
+    """
+    pending = list(dict.fromkeys(addresses))
+    started = {}  # {sock: (address, 시작 시각)}
+    successes = 0
+    selector = selectors.DefaultSelector()
+    deadline = time.monotonic() + timeout
+    next_start = 0.0
+    try:
+        while pending or started:
+            now = time.monotonic()
+            if now >= deadline or (should_stop and should_stop()):
+                break
+
+            if pending and (now >= next_start or not started):
+                address = pending.pop(0)
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                try:
+                    err = sock.connect_ex((address, port))
+                except OSError as e:
+                    err = e.errno
+                if err and err not in _IN_PROGRESS:
+                    sock.close()
+                    continue
+                started[sock] = (address, time.perf_counter())
+                selector.register(sock, selectors.EVENT_WRITE)
+                next_start = now + stagger
+                continue
+
+            wait = deadline - now
+            if pending:
+                wait = min(wait, max(0.0, next_start - now))
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                selector.unregister(sock)
+                address, start = started.pop(sock)
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                    sock.close()
+                    next_start = 0.0
+                    continue
+                sock.setblocking(True)
+                successes += 1
+                on_connected(sock, address, time.perf_counter() - start)
+    finally:
+        for sock in started:
+            sock.close()
+        selector.close()
+    return successes
+
+
+def choose_path(links: List[PeerLink], active: PeerLink, now: float, timeout: float,
+                ratio: float = 1.5, min_gain: float = 0.001) -> Optional[PeerLink]:
+    """active보다 RTT가 ratio배 이상, min_gain초 이상 빠른 경로 (없으면 None)"""
+    best = min(links, key=lambda link: link.effective_rtt(now, timeout))
+    if best is active:
+        return None
+    best_rtt = best.effective_rtt(now, timeout)
+    active_rtt = active.effective_rtt(now, timeout)
+    if best_rtt == float('inf'):
+        return None
+    if active_rtt == float('inf') or (active_rtt > best_rtt * ratio and active_rtt - best_rtt > min_gain):
+        return best
+    return None
@@ -1,10 +1,43 @@
+import os
 import socket
-import json
+import logging
+import struct
 import threading
 import time
 from pynput import mouse, keyboard
-from src.events import serialize_event, deserialize_event
-from typing import Callable, Optional
+from src.auth import AuthenticationError, load_master_key, perform_handshake
+from src.discovery import advertised_ips, get_local_ips, sanitize_addresses
+from src.events import (Event, EventDecoder, KeyEvent, KeyHeld, Message, MouseButton, MouseScroll, MovePool,
+                        TextEvent, MESSAGE, MESSAGE_TYPES, MOUSE_MOVE, MOUSE_BUTTON, MOUSE_SCROLL, KEYBOARD, TEXT,
+                        KEY_HELD)
+from src.metrics import REGISTRY, MetricsRegistry
+from src.paths import PeerLink, choose_path, race_connect
+from src.peer_cache import PeerCache, valid_number
+from src.pointer_pacer import PointerPacer
+from src.profiling import INSTRUMENTATION
+from src.relay import ROLE_CONNECT, parse_relay_address, relay_session_name, request_relay
+from src.scroll import ScrollAccumulator, ScrollInjector
+from src.screen_map import ScreenMap, single_monitor, valid_dimension, validate_monitors
+from src.key_repeat import KeyHeldSender, KeyRepeater, SHORTCUT_MODIFIERS, is_repeating_key, is_text_char
+from src.send_queue import SendQueue
+from src.input_process import InputProcess
+from src.jitter_buffer import JitterBuffer
+from src.log import get_logger, log_limited
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+    import termios
+    # 커널 송신 큐에 남은 바이트 수 (Linux SIOCOUTQ == TIOCOUTQ)
+    SIOCOUTQ = getattr(termios, 'TIOCOUTQ', 0x5411)
+    SIOCINQ = termios.FIONREAD
+except ImportError:
+    fcntl = None
+
+# struct tcp_info에서 tcpi_rtt (마이크로초) 위치: u8 x 8 다음 16번째 u32
+TCP_INFO_RTT_OFFSET = 8 + 15 * 4
+
+log = get_logger('peer')
 
 class KMPeer:
     """
@@ -12,7 +45,37 @@ class KMPeer:
     양방향 통신 및 화면 경계 감지를 지원
     """
 
-    def __init__(self, config):
+    # 화면 경계 감지 범위 (px)
+    EDGE_THRESHOLD = 20
+
+    # 리스너를 만드는 모듈 (mouse, keyboard). 벤치마크는 OS 훅이 없는 가짜 리스너로 교체
+    listener_backends = (mouse, keyboard)
+
+    # 직렬화된 버튼 이름 -> pynput 버튼
+    BUTTONS = {
+        'Button.left': mouse.Button.left,
+        'Button.right': mouse.Button.right,
+        'Button.middle': mouse.Button.middle,
+    }
+
+    # 키를 누르고 있는 동안 송신측이 보내는 유지 신호 간격 (초, 수신측 repeat_timeout_ms보다 짧아야 함)
+    KEY_HELD_INTERVAL = 1.0
+
+    # 커널 RTT(TCP_INFO)가 없는 OS에서 포인터 혼잡 추정용 ping 최소 간격 (초, 송신 중에만)
+    PACER_PING_INTERVAL = 0.1
+
+    # peer 하나와 동시에 유지하는 최대 연결(경로) 수
+    MAX_LINKS = 4
+    # 경로 전환 표시를 기다리는 최대 시간 (초)
+    PATH_WAIT = 2.0
+    # relay 연결 실패 시 재시도 간격 (초, 실패할 때마다 두 배)
+    RELAY_RETRY_MIN = 1.0
+    RELAY_RETRY_MAX = 30.0
+    # 더 빠른 경로가 연속으로 이 횟수만큼 측정돼야 전환 (흔들림 방지)
+    SWITCH_ROUNDS = 3
+
+    def __init__(self, config, registry: Optional[MetricsRegistry] = None,
+                 peer_cache: Optional[PeerCache] = None):
         self.config = config
         self.socket = None
         self.running = False
@@ -20,36 +83,75 @@ class KMPeer:
 
         # 제어권 상태
         self.has_control = True  # 시작시 로컬이 제어권 보유
+        # 마지막 제어권 전환 소요 시간 (초, 성능 패널 표시용)
+        self.last_handoff: Optional[float] = None
+
+        # 입력 캡처/주입을 별도 프로세스에서 실행 (features.input_process)
+        self.input_process = InputProcess() if config.get('features.input_process', False) else None
 
         # 마우스/키보드 컨트롤러
-        try:
-            self.mouse_controller = mouse.Controller()
-            self.keyboard_controller = keyboard.Controller()
-            print("Mouse and keyboard controllers initialized")
-        except Exception as e:
-            print(f"Failed to initialize controllers: {e}")
-            print("This may be a permission issue. The application may not work properly.")
-            self.mouse_controller = None
-            self.keyboard_controller = None
+        if self.input_process is not None:
+            # 주입은 공유 메모리 링을 거쳐 입력 프로세스에서 수행
+            self.mouse_controller = self.input_process.mouse
+            self.keyboard_controller = self.input_process.keyboard
+        else:
+            try:
+                self.mouse_controller = mouse.Controller()
+                self.keyboard_controller = keyboard.Controller()
+                log.info("Mouse and keyboard controllers initialized")
+            except Exception as e:
+                log.error("Failed to initialize controllers: %s. This may be a permission issue. The application may not work properly.", e)
+                self.mouse_controller = None
+                self.keyboard_controller = None
 
         # 리스너
         self.mouse_listener = None
         self.keyboard_listener = None
 
         # 네트워크 스레드
-        self.listen_thread = None
         self.server_thread = None
+        self.server_socket: Optional[socket.socket] = None
+        self.send_thread = None
+
+        # 입력 콜백은 큐에 넣기만 하고 소켓 전송은 송신 스레드가 담당
+        self.send_queue: Optional[SendQueue] = None
+        # 전송이 끝난 mouse_move 객체는 다음 캡처에 재사용
+        self.move_pool = MovePool()
+        # 혼잡 적응 포인터 샘플링: 커널 송신 큐/RTT로 추정한 지연이 target을 넘으면 mouse_move 간격을 늘림
+        self.pointer_pacer: Optional[PointerPacer] = None
+        self.pacer_ping_at = 0.0
+        if config.get('network.adaptive_pointer', True):
+            self.pointer_pacer = PointerPacer(target=config.get('network.pointer_target_ms', 30) / 1000.0,
+                                              min_rate=config.get('network.pointer_min_hz', 15))
 
         # 콜백
         self.on_connection_changed: Optional[Callable] = None
         self.on_control_changed: Optional[Callable] = None
 
-        # 화면 정보
+        # 알려진 peer 캐시 (마지막 연결 주소, 화면 배치, RTT)
+        self.peer_cache = peer_cache if peer_cache is not None else PeerCache.from_config(config)
+        self.remote_ip = self._resolve_remote_ip()
+        cached = self.peer_cache.get(self.remote_ip) if self.peer_cache is not None and self.remote_ip else None
+        cached = cached or {}
+
+        # 화면 정보 (원격 배치는 이 peer의 캐시 항목 -> 직접 설정한 remote.monitors 순으로, 연결 후 screen_info로 갱신)
         self.local_width = config.get('local.screen_width', 1920)
         self.local_height = config.get('local.screen_height', 1080)
         self.remote_width = config.get('remote.screen_width', 1920)
         self.remote_height = config.get('remote.screen_height', 1080)
-        self.layout_position = config.get('layout.position', 'right')
+        # 저장된 목록도 잘못됐을 수 있으므로 검사 후 사용
+        self.remote_monitors = validate_monitors(cached.get('monitors'))
+        if self.remote_monitors:
+            if valid_dimension(cached.get('screen_width')) and valid_dimension(cached.get('screen_height')):
+                self.remote_width = int(cached['screen_width'])
+                self.remote_height = int(cached['screen_height'])
+        else:
+            self.remote_monitors = validate_monitors(config.get('remote.monitors'))
+        self.local_monitors = (validate_monitors(config.get('local.monitors'))
+                               or single_monitor(self.local_width, self.local_height))
+        self.remote_monitors = self.remote_monitors or single_monitor(self.remote_width, self.remote_height)
+        self._layout_position = config.get('layout.position', 'right')
+        self._build_screen_map()
 
         # 마지막 마우스 위치
         self.last_mouse_pos = (0, 0)
@@ -57,6 +159,268 @@ class KMPeer:
         # 제어권 전환 쿨다운
         self.last_transfer_time = 0
 
+        # 마지막으로 측정한 RTT (초)
+        self.rtt = cached['rtt_ms'] / 1000.0 if valid_number(cached.get('rtt_ms')) and cached['rtt_ms'] > 0 else None
+
+        # 메트릭
+        self._init_metrics(registry or REGISTRY)
+        self.ever_connected = False
+
+        # 스크롤: 송신측 프레임 단위 누적, 수신측 소수 델타 보존
+        self.scroll_accumulator = ScrollAccumulator(
+            self._send_scroll, frame_interval=config.get('features.scroll_frame_ms', 16) / 1000.0)
+        self.scroll_injector = ScrollInjector(lambda dx, dy: self.mouse_controller.scroll(dx, dy))
+
+        # 키 자동 반복: 송신측은 OS 반복 입력을 보내지 않고, 수신측이 로컬에서 반복
+        self.receiver_repeat = config.get('keyboard.receiver_repeat', True)
+        # 눌린 반복 키마다 KEY_HELD_INTERVAL 간격으로 유지 신호 전송 (OS 자동 반복 콜백과 무관하게 타이머로)
+        self.key_held_sender = KeyHeldSender(lambda key_str: self._send_event(KeyHeld(key_str)),
+                                             interval=self.KEY_HELD_INTERVAL)
+        self.key_repeater = KeyRepeater(
+            press=lambda key: self.keyboard_controller.press(key),
+            release=lambda key: self.keyboard_controller.release(key),
+            delay=config.get('keyboard.repeat_delay_ms', 500) / 1000.0,
+            interval=config.get('keyboard.repeat_interval_ms', 33) / 1000.0,
+            timeout=config.get('keyboard.repeat_timeout_ms', 2500) / 1000.0,
+        )
+
+        # ASCII 밖의 문자 키 입력과 send_text()는 text 이벤트로 전송 (상대가 screen_info로 지원을 알린 경우에만)
+        self.text_events = config.get('keyboard.text_events', True)
+        self.remote_text = False
+        self.modifiers_down = set()  # 눌린 단축키 수정자 (눌려 있으면 문자도 키 이벤트로 전송)
+        self.text_keys = set()  # text로 보낸 키 (release는 전송하지 않음)
+
+        # 수신측 mouse_move 지터 버퍼 (송신측 타임스탬프로 일정한 간격 재생)
+        self.jitter_buffer = None
+        if config.get('jitter_buffer.enabled', False):
+            self.jitter_buffer = JitterBuffer(
+                lambda x, y: setattr(self.mouse_controller, 'position', (x, y)),
+                min_delay=config.get('jitter_buffer.min_delay_ms', 0) / 1000.0,
+                max_delay=config.get('jitter_buffer.max_delay_ms', 40) / 1000.0,
+                percentile=config.get('jitter_buffer.percentile', 95),
+                interpolate_step=config.get('jitter_buffer.interpolate_ms', 8) / 1000.0,
+                late=self.m_jitter_late, interpolated=self.m_jitter_interpolated,
+            )
+        # 상대가 지터 버퍼를 사용하면 mouse_move에 송신 시각(t)을 붙임
+        self.remote_timestamps = False
+
+        # 인증 (security.psk 설정시 핸드셰이크 + 프레임 단위 HMAC, 연결마다 세션)
+        self.master_key = load_master_key(config)
+
+        # relay 경유 연결 (다른 서브넷의 peer와 relay에서 같은 세션 이름으로 만남, 인증은 종단 간)
+        self.relay_address = parse_relay_address(config.get('relay.address', ''))
+        self.relay_session = relay_session_name(config.get('relay.session', ''), self.master_key)
+        if self.relay_address and self.relay_session is None:
+            log.error("relay.address is set but neither relay.session nor security.psk is; relay disabled")
+            self.relay_address = None
+        self.relay_socket: Optional[socket.socket] = None  # 상대를 기다리는 relay 연결 (stop()에서 깨움)
+        self.relay_thread = None
+
+        # 다중 경로: 상대의 모든 주소로 연결을 경쟁시키고 RTT가 가장 낮은 연결로 입력을 보냄
+        # node id가 작은 쪽(leader)이 사용할 경로를 정하고, 상대는 경로 전환 표시('path')를 따라감
+        self.node_id = os.urandom(8).hex()
+        self.multipath = config.get('network.multipath', True)
+        self.local_addresses = advertised_ips(get_local_ips())
+        self.race_stagger = config.get('network.race_stagger_ms', 250) / 1000.0
+        self.probe_interval = config.get('network.path_probe_ms', 1000) / 1000.0
+        self.switch_ratio = config.get('network.path_switch_ratio', 1.5)
+        self.links: List[PeerLink] = []
+        self.link_lock = threading.RLock()
+        self.link_cond = threading.Condition(self.link_lock)
+        self.send_link: Optional[PeerLink] = None  # 입력 이벤트를 보내는 연결
+        self.recv_link: Optional[PeerLink] = None  # 입력 이벤트를 처리하는 연결 (상대가 보내는 연결)
+        self.remote_node: Optional[str] = None
+        self.link_counter = 0
+        self.dialed = set()  # 이미 연결을 시도한 상대 주소
+        self.switch_candidate: Optional[PeerLink] = None
+        self.switch_votes = 0
+        self.probe_thread = None
+        # 입력이 오가는 동안에만 경로를 측정 (유휴 상태에서는 측정 스레드가 깨어나지 않음)
+        self.path_activity = threading.Event()
+
+        # 계측 (diagnostics.instrument 또는 런타임 토글로 활성화)
+        self.instrumentation = INSTRUMENTATION
+        self._dispatch_event = self.instrumentation.wrap('dispatch', self._handle_remote_event)
+
+    def _init_metrics(self, registry: MetricsRegistry):
+        """메트릭 등록"""
+        self.registry = registry
+        self.m_events_sent = registry.counter('km_events_sent_total', "Events sent by type", label='type')
+        self.m_events_received = registry.counter('km_events_received_total', "Events received by type", label='type')
+        self.m_bytes_sent = registry.counter('km_bytes_sent_total', "Bytes written to the peer socket")
+        self.m_bytes_received = registry.counter('km_bytes_received_total', "Bytes read from the peer socket")
+        self.m_decode_errors = registry.counter('km_decode_errors_total', "Received lines that failed to decode")
+        self.m_send_errors = registry.counter('km_send_errors_total', "Socket errors while sending")
+        self.m_handoffs = registry.counter('km_handoffs_total', "Control handoffs by direction", label='direction')
+        self.m_handoff_duration = registry.histogram('km_handoff_duration_seconds',
+                                                     "Time spent performing a control handoff", label='direction')
+        self.m_connections = registry.counter('km_connections_total', "Established peer connections")
+        self.m_reconnects = registry.counter('km_reconnects_total', "Connections re-established after a disconnect")
+        self.m_connect_failures = registry.counter('km_connect_failures_total', "Failed outgoing connection attempts")
+        self.m_scroll_coalesced = registry.counter('km_scroll_coalesced_total',
+                                                   "Scroll callbacks merged into a later scroll event")
+        self.m_send_dropped = registry.counter('km_send_queue_dropped_total',
+                                               "Events dropped because the send queue was full", label='type')
+        self.m_send_merged = registry.counter('km_send_queue_merged_total',
+                                              "Events merged into a queued event of the same type", label='type')
+        self.m_send_queue_events = registry.gauge(
+            'km_send_queue_events', "Events waiting in the send queue",
+            func=lambda: len(self.send_queue) if self.send_queue is not None else 0)
+        self.m_send_queue_high_water = registry.gauge(
+            'km_send_queue_high_water', "Largest send queue depth seen",
+            func=lambda: self.send_queue.high_water if self.send_queue is not None else 0)
+        self.m_key_repeats_suppressed = registry.counter('km_key_repeats_suppressed_total',
+                                                         "OS key auto-repeat presses not sent to the peer")
+        self.m_auth_failures = registry.counter('km_auth_failures_total', "Failed handshakes and rejected frames")
+        self.m_send_queue = registry.gauge('km_send_queue_bytes', "Bytes queued in the kernel send buffer",
+                                           func=lambda: self._socket_queue_bytes(SIOCOUTQ))
+        self.m_receive_queue = registry.gauge('km_receive_queue_bytes',
+                                              "Bytes received but not yet dispatched",
+                                              func=lambda: self._socket_queue_bytes(SIOCINQ) + self.receive_pending)
+        self.receive_pending = 0
+        self.m_jitter_late = registry.counter('km_jitter_late_total',
+                                              "Pointer samples that arrived after their playout time")
+        self.m_jitter_interpolated = registry.counter('km_jitter_interpolated_total',
+                                                      "Pointer positions interpolated by the jitter buffer")
+        self.m_jitter_delay = registry.gauge(
+            'km_jitter_delay_seconds', "Current jitter buffer playout delay",
+            func=lambda: self.jitter_buffer.target if self.jitter_buffer is not None else 0.0)
+        self.m_rtt = registry.gauge('km_peer_rtt_seconds', "Last measured round-trip time to the peer",
+                                    func=lambda: self.rtt or 0.0)
+        self.m_pointer_rate = registry.gauge(
+            'km_pointer_rate_limit_hz', "Current mouse_move send rate limit (0 = unlimited)",
+            func=lambda: self.pointer_pacer.rate_limit if self.pointer_pacer is not None else 0.0)
+        self.m_send_delay = registry.gauge(
+            'km_send_delay_seconds', "Estimated queueing delay for new events on the send path",
+            func=lambda: self.pointer_pacer.delay if self.pointer_pacer is not None else 0.0)
+        self.m_path_switches = registry.counter('km_path_switches_total', "Changes of the path used to send events")
+        self.m_paths = registry.gauge('km_peer_paths', "Open connections (paths) to the peer",
+                                      func=lambda: len(self.links))
+
+    def _resolve_remote_ip(self) -> str:
+        """연결할 peer 주소 (설정이 없으면 캐시의 마지막 연결 peer)"""
+        remote_ip = self.config.get('remote.ip')
+        if not remote_ip and self.peer_cache is not None:
+            last_good = self.peer_cache.last_good()
+            if last_good:
+                remote_ip = last_good[0]
+                log.info("Using cached peer %s (%s)", remote_ip, last_good[1].get('name', ''))
+        return remote_ip or ''
+
+    @staticmethod
+    def _measure_rtt(sock: socket.socket, fallback: Optional[float] = None) -> Optional[float]:
+        """커널이 추정한 RTT (TCP_INFO, 초). 지원되지 않으면 fallback"""
+        tcp_info = getattr(socket, 'TCP_INFO', None)
+        if tcp_info is not None:
+            try:
+                info = sock.getsockopt(socket.IPPROTO_TCP, tcp_info, 104)
+                rtt_us = struct.unpack_from('I', info, TCP_INFO_RTT_OFFSET)[0]
+                if rtt_us:
+                    return rtt_us / 1e6
+            except (OSError, struct.error):
+                pass
+        return fallback
+
+    def current_rtt(self) -> Optional[float]:
+        """송신 경로의 현재 RTT (커널 추정값이라 트래픽 없이 조회, 연결 전이면 None)"""
+        sock = self.socket
+        if sock is None or not self.connected:
+            return None
+        return self._measure_rtt(sock, self.rtt)
+
+    def _socket_queue_bytes(self, request, sock: Optional[socket.socket] = None) -> int:
+        """커널 소켓 큐 크기 조회 (sock이 없으면 송신 경로, 지원되지 않으면 0)"""
+        sock = sock or self.socket
+        if fcntl is None or not sock or not self.connected:
+            return 0
+        try:
+            return struct.unpack('i', fcntl.ioctl(sock.fileno(), request, b'\0\0\0\0'))[0]
+        except OSError:
+            return 0
+
+    @property
+    def layout_position(self) -> str:
+        return self._layout_position
+
+    @layout_position.setter
+    def layout_position(self, position: str):
+        self._layout_position = position
+        self._build_screen_map()
+
+    def _build_screen_map(self):
+        """양쪽 모니터 목록으로 좌표 매핑 테이블 재구성"""
+        self.screen_map = ScreenMap(self.local_monitors, self.remote_monitors, self._layout_position,
+                                    entry_inset=self.EDGE_THRESHOLD * 2)
+
+    def _send_screen_info(self):
+        """연결 직후 로컬 모니터 배치를 상대에게 알림"""
+        self._send_event(Message('screen_info', {
+            'screen_width': self.local_width,
+            'screen_height': self.local_height,
+            'monitors': self.local_monitors,
+            'timestamps': self.jitter_buffer is not None,
+            'text': True,
+        }))
+
+    def _on_connected(self, link: PeerLink):
+        """연결 수립 시 공통 처리 (메트릭, 화면 정보 교환, peer 캐시 갱신, 초기 제어권)"""
+        self.m_connections.inc()
+        if self.ever_connected:
+            self.m_reconnects.inc()
+        self.ever_connected = True
+        self.send_queue.clear()
+        if self.pointer_pacer is not None:
+            self.pointer_pacer.reset()
+        self._send_screen_info()
+
+        self.rtt = link.rtt
+        # relay 주소는 peer 주소가 아니므로 캐시하지 않음
+        if not link.relayed:
+            self.remote_ip = link.address
+            if self.peer_cache is not None and self.remote_ip:
+                self.peer_cache.record_connected(self.remote_ip, self.rtt, link.addresses)
+
+        # 첫 경로를 받은 쪽(서버 역할)이 초기 제어권 보유
+        self.has_control = not link.outgoing
+        if link.relayed:
+            log.info("Connected to peer through relay %s", link.address)
+        elif link.outgoing:
+            log.info("Connected to peer at %s:%s", link.address, link.remote_port)
+        else:
+            log.info("Peer connected from %s", link.address)
+
+        if self.on_connection_changed:
+            self.on_connection_changed(True)
+        if self.on_control_changed:
+            self.on_control_changed(self.has_control)
+
+        if self.has_control:
+            self._start_listeners()
+            # 초기 연결 시 쿨다운 설정 (즉시 경계 감지 방지)
+            self.last_transfer_time = time.time()
+
+    def _authenticate(self, sock: socket.socket, is_server: bool):
+        """사전 공유 키 핸드셰이크. (세션, 함께 수신된 바이트) 또는 실패시 None (키가 없으면 세션 None)"""
+        # 작은 이벤트 프레임이 Nagle/지연 ACK로 묶여 지연되지 않도록
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+        if not self.master_key:
+            return None, b''
+
+        try:
+            return perform_handshake(sock, self.master_key, is_server)
+        except (AuthenticationError, OSError) as e:
+            self.m_auth_failures.inc()
+            log_limited(log, logging.WARNING, 'auth_failed', "Peer authentication failed: %s", e)
+            try:
+                sock.close()
+            except:
+                pass
+            return None
+
     def start(self):
         """P2P 연결 시작"""
         if self.running:
@@ -64,80 +428,166 @@ class KMPeer:
 
         self.running = True
 
+        if not self.master_key:
+            log.warning("security.psk is not set; peer connections are not authenticated")
+
+        # 송신 스레드 시작
+        self.send_queue = SendQueue(self.config.get('network.send_queue_size', 256),
+                                    dropped=self.m_send_dropped, merged=self.m_send_merged, pool=self.move_pool)
+        self.send_thread = threading.Thread(target=self._send_loop, daemon=True)
+        self.send_thread.start()
+
+        # 입력 프로세스 시작 (캡처된 입력은 리스너 콜백과 같은 함수로 전달)
+        if self.input_process is not None:
+            wrap = self.instrumentation.wrap
+            self.input_process.start(
+                on_move=wrap('on_move', self._on_move),
+                on_click=wrap('on_click', self._on_click),
+                on_scroll=wrap('on_scroll', self._on_scroll),
+                on_press=wrap('on_press', self._on_press),
+                on_release=wrap('on_release', self._on_release),
+            )
+
         # 서버 소켓 시작 (다른 peer의 연결을 받기 위해)
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
         self.server_thread.start()
 
-        # 원격 peer에 연결 시도
-        remote_ip = self.config.get('remote.ip')
-        if remote_ip:
-            threading.Thread(target=self._connect_to_peer, args=(remote_ip,), daemon=True).start()
+        # 경로가 둘 이상이면 주기적으로 RTT 측정
+        if self.multipath:
+            self.probe_thread = threading.Thread(target=self._path_probe_loop, daemon=True)
+            self.probe_thread.start()
+
+        # 원격 peer에 바로 연결 시도 (캐시된 peer 포함, 검색 완료를 기다리지 않음)
+        if self.remote_ip:
+            threading.Thread(target=self._connect_to_peer, daemon=True).start()
+
+        # relay를 거친 연결 (직접 연결과 함께 경로 후보가 됨)
+        if self.relay_address:
+            self.relay_thread = threading.Thread(target=self._relay_loop, daemon=True)
+            self.relay_thread.start()
 
     def stop(self):
         """P2P 연결 중지"""
         self.running = False
         self._stop_listeners()
-
-        if self.socket:
+        self.scroll_accumulator.stop()
+        self.key_held_sender.stop()
+        self.key_repeater.stop()
+        if self.jitter_buffer is not None:
+            self.jitter_buffer.stop()
+        if self.send_queue is not None:
+            self.send_queue.close()
+        if self.input_process is not None:
+            self.input_process.stop()
+
+        # 블로킹 accept를 깨워 서버 스레드 종료 (close만으로는 accept가 깨어나지 않는 OS가 있음)
+        server_socket, self.server_socket = self.server_socket, None
+        if server_socket is not None:
             try:
-                self.socket.close()
-            except:
+                server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server_socket.close()
+        relay_socket = self.relay_socket
+        if relay_socket is not None:
+            try:
+                relay_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
                 pass
+        self.path_activity.set()
+
+        with self.link_cond:
+            links, self.links = self.links, []
+            self.send_link = self.recv_link = None
             self.socket = None
+            self.remote_node = None
+            self.link_cond.notify_all()
+        for link in links:
+            link.close()
+        if self.peer_cache is not None:
+            self.peer_cache.flush()
 
         self.connected = False
         if self.on_connection_changed:
             self.on_connection_changed(False)
 
+    def send_text(self, text: str) -> bool:
+        """문자열을 상대에게 입력 (붙여넣기 등). 상대가 text 이벤트를 지원하지 않으면 문자별 키 이벤트로 전송"""
+        if not self.connected or not text:
+            return False
+        if self.remote_text:
+            self._send_event(TextEvent(text))
+            return True
+        for ch in text:
+            self._send_event(KeyEvent(ch, True))
+            self._send_event(KeyEvent(ch, False))
+        return True
+
+    def send_scripted(self, events: List[Event], timeout: float = 5.0) -> int:
+        """
+        스크립트 입력(자동화 API)을 일반 송신 경로로 전송. 경계 감지/병합/버림 없이 순서대로 보내고
+        송신 큐가 절반 이상 차 있으면 비워질 때까지 블로킹 (실제 입력이 버려지지 않도록). 넣은 이벤트 수 반환
+        """
+        send_queue = self.send_queue
+        if not self.connected or not self.has_control or send_queue is None:
+            return 0
+        return send_queue.put_many(events, max(1, send_queue.capacity // 2), timeout)
+
+    def path_info(self) -> List[dict]:
+        """현재 peer와의 연결(경로) 목록"""
+        with self.link_lock:
+            return [{
+                'address': link.address,
+                'rtt_ms': round(link.rtt * 1000, 3) if link.rtt is not None else None,
+                'outgoing': link.outgoing,
+                'relayed': link.relayed,
+                'active': link is self.send_link,
+            } for link in self.links]
+
     def _run_server(self):
-        """서버 소켓 실행 (다른 peer의 연결 대기)"""
+        """서버 소켓 실행 (다른 peer의 연결 대기, 같은 peer의 추가 경로도 받음)"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket = server_socket
 
         port = self.config.get('network.port', 12345)
         try:
             server_socket.bind(('0.0.0.0', port))
-            server_socket.listen(1)
-            server_socket.settimeout(1.0)
+            server_socket.listen(self.MAX_LINKS)
 
+            # 블로킹 accept (폴링 없음, stop()이 소켓을 닫아 깨움)
             while self.running:
                 try:
                     client_socket, addr = server_socket.accept()
-                    if not self.connected:  # 아직 연결되지 않은 경우
-                        print(f"Peer connected from {addr}")
-                        self.socket = client_socket
-                        self.connected = True
-
-                        # 서버 역할: 초기 제어권 보유
-                        self.has_control = True
-
-                        if self.on_connection_changed:
-                            self.on_connection_changed(True)
-                        if self.on_control_changed:
-                            self.on_control_changed(True)
+                    if len(self.links) >= self.MAX_LINKS:
+                        client_socket.close()
+                        continue
+                    # 인증/hello는 별도 스레드에서 (다른 경로의 accept를 막지 않도록)
+                    threading.Thread(target=self._add_link, args=(client_socket, False, addr[0]),
+                                     daemon=True).start()
 
-                        self._start_listeners()
-
-                        # 초기 연결 시 쿨다운 설정 (즉시 경계 감지 방지)
-                        self.last_transfer_time = time.time()
-
-                        self._start_receive_loop()
-                    else:
-                        client_socket.close()  # 이미 연결된 경우 거부
-
-                except socket.timeout:
-                    continue
                 except Exception as e:
-                    print(f"Server accept error: {e}")
+                    if self.running:
+                        log.error("Server accept error: %s", e)
                     break
 
         except Exception as e:
-            print(f"Server bind error: {e}")
+            log.error("Server bind error: %s", e)
         finally:
             server_socket.close()
 
-    def _connect_to_peer(self, remote_ip: str):
-        """원격 peer에 연결"""
+    def _candidate_addresses(self) -> List[str]:
+        """연결을 경쟁시킬 상대 주소 (설정/캐시된 주소 먼저, 그 다음 상대가 알린 다른 인터페이스 주소)"""
+        addresses = [self.remote_ip]
+        if self.multipath:
+            addresses += sanitize_addresses(self.config.get('remote.addresses'))
+            cached = self.peer_cache.get(self.remote_ip) if self.peer_cache is not None else None
+            if cached:
+                addresses += sanitize_addresses(cached.get('addresses'))
+        return [address for address in dict.fromkeys(addresses) if address]
+
+    def _connect_to_peer(self):
+        """원격 peer에 연결 (주소가 여럿이면 happy eyeballs 방식으로 경쟁)"""
         port = self.config.get('remote.port', 12345)
         max_retries = 3
         retry_delay = 2
@@ -146,79 +596,506 @@ class KMPeer:
             if not self.running or self.connected:
                 break
 
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5.0)
-                sock.connect((remote_ip, port))
+            addresses = self._candidate_addresses()
+            self.dialed.update(addresses)
+            if race_connect(addresses, port, self._on_raced, stagger=self.race_stagger, timeout=5.0,
+                            should_stop=lambda: not self.running):
+                break
+
+            self.m_connect_failures.inc()
+            log_limited(log, logging.WARNING, 'connect_failed', "Connection attempt %d to %s failed",
+                        attempt + 1, ', '.join(addresses))
+            time.sleep(retry_delay)
+
+    def _on_raced(self, sock: socket.socket, address: str, connect_time: float):
+        """경쟁 중 연결된 소켓 (인증/hello는 별도 스레드에서)"""
+        threading.Thread(target=self._add_link, args=(sock, True, address, connect_time), daemon=True).start()
+
+    def _dial_more_paths(self, link: PeerLink):
+        """상대가 알린 다른 인터페이스 주소로도 연결 (leader만, 예비 경로)"""
+        with self.link_lock:
+            known = {other.address for other in self.links}
+            addresses = [address for address in link.addresses
+                         if address not in known and address not in self.dialed]
+            self.dialed.update(addresses)
+        if addresses and link.remote_port:
+            threading.Thread(target=race_connect, daemon=True,
+                             args=(addresses, link.remote_port, self._on_raced),
+                             kwargs={'stagger': self.race_stagger, 'should_stop': lambda: not self.running}).start()
+
+    def _add_link(self, sock: socket.socket, outgoing: bool, address: str, connect_time: Optional[float] = None,
+                  relayed: bool = False) -> Optional[PeerLink]:
+        """새 연결 인증 후 hello 전송, 수신 스레드 시작 (경로 등록은 상대 hello를 받은 뒤)"""
+        auth = self._authenticate(sock, is_server=not outgoing)
+        if auth is None:
+            return None
+
+        link = PeerLink(sock, auth[0], auth[1], outgoing, address, relayed=relayed)
+        link.rtt = self._measure_rtt(sock, fallback=connect_time)
+        hello = Message('hello', {
+            'node': self.node_id,
+            'port': self.config.get('network.port', 12345),
+            'addresses': self.local_addresses if self.multipath else [],
+        })
+        if outgoing:
+            with self.link_lock:
+                self.link_counter += 1
+                link.key = f"{self.node_id}:{self.link_counter}"
+            hello.fields['link'] = link.key
+
+        try:
+            link.send_events((hello,))
+        except OSError:
+            link.close()
+            return None
+        threading.Thread(target=self._receive_loop, args=(link,), daemon=True).start()
+        return link
+
+    def _relay_loop(self):
+        """relay를 거쳐 peer에 연결하고, 그 연결이 끊기면 다시 relay에 합류 (실패하면 점점 늦게 재시도)"""
+        delay = self.RELAY_RETRY_MIN
+        while self.running:
+            link = self._connect_via_relay()
+            if link is None:
+                if not self.running:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, self.RELAY_RETRY_MAX)
+                continue
 
-                self.socket = sock
-                self.connected = True
-                print(f"Connected to peer at {remote_ip}:{port}")
+            delay = self.RELAY_RETRY_MIN
+            with self.link_cond:
+                self.link_cond.wait_for(lambda: link.closed or not self.running)
 
-                # 클라이언트 역할: 초기 제어권 없음 (Server만 제어 가능)
-                self.has_control = False
+    def _connect_via_relay(self) -> Optional[PeerLink]:
+        """relay에 합류해 상대가 올 때까지 블로킹, 배정된 역할로 인증/hello 진행"""
+        host, port = self.relay_address
+        try:
+            sock = socket.create_connection((host, port), timeout=5.0)
+        except OSError as e:
+            log_limited(log, logging.WARNING, 'relay_connect', "Relay %s:%d unreachable: %s", host, port, e)
+            return None
 
-                if self.on_connection_changed:
-                    self.on_connection_changed(True)
-                if self.on_control_changed:
-                    self.on_control_changed(False)
+        self.relay_socket = sock
+        try:
+            sock.settimeout(None)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            role = request_relay(sock, self.relay_session)
+        except (OSError, ValueError) as e:
+            sock.close()
+            if self.running:
+                log_limited(log, logging.WARNING, 'relay_join', "Relay %s:%d join failed: %s", host, port, e)
+            return None
+        finally:
+            self.relay_socket = None
+        if not self.running:
+            sock.close()
+            return None
+
+        log.debug("Relay %s:%d paired us (%s)", host, port, role)
+        return self._add_link(sock, role == ROLE_CONNECT, host, relayed=True)
+
+    def _on_hello(self, link: PeerLink, event: Message):
+        """상대 hello: 같은 peer의 경로로 등록 (다른 peer이거나 자기 자신이면 거부)"""
+        node = event.get('node')
+        with self.link_cond:
+            accept = (node and node != self.node_id and (self.remote_node is None or node == self.remote_node)
+                      and len(self.links) < self.MAX_LINKS and self.running)
+            if accept:
+                link.remote_node = node
+                port = event.get('port')
+                link.remote_port = port if isinstance(port, int) and 0 < port < 65536 else 0
+                link.addresses = sanitize_addresses(event.get('addresses'))
+                if not link.outgoing:
+                    link.key = event.get('link')
+                self.remote_node = node
+                self.links.append(link)
+                first = self.send_link is None
+                self.link_cond.notify_all()
+        if not accept or not link.key:
+            log.info("Rejected connection from %s", link.address)
+            link.close()
+            with self.link_cond:
+                self.link_cond.notify_all()
+            return
 
-                # 클라이언트는 리스너를 시작하지 않음 (제어권이 없으므로)
-                self._start_receive_loop()
+        log.debug("Path via %s ready (%s)", link.address, link.key)
+        if self._is_leader():
+            if first:
+                self._activate_first_path(link)
+            if self.multipath:
+                self._dial_more_paths(link)
+
+    def _is_leader(self) -> bool:
+        """사용할 경로를 정하는 쪽 (node id가 작은 쪽)"""
+        return self.remote_node is not None and self.node_id < self.remote_node
+
+    def _find_link(self, key: Optional[str]) -> Optional[PeerLink]:
+        with self.link_lock:
+            for link in self.links:
+                if link.key == key:
+                    return link
+        return None
+
+    def _activate_first_path(self, link: PeerLink):
+        """첫 경로로 연결 시작 (상대가 이후 이벤트를 이 경로에서 처리하도록 경로 표시를 먼저 보냄)"""
+        with self.link_cond:
+            if self.send_link is not None or link.closed:
+                return
+            self.send_link = link
+            self.socket = link.sock
+        try:
+            link.send_events((Message('path', {'link': link.key}),))
+        except OSError:
+            with self.link_cond:
+                self.send_link = None
+                self.socket = None
+            link.close()
+            return
+        self.connected = True
+        self._on_connected(link)
+
+    def _use_send_link(self, link: PeerLink):
+        """송신 경로 교체 (송신 스레드 또는 장애 조치에서 호출)"""
+        with self.link_lock:
+            previous, self.send_link = self.send_link, link
+            self.socket = link.sock
+        if previous is not link:
+            self.m_path_switches.inc()
+            if link.rtt is not None:
+                self.rtt = link.rtt
+            log.info("Switched path to %s (rtt %s)", link.address,
+                     f"{link.rtt * 1000:.2f}ms" if link.rtt is not None else 'unknown')
+
+    def _switch_send_path(self, link: PeerLink):
+        """송신 큐를 거쳐 경로 전환 (이전 경로로 보낸 이벤트 뒤에 경로 표시를 보내 순서 유지)"""
+        if self.send_queue is not None:
+            self.send_queue.put(Message('path', {'link': link.key}))
+
+    def _on_path_marker(self, link: PeerLink, key: Optional[str]):
+        """상대가 이후 입력을 key 경로로 보냄: 수신 경로를 바꾸고, leader가 아니면 송신 경로도 따라감"""
+        target = self._find_link(key)
+        if target is None:
+            return
+        with self.link_cond:
+            self.recv_link = target
+            self.link_cond.notify_all()
+            first = self.send_link is None
+            follow = not self._is_leader() and self.send_link is not target
+
+        if first:
+            self._activate_first_path(target)
+        elif follow:
+            self._switch_send_path(target)
+
+    def _path_probe_loop(self):
+        """경로가 둘 이상이고 입력이 오가는 동안 ping으로 경로별 RTT를 측정하고, leader는 더 빠른 경로로 전환"""
+        while self.running:
+            # 경로가 하나뿐이거나 유휴 상태면 타이머 없이 블로킹
+            with self.link_cond:
+                self.link_cond.wait_for(lambda: len(self.links) >= 2 or not self.running)
+            self.path_activity.wait()
+            if not self.running:
                 break
+            self.path_activity.clear()
 
-            except Exception as e:
-                print(f"Connection attempt {attempt + 1} failed: {e}")
-                time.sleep(retry_delay)
+            with self.link_lock:
+                links = list(self.links)
+                active = self.send_link
+            if len(links) < 2 or active is None:
+                continue
 
-    def _start_receive_loop(self):
-        """메시지 수신 루프 시작"""
-        self.listen_thread = threading.Thread(target=self._receive_loop, daemon=True)
-        self.listen_thread.start()
+            now = time.perf_counter()
+            for link in links:
+                try:
+                    link.ping(now)
+                except OSError:
+                    link.close()
+            if active.rtt is not None:
+                self.rtt = active.rtt
+
+            if self._is_leader():
+                self._maybe_switch(links, active, now)
+            time.sleep(self.probe_interval)
+
+    def _maybe_switch(self, links: List[PeerLink], active: PeerLink, now: float):
+        """더 빠른 경로가 SWITCH_ROUNDS번 연속 측정되면 전환 (현재 경로가 응답하지 않으면 바로)"""
+        timeout = self.probe_interval * 3
+        candidate = choose_path(links, active, now, timeout, ratio=self.switch_ratio)
+        if candidate is None:
+            self.switch_candidate, self.switch_votes = None, 0
+            return
+
+        if candidate is self.switch_candidate:
+            self.switch_votes += 1
+        else:
+            self.switch_candidate, self.switch_votes = candidate, 1
+        if self.switch_votes >= self.SWITCH_ROUNDS or active.effective_rtt(now, timeout) == float('inf'):
+            self.switch_candidate, self.switch_votes = None, 0
+            self._switch_send_path(candidate)
+
+    def _on_link_lost(self, link: PeerLink):
+        """경로 하나가 끊김: 다른 경로가 있으면 그쪽으로 전환, 없으면 연결 종료"""
+        link.close()
+        with self.link_cond:
+            if link in self.links:
+                self.links.remove(link)
+            remaining = list(self.links)
+            in_use = link is self.send_link or link is self.recv_link
+            self.link_cond.notify_all()
+
+        if not remaining:
+            self._on_disconnected()
+            return
+        if not in_use:
+            return
+
+        if self._is_leader():
+            best = min(remaining, key=lambda other: other.effective_rtt(time.perf_counter(), float('inf')))
+            log.warning("Path via %s lost, switching to %s", link.address, best.address)
+            try:
+                # 끊긴 경로로는 표시를 보낼 수 없으므로 새 경로로 바로 보내고 전환
+                best.send_events((Message('path', {'link': best.key}),))
+            except OSError:
+                best.close()
+                return
+            self._use_send_link(best)
+        else:
+            # leader의 경로 표시를 기다리고, 오지 않으면 연결 종료
+            timer = threading.Timer(self.PATH_WAIT, self._check_failover, args=(link,))
+            timer.daemon = True
+            timer.start()
+
+    def _check_failover(self, link: PeerLink):
+        if self.running and (self.send_link is link or self.recv_link is link):
+            log.warning("No replacement path after %s was lost", link.address)
+            self._on_disconnected()
+
+    def _on_disconnected(self):
+        """모든 경로 종료 (수신측에서 눌린 채 남은 키 정리)"""
+        self._stop_listeners()
+        with self.link_cond:
+            links, self.links = self.links, []
+            was_connected = self.connected
+            self.connected = False
+            self.send_link = self.recv_link = None
+            self.socket = None
+            self.remote_node = None
+            self.dialed = set()
+            self.link_cond.notify_all()
+        for link in links:
+            link.close()
+
+        self.key_repeater.release_all()
+        if self.jitter_buffer is not None:
+            self.jitter_buffer.reset()
+        if was_connected and self.on_connection_changed:
+            self.on_connection_changed(False)
 
-    def _receive_loop(self):
-        """메시지 수신 루프"""
+    def _receive_loop(self, link: PeerLink):
+        """경로 하나의 메시지 수신 루프"""
         buffer = b''
+        pending, link.pending = link.pending, b''
+        opener = link.session.opener if link.session else None
+        decoder = EventDecoder()
 
         # 소켓 타임아웃 제거 (블로킹 모드)
         try:
-            self.socket.settimeout(None)
+            link.sock.settimeout(None)
         except:
             pass
 
-        while self.running and self.connected:
+        while self.running and not link.closed:
             try:
-                data = self.socket.recv(1024)
-                if not data:
-                    print("Connection closed by peer")
-                    break
+                if pending:
+                    data, pending = pending, b''
+                else:
+                    data = link.sock.recv(1024)
+                    if not data:
+                        log.info("Connection closed by peer (%s)", link.address)
+                        break
+                    self.m_bytes_received.inc(len(data))
+
+                # 인증된 세션이면 MAC 검증을 통과한 페이로드만 처리
+                if opener:
+                    data = opener.feed(data)
 
                 buffer += data
                 while b'\n' in buffer:
                     line, buffer = buffer.split(b'\n', 1)
                     if line:
                         try:
-                            event = deserialize_event(line)
-                            self._handle_remote_event(event)
-                        except json.JSONDecodeError as e:
-                            print(f"JSON decode error: {e}")
-
+                            event = decoder.decode(line)
+                        except (ValueError, KeyError) as e:
+                            self.m_decode_errors.inc()
+                            log_limited(log, logging.WARNING, 'decode_error', "Event decode error: %s", e)
+                            continue
+                        # 메시지 종류는 상대가 정하므로 모르는 종류는 한 라벨로 (라벨 수 제한)
+                        label = event.name
+                        if event.code == MESSAGE and label not in MESSAGE_TYPES:
+                            label = 'other'
+                        self.m_events_received.inc(label_value=label)
+                        try:
+                            self._handle_link_event(link, event)
+                        except Exception as e:
+                            # 이벤트 하나를 처리하지 못해도 수신 스레드는 계속 (죽으면 _on_link_lost가 불리지 않음)
+                            self.m_decode_errors.inc()
+                            log_limited(log, logging.ERROR, 'handle_error', "Failed to handle %s event: %s",
+                                        event.name, e)
+                self.receive_pending = len(buffer)
+
+            except AuthenticationError as e:
+                self.m_auth_failures.inc()
+                log_limited(log, logging.WARNING, 'rejected_frame', "Rejected frame from peer: %s", e)
+                break
             except socket.error as e:
-                print(f"Socket error: {e}")
+                if not link.closed:
+                    log_limited(log, logging.WARNING, 'socket_error', "Socket error: %s", e)
                 break
 
-        # 연결 종료
-        self.connected = False
-        if self.on_connection_changed:
-            self.on_connection_changed(False)
+        self._on_link_lost(link)
 
-    def _handle_remote_event(self, event: dict):
-        """원격에서 받은 이벤트 처리"""
-        event_type = event.get('type')
+    def _handle_link_event(self, link: PeerLink, event: Event):
+        """경로 제어 메시지는 바로 처리하고, 입력 이벤트는 현재 수신 경로에서 온 것만 디스패치"""
+        if event.code == MESSAGE:
+            name = event.name
+            if name == 'hello':
+                self._on_hello(link, event)
+                return
+            if name == 'ping':
+                try:
+                    link.send_events((Message('pong', {'t': event.get('t')}),))
+                except OSError:
+                    link.close()
+                return
+            if name == 'pong':
+                sent_at = event.get('t')
+                if isinstance(sent_at, (int, float)):
+                    link.observe_rtt(time.perf_counter() - sent_at)
+                return
+            if name == 'path':
+                self._on_path_marker(link, event.get('link'))
+                return
+
+        if link is not self.recv_link:
+            # 상대가 이미 이 경로로 옮김: 이전 경로의 경로 표시가 처리될 때까지 대기 (이벤트 순서 유지)
+            with self.link_cond:
+                self.link_cond.wait_for(lambda: link is self.recv_link or link.closed or not self.running,
+                                        timeout=self.PATH_WAIT)
+            if link is not self.recv_link:
+                log_limited(log, logging.WARNING, 'inactive_path', "Dropped %s from inactive path %s",
+                            event.name, link.address)
+                return
+        if not self.path_activity.is_set():
+            self.path_activity.set()
+        self._dispatch_event(event)
+
+    def _handle_remote_event(self, event: Event):
+        """원격에서 받은 이벤트 처리 (수신 디코더가 재사용하는 객체이므로 보관하지 않음)"""
+        code = event.code
+        if code == MESSAGE:
+            self._handle_remote_message(event)
+            return
+
+        # 제어권이 없을 때만 원격 입력을 처리
+        if self.has_control:
+            return
+
+        # 클릭/스크롤/키 입력 전에 지터 버퍼에 남은 움직임을 먼저 반영 (입력 위치/순서 유지)
+        if self.jitter_buffer is not None and code != MOUSE_MOVE and code != KEY_HELD:
+            self.jitter_buffer.flush()
+
+        if code == MOUSE_MOVE:
+            if self.mouse_controller:
+                # 원격 좌표를 로컬 좌표로 변환
+                x, y = self._remote_to_local_coords(event.x, event.y)
+                if self.jitter_buffer is not None and event.t is not None:
+                    self.jitter_buffer.push(event.t, x, y)
+                    return
+                try:
+                    self.mouse_controller.position = (x, y)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'inject_move', "Failed to move mouse: %s", e)
+
+        elif code == MOUSE_BUTTON:
+            if self.mouse_controller:
+                button = self.BUTTONS.get(event.button)
+                if button:
+                    try:
+                        if event.pressed:
+                            self.mouse_controller.press(button)
+                        else:
+                            self.mouse_controller.release(button)
+                    except Exception as e:
+                        log_limited(log, logging.WARNING, 'inject_button', "Failed to handle mouse button: %s", e)
+
+        elif code == MOUSE_SCROLL:
+            if self.mouse_controller:
+                try:
+                    self.scroll_injector.inject(event.dx, event.dy)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'inject_scroll', "Failed to scroll: %s", e)
+
+        elif code == KEYBOARD:
+            if self.keyboard_controller:
+                key_str = event.key
+                key = self._resolve_key(key_str)
+
+                if key:
+                    try:
+                        if event.pressed:
+                            self.keyboard_controller.press(key)
+                            # 송신측이 OS 반복을 생략했으면 로컬에서 반복
+                            if event.repeat:
+                                self.key_repeater.key_down(key_str, key)
+                        else:
+                            self.key_repeater.key_up(key_str)
+                            self.keyboard_controller.release(key)
+                    except Exception as e:
+                        log_limited(log, logging.WARNING, 'inject_key', "Failed to handle keyboard: %s", e)
+
+        elif code == TEXT:
+            if self.keyboard_controller:
+                try:
+                    self.keyboard_controller.type(event.text)
+                except Exception as e:
+                    log_limited(log, logging.WARNING, 'inject_text', "Failed to type text: %s", e)
+
+        elif code == KEY_HELD:
+            self.key_repeater.keep_alive(event.key)
+
+    def _handle_remote_message(self, event: Message):
+        """화면 정보/제어권 전환 메시지 처리"""
+        event_type = event.name
+
+        # 상대 모니터 배치 (연결 직후 1회)
+        if event_type == 'screen_info':
+            # 상대가 보낸 값은 검사 후 사용 (잘못되면 단일 모니터로, 캐시에도 검사한 값만 저장)
+            width, height = event.get('screen_width'), event.get('screen_height')
+            if valid_dimension(width) and valid_dimension(height):
+                self.remote_width, self.remote_height = int(width), int(height)
+            monitors = validate_monitors(event.get('monitors'))
+            if monitors is None and event.get('monitors') is not None:
+                log_limited(log, logging.WARNING, 'bad_monitors', "Ignoring invalid monitor list from peer")
+            self.remote_monitors = monitors or single_monitor(self.remote_width, self.remote_height)
+            self.remote_timestamps = bool(event.get('timestamps'))
+            self.remote_text = bool(event.get('text'))
+            self._build_screen_map()
+            # 상대별 배치는 캐시 항목에만 (전역 설정에 쓰면 다른 peer로 바꿨을 때 잘못된 배치를 쓰고, 수신 스레드에서 디스크 I/O)
+            if self.peer_cache is not None and self.remote_ip:
+                self.peer_cache.record_screen(self.remote_ip, self.remote_width, self.remote_height,
+                                              self.remote_monitors)
+            log.info("Remote screen: %dx%d, %d monitor(s)", self.remote_width, self.remote_height, len(self.remote_monitors))
+            return
 
         # 제어권 전환 이벤트
         if event_type == 'control_transfer':
+            handoff_start = time.perf_counter()
             self.has_control = event.get('give_control', False)
+            self.scroll_injector.reset()
+            self.key_repeater.release_all()
+            if self.jitter_buffer is not None:
+                self.jitter_buffer.reset()
 
             # 제어권을 받을 때 마우스 위치 설정
             if self.has_control:
@@ -229,111 +1106,82 @@ class KMPeer:
                         self.mouse_controller.position = (cursor_x, cursor_y)
                         time.sleep(0.1)  # 짧은 지연으로 위치 안정화
                     except Exception as e:
-                        print(f"Failed to set cursor position: {e}")
+                        log_limited(log, logging.WARNING, 'inject_move', "Failed to set cursor position: %s", e)
                 self._start_listeners()
-                print(f"Control received, cursor at ({cursor_x}, {cursor_y})")
+                log.info("Control received, cursor at (%s, %s)", cursor_x, cursor_y)
             else:
                 self._stop_listeners()
-                print("Control released")
+                log.info("Control released")
+
+            self.last_handoff = time.perf_counter() - handoff_start
+            self.m_handoffs.inc(label_value='in')
+            self.m_handoff_duration.observe(self.last_handoff, label_value='in')
 
             if self.on_control_changed:
                 self.on_control_changed(self.has_control)
-            return
 
-        # 제어권이 없을 때만 원격 입력을 처리
-        if not self.has_control:
-            if event_type == 'mouse_move':
-                if self.mouse_controller:
-                    # 원격 좌표를 로컬 좌표로 변환
-                    x, y = self._remote_to_local_coords(event['x'], event['y'])
-                    try:
-                        self.mouse_controller.position = (x, y)
-                    except Exception as e:
-                        print(f"Failed to move mouse: {e}")
-
-            elif event_type == 'mouse_button':
-                if self.mouse_controller:
-                    button_map = {
-                        'Button.left': mouse.Button.left,
-                        'Button.right': mouse.Button.right,
-                        'Button.middle': mouse.Button.middle,
-                    }
-                    button = button_map.get(event['button'])
-                    if button:
-                        try:
-                            if event['pressed']:
-                                self.mouse_controller.press(button)
-                            else:
-                                self.mouse_controller.release(button)
-                        except Exception as e:
-                            print(f"Failed to handle mouse button: {e}")
-
-            elif event_type == 'mouse_scroll':
-                if self.mouse_controller:
-                    try:
-                        self.mouse_controller.scroll(event['dx'], event['dy'])
-                    except Exception as e:
-                        print(f"Failed to scroll: {e}")
-
-            elif event_type == 'keyboard':
-                if self.keyboard_controller:
-                    key_str = event['key']
-                    key = None
-                    if 'Key.' in key_str:
-                        key = getattr(keyboard.Key, key_str.split('.')[-1], None)
-                    else:
-                        key = key_str
-
-                    if key:
-                        try:
-                            if event['pressed']:
-                                self.keyboard_controller.press(key)
-                            else:
-                                self.keyboard_controller.release(key)
-                        except Exception as e:
-                            print(f"Failed to handle keyboard: {e}")
+    @staticmethod
+    def _resolve_key(key_str):
+        """직렬화된 키 문자열을 pynput 키로 변환"""
+        if not key_str:
+            return None
+        if 'Key.' in key_str:
+            return getattr(keyboard.Key, key_str.split('.')[-1], None)
+        return key_str
 
     def _start_listeners(self):
         """마우스/키보드 리스너 시작"""
+        if self.input_process is not None:
+            self.input_process.start_capture()
+            return
+
         if self.mouse_listener or self.keyboard_listener:
             return
 
         try:
-            self.mouse_listener = mouse.Listener(
-                on_move=self._on_move,
-                on_click=self._on_click,
-                on_scroll=self._on_scroll
+            wrap = self.instrumentation.wrap
+            mouse_backend, keyboard_backend = self.listener_backends
+            self.mouse_listener = mouse_backend.Listener(
+                on_move=wrap('on_move', self._on_move),
+                on_click=wrap('on_click', self._on_click),
+                on_scroll=wrap('on_scroll', self._on_scroll)
             )
-            self.keyboard_listener = keyboard.Listener(
-                on_press=self._on_press,
-                on_release=self._on_release
+            self.keyboard_listener = keyboard_backend.Listener(
+                on_press=wrap('on_press', self._on_press),
+                on_release=wrap('on_release', self._on_release)
             )
 
             self.mouse_listener.start()
             self.keyboard_listener.start()
-            print("Listeners started successfully")
+            log.debug("Listeners started")
         except Exception as e:
-            print(f"Failed to start listeners: {e}")
-            print("This may be a permission issue. Try running with sudo or check X11 access.")
+            log.error("Failed to start listeners: %s. This may be a permission issue. Try running with sudo or check X11 access.", e)
             self.mouse_listener = None
             self.keyboard_listener = None
 
     def _stop_listeners(self):
         """마우스/키보드 리스너 중지"""
+        self.key_held_sender.clear()
+        self.modifiers_down.clear()
+        self.text_keys.clear()
+        if self.input_process is not None:
+            self.input_process.stop_capture()
+            return
+
         if self.mouse_listener:
             try:
                 self.mouse_listener.stop()
-                print("Mouse listener stopped")
+                log.debug("Mouse listener stopped")
             except Exception as e:
-                print(f"Error stopping mouse listener: {e}")
+                log.warning("Error stopping mouse listener: %s", e)
             self.mouse_listener = None
 
         if self.keyboard_listener:
             try:
                 self.keyboard_listener.stop()
-                print("Keyboard listener stopped")
+                log.debug("Keyboard listener stopped")
             except Exception as e:
-                print(f"Error stopping keyboard listener: {e}")
+                log.warning("Error stopping keyboard listener: %s", e)
             self.keyboard_listener = None
 
     def _on_move(self, x, y):
@@ -349,28 +1197,36 @@ class KMPeer:
 
         self.last_mouse_pos = (x, y)
 
-        # 마우스 이동 이벤트 전송
-        event = {'type': 'mouse_move', 'x': x, 'y': y}
-        self._send_event(event)
+        # 마우스 이동 이벤트 전송 (풀에서 재사용)
+        t = round(time.perf_counter(), 4) if self.remote_timestamps else None
+        self._send_event(self.move_pool.acquire(x, y, t))
 
     def _on_click(self, x, y, button, pressed):
         """마우스 클릭 이벤트"""
         if not self.has_control or not self.connected:
             return
 
-        event = {'type': 'mouse_button', 'x': x, 'y': y, 'button': str(button), 'pressed': pressed}
-        self._send_event(event)
+        self._send_event(MouseButton(x, y, str(button), pressed))
 
     def _on_scroll(self, x, y, dx, dy):
         """마우스 스크롤 이벤트"""
         if not self.has_control or not self.connected:
             return
 
-        event = {'type': 'mouse_scroll', 'x': x, 'y': y, 'dx': dx, 'dy': dy}
-        self._send_event(event)
+        # 프레임 단위로 합산 (합쳐진 이벤트는 나중에 한 번에 전송)
+        if self.scroll_accumulator.add(dx, dy):
+            self.m_scroll_coalesced.inc()
+
+    def _send_scroll(self, dx: float, dy: float):
+        """누적된 스크롤 델타 전송 (소수점 유지)"""
+        if not self.has_control or not self.connected:
+            return
+
+        x, y = self.last_mouse_pos
+        self._send_event(MouseScroll(x, y, dx, dy))
 
     def _on_press(self, key):
-        """키보드 눌림 이벤트"""
+        """키보드 눌림 이벤트 (입력 프로세스에서는 이미 문자열로 변환된 키)"""
         if not self.has_control or not self.connected:
             return
 
@@ -379,7 +1235,24 @@ class KMPeer:
         except AttributeError:
             key_str = str(key)
 
-        event = {'type': 'keyboard', 'key': key_str, 'pressed': True}
+        if key_str in SHORTCUT_MODIFIERS:
+            self.modifiers_down.add(key_str)
+        elif self.text_events and self.remote_text and not self.modifiers_down and is_text_char(key_str):
+            # 키 입력 하나의 문자를 키 누름/뗌 대신 문자열로 전송 (연속 입력은 송신 큐에서 이어 붙임)
+            # IME 조합 결과가 아니라 키 콜백이 준 문자이므로 조합 중인 글자(자모)가 그대로 갈 수 있음
+            self.text_keys.add(key_str)
+            self._send_event(TextEvent(key_str))
+            return
+
+        event = KeyEvent(key_str, True)
+
+        if self.receiver_repeat and is_repeating_key(key_str):
+            if not self.key_held_sender.press(key_str):
+                # OS 자동 반복: 전송하지 않음 (유지 신호는 key_held_sender가 주기적으로 보냄)
+                self.m_key_repeats_suppressed.inc()
+                return
+            event.repeat = True
+
         self._send_event(event)
 
     def _on_release(self, key):
@@ -392,36 +1265,44 @@ class KMPeer:
         except AttributeError:
             key_str = str(key)
 
-        event = {'type': 'keyboard', 'key': key_str, 'pressed': False}
-        self._send_event(event)
+        if key_str in self.text_keys:
+            self.text_keys.discard(key_str)
+            return
+        self.modifiers_down.discard(key_str)
+        self.key_held_sender.release(key_str)
+        self._send_event(KeyEvent(key_str, False))
 
     def _check_edge_trigger(self, x, y) -> bool:
         """화면 경계 도달 여부 확인"""
-        threshold = 20  # 경계로부터 몇 픽셀 이내 (증가)
+        threshold = self.EDGE_THRESHOLD
 
         # 쿨다운 체크 (0.5초 이내 재전환 방지)
         current_time = time.time()
         if current_time - self.last_transfer_time < 0.5:
             return False
 
+        # 전체 가상 화면 경계 (원점이 음수인 모니터 배치 포함)
+        min_x, min_y, max_x, max_y = self.screen_map.local_bounds
+
         if self.layout_position == 'right':
             # 오른쪽 경계 또는 오른쪽을 벗어남
-            return x >= self.local_width - threshold
+            return x >= max_x - threshold
         elif self.layout_position == 'left':
-            # 왼쪽 경계 또는 왼쪽을 벗어남 (음수 포함)
-            return x <= threshold
+            # 왼쪽 경계 또는 왼쪽을 벗어남
+            return x <= min_x + threshold
         elif self.layout_position == 'bottom':
             # 아래쪽 경계 또는 아래쪽을 벗어남
-            return y >= self.local_height - threshold
+            return y >= max_y - threshold
         elif self.layout_position == 'top':
-            # 위쪽 경계 또는 위쪽을 벗어남 (음수 포함)
-            return y <= threshold
+            # 위쪽 경계 또는 위쪽을 벗어남
+            return y <= min_y + threshold
 
         return False
 
     def _transfer_control_to_remote(self, x, y):
         """제어권을 원격으로 넘김"""
-        print(f"Transferring control to remote at ({x}, {y})")
+        log.info("Transferring control to remote at (%s, %s)", x, y)
+        handoff_start = time.perf_counter()
 
         # 쿨다운 타이머 업데이트
         self.last_transfer_time = time.time()
@@ -430,65 +1311,132 @@ class KMPeer:
         remote_x, remote_y = self._local_to_remote_coords(x, y)
 
         # 제어권 전환 메시지 전송
-        self._send_event({
-            'type': 'control_transfer',
+        self._send_event(Message('control_transfer', {
             'give_control': True,
             'cursor_x': remote_x,
             'cursor_y': remote_y
-        })
+        }))
 
         # 로컬 제어권 해제
         self.has_control = False
         self._stop_listeners()
 
+        self.last_handoff = time.perf_counter() - handoff_start
+        self.m_handoffs.inc(label_value='out')
+        self.m_handoff_duration.observe(self.last_handoff, label_value='out')
+
         if self.on_control_changed:
             self.on_control_changed(False)
 
     def _local_to_remote_coords(self, x, y):
-        """로컬 좌표를 원격 좌표로 변환"""
-        # 좌표를 화면 범위 내로 정규화
-        x = max(0, min(x, self.local_width - 1))
-        y = max(0, min(y, self.local_height - 1))
-
-        if self.layout_position == 'right':
-            # 오른쪽 화면으로 넘어갈 때 → 원격 화면 왼쪽 끝
-            remote_x = 150  # 충분히 안쪽으로 (증가)
-            remote_y = int(y * self.remote_height / self.local_height)
-            return (remote_x, remote_y)
-        elif self.layout_position == 'left':
-            # 왼쪽 화면으로 넘어갈 때 → 원격 화면 오른쪽 끝
-            remote_x = self.remote_width - 150  # 충분히 안쪽으로 (증가)
-            remote_y = int(y * self.remote_height / self.local_height)
-            return (remote_x, remote_y)
-        elif self.layout_position == 'bottom':
-            # 아래쪽 화면으로 넘어갈 때 → 원격 화면 위쪽 끝
-            remote_x = int(x * self.remote_width / self.local_width)
-            remote_y = 150  # 충분히 안쪽으로 (증가)
-            return (remote_x, remote_y)
-        elif self.layout_position == 'top':
-            # 위쪽 화면으로 넘어갈 때 → 원격 화면 아래쪽 끝
-            remote_x = int(x * self.remote_width / self.local_width)
-            remote_y = self.remote_height - 150  # 충분히 안쪽으로 (증가)
-            return (remote_x, remote_y)
-
-        return (x, y)
+        """로컬 경계 좌표를 원격 화면 진입 좌표로 변환 (경계 모니터끼리 매핑)"""
+        return self.screen_map.local_to_remote_entry(x, y)
 
     def _remote_to_local_coords(self, remote_x, remote_y):
-        """원격 좌표를 로컬 좌표로 변환"""
-        # 단순 스케일링 (더 정교한 매핑 가능)
-        local_x = int(remote_x * self.local_width / self.remote_width)
-        local_y = int(remote_y * self.local_height / self.remote_height)
-        return (local_x, local_y)
-
-    def _send_event(self, event: dict):
-        """이벤트를 원격으로 전송"""
-        if not self.connected or not self.socket:
+        """원격 좌표를 로컬 좌표로 변환 (모니터 쌍별 고정소수점 변환)"""
+        return self.screen_map.remote_to_local(remote_x, remote_y)
+
+    def _send_event(self, event: Event):
+        """이벤트를 송신 큐에 넣음 (입력 훅 스레드에서 호출되므로 블로킹하지 않음)"""
+        if not self.connected or self.send_queue is None:
             return
 
+        if not self.send_queue.put(event):
+            # 버릴 수 없는 이벤트가 한계까지 쌓임: 링크가 멈춘 것으로 간주
+            log.warning("Send queue overflow; peer is not reading, disconnecting")
+            self._on_send_failed(self.send_link)
+
+    def _send_loop(self):
+        """송신 스레드: 큐에 쌓인 이벤트를 한 번에 직렬화해 한 프레임으로 전송 (경로 표시에서 송신 경로 교체)"""
+        send_queue = self.send_queue
+        pacer = self.pointer_pacer
+        while True:
+            # 혼잡해 mouse_move 간격이 늘어난 동안에는 이동만 있는 큐를 다음 전송 시각까지 붙잡아 둠
+            batch = send_queue.get_batch(pacer.next_move if pacer is not None else 0.0)
+            if batch is None:
+                break
+            if not self.connected:
+                continue
+
+            start = 0
+            for i, event in enumerate(batch):
+                if event.code != MESSAGE or event.name != 'path':
+                    continue
+                # 표시까지는 이전 경로로 (이전 경로가 끊겼으면 새 경로로) 보낸 뒤 교체
+                target = self._find_link(event.get('link'))
+                link = self.send_link
+                if link is None or link.closed:
+                    link = target
+                self._send_batch(batch[start:i + 1], link)
+                if target is not None and not target.closed:
+                    self._use_send_link(target)
+                start = i + 1
+            if start < len(batch):
+                self._send_batch(batch[start:], self.send_link)
+            if pacer is not None:
+                self._pace_pointer(pacer, batch)
+
+            # 직렬화가 끝났으므로 mouse_move 객체는 풀로 반환
+            release = self.move_pool.release
+            for event in batch:
+                release(event)
+
+    def _send_batch(self, batch: List[Event], link: Optional[PeerLink]):
+        if link is None or not batch:
+            return
         try:
-            self.socket.sendall(serialize_event(event))
-        except socket.error as e:
-            print(f"Send error: {e}")
-            self.connected = False
-            if self.on_connection_changed:
-                self.on_connection_changed(False)
+            # 인증 프레임의 시퀀스 번호는 경로별 send_lock 안에서 증가
+            sent = link.send_events(batch)
+            for event in batch:
+                self.m_events_sent.inc(label_value=event.name)
+            self.m_bytes_sent.inc(sent)
+            if not self.path_activity.is_set():
+                self.path_activity.set()
+        except (socket.error, AttributeError) as e:
+            self.m_send_errors.inc()
+            log_limited(log, logging.WARNING, 'send_error', "Send error: %s", e)
+            self._on_send_failed(link)
+
+    def _pace_pointer(self, pacer: PointerPacer, batch: List[Event]):
+        """송신 후 커널 송신 큐와 RTT를 측정해 mouse_move 간격 조절 (송신 스레드)"""
+        now = time.perf_counter()
+        link = self.send_link
+        if link is not None and not link.closed and pacer.due(now):
+            limited = pacer.rate_limit > 0
+            rtt = self._measure_rtt(link.sock)
+            if rtt is None:
+                rtt = self._pacer_app_rtt(link, now)
+            pacer.update(now, link, link.bytes_sent, self._socket_queue_bytes(SIOCOUTQ, link.sock) if fcntl else 0, rtt)
+            if (pacer.rate_limit > 0) != limited:
+                if limited:
+                    log_limited(log, logging.INFO, 'pointer_pacing', "Send path recovered; pointer rate unlimited")
+                else:
+                    log_limited(log, logging.INFO, 'pointer_pacing',
+                                "Send path congested (estimated delay %.0fms); limiting pointer updates to %.0f Hz",
+                                pacer.delay * 1000, pacer.rate_limit)
+        for event in batch:
+            if event.code == MOUSE_MOVE:
+                pacer.moved(now)
+                break
+
+    def _pacer_app_rtt(self, link: PeerLink, now: float) -> Optional[float]:
+        """
+        TCP_INFO/SIOCOUTQ가 없는 OS(Windows 등)의 혼잡 추정용 RTT (송신 스레드)
+        보낸 데이터 뒤에 ping을 넣어 커널/경로 큐 대기까지 포함한 왕복 시간(link.rtt)을 측정하고,
+        아직 돌아오지 않은 ping의 경과 시간도 지연의 하한으로 사용
+        """
+        outstanding = link.ping_outstanding
+        if outstanding is not None:
+            return max(link.rtt or 0.0, now - outstanding)
+        if now - self.pacer_ping_at >= self.PACER_PING_INTERVAL:
+            self.pacer_ping_at = now
+            try:
+                link.ping(now)
+            except OSError:
+                pass  # 송신 실패는 다음 _send_batch에서 처리
+        return link.rtt
+
+    def _on_send_failed(self, link: Optional[PeerLink]):
+        """송신 실패 처리: 경로를 닫으면 수신 스레드가 다른 경로로 전환하거나 연결을 종료"""
+        if link is not None:
+            link.close()
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from src.log import get_logger, log_limited
+
+log = get_logger('peer_cache')
+
+
+# 숫자여야 하는 항목 필드 (손으로 고친/깨진 캐시에서 잘못된 값은 불러올 때 버림)
+NUMERIC_FIELDS = ('rtt_ms', 'last_seen', 'last_connected')
+
+
+def valid_number(value) -> bool:
+    """캐시의 RTT/시각으로 쓸 수 있는 값인지 (bool이 아닌 유한한 0 이상 숫자)"""
+    return (isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+            and value >= 0)
+
+
+def user_data_dir() -> str:
+    """사용자별 설정 디렉터리 (Windows: %APPDATA%, macOS: Application Support, 그 외: XDG_CONFIG_HOME)"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'km_share')
+
+
+class PeerCache:
+    """
+    알려진 peer 디스크 캐시 {ip: {name, os, screen_width, screen_height, monitors, addresses, rtt_ms, last_seen, last_connected}}
+    시작 시 불러와서 검색을 기다리지 않고 마지막으로 연결됐던 peer에 바로 연결하는 데 사용
+    항목은 주소(ip)로만 구분 (같은 호스트 이름의 다른 PC가 서로의 주소를 덮어쓰지 않도록)
+    변경은 SAVE_DELAY 동안 모아서 한 번에 저장 (검색 응답마다 파일을 다시 쓰지 않음), 종료 시 flush()
+    """
+
+    # 변경 후 저장까지 기다리는 시간 (초)
+    SAVE_DELAY = 2.0
+
+    def __init__(self, path: str, max_entries: int = 32):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.peers: Dict[str, Dict] = self._load()
+        self.dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def from_config(cls, config) -> Optional['PeerCache']:
+        """network.peer_cache 설정으로 생성 (비어있으면 None, 상대 경로는 사용자 설정 디렉터리 기준)"""
+        path = config.get('network.peer_cache', '')
+        if not path:
+            return None
+        return cls(os.path.join(user_data_dir(), os.path.expanduser(path)))
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                peers = json.load(f)
+        except Exception as e:
+            log.warning("Failed to load peer cache %s: %s", self.path, e)
+            return {}
+        if not isinstance(peers, dict):
+            log.warning("Ignoring peer cache %s: not a JSON object", self.path)
+            return {}
+
+        result = {}
+        for ip, entry in peers.items():
+            if not isinstance(entry, dict):
+                continue
+            for key in NUMERIC_FIELDS:
+                if key in entry and not valid_number(entry[key]):
+                    del entry[key]
+            result[ip] = entry
+        if len(result) < len(peers):
+            log.warning("Dropped %d invalid entries from peer cache %s", len(peers) - len(result), self.path)
+        return result
+
+    def _changed(self):
+        """lock을 잡은 상태에서 호출: SAVE_DELAY 뒤 저장 예약 (이미 예약돼 있으면 그대로)"""
+        self.dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """예약된 변경을 바로 저장 (종료 시 호출)"""
+        with self.lock:
+            timer, self._save_timer = self._save_timer, None
+            if timer is not None:
+                timer.cancel()
+            if not self.dirty:
+                return
+            self.dirty = False
+        self.save()
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (중간에 종료돼도 기존 캐시 유지)"""
+        with self.lock:
+            # 오래 안 보인 peer부터 정리
+            if len(self.peers) > self.max_entries:
+                newest = sorted(self.peers.items(), key=lambda item: self._recency(item[1]), reverse=True)
+                self.peers = dict(newest[:self.max_entries])
+
+            tmp_path = self.path + '.tmp'
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.peers, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                log_limited(log, logging.WARNING, 'peer_cache_save', "Failed to save peer cache %s: %s", self.path, e)
+
+    @staticmethod
+    def _recency(entry: Dict) -> float:
+        return max(entry.get('last_seen', 0), entry.get('last_connected', 0))
+
+    def _entry(self, ip: str) -> Dict:
+        """ip의 항목 (없으면 생성)"""
+        entry = self.peers.get(ip)
+        if entry is None:
+            entry = self.peers[ip] = {}
+        return entry
+
+    def remember(self, ip: str, peer_info: Dict):
+        """검색으로 받은 peer 정보 저장"""
+        with self.lock:
+            entry = self._entry(ip)
+            for key in ('name', 'os', 'screen_width', 'screen_height', 'addresses'):
+                if key in peer_info:
+                    entry[key] = peer_info[key]
+            entry['last_seen'] = time.time()
+            self._changed()
+
+    def record_connected(self, ip: str, rtt: Optional[float] = None, addresses: Optional[List[str]] = None):
+        """연결 성공 기록 (rtt: 초, addresses: 상대가 알린 인터페이스 주소)"""
+        with self.lock:
+            entry = self._entry(ip)
+            entry['last_connected'] = entry['last_seen'] = time.time()
+            if rtt is not None:
+                entry['rtt_ms'] = round(rtt * 1000, 3)
+            if addresses:
+                entry['addresses'] = list(addresses)
+            self._changed()
+
+    def record_screen(self, ip: str, screen_width: int, screen_height: int, monitors):
+        """연결 중 받은 상대 화면 배치 저장"""
+        with self.lock:
+            entry = self._entry(ip)
+            entry['screen_width'] = screen_width
+            entry['screen_height'] = screen_height
+            entry['monitors'] = monitors
+            self._changed()
+
+    def get(self, ip: str) -> Optional[Dict]:
+        with self.lock:
+            entry = self.peers.get(ip)
+            return dict(entry) if entry is not None else None
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {ip: dict(entry) for ip, entry in self.peers.items()}
+
+    def last_good(self) -> Optional[Tuple[str, Dict]]:
+        """마지막으로 연결에 성공한 peer (ip, 정보)"""
+        with self.lock:
+            connected = [(ip, entry) for ip, entry in self.peers.items() if entry.get('last_connected')]
+            if not connected:
+                return None
+            ip, entry = max(connected, key=lambda item: item[1]['last_connected'])
+            return ip, dict(entry)
+
+    def __len__(self):
+        return len(self.peers)
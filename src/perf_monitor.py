@@ -0,0 +1,79 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+
+def _percentile(ordered: Sequence[float], p: float) -> Optional[float]:
+    """정렬된 값의 p 백분위수 (값이 없으면 None)"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+
+class PerfSampler:
+    """
+    성능 패널용 샘플러: KMPeer의 프로세스 내 카운터를 읽어 초당 값과 RTT 백분위수를 계산
+    GUI 스레드에서 고정 주기로 sample()을 호출한다. 카운터 읽기와 getsockopt 한 번뿐이라
+    입력/송신 경로와 경쟁하지 않고, 네트워크 트래픽도 만들지 않는다.
+    """
+
+    def __init__(self, history: int = 120):
+        # 스파크라인/백분위수에 쓰는 최근 샘플 수
+        self.history = history
+        self.event_rates: Deque[float] = deque(maxlen=history)
+        self.rtt_samples: Deque[float] = deque(maxlen=history)
+        # 직전 샘플 (시각, 송신 이벤트, 수신 이벤트, 송신 바이트, 수신 바이트)
+        self._last: Optional[tuple] = None
+
+    def reset(self):
+        """기록 초기화 (peer가 바뀔 때)"""
+        self.event_rates.clear()
+        self.rtt_samples.clear()
+        self._last = None
+
+    def sample(self, peer, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """peer 카운터를 한 번 읽어 현재 값 계산 (첫 샘플의 초당 값은 0)"""
+        now = time.perf_counter() if now is None else now
+        counters = (peer.m_events_sent.total(), peer.m_events_received.total(),
+                    peer.m_bytes_sent.get(), peer.m_bytes_received.get())
+
+        rates: List[float] = [0.0, 0.0, 0.0, 0.0]
+        if self._last is not None and now > self._last[0]:
+            elapsed = now - self._last[0]
+            rates = [max(0.0, (value - last) / elapsed) for value, last in zip(counters, self._last[1:])]
+        self._last = (now,) + counters
+        self.event_rates.append(rates[0] + rates[1])
+
+        rtt = peer.current_rtt()
+        if rtt is not None:
+            self.rtt_samples.append(rtt)
+        ordered = sorted(self.rtt_samples)
+
+        send_queue = peer.send_queue
+        return {
+            'events_sent': rates[0],
+            'events_received': rates[1],
+            'bytes_sent': rates[2],
+            'bytes_received': rates[3],
+            'rtt': rtt,
+            'rtt_p50': _percentile(ordered, 50),
+            'rtt_p90': _percentile(ordered, 90),
+            'rtt_p99': _percentile(ordered, 99),
+            'queue_events': len(send_queue) if send_queue is not None else 0,
+            'queue_bytes': peer.m_send_queue.get(),
+            'last_handoff': peer.last_handoff,
+        }
+
+
+def format_rate(value: float, unit: str = '') -> str:
+    """초당 값 표시 (1000 단위로 k/M 접두사)"""
+    if value >= 1e6:
+        return f"{value / 1e6:.1f}M{unit}/s"
+    if value >= 1e3:
+        return f"{value / 1e3:.1f}k{unit}/s"
+    return f"{value:.0f}{unit}/s"
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    """초 단위 값을 ms로 표시 (없으면 '-')"""
+    return '-' if seconds is None else f"{seconds * 1000:.1f}ms"
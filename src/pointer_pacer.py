@@ -0,0 +1,105 @@
+from typing import Optional
+
+
+class PointerPacer:
+    """
+    송신측 혼잡 적응 mouse_move 샘플링 (송신 스레드 전용)
+    커널 송신 큐에 남은 바이트(SIOCOUTQ)를 측정한 전달 속도로 나눈 값에 RTT 증가분을 더해
+    새 프레임이 겪을 지연을 추정하고, mouse_move 최대 전송률을 AIMD로 조절한다.
+    SIOCOUTQ/TCP_INFO가 없는 OS에서는 queued=0과 앱 ping RTT(송신 데이터 뒤에서 대기한 시간 포함)만으로 추정.
+    - 추정 지연이 target을 넘으면 전송률 절반 (처음이면 START_RATE, 최소 min_rate)
+    - target의 절반 아래면 초당 INCREASE_RATE씩 늘리고 RELEASE_RATE를 넘으면 제한 해제
+    간격 안에 들어온 이동은 송신 큐에서 마지막 위치로 합쳐지므로 커서는 최신 위치로 이어지고,
+    키/버튼/스크롤은 제한과 상관없이 바로 전송된다.
+    """
+
+    # 측정 최소 간격 (초, 프레임마다 ioctl/getsockopt를 하지 않도록)
+    SAMPLE_INTERVAL = 0.005
+    # 연속 감소 최소 간격 (초, 줄인 효과가 큐에 나타나기 전에 반복해서 줄이지 않도록)
+    DECREASE_INTERVAL = 0.05
+    # 처음 혼잡을 감지했을 때의 전송률 / 초당 증가량 / 제한 해제 기준 (Hz)
+    START_RATE = 120.0
+    INCREASE_RATE = 120.0
+    RELEASE_RATE = 250.0
+    # 전달 속도 EWMA 계수
+    RATE_ALPHA = 0.3
+
+    def __init__(self, target: float = 0.03, min_rate: float = 15.0):
+        self.target = target
+        self.min_rate = min_rate
+        # 현재 mouse_move 최대 전송률 (Hz, 0이면 제한 없음)
+        self.rate_limit = 0.0
+        # 추정 송신 지연 (커널 큐 대기 + RTT 증가분, 초)
+        self.delay = 0.0
+        # 다음 mouse_move를 보낼 수 있는 시각 (perf_counter, 0이면 제한 없음)
+        self.next_move = 0.0
+        # 전달 속도 (bytes/s, 큐가 차 있던 구간에서만 측정)
+        self.rate: Optional[float] = None
+        self.base_rtt: Optional[float] = None
+        self.last_sample = 0.0
+        self.last_decrease = 0.0
+        self._link = None
+        self._last: Optional[tuple] = None  # 직전 측정 (시각, 전달된 누적 바이트, 큐 바이트)
+
+    def reset(self):
+        """상태 초기화 (경로가 바뀌거나 재연결될 때)"""
+        self.rate_limit = 0.0
+        self.delay = 0.0
+        self.next_move = 0.0
+        self.rate = None
+        self.base_rtt = None
+        self._last = None
+
+    @property
+    def interval(self) -> float:
+        """mouse_move 최소 간격 (초, 0이면 제한 없음)"""
+        return 1.0 / self.rate_limit if self.rate_limit else 0.0
+
+    def moved(self, now: float):
+        """mouse_move를 보낸 뒤 호출: 다음 이동 전송 가능 시각 갱신"""
+        self.next_move = now + self.interval if self.rate_limit else 0.0
+
+    def due(self, now: float) -> bool:
+        return now - self.last_sample >= self.SAMPLE_INTERVAL
+
+    def update(self, now: float, link, sent_total: int, queued: int, rtt: Optional[float]) -> float:
+        """
+        송신 후 측정값 반영 (link: 측정한 경로, sent_total: 그 경로로 쓴 누적 바이트,
+        queued: 커널 송신 큐 바이트, rtt: 커널 RTT 또는 앱 ping RTT). 새 전송률 제한 반환
+        """
+        elapsed = now - self.last_sample
+        self.last_sample = now
+        if link is not self._link:
+            self._link = link
+            self.reset()
+
+        # 커널 큐를 빠져나간(상대가 ACK한) 누적 바이트의 증가 속도 = 병목 전달 속도
+        delivered = sent_total - queued
+        if self._last is not None:
+            last_time, last_delivered, last_queued = self._last
+            if last_queued > 0 and now > last_time:
+                sample = max(0.0, (delivered - last_delivered) / (now - last_time))
+                self.rate = sample if self.rate is None else self.rate + self.RATE_ALPHA * (sample - self.rate)
+        self._last = (now, delivered, queued)
+
+        queue_delay = 0.0
+        if queued and self.rate is not None:
+            queue_delay = queued / self.rate if self.rate > 0 else float('inf')
+
+        # 경로 중간(라우터 버퍼)에 쌓인 대기는 RTT 증가로만 보임
+        inflation = 0.0
+        if rtt:
+            if self.base_rtt is None or rtt < self.base_rtt:
+                self.base_rtt = rtt
+            inflation = rtt - self.base_rtt
+
+        self.delay = queue_delay + inflation
+        if self.delay > self.target:
+            if now - self.last_decrease >= self.DECREASE_INTERVAL:
+                self.last_decrease = now
+                self.rate_limit = max(self.min_rate, self.rate_limit / 2 if self.rate_limit else self.START_RATE)
+        elif self.rate_limit and self.delay < self.target / 2:
+            self.rate_limit += self.INCREASE_RATE * elapsed
+            if self.rate_limit > self.RELEASE_RATE:
+                self.rate_limit = 0.0
+        return self.rate_limit
@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import signal
+import pstats
+import cProfile
+import threading
+import traceback
+import tracemalloc
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, Optional
+from src.log import get_logger
+from src.metrics import REGISTRY, MetricsRegistry
+
+log = get_logger('profiling')
+
+
+class Instrumentation:
+    """
+    입력 콜백/수신 디스패치 계측 (opt-in)
+    - 콜백별 소요 시간 측정, 임계값 초과 호출을 스택과 함께 기록
+    - 실행 중 cProfile / tracemalloc 샘플링 시작/중지
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.enabled = False
+        self.threshold = 0.02  # 초
+        self.output_dir = '.'
+
+        self.m_duration = registry.histogram('km_callback_duration_seconds',
+                                             "Duration of instrumented callbacks", label='callback')
+        self.m_stalls = registry.counter('km_callback_stalls_total',
+                                         "Instrumented calls slower than the stall threshold", label='callback')
+
+        # 최근 지연 호출 기록 (GUI/데몬 조회용)
+        self.stalls = deque(maxlen=50)
+
+        # 진행 중인 호출 {thread_id: (name, start)} - 워치독이 참조
+        self._in_flight: Dict[int, tuple] = {}
+        # 워치독 스레드마다 자기 종료 이벤트를 가짐 (끈 직후 다시 켜도 새 스레드가 이전 종료 요청을 물려받지 않도록)
+        self._watchdog = None
+        self._watchdog_stop = threading.Event()
+        self._watchdog_lock = threading.Lock()
+
+        # cProfile은 프로세스에 하나만 (Python 3.12+는 동시에 두 번째 프로파일러를 켜면 ValueError)
+        # 한 번에 한 스레드의 호출만 프로파일하고, 그동안 다른 스레드의 호출은 그대로 실행
+        self.profiling = False
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profiler_busy = threading.Lock()
+        self._profiled_calls = 0
+
+    def configure(self, config):
+        """설정에서 계측 옵션 로드"""
+        self.threshold = config.get('diagnostics.stall_threshold_ms', 20) / 1000.0
+        self.output_dir = config.get('diagnostics.output_dir', '.')
+        self.set_enabled(config.get('diagnostics.instrument', False))
+
+    def set_enabled(self, enabled: bool):
+        """계측 활성화/비활성화"""
+        with self._watchdog_lock:
+            self.enabled = enabled
+            if enabled and self._watchdog is None:
+                self._watchdog_stop = threading.Event()
+                self._watchdog = threading.Thread(target=self._watchdog_loop, args=(self._watchdog_stop,), daemon=True)
+                self._watchdog.start()
+            elif not enabled and self._watchdog is not None:
+                # 이전 스레드는 다음 대기에서 깨어나 종료 (기다리지 않음)
+                self._watchdog_stop.set()
+                self._watchdog = None
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """계측 래퍼 생성 (비활성 시 플래그 확인 한 번만 추가됨)"""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            return self._call(name, func, args, kwargs)
+
+        return wrapper
+
+    def _call(self, name: str, func: Callable, args, kwargs):
+        tid = threading.get_ident()
+        start = time.perf_counter()
+        self._in_flight[tid] = (name, start, [False])
+        try:
+            if self.profiling and self._profiler_busy.acquire(blocking=False):
+                try:
+                    return self._profiled_call(func, args, kwargs)
+                finally:
+                    self._profiler_busy.release()
+            return func(*args, **kwargs)
+        finally:
+            _, _, reported = self._in_flight.pop(tid, (None, None, [True]))
+            elapsed = time.perf_counter() - start
+            self.m_duration.observe(elapsed, label_value=name)
+            if elapsed >= self.threshold and not reported[0]:
+                # 워치독이 잡지 못한 짧은 지연: 호출 위치 스택만 기록
+                self._record_stall(name, elapsed, ''.join(traceback.format_stack(limit=8)[:-1]))
+
+    def _record_stall(self, name: str, elapsed: float, stack: str):
+        self.m_stalls.inc(label_value=name)
+        self.stalls.append({'callback': name, 'duration_ms': elapsed * 1000, 'time': time.time(), 'stack': stack})
+        log.warning("Slow callback %s: %.1f ms\n%s", name, elapsed * 1000, stack)
+
+    def _watchdog_loop(self, stop: threading.Event):
+        """진행 중인 호출이 임계값을 넘으면 해당 스레드의 현재 스택을 기록"""
+        while not stop.wait(self.threshold / 2):
+            now = time.perf_counter()
+            frames = None
+            for tid, (name, start, reported) in list(self._in_flight.items()):
+                if reported[0] or now - start < self.threshold:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(tid)
+                stack = ''.join(traceback.format_stack(frame, limit=12)) if frame else ''
+                reported[0] = True
+                self._record_stall(name, now - start, stack)
+
+    def _profiled_call(self, func: Callable, args, kwargs):
+        """_profiler_busy를 잡은 스레드에서만 호출. 다른 도구가 프로파일러를 쓰고 있으면 그냥 실행"""
+        profiler = self._profiler
+        if profiler is None:
+            return func(*args, **kwargs)
+        try:
+            profiler.enable()
+        except ValueError:
+            # 디버거/다른 프로파일러가 이미 활성 (3.12+ sys.monitoring): 입력 콜백을 죽이지 않음
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            self._profiled_calls += 1
+
+    def start_profiling(self):
+        """계측된 호출에 대해 cProfile 시작 (계측도 함께 활성화)"""
+        with self._profiler_busy:
+            self._profiler = cProfile.Profile()
+            self._profiled_calls = 0
+        self.profiling = True
+        if not self.enabled:
+            self.set_enabled(True)
+        log.info("cProfile sampling started")
+
+    def stop_profiling(self) -> Optional[str]:
+        """cProfile 중지 후 결과를 파일로 저장"""
+        self.profiling = False
+        # 진행 중인 프로파일 호출이 끝날 때까지 대기
+        with self._profiler_busy:
+            profiler, self._profiler = self._profiler, None
+
+        if profiler is None or not self._profiled_calls:
+            log.info("cProfile stopped (no samples)")
+            return None
+
+        path = os.path.join(self.output_dir, time.strftime('km_share_%Y%m%d_%H%M%S.prof'))
+        pstats.Stats(profiler).dump_stats(path)
+        log.info("cProfile stopped, %d calls profiled, stats written to %s", self._profiled_calls, path)
+        return path
+
+    def toggle_profiling(self):
+        if self.profiling:
+            try:
+                self.stop_profiling()
+            except OSError as e:
+                log.warning("Failed to write cProfile stats: %s", e)
+        else:
+            self.start_profiling()
+
+    def start_tracemalloc(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            log.info("tracemalloc started")
+
+    def stop_tracemalloc(self, limit: int = 20) -> Optional[str]:
+        """tracemalloc 스냅샷 상위 할당 위치를 파일로 저장 후 중지"""
+        if not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        path = os.path.join(self.output_dir, time.strftime('km_share_%Y%m%d_%H%M%S.tracemalloc.txt'))
+        with open(path, 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:limit]:
+                f.write(f"{stat}\n")
+        log.info("tracemalloc stopped, top allocations written to %s", path)
+        return path
+
+    def toggle_tracemalloc(self):
+        if tracemalloc.is_tracing():
+            try:
+                self.stop_tracemalloc()
+            except OSError as e:
+                log.warning("Failed to write tracemalloc snapshot: %s", e)
+        else:
+            self.start_tracemalloc()
+
+    def install_signal_handlers(self):
+        """SIGUSR1: cProfile 토글, SIGUSR2: tracemalloc 토글 (POSIX 전용, 메인 스레드에서 호출)"""
+        if not hasattr(signal, 'SIGUSR1'):
+            return
+        try:
+            signal.signal(signal.SIGUSR1, lambda *_: threading.Thread(target=self.toggle_profiling).start())
+            signal.signal(signal.SIGUSR2, lambda *_: threading.Thread(target=self.toggle_tracemalloc).start())
+        except ValueError:
+            pass  # 메인 스레드가 아닌 경우
+
+
+# 프로세스 기본 계측 객체
+INSTRUMENTATION = Instrumentation()
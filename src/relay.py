@@ -0,0 +1,390 @@
+import os
+import re
+import hmac
+import errno
+import select
+import signal
+import socket
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from src.log import configure_logging, get_logger, log_limited, shutdown_logging
+from src.metrics import REGISTRY, MetricsExporter, MetricsRegistry
+
+log = get_logger('relay')
+
+# 합류 요청/응답 (인증 핸드셰이크 전에 한 줄씩 오가는 평문)
+# peer -> relay: 'KMRELAY <session>\n'
+# relay -> peer: 'KMRELAY accept\n' (먼저 온 쪽, 연결을 받은 쪽으로 핸드셰이크) 또는 'KMRELAY connect\n'
+RELAY_MAGIC = b'KMRELAY'
+ROLE_ACCEPT = 'accept'
+ROLE_CONNECT = 'connect'
+MAX_LINE = 128
+SESSION_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+DEFAULT_RELAY_PORT = 24850
+
+
+def relay_session_name(configured: str, master_key: Optional[bytes]) -> Optional[str]:
+    """
+    relay에서 상대를 찾는 세션 이름 (설정이 없으면 PSK에서 유도, relay는 키를 알 수 없음)
+    둘 다 없으면 None: 공용 이름을 쓰면 relay가 서로 모르는 설치본끼리 짝지어 버림
+    """
+    if configured:
+        return configured
+    if master_key:
+        return hmac.new(master_key, b'km-share relay session', hashlib.sha256).hexdigest()[:32]
+    return None
+
+
+def parse_relay_address(value: str, default_port: int = DEFAULT_RELAY_PORT) -> Optional[Tuple[str, int]]:
+    """'host' 또는 'host:port' (비어있거나 잘못되면 None)"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    host, sep, port = value.rpartition(':')
+    if not sep:
+        return value, default_port
+    try:
+        return host, int(port)
+    except ValueError:
+        return None
+
+
+def _read_line(sock: socket.socket, limit: int = MAX_LINE) -> bytes:
+    """한 줄 읽기 (줄 뒤에 이어지는 상대 데이터를 소비하지 않도록 1바이트씩, 연결마다 한 번뿐)"""
+    line = b''
+    while not line.endswith(b'\n'):
+        chunk = sock.recv(1)
+        if not chunk:
+            raise ConnectionError("connection closed during relay handshake")
+        line += chunk
+        if len(line) > limit:
+            raise ValueError("relay line too long")
+    return line[:-1]
+
+
+def request_relay(sock: socket.socket, session: str) -> str:
+    """relay에 세션 합류 요청 후 상대가 올 때까지 블로킹, 배정된 역할(accept/connect) 반환"""
+    sock.sendall(RELAY_MAGIC + b' ' + session.encode('ascii') + b'\n')
+    parts = _read_line(sock).split()
+    role = parts[1].decode('ascii', 'replace') if len(parts) == 2 and parts[0] == RELAY_MAGIC else ''
+    if role not in (ROLE_ACCEPT, ROLE_CONNECT):
+        raise ValueError(f"unexpected relay reply: {b' '.join(parts)[:32]!r}")
+    return role
+
+
+class RelaySession:
+    """
+    relay가 짝지은 연결 두 개와 방향별 전달량
+    방향 0은 먼저 온 쪽 -> 나중 쪽, 1은 반대. 방향마다 전달 스레드 하나가 자기 칸만 갱신한다.
+    """
+
+    def __init__(self, number: int, name: str, first: Tuple[socket.socket, str],
+                 second: Tuple[socket.socket, str]):
+        self.number = number
+        self.name = name
+        self.sockets = (first[0], second[0])
+        self.addresses = (first[1], second[1])
+        self.bytes = [0, 0]
+        self.chunks = [0, 0]
+        self.started = time.monotonic()
+        self.ended: Optional[float] = None
+        self.forwarders = 0  # 실행 중인 전달 스레드 수
+        self.lock = threading.Lock()
+
+    def shutdown(self) -> bool:
+        """양쪽 연결을 shutdown해 블로킹 중인 전달을 깨움. 처음 호출될 때만 True"""
+        with self.lock:
+            if self.ended is not None:
+                return False
+            self.ended = time.monotonic()
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return True
+
+    def forward_done(self):
+        """전달 스레드 하나 종료 (splice가 fd 번호를 직접 쓰므로 둘 다 끝난 뒤에 닫아 번호 재사용을 막음)"""
+        with self.lock:
+            self.forwarders -= 1
+            last = self.forwarders <= 0
+        if last:
+            self.close_sockets()
+
+    def close_sockets(self):
+        for sock in self.sockets:
+            sock.close()
+
+    def snapshot(self) -> dict:
+        end = self.ended if self.ended is not None else time.monotonic()
+        return {
+            'session': self.number,
+            'name': self.name,
+            'addresses': list(self.addresses),
+            'bytes': list(self.bytes),
+            'chunks': list(self.chunks),
+            'duration_s': round(end - self.started, 3),
+            'active': self.ended is None,
+        }
+
+
+class RelayServer:
+    """
+    서로 직접 닿지 않는 peer(다른 서브넷/VLAN) 사이의 연결 중계
+    양쪽 서브넷에 모두 닿는 호스트에서 실행하고, 두 peer가 같은 세션 이름으로 합류하면 바이트를 그대로 전달한다.
+    - 이벤트를 디코드하지 않음 (인증 핸드셰이크와 프레임 HMAC은 peer 사이 종단 간, relay는 키를 모름)
+    - Linux: os.splice로 소켓 -> 파이프 -> 소켓 (사용자 공간 복사 없음), 그 외: 큰 버퍼 recv_into/sendall
+    - 방향마다 블로킹 스레드 하나 (유휴 세션은 깨어나지 않음)
+    """
+
+    # 합류 요청 한 줄을 기다리는 시간 (초)
+    PREAMBLE_TIMEOUT = 5.0
+    # splice/복사 한 번에 옮기는 최대 바이트
+    CHUNK = 256 * 1024
+
+    def __init__(self, port: int = DEFAULT_RELAY_PORT, host: str = '0.0.0.0', max_sessions: int = 64,
+                 use_splice: bool = True, registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.use_splice = use_splice and hasattr(os, 'splice')
+
+        self.running = False
+        self.server_socket: Optional[socket.socket] = None
+        self.lock = threading.Lock()
+        self.waiting: Dict[str, Tuple[socket.socket, str]] = {}  # {세션 이름: 먼저 온 연결}
+        self.active: Dict[int, RelaySession] = {}
+        self.finished: List[dict] = []  # 최근 종료된 세션 요약
+        self.session_counter = 0
+
+        self.m_sessions = registry.counter('km_relay_sessions_total', "Peer pairs joined by the relay")
+        self.m_bytes = registry.counter('km_relay_bytes_total', "Bytes forwarded by the relay")
+        self.m_rejected = registry.counter('km_relay_rejected_total',
+                                           "Relay connections rejected (bad request or too many sessions)")
+        self.m_active = registry.gauge('km_relay_active_sessions', "Sessions currently forwarded",
+                                       func=lambda: len(self.active))
+        self.m_waiting = registry.gauge('km_relay_waiting', "Connections waiting for their partner",
+                                        func=lambda: len(self.waiting))
+
+    @classmethod
+    def from_config(cls, config, registry: MetricsRegistry = REGISTRY) -> 'RelayServer':
+        return cls(
+            port=config.get('relay.port', DEFAULT_RELAY_PORT),
+            max_sessions=config.get('relay.max_sessions', 64),
+            use_splice=config.get('relay.splice', True),
+            registry=registry,
+        )
+
+    def start(self):
+        """수신 시작 (port가 0이면 임의 포트, 바인드 후 self.port에 반영)"""
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(16)
+        self.port = server_socket.getsockname()[1]
+        self.server_socket = server_socket
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        log.info("Relay listening on %s:%d (%s)", self.host, self.port, 'splice' if self.use_splice else 'copy')
+
+    def stop(self):
+        """수신 중지, 대기 중인 연결과 진행 중인 세션 종료"""
+        self.running = False
+        server_socket, self.server_socket = self.server_socket, None
+        if server_socket is not None:
+            try:
+                server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server_socket.close()
+
+        with self.lock:
+            waiting = list(self.waiting.values())
+            self.waiting.clear()
+            sessions = list(self.active.values())
+        for sock, _ in waiting:
+            sock.close()
+        for session in sessions:
+            self._end_session(session)
+
+    def sessions(self) -> List[dict]:
+        """진행 중인 세션과 최근 종료된 세션의 방향별 전달량"""
+        with self.lock:
+            active = [session.snapshot() for session in self.active.values()]
+            return active + list(self.finished)
+
+    def _accept_loop(self):
+        """블로킹 accept (폴링 없음, stop()이 소켓을 닫아 깨움)"""
+        server_socket = self.server_socket
+        while self.running:
+            try:
+                conn, addr = server_socket.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._join, args=(conn, addr[0]), daemon=True).start()
+
+    def _join(self, conn: socket.socket, address: str):
+        """합류 요청을 읽고 같은 세션의 상대와 짝짓기 (상대가 없으면 대기 목록에 등록)"""
+        try:
+            conn.settimeout(self.PREAMBLE_TIMEOUT)
+            parts = _read_line(conn).split()
+            name = parts[1].decode('ascii', 'replace') if len(parts) == 2 and parts[0] == RELAY_MAGIC else ''
+            if not SESSION_PATTERN.match(name):
+                raise ValueError("bad relay request")
+            conn.settimeout(None)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # 상대를 기다리는 동안 죽은 연결을 커널이 정리하도록
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (OSError, ValueError) as e:
+            self.m_rejected.inc()
+            log_limited(log, logging.WARNING, 'relay_rejected', "Rejected relay connection from %s: %s", address, e)
+            conn.close()
+            return
+
+        # 잠금 안에서는 목록만 바꾸고, 대기 중인 상대의 생존 확인(소켓 I/O)은 잠금 밖에서
+        session = None
+        while True:
+            with self.lock:
+                partner = self.waiting.pop(name, None)
+                if partner is None:
+                    if len(self.waiting) + len(self.active) < self.max_sessions:
+                        self.waiting[name] = (conn, address)
+                        log.debug("Relay session %s: %s waiting for partner", name, address)
+                        return
+                    break
+            if self._alive(partner[0]):
+                with self.lock:
+                    self.session_counter += 1
+                    session = RelaySession(self.session_counter, name, partner, (conn, address))
+                    self.active[session.number] = session
+                break
+            partner[0].close()
+
+        if session is None:
+            self.m_rejected.inc()
+            log_limited(log, logging.WARNING, 'relay_full', "Relay full, rejected %s", address)
+            conn.close()
+            return
+
+        try:
+            session.sockets[0].sendall(RELAY_MAGIC + b' ' + ROLE_ACCEPT.encode() + b'\n')
+            session.sockets[1].sendall(RELAY_MAGIC + b' ' + ROLE_CONNECT.encode() + b'\n')
+        except OSError:
+            self._end_session(session)
+            session.close_sockets()
+            return
+
+        self.m_sessions.inc()
+        log.info("Relay session #%d (%s): %s <-> %s", session.number, name, *session.addresses)
+        session.forwarders = 2
+        for direction in (0, 1):
+            threading.Thread(target=self._forward, args=(session, direction), daemon=True).start()
+
+    @staticmethod
+    def _alive(sock: socket.socket) -> bool:
+        """대기 중인 연결이 아직 열려 있는지 (블로킹 없이, 데이터를 소비하지 않고 확인)"""
+        try:
+            # 읽을 것이 없으면 열려 있음. 읽을 수 있으면 recv가 블로킹하지 않으므로 EOF인지 엿봄
+            # (MSG_DONTWAIT는 Windows에 없음)
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return True
+            return sock.recv(1, socket.MSG_PEEK) != b''
+        except (OSError, ValueError):
+            return False
+
+    def _forward(self, session: RelaySession, direction: int):
+        """한 방향 전달 (끝나면 세션 전체 종료)"""
+        src = session.sockets[direction]
+        dst = session.sockets[1 - direction]
+        try:
+            if self.use_splice:
+                self._forward_splice(session, direction, src, dst)
+            else:
+                self._forward_copy(session, direction, src, dst)
+        except OSError as e:
+            if session.ended is None and e.errno not in (errno.ECONNRESET, errno.EPIPE, errno.EBADF):
+                log_limited(log, logging.WARNING, 'relay_forward', "Relay session #%d forward error: %s",
+                            session.number, e)
+        self._end_session(session)
+        session.forward_done()
+
+    def _forward_splice(self, session: RelaySession, direction: int, src: socket.socket, dst: socket.socket):
+        """소켓 -> 파이프 -> 소켓 (데이터가 커널 밖으로 나오지 않음)"""
+        read_fd, write_fd = os.pipe()
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            while True:
+                count = os.splice(src_fd, write_fd, self.CHUNK)
+                if not count:
+                    break
+                remaining = count
+                while remaining:
+                    remaining -= os.splice(read_fd, dst_fd, remaining)
+                session.bytes[direction] += count
+                session.chunks[direction] += 1
+                self.m_bytes.inc(count)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def _forward_copy(self, session: RelaySession, direction: int, src: socket.socket, dst: socket.socket):
+        """큰 버퍼 하나를 재사용하는 recv_into/sendall 복사 (splice가 없는 OS)"""
+        buffer = bytearray(self.CHUNK)
+        view = memoryview(buffer)
+        while True:
+            count = src.recv_into(buffer)
+            if not count:
+                break
+            dst.sendall(view[:count])
+            session.bytes[direction] += count
+            session.chunks[direction] += 1
+            self.m_bytes.inc(count)
+
+    def _end_session(self, session: RelaySession):
+        """세션 종료 처리 (한 번만 집계/로그)"""
+        if not session.shutdown():
+            return
+        summary = session.snapshot()
+        with self.lock:
+            self.active.pop(session.number, None)
+            self.finished.append(summary)
+            del self.finished[:-self.max_sessions]
+        log.info("Relay session #%d (%s) closed after %.1fs: %d bytes ->, %d bytes <-",
+                 session.number, session.name, summary['duration_s'], summary['bytes'][0], summary['bytes'][1])
+
+
+def main(config_path: str = 'km_share_config.json'):
+    """relay 역할로 실행 (입력 캡처/주입 없음, 종료 시그널까지 블로킹)"""
+    from src.config_manager import ConfigManager
+
+    config = ConfigManager(config_path)
+    configure_logging(config)
+    exporter = MetricsExporter.from_config(config)
+    exporter.start()
+
+    relay = RelayServer.from_config(config)
+    relay.start()
+
+    stop = threading.Event()
+    try:
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    except ValueError:
+        pass  # 메인 스레드가 아닌 경우
+
+    log.info("KM-Share relay running on port %d", relay.port)
+    stop.wait()
+    relay.stop()
+    exporter.stop()
+    log.info("KM-Share relay stopped")
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
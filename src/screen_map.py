@@ -0,0 +1,179 @@
+import math
+import numbers
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 고정소수점 변환 정밀도 (16.16)
+FIXED_SHIFT = 16
+
+Monitor = Dict[str, int]  # {'x', 'y', 'width', 'height'}
+
+# 상대가 보낸 모니터 목록 허용 범위 (개수, 크기/좌표 절댓값 px)
+MAX_MONITORS = 16
+MAX_DIMENSION = 1 << 16
+MAX_COORDINATE = 1 << 20
+
+
+def single_monitor(width: int, height: int) -> List[Monitor]:
+    """모니터 목록을 모를 때 사용하는 단일 모니터 기본값"""
+    return [{'x': 0, 'y': 0, 'width': int(width), 'height': int(height)}]
+
+
+def valid_dimension(value) -> bool:
+    """화면 폭/높이로 쓸 수 있는 값인지 (양수, 범위 안의 숫자)"""
+    return isinstance(value, numbers.Real) and not isinstance(value, bool) and 0 < value <= MAX_DIMENSION
+
+
+def validate_monitors(monitors) -> Optional[List[Monitor]]:
+    """상대/캐시/설정에서 온 모니터 목록 검사: 올바르면 정수로 정리한 목록, 아니면 None"""
+    if not isinstance(monitors, list) or not 0 < len(monitors) <= MAX_MONITORS:
+        return None
+    result = []
+    for m in monitors:
+        if not isinstance(m, dict):
+            return None
+        x, y, width, height = m.get('x'), m.get('y'), m.get('width'), m.get('height')
+        for value in (x, y):
+            if (not isinstance(value, numbers.Real) or isinstance(value, bool) or not math.isfinite(value)
+                    or abs(value) > MAX_COORDINATE):
+                return None
+        if not valid_dimension(width) or not valid_dimension(height) or int(width) < 1 or int(height) < 1:
+            return None
+        result.append({'x': int(x), 'y': int(y), 'width': int(width), 'height': int(height)})
+    return result
+
+
+def _normalize(monitors: Sequence[Monitor]) -> List[Tuple[int, int, int, int]]:
+    """(x0, y0, x1, y1) 튜플 목록, 왼쪽->오른쪽, 위->아래 순서 (잘못된 목록이면 빈 목록)"""
+    rects = [(m['x'], m['y'], m['x'] + m['width'], m['y'] + m['height'])
+             for m in validate_monitors(list(monitors)) or ()]
+    return sorted(rects, key=lambda r: (r[0], r[1]))
+
+
+class _RectTransform:
+    """모니터 하나를 다른 모니터 하나로 보내는 고정소수점 선형 변환"""
+
+    __slots__ = ('sx0', 'sy0', 'sx1', 'sy1', 'dx0', 'dy0', 'dx_max', 'dy_max', 'kx', 'ky')
+
+    def __init__(self, src: Tuple[int, int, int, int], dst: Tuple[int, int, int, int]):
+        self.sx0, self.sy0, self.sx1, self.sy1 = src
+        self.dx0, self.dy0 = dst[0], dst[1]
+        self.dx_max, self.dy_max = dst[2] - 1, dst[3] - 1
+        self.kx = ((dst[2] - dst[0]) << FIXED_SHIFT) // (src[2] - src[0])
+        self.ky = ((dst[3] - dst[1]) << FIXED_SHIFT) // (src[3] - src[1])
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.sx0 <= x < self.sx1 and self.sy0 <= y < self.sy1
+
+    def distance(self, x: int, y: int) -> int:
+        dx = self.sx0 - x if x < self.sx0 else (x - self.sx1 + 1 if x >= self.sx1 else 0)
+        dy = self.sy0 - y if y < self.sy0 else (y - self.sy1 + 1 if y >= self.sy1 else 0)
+        return dx + dy
+
+    def map(self, x: int, y: int) -> Tuple[int, int]:
+        # 곱셈 + 시프트만 사용, 결과는 대상 모니터 안으로 제한
+        lx = self.dx0 + (((x - self.sx0) * self.kx) >> FIXED_SHIFT)
+        ly = self.dy0 + (((y - self.sy0) * self.ky) >> FIXED_SHIFT)
+        return (min(max(lx, self.dx0), self.dx_max), min(max(ly, self.dy0), self.dy_max))
+
+
+class ScreenMap:
+    """
+    양쪽 peer의 모니터 목록으로 한 번 만들어 두는 좌표 매핑
+    - remote_to_local: 모니터 수가 같으면 원격 모니터 i -> 로컬 모니터 i (위치 순서 기준),
+      다르면 원격 전체 영역 -> 로컬 전체 영역으로 변환한 뒤 모니터가 없는 틈이면 가장 가까운 로컬 모니터로
+    - local_to_remote_entry: 화면 경계를 넘을 때 원격 화면 반대쪽 경계의 진입 위치
+    """
+
+    def __init__(self, local_monitors: Sequence[Monitor], remote_monitors: Sequence[Monitor],
+                 position: str = 'right', entry_inset: int = 40):
+        self.local = _normalize(local_monitors) or _normalize(single_monitor(1920, 1080))
+        self.remote = _normalize(remote_monitors) or _normalize(single_monitor(1920, 1080))
+        self.position = position
+        self.entry_inset = entry_inset
+
+        self.local_bounds = self._bounds(self.local)
+        self.remote_bounds = self._bounds(self.remote)
+
+        # 원격 -> 로컬 변환 (모니터 수가 다르면 어느 쪽 모니터도 빠지지 않도록 전체 영역끼리)
+        if len(self.remote) == len(self.local):
+            self.transforms = [_RectTransform(src, dst) for src, dst in zip(self.remote, self.local)]
+            self.snap = None
+        else:
+            self.transforms = [_RectTransform(self.remote_bounds, self.local_bounds)]
+            self.snap = [_RectTransform(r, r) for r in self.local] if len(self.local) > 1 else None
+        self._last = self.transforms[0]
+
+        self._build_entry_map()
+
+    @staticmethod
+    def _bounds(rects) -> Tuple[int, int, int, int]:
+        return (min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects))
+
+    def remote_to_local(self, x, y) -> Tuple[int, int]:
+        """원격 좌표 -> 로컬 좌표 (직전 모니터 캐시 확인 후 모니터 목록 조회)"""
+        x, y = int(x), int(y)
+        t = self._last
+        if not t.contains(x, y):
+            for t in self.transforms:
+                if t.contains(x, y):
+                    break
+            else:
+                # 모니터 사이 빈 공간/화면 밖: 가장 가까운 모니터로
+                t = min(self.transforms, key=lambda tr: tr.distance(x, y))
+            self._last = t
+        if self.snap is None:
+            return t.map(x, y)
+        lx, ly = t.map(x, y)
+        for r in self.snap:
+            if r.contains(lx, ly):
+                return lx, ly
+        return min(self.snap, key=lambda r: r.distance(lx, ly)).map(lx, ly)
+
+    def _build_entry_map(self):
+        """경계 방향에 따라 로컬 경계 구간 -> 원격 진입 경계 구간 변환을 미리 계산"""
+        lb, rb = self.local_bounds, self.remote_bounds
+        horizontal = self.position in ('left', 'right')
+
+        if self.position == 'right':
+            local_edge = [r for r in self.local if r[2] == lb[2]]
+            remote_edge = [r for r in self.remote if r[0] == rb[0]]
+        elif self.position == 'left':
+            local_edge = [r for r in self.local if r[0] == lb[0]]
+            remote_edge = [r for r in self.remote if r[2] == rb[2]]
+        elif self.position == 'bottom':
+            local_edge = [r for r in self.local if r[3] == lb[3]]
+            remote_edge = [r for r in self.remote if r[1] == rb[1]]
+        else:
+            local_edge = [r for r in self.local if r[1] == lb[1]]
+            remote_edge = [r for r in self.remote if r[3] == rb[3]]
+
+        # 경계를 따라가는 축 (좌/우 배치면 y축, 상/하 배치면 x축)
+        a0, a1 = (1, 3) if horizontal else (0, 2)
+        self.local_span = (min(r[a0] for r in local_edge), max(r[a1] for r in local_edge))
+        self.remote_span = (min(r[a0] for r in remote_edge), max(r[a1] for r in remote_edge))
+        self.span_k = ((self.remote_span[1] - self.remote_span[0]) << FIXED_SHIFT) // \
+            max(1, self.local_span[1] - self.local_span[0])
+        self.remote_edge = sorted(remote_edge, key=lambda r: r[a0])
+
+    def local_to_remote_entry(self, x, y) -> Tuple[int, int]:
+        """로컬 경계 위치 -> 원격 화면 진입 좌표"""
+        horizontal = self.position in ('left', 'right')
+        along = int(y) if horizontal else int(x)
+        along = min(max(along, self.local_span[0]), self.local_span[1] - 1)
+        remote_along = self.remote_span[0] + (((along - self.local_span[0]) * self.span_k) >> FIXED_SHIFT)
+
+        # 진입 위치를 포함하는 원격 경계 모니터 (모니터 사이 틈이면 가장 가까운 것)
+        a0, a1 = (1, 3) if horizontal else (0, 2)
+        target = min(self.remote_edge,
+                     key=lambda r: 0 if r[a0] <= remote_along < r[a1] else min(abs(r[a0] - remote_along),
+                                                                                abs(r[a1] - 1 - remote_along)))
+        remote_along = min(max(remote_along, target[a0]), target[a1] - 1)
+
+        if self.position == 'right':
+            return (target[0] + self.entry_inset, remote_along)
+        elif self.position == 'left':
+            return (target[2] - 1 - self.entry_inset, remote_along)
+        elif self.position == 'bottom':
+            return (remote_along, target[1] + self.entry_inset)
+        return (remote_along, target[3] - 1 - self.entry_inset)
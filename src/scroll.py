@@ -0,0 +1,113 @@
+import sys
+import time
+import threading
+from typing import Callable
+
+
+class ScrollAccumulator:
+    """
+    송신측 스크롤 델타 누적
+    한 프레임(기본 1/60초) 안에 들어온 휠/터치패드 이벤트를 합쳐 한 번만 전송한다.
+    프레임의 첫 이벤트는 즉시 보내고, 이후 이벤트는 프레임 끝에서 합산해 보낸다.
+    """
+
+    def __init__(self, flush: Callable[[float, float], None], frame_interval: float = 1 / 60):
+        self.flush = flush
+        self.frame_interval = frame_interval
+
+        self.dx = 0.0
+        self.dy = 0.0
+        self.pending = 0  # 누적된 원본 이벤트 수
+        self.last_flush = 0.0
+
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def add(self, dx: float, dy: float) -> int:
+        """델타 추가. 합쳐져서 별도 전송되지 않은 이벤트 수(0 또는 1)를 반환"""
+        with self.cond:
+            now = time.perf_counter()
+            if not self.pending and now - self.last_flush >= self.frame_interval:
+                # 프레임의 첫 이벤트: 지연 없이 바로 전송
+                self.last_flush = now
+                send_now = True
+            else:
+                self.dx += dx
+                self.dy += dy
+                self.pending += 1
+                send_now = False
+                if not self.running:
+                    self.running = True
+                    self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+                    self.thread.start()
+                self.cond.notify()
+
+        if send_now:
+            self.flush(dx, dy)
+            return 0
+        return 1
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.dx = self.dy = 0.0
+            self.pending = 0
+            self.cond.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+
+                # 프레임 끝까지 대기하며 더 누적
+                deadline = self.last_flush + self.frame_interval
+                remaining = deadline - time.perf_counter()
+                while self.running and remaining > 0:
+                    self.cond.wait(remaining)
+                    remaining = deadline - time.perf_counter()
+                if not self.running:
+                    return
+
+                dx, dy = self.dx, self.dy
+                self.dx = self.dy = 0.0
+                self.pending = 0
+                self.last_flush = time.perf_counter()
+
+            if dx or dy:
+                self.flush(dx, dy)
+
+
+class ScrollInjector:
+    """
+    수신측 스크롤 주입
+    소수점 델타를 잘라내지 않고 잔여값으로 보존한다. 고해상도 휠을 지원하는 Windows는
+    소수 델타를 그대로 주입하고, 정수 단위만 지원하는 플랫폼은 정수 단위가 모였을 때만 합쳐서 주입한다.
+    """
+
+    def __init__(self, scroll: Callable, high_resolution: bool = sys.platform == 'win32'):
+        self.scroll = scroll
+        self.high_resolution = high_resolution
+        self.residual_x = 0.0
+        self.residual_y = 0.0
+
+    def inject(self, dx: float, dy: float):
+        if self.high_resolution:
+            self.scroll(dx, dy)
+            return
+
+        self.residual_x += dx
+        self.residual_y += dy
+        # 부동소수점 누적 오차로 한 단계가 사라지지 않도록 반올림 후 절삭
+        steps_x = int(round(self.residual_x, 6))
+        steps_y = int(round(self.residual_y, 6))
+        if steps_x or steps_y:
+            self.residual_x -= steps_x
+            self.residual_y -= steps_y
+            self.scroll(steps_x, steps_y)
+
+    def reset(self):
+        self.residual_x = self.residual_y = 0.0
@@ -0,0 +1,155 @@
+import time
+import threading
+from collections import deque
+from typing import List, Optional, Sequence
+from src.events import Event, MovePool, MOUSE_MOVE, MOUSE_SCROLL, TEXT
+from src.metrics import Counter
+
+# 가득 찼을 때 버려도 되는 이벤트 (최신 위치만 의미가 있음)
+DROPPABLE_TYPES = frozenset((MOUSE_MOVE,))
+
+
+class SendQueue:
+    """
+    입력 훅 콜백과 송신 스레드 사이의 제한된 송신 큐
+    - put()은 절대 블로킹하지 않음 (소켓 I/O는 송신 스레드에서만)
+    - 연속된 mouse_move는 마지막 위치로, 연속된 mouse_scroll은 델타 합으로, 연속된 text는 이어 붙여 병합
+    - capacity를 넘으면 가장 오래된 mouse_move부터 버림. 키/버튼/제어 이벤트는 버리지 않으며
+      hard_limit까지 쌓이면 링크가 멈춘 것으로 보고 put()이 False를 반환
+    - pool이 있으면 병합/버림으로 빠진 mouse_move를 풀에 돌려줌
+    - get_batch()에 hold_moves_until을 주면 혼잡할 때 mouse_move만 그 시각까지 붙잡아 둠 (PointerPacer)
+    - put_many()는 스크립트 입력용: 병합/버림 없이 넣고, 큐가 차 있으면 송신 스레드가 비울 때까지 블로킹
+    """
+
+    def __init__(self, capacity: int = 256, hard_limit: Optional[int] = None,
+                 dropped: Optional[Counter] = None, merged: Optional[Counter] = None,
+                 pool: Optional[MovePool] = None):
+        self.capacity = capacity
+        self.hard_limit = hard_limit or capacity * 8
+        self.queue = deque()
+        lock = threading.Lock()
+        self.cond = threading.Condition(lock)  # 송신 스레드가 이벤트를 기다림
+        self.space = threading.Condition(lock)  # put_many()가 빈 자리를 기다림
+        self.closed = False
+        self.pool = pool
+
+        self.high_water = 0
+        # 타입별 버림/병합 카운터
+        self.dropped = dropped or Counter('send_queue_dropped', "Events dropped from the send queue", label='type')
+        self.merged = merged or Counter('send_queue_merged', "Events merged in the send queue", label='type')
+
+    def __len__(self):
+        return len(self.queue)
+
+    def put(self, event: Event) -> bool:
+        code = event.code
+        with self.cond:
+            queue = self.queue
+            if queue:
+                tail = queue[-1]
+                if tail.code == code:
+                    if code == MOUSE_MOVE:
+                        queue[-1] = event
+                        self.merged.inc(label_value=event.name)
+                        self._release(tail)
+                        return True
+                    if code == MOUSE_SCROLL:
+                        tail.dx += event.dx
+                        tail.dy += event.dy
+                        self.merged.inc(label_value=event.name)
+                        return True
+                    if code == TEXT:
+                        tail.text += event.text
+                        self.merged.inc(label_value=event.name)
+                        return True
+
+            if len(queue) >= self.capacity:
+                if not self._drop_oldest_droppable():
+                    if code in DROPPABLE_TYPES:
+                        self.dropped.inc(label_value=event.name)
+                        self._release(event)
+                        return True
+                    if len(queue) >= self.hard_limit:
+                        return False
+
+            queue.append(event)
+            if len(queue) > self.high_water:
+                self.high_water = len(queue)
+            self.cond.notify()
+            return True
+
+    def put_many(self, events: Sequence[Event], limit: int, timeout: Optional[float] = None) -> int:
+        """
+        이벤트를 병합/버림 없이 순서대로 넣음 (모든 mouse_move를 그대로 전송)
+        큐가 limit개 이상이면 송신 스레드가 비울 때까지 대기 (소켓이 막히면 호출자까지 역압 전달).
+        넣은 개수 반환 (timeout이 지나거나 닫히면 일부만)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        count = 0
+        with self.cond:
+            queue = self.queue
+            for event in events:
+                while len(queue) >= limit and not self.closed:
+                    self.cond.notify()
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return count
+                    self.space.wait(remaining)
+                if self.closed:
+                    return count
+                queue.append(event)
+                count += 1
+            if len(queue) > self.high_water:
+                self.high_water = len(queue)
+            self.cond.notify()
+        return count
+
+    def _drop_oldest_droppable(self) -> bool:
+        for i, queued in enumerate(self.queue):
+            if queued.code in DROPPABLE_TYPES:
+                del self.queue[i]
+                self.dropped.inc(label_value=queued.name)
+                self._release(queued)
+                return True
+        return False
+
+    def _release(self, event: Event):
+        if self.pool is not None:
+            self.pool.release(event)
+
+    def get_batch(self, hold_moves_until: float = 0.0) -> Optional[List[Event]]:
+        """
+        대기 중인 이벤트를 모두 꺼냄 (없으면 블로킹, 닫히면 None)
+        hold_moves_until(perf_counter 시각) 전에는 큐에 mouse_move 하나만 있으면 꺼내지 않고 기다림:
+        그 사이 이동은 마지막 위치로 합쳐지고, 다른 이벤트가 들어오면 이동과 함께 바로 꺼냄
+        """
+        with self.cond:
+            queue = self.queue
+            while not self.closed:
+                if not queue:
+                    self.cond.wait()
+                    continue
+                if hold_moves_until and len(queue) == 1 and queue[0].code == MOUSE_MOVE:
+                    remaining = hold_moves_until - time.perf_counter()
+                    if remaining > 0:
+                        self.cond.wait(remaining)
+                        continue
+                break
+            if self.closed:
+                return None
+            batch = list(queue)
+            queue.clear()
+            self.space.notify_all()
+            return batch
+
+    def clear(self):
+        with self.cond:
+            self.queue.clear()
+            self.space.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.queue.clear()
+            self.cond.notify_all()
+            self.space.notify_all()
@@ -1,7 +1,14 @@
 import socket
 import json
+import sys
+import threading
+import selectors
+from collections import deque
 from pynput import mouse, keyboard
 from src.events import serialize_event
+from src.log import configure_logging, get_logger
+
+log = get_logger('server')
 
 class KMServer:
     def __init__(self, host, port):
@@ -13,9 +20,9 @@ class KMServer:
     def start(self):
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(1)
-        print(f"Server listening on {self.host}:{self.port}")
+        log.info("Server listening on %s:%s", self.host, self.port)
         self.client_socket, addr = self.server_socket.accept()
-        print(f"Accepted connection from {addr}")
+        log.info("Accepted connection from %s", addr)
 
         self.start_listeners()
 
@@ -24,7 +31,7 @@ class KMServer:
             try:
                 self.client_socket.sendall(serialize_event(event))
             except socket.error as e:
-                print(f"Socket error: {e}")
+                log.warning("Socket error: %s", e)
                 self.client_socket = None
 
     def on_move(self, x, y):
@@ -71,7 +78,209 @@ class KMServer:
         mouse_listener.join()
         keyboard_listener.join()
 
+class _BroadcastClient:
+    """브로드캐스트 서버의 클라이언트별 송신 큐"""
+
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.pending = deque()  # 아직 못 보낸 버퍼 (모든 클라이언트가 같은 묶음 bytes 객체를 공유)
+        self.pending_bytes = 0
+        self.dropped = 0
+
+
+class KMBroadcastServer(KMServer):
+    """
+    한 대의 키보드/마우스로 여러 KMClient를 동시에 제어하는 1:N 브로드캐스트 서버
+    이벤트는 한 번만 직렬화해 송신 대기열에 넣고, 네트워크 루프 스레드가 대기열을 모아 한 버퍼로 만들어
+    논블로킹 소켓으로 모든 클라이언트에 보낸다. 입력 훅 스레드의 비용은 클라이언트 수와 무관하고,
+    전송 비용(클라이언트마다 send() 1회)은 루프 스레드에서 그동안 쌓인 이벤트 묶음 단위로 든다.
+    느린 클라이언트는 자기 큐에만 쌓이며, max_queue_bytes를 넘으면 mouse_move는 그 클라이언트에 대해 버리고,
+    그 4배를 넘으면 연결을 끊어 나머지 클라이언트를 멈추지 않는다.
+    """
+
+    def __init__(self, host, port, max_queue_bytes=64 * 1024):
+        super().__init__(host, port)
+        self.max_queue_bytes = max_queue_bytes
+        self.clients = {}  # 루프 스레드 전용 (stop()은 루프 종료 후 접근)
+        self.lock = threading.Lock()  # outbox/wake_pending 보호
+        self.outbox = deque()  # 아직 팬아웃하지 않은 (버퍼, 버려도 되는지)
+        self.wake_pending = False
+        self.selector = selectors.DefaultSelector()
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.running = False
+        self.loop_thread = None
+
+    def start(self):
+        self.serve()
+        self.start_listeners()
+
+    def serve(self):
+        """리스너 없이 네트워크 루프만 시작 (테스트/벤치마크용)"""
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(64)
+        self.server_socket.setblocking(False)
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+
+        self.selector.register(self.server_socket, selectors.EVENT_READ, 'accept')
+        self.selector.register(self.wake_r, selectors.EVENT_READ, 'wake')
+
+        self.running = True
+        self.loop_thread = threading.Thread(target=self._loop, daemon=True)
+        self.loop_thread.start()
+        log.info("Broadcast server listening on %s:%s", self.host, self.port)
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.loop_thread:
+            self.loop_thread.join()
+            self.loop_thread = None
+        for client in list(self.clients.values()):
+            self._disconnect(client, reason=None)
+        self.selector.close()
+        self.server_socket.close()
+        self.wake_r.close()
+        self.wake_w.close()
+
+    def send_event(self, event):
+        self.broadcast(serialize_event(event), droppable=event.get('type') == 'mouse_move')
+
+    def broadcast(self, data: bytes, droppable: bool = False):
+        """직렬화된 버퍼를 송신 대기열에 넣고 루프 스레드를 깨움 (호출 스레드 비용은 클라이언트 수와 무관)"""
+        with self.lock:
+            self.outbox.append((data, droppable))
+            if self.wake_pending:
+                return
+            self.wake_pending = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            self.wake_w.send(b'\0')
+        except OSError:
+            pass
+
+    def _disconnect(self, client, reason):
+        """클라이언트 연결 종료 (루프 스레드에서 호출)"""
+        self.clients.pop(client.sock.fileno(), None)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        if reason:
+            log.info("Client %s disconnected: %s", client.addr, reason)
+
+    def _loop(self):
+        while self.running:
+            for key, mask in self.selector.select():
+                if key.data == 'accept':
+                    self._accept()
+                elif key.data == 'wake':
+                    try:
+                        self.wake_r.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    with self.lock:
+                        batch, self.outbox = self.outbox, deque()
+                        self.wake_pending = False
+                    if batch:
+                        self._fan_out(batch)
+                else:
+                    client = key.data
+                    if self.clients.get(client.sock.fileno()) is not client:
+                        continue  # 같은 select 결과 안에서 이미 끊긴 클라이언트
+                    if mask & selectors.EVENT_READ:
+                        try:
+                            if not client.sock.recv(4096):
+                                self._disconnect(client, reason="closed by client")
+                                continue
+                        except BlockingIOError:
+                            pass
+                        except OSError:
+                            self._disconnect(client, reason="connection error")
+                            continue
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(client)
+
+    def _accept(self):
+        try:
+            sock, addr = self.server_socket.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _BroadcastClient(sock, addr)
+        self.clients[sock.fileno()] = client
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        log.info("Accepted connection from %s (%d clients)", addr, len(self.clients))
+
+    def _fan_out(self, batch):
+        """대기열 묶음을 한 버퍼로 합쳐 클라이언트마다 한 번씩 전송 (루프 스레드에서 호출)"""
+        data = b''.join(item for item, _ in batch) if len(batch) > 1 else batch[0][0]
+        essential = None  # 큐가 찬 클라이언트용: mouse_move를 뺀 버퍼
+        droppable = sum(1 for _, flag in batch if flag)
+
+        for client in list(self.clients.values()):
+            payload = data
+            if client.pending_bytes >= self.max_queue_bytes:
+                if essential is None:
+                    essential = b''.join(item for item, flag in batch if not flag)
+                client.dropped += droppable
+                if not essential:
+                    continue
+                if client.pending_bytes >= self.max_queue_bytes * 4:
+                    self._disconnect(client, reason="too slow")
+                    continue
+                payload = essential
+
+            if client.pending:
+                client.pending.append(payload)
+                client.pending_bytes += len(payload)
+                continue
+
+            try:
+                sent = client.sock.send(payload)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._disconnect(client, reason="send failed")
+                continue
+
+            if sent < len(payload):
+                remaining = memoryview(payload)[sent:]
+                client.pending.append(remaining)
+                client.pending_bytes += len(remaining)
+                # 보낼 데이터가 남은 클라이언트만 쓰기 이벤트를 기다림
+                self.selector.modify(client.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+
+    def _flush(self, client):
+        """남은 데이터 전송 (루프 스레드에서 호출)"""
+        while client.pending:
+            data = client.pending[0]
+            try:
+                sent = client.sock.send(data)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._disconnect(client, reason="send failed")
+                return
+
+            client.pending_bytes -= sent
+            if sent < len(data):
+                client.pending[0] = memoryview(data)[sent:]
+                return
+            client.pending.popleft()
+
+        self.selector.modify(client.sock, selectors.EVENT_READ, client)
+
+
 if __name__ == "__main__":
+    configure_logging()
+
     # Load config
     try:
         with open('config.json', 'r') as f:
@@ -79,10 +288,16 @@ if __name__ == "__main__":
         server_config = config.get('server', {})
         host = server_config.get('host', '0.0.0.0')
         port = server_config.get('port', 12345)
+        config_broadcast = server_config.get('broadcast', False)
     except (FileNotFoundError, json.JSONDecodeError):
-        print("Using default config: 0.0.0.0:12345")
+        log.info("Using default config: 0.0.0.0:12345")
         host = '0.0.0.0'
         port = 12345
+        config_broadcast = False
 
-    server = KMServer(host, port)
+    # --broadcast: 여러 클라이언트를 동시에 제어
+    if '--broadcast' in sys.argv or config_broadcast:
+        server = KMBroadcastServer(host, port)
+    else:
+        server = KMServer(host, port)
     server.start()
@@ -0,0 +1,188 @@
+import json
+import socket
+import threading
+import unittest
+from src.auth import (AuthenticationError, FrameOpener, FrameSealer, MAX_FRAME_SIZE, derive_key,
+                      perform_handshake)
+
+KEY = b'k' * 32
+
+
+class FrameTest(unittest.TestCase):
+    """FrameSealer/FrameOpener: 왕복, 변조, 재전송/순서"""
+
+    def setUp(self):
+        self.sealer = FrameSealer(KEY)
+        self.opener = FrameOpener(KEY)
+
+    def test_round_trip(self):
+        frames = [self.sealer.seal(b'{"type": "ping"}\n'), self.sealer.seal(b''), self.sealer.seal(b'x' * 1000)]
+        self.assertEqual(self.opener.feed(b''.join(frames)), b'{"type": "ping"}\n' + b'x' * 1000)
+        self.assertEqual(self.opener.seq, 3)
+
+    def test_partial_frames(self):
+        data = self.sealer.seal(b'hello') + self.sealer.seal(b'world')
+        received = b''.join(self.opener.feed(data[i:i + 3]) for i in range(0, len(data), 3))
+        self.assertEqual(received, b'helloworld')
+
+    def test_tampered_payload(self):
+        frame = bytearray(self.sealer.seal(b'{"type": "keyboard", "key": "a"}\n'))
+        frame[-3] ^= 1
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(bytes(frame))
+
+    def test_tampered_length(self):
+        header, payload = self.sealer.seal(b'abcdef').split(b'\n', 1)
+        seq, length, mac = header.split(b' ')
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(b' '.join((seq, b'5', mac)) + b'\n' + payload)
+
+    def test_wrong_key(self):
+        with self.assertRaises(AuthenticationError):
+            FrameOpener(b'x' * 32).feed(self.sealer.seal(b'data'))
+
+    def test_replay(self):
+        frame = self.sealer.seal(b'click')
+        self.assertEqual(self.opener.feed(frame), b'click')
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(frame)
+
+    def test_dropped_frame(self):
+        self.sealer.seal(b'first')
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(self.sealer.seal(b'second'))
+
+    def test_reordered_seq_with_valid_mac(self):
+        # 시퀀스 번호는 MAC에 포함되므로 헤더의 번호만 바꾸면 검증 실패
+        header, payload = self.sealer.seal(b'data').split(b'\n', 1)
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(b'#1' + header[2:] + b'\n' + payload)
+
+    def test_malformed_header(self):
+        for data in (b'garbage\n', b'#zz 1 00\n', b'#0 1\n', b'#' + b'0' * 200):
+            with self.subTest(data=data), self.assertRaises(AuthenticationError):
+                FrameOpener(KEY).feed(data)
+
+    def test_frame_too_large(self):
+        with self.assertRaises(AuthenticationError):
+            self.opener.feed(b'#0 %d %s\n' % (MAX_FRAME_SIZE + 1, b'0' * 32))
+
+
+class HandshakeTest(unittest.TestCase):
+    """socketpair 위의 핸드셰이크: 같은 키면 세션 키가 맞물리고, 다르면 양쪽 모두 실패"""
+
+    def _handshake(self, server_key, client_key):
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+        result = {}
+
+        def server():
+            try:
+                result['server'] = perform_handshake(server_sock, server_key, is_server=True, timeout=2)
+            except AuthenticationError as e:
+                result['server'] = e
+                server_sock.close()
+
+        thread = threading.Thread(target=server)
+        thread.start()
+        try:
+            result['client'] = perform_handshake(client_sock, client_key, is_server=False, timeout=2)
+        except AuthenticationError as e:
+            result['client'] = e
+            client_sock.close()
+        thread.join()
+        return result['server'], result['client']
+
+    def test_matching_keys(self):
+        key = derive_key('secret')
+        (server, _), (client, _) = self._handshake(key, key)
+        self.assertEqual(server.opener.feed(client.sealer.seal(b'up')), b'up')
+        self.assertEqual(client.opener.feed(server.sealer.seal(b'down')), b'down')
+
+    def test_session_keys_differ_by_direction(self):
+        key = derive_key('secret')
+        (server, _), _ = self._handshake(key, key)
+        with self.assertRaises(AuthenticationError):
+            server.opener.feed(server.sealer.seal(b'reflected'))
+
+    def test_wrong_key(self):
+        server, client = self._handshake(derive_key('secret'), derive_key('other'))
+        self.assertIsInstance(server, AuthenticationError)
+        self.assertIsInstance(client, AuthenticationError)
+
+
+class HandshakeFailureTest(unittest.TestCase):
+    """상대가 규칙을 어길 때 perform_handshake가 AuthenticationError로 끝나는지 (실제 socketpair)"""
+
+    def setUp(self):
+        self.sock, self.other = socket.socketpair()
+        self.addCleanup(self.sock.close)
+        self.addCleanup(self.other.close)
+
+    def _send(self, *messages):
+        for message in messages:
+            data = message if isinstance(message, bytes) else (json.dumps(message) + '\n').encode('utf-8')
+            self.other.sendall(data)
+
+    def _assert_fails(self, is_server, message, timeout=1.0):
+        with self.assertRaises(AuthenticationError) as ctx:
+            perform_handshake(self.sock, KEY, is_server=is_server, timeout=timeout)
+        self.assertIn(message, str(ctx.exception))
+
+    def test_malformed_json(self):
+        self._send(b'{not json\n')
+        self._assert_fails(True, "Malformed handshake message")
+
+    def test_unexpected_message_type(self):
+        self._send({'type': 'auth_response', 'mac': '00'})
+        self._assert_fails(True, "Expected auth_hello")
+
+    def test_bad_nonce_hex(self):
+        self._send({'type': 'auth_hello', 'nonce': 'zz'})
+        self._assert_fails(True, "Malformed auth_hello")
+
+    def test_missing_field(self):
+        self._send({'type': 'auth_challenge', 'nonce': '00'})
+        self._assert_fails(False, "Malformed auth_challenge")
+
+    def test_closed_during_handshake(self):
+        self._send({'type': 'auth_hello', 'nonce': '00' * 16})
+        self.other.shutdown(socket.SHUT_WR)
+        self._assert_fails(True, "Connection closed during handshake")
+
+    def test_message_too_long(self):
+        self._send(b'x' * 5000)
+        self._assert_fails(True, "Handshake message too long")
+
+    def test_timeout_restores_previous_timeout(self):
+        self.sock.settimeout(7.0)
+        self._assert_fails(True, "Handshake timed out", timeout=0.05)
+        self.assertEqual(self.sock.gettimeout(), 7.0)
+
+    def test_forged_server_mac(self):
+        # 클라이언트가 먼저 보내는 auth_hello를 읽은 뒤 키를 모르는 상대가 임의의 MAC으로 응답
+        def fake_server():
+            self.other.recv(1024)
+            self._send({'type': 'auth_challenge', 'nonce': '11' * 16, 'mac': '22' * 32})
+
+        thread = threading.Thread(target=fake_server)
+        thread.start()
+        self._assert_fails(False, "Peer failed authentication")
+        thread.join()
+
+    def test_frames_after_handshake(self):
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.setdefault('server', perform_handshake(self.other, KEY, is_server=True, timeout=1)))
+        thread.start()
+        session, pending = perform_handshake(self.sock, KEY, is_server=False, timeout=1)
+        thread.join()
+        server_session, _ = result['server']
+        self.other.sendall(server_session.sealer.seal(b'first'))
+        self.assertEqual(pending, b'')
+        self.assertEqual(session.opener.feed(self.sock.recv(1024)), b'first')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import unittest
+from src.automation import _ClientState, build_segments, looks_like_http
+from src.events import MovePool
+
+
+class _Peer:
+    BUTTONS = {'Button.left': 'left', 'Button.right': 'right', 'Button.middle': 'middle'}
+
+    def __init__(self, remote_text=True, remote_timestamps=False):
+        self.move_pool = MovePool()
+        self.remote_text = remote_text
+        self.remote_timestamps = remote_timestamps
+
+
+def _decoded(segments):
+    return [([json.loads(event.encode()) for event in events], wait) for events, wait in segments]
+
+
+class BuildSegmentsTest(unittest.TestCase):
+    """스크립트 events 검사와 (이벤트 목록, 대기 시간) 구간 변환"""
+
+    def setUp(self):
+        self.state = _ClientState(authenticated=True)
+        self.peer = _Peer()
+
+    def _build(self, items):
+        return _decoded(build_segments(items, self.state, self.peer))
+
+    def test_click_uses_last_move_position(self):
+        segments = self._build([['move', 100, 200], ['click', 'left']])
+        self.assertEqual(segments, [([
+            {'type': 'mouse_move', 'x': 100, 'y': 200},
+            {'type': 'mouse_button', 'x': 100, 'y': 200, 'button': 'Button.left', 'pressed': True},
+            {'type': 'mouse_button', 'x': 100, 'y': 200, 'button': 'Button.left', 'pressed': False},
+        ], 0.0)])
+        self.assertEqual((self.state.x, self.state.y), (100, 200))
+
+    def test_wait_splits_segments(self):
+        segments = self._build([['tap', 'a'], ['wait', 25], ['scroll', 0, -1], ['wait', -5]])
+        self.assertEqual([wait for _, wait in segments], [0.025, 0.0])
+        self.assertEqual([len(events) for events, _ in segments], [2, 1])
+
+    def test_move_timestamps_when_peer_asks(self):
+        self.peer.remote_timestamps = True
+        event = self._build([['move', 1, 2]])[0][0][0]
+        self.assertIn('t', event)
+
+    def test_text_event_or_key_fallback(self):
+        self.assertEqual(self._build([['text', 'hi']])[0][0], [{'type': 'text', 'text': 'hi'}])
+        self.peer.remote_text = False
+        events = self._build([['text', 'hi']])[0][0]
+        self.assertEqual([(e['key'], e['pressed']) for e in events], [('h', True), ('h', False), ('i', True), ('i', False)])
+
+    def test_invalid_items_rejected(self):
+        cases = [
+            ['move', 1],
+            ['move', 'x', 2],
+            ['click', 'back'],
+            ['button', 'left'],
+            ['key', '', True],
+            ['key', 5, True],
+            ['text', 5],
+            ['scroll', 'up', 1],
+            ['wait', 'soon'],
+            ['jump'],
+            [],
+            None,
+        ]
+        for item in cases:
+            with self.subTest(item=item):
+                with self.assertRaisesRegex(ValueError, r'^event 1: '):
+                    build_segments([['tap', 'a'], item], self.state, self.peer)
+
+    def test_events_must_be_list(self):
+        with self.assertRaises(ValueError):
+            build_segments({'move': [1, 2]}, self.state, self.peer)
+
+
+class LooksLikeHttpTest(unittest.TestCase):
+    """브라우저 요청 판별"""
+
+    def test_request_lines(self):
+        self.assertTrue(looks_like_http(b'POST / HTTP/1.1\r\n'))
+        self.assertTrue(looks_like_http(b'get /x HTTP/1.0'))
+        self.assertTrue(looks_like_http(b'FOO /x HTTP/1.1'))
+
+    def test_json_lines(self):
+        self.assertFalse(looks_like_http(b'{"id": 1, "cmd": "status"}\n'))
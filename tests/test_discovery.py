@@ -0,0 +1,37 @@
+import unittest
+from src.discovery import MAX_ADVERTISED_ADDRESSES, sanitize_addresses
+
+
+class SanitizeAddressesTest(unittest.TestCase):
+    """상대/검색 응답이 알린 주소 목록 검사 (연결 시도와 캐시 저장 전)"""
+
+    def test_keeps_valid_addresses(self):
+        self.assertEqual(sanitize_addresses(['192.168.0.10', '10.0.0.1']), ['192.168.0.10', '10.0.0.1'])
+
+    def test_not_a_list(self):
+        for value in (None, '192.168.0.10', {'a': 1}, 42):
+            with self.subTest(value=value):
+                self.assertEqual(sanitize_addresses(value), [])
+
+    def test_drops_non_strings(self):
+        self.assertEqual(sanitize_addresses([{'host': 'x'}, 12345, None, ['1.2.3.4'], '1.2.3.4']), ['1.2.3.4'])
+
+    def test_drops_invalid_and_shorthand(self):
+        for address in ('example.com', '1.2.3', '10.1', '0x7f.0.0.1', '256.1.1.1', '1.2.3.4 ', '::1', ''):
+            with self.subTest(address=address):
+                self.assertEqual(sanitize_addresses([address]), [])
+
+    def test_drops_loopback_unspecified_multicast(self):
+        for address in ('127.0.0.1', '127.8.8.8', '0.0.0.0', '224.0.0.1', '255.255.255.255'):
+            with self.subTest(address=address):
+                self.assertEqual(sanitize_addresses([address]), [])
+
+    def test_dedup_and_cap(self):
+        addresses = ['10.0.0.1', '10.0.0.1'] + ['10.0.1.%d' % i for i in range(1, 50)]
+        result = sanitize_addresses(addresses)
+        self.assertEqual(len(result), MAX_ADVERTISED_ADDRESSES)
+        self.assertEqual(result[:2], ['10.0.0.1', '10.0.1.1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
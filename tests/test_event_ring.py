@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from src.event_ring import EventRing, MOVE, PRESS, TEXT_SIZE
+
+
+class EventRingTest(unittest.TestCase):
+    """공유 메모리 링: 레코드 왕복, 순환, 가득 참/대기, 깨우기, 닫기"""
+
+    def _ring(self, capacity=4, **kwargs):
+        ring = EventRing(capacity, **kwargs)
+        self.addCleanup(ring.close)
+        return ring
+
+    def test_round_trip(self):
+        ring = self._ring()
+        self.assertTrue(ring.push(MOVE, 0, 10, -20, 0.5, -1.5))
+        self.assertTrue(ring.push(PRESS, 1, text='Key.shift'))
+        self.assertEqual(len(ring), 2)
+        self.assertEqual(ring.pop_all(), [(MOVE, 0, 10, -20, 0.5, -1.5, ''), (PRESS, 1, 0, 0, 0.0, 0.0, 'Key.shift')])
+        self.assertEqual(len(ring), 0)
+        self.assertEqual(ring.pop_all(), [])
+
+    def test_text_is_truncated(self):
+        ring = self._ring()
+        ring.push(PRESS, text='a' * 100)
+        self.assertEqual(ring.pop_all()[0][6], 'a' * TEXT_SIZE)
+
+    def test_wraparound_keeps_order(self):
+        ring = self._ring()
+        seen = []
+        for i in range(10):
+            ring.push(MOVE, x=i)
+            if i % 3 == 2:
+                seen.extend(record[2] for record in ring.pop_all())
+        seen.extend(record[2] for record in ring.pop_all())
+        self.assertEqual(seen, list(range(10)))
+
+    def test_full_ring_drops(self):
+        ring = self._ring()
+        for i in range(4):
+            self.assertTrue(ring.push(MOVE, x=i))
+        self.assertFalse(ring.push(MOVE, x=4))
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual([record[2] for record in ring.pop_all()], [0, 1, 2, 3])
+
+    def test_blocking_push_waits_for_consumer(self):
+        ring = self._ring()
+        for i in range(4):
+            ring.push(MOVE, x=i)
+        timer = threading.Timer(0.05, ring.pop_all)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertTrue(ring.push(PRESS, text='a', block=True))
+        self.assertEqual(ring.dropped, 0)
+        self.assertEqual(ring.pop_all()[-1][6], 'a')
+
+    def test_blocking_push_gives_up_when_consumer_stalls(self):
+        ring = self._ring()
+        for i in range(4):
+            ring.push(MOVE, x=i)
+        with mock.patch.object(EventRing, 'BLOCK_TIMEOUT', 0.05):
+            start = time.perf_counter()
+            self.assertFalse(ring.push(PRESS, block=True))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.assertEqual(ring.dropped, 1)
+
+    def test_wait_wakes_on_push(self):
+        ring = self._ring()
+        timer = threading.Timer(0.05, ring.push, (MOVE,))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertTrue(ring.wait(2))
+        self.assertEqual(len(ring.pop_all()), 1)
+
+    def test_wait_times_out(self):
+        ring = self._ring()
+        self.assertFalse(ring.wait(0.01))
+        ring.wake()
+        self.assertFalse(ring.wait(0.01))
+
+    def test_attach_by_name(self):
+        ring = self._ring()
+        other = EventRing(4, name=ring.shm.name, doorbell=ring.doorbell)
+        self.addCleanup(other.close)
+        other.push(MOVE, x=7)
+        self.assertEqual(ring.pop_all()[0][2], 7)
+
+    def test_closed_ring_rejects_push(self):
+        ring = self._ring()
+        ring.close()
+        self.assertFalse(ring.push(MOVE))
+        ring.close()
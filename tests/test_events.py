@@ -0,0 +1,92 @@
+import json
+import unittest
+from src.events import (EventDecoder, KeyEvent, KeyHeld, Message, MouseButton, MouseMove, MouseScroll, TextEvent,
+                        serialize_event)
+
+
+class EventDecoderTest(unittest.TestCase):
+    """serialize_event -> EventDecoder.decode 왕복과 잘못된 입력"""
+
+    def setUp(self):
+        self.decoder = EventDecoder()
+
+    def _round_trip(self, event):
+        line = serialize_event(event)
+        self.assertTrue(line.endswith(b'\n'))
+        return self.decoder.decode(line)
+
+    def test_round_trip(self):
+        cases = [
+            (MouseMove(10, -20), ('x', 'y', 't')),
+            (MouseMove(1.5, 2, t=123.25), ('x', 'y', 't')),
+            (MouseButton(3, 4, 'Button.left', True), ('x', 'y', 'button', 'pressed')),
+            (MouseScroll(5, 6, 0, -3), ('x', 'y', 'dx', 'dy')),
+            (KeyEvent('a', True), ('key', 'pressed', 'repeat')),
+            (KeyEvent('Key.shift', False, repeat=True), ('key', 'pressed', 'repeat')),
+            (KeyEvent('"\\\n', True), ('key', 'pressed', 'repeat')),
+            (TextEvent('한글 "quoted"'), ('text',)),
+            (KeyHeld('Key.ctrl'), ('key',)),
+        ]
+        for event, fields in cases:
+            with self.subTest(event=event):
+                decoded = self._round_trip(event)
+                self.assertIs(type(decoded), type(event))
+                for field in fields:
+                    self.assertEqual(getattr(decoded, field), getattr(event, field), field)
+
+    def test_encode_is_valid_json(self):
+        for event in (MouseMove(1, 2), KeyEvent('\t', True), TextEvent('é')):
+            with self.subTest(event=event):
+                self.assertEqual(json.loads(event.encode())['type'], event.name)
+
+    def test_message_round_trip(self):
+        decoded = self._round_trip(Message('screen_info', {'width': 1920, 'height': 1080}))
+        self.assertIsInstance(decoded, Message)
+        self.assertEqual(decoded.name, 'screen_info')
+        self.assertEqual(decoded.fields, {'width': 1920, 'height': 1080})
+
+    def test_dict_event(self):
+        decoded = self._round_trip({'type': 'mouse_move', 'x': 7, 'y': 8})
+        self.assertEqual((decoded.x, decoded.y, decoded.t), (7, 8, None))
+
+    def test_reuses_instances(self):
+        first = self._round_trip(MouseMove(1, 1))
+        second = self._round_trip(MouseMove(2, 2))
+        self.assertIs(first, second)
+        self.assertEqual(second.x, 2)
+
+    def test_optional_fields_reset(self):
+        self._round_trip(MouseMove(1, 1, t=5.0))
+        self.assertIsNone(self._round_trip(MouseMove(2, 2)).t)
+        self._round_trip(KeyEvent('a', True, repeat=True))
+        self.assertFalse(self._round_trip(KeyEvent('a', True)).repeat)
+
+    def test_unknown_type(self):
+        decoded = self.decoder.decode(b'{"type": "future_event", "value": 1}')
+        self.assertIsInstance(decoded, Message)
+        self.assertEqual((decoded.name, decoded.fields), ('future_event', {'value': 1}))
+
+    def test_missing_type(self):
+        decoded = self.decoder.decode(b'{"x": 1}')
+        self.assertIsInstance(decoded, Message)
+        self.assertEqual(decoded.name, 'None')
+
+    def test_malformed_json(self):
+        for data in (b'', b'{', b'not json', b'{"type": "mouse_move", "x": 1,}', b'\xff\xfe'):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                self.decoder.decode(data)
+
+    def test_not_an_object(self):
+        for data in (b'[1, 2]', b'"mouse_move"', b'42', b'null'):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                self.decoder.decode(data)
+
+    def test_missing_fields(self):
+        for data in (b'{"type": "mouse_move", "x": 1}', b'{"type": "keyboard", "key": "a"}',
+                     b'{"type": "mouse_scroll", "x": 0, "y": 0, "dx": 1}', b'{"type": "text"}'):
+            with self.subTest(data=data), self.assertRaises(KeyError):
+                self.decoder.decode(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
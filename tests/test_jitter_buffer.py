@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+from src.jitter_buffer import JitterBuffer
+
+
+class JitterBufferTest(unittest.TestCase):
+    """재생 계획(보간/지연 샘플), target 추정, flush/reset"""
+
+    def setUp(self):
+        self.injected = []
+        self.done = threading.Event()
+        self.buffer = JitterBuffer(self._inject)
+        self.addCleanup(self.buffer.stop)
+
+    def _inject(self, x, y):
+        self.injected.append((x, y))
+        if (x, y) == (4, 4):
+            self.done.set()
+
+    def _prime(self, last, queued, offset=0.0):
+        self.buffer.offset_min = offset
+        self.buffer.last = last
+        self.buffer.queue.extend(queued)
+
+    def test_plan_without_history_waits_until_due(self):
+        self._prime(None, [(1.0, 10, 20)], offset=0.005)
+        point, consume, wait = self.buffer._plan(0.99)
+        self.assertEqual(point, (1.0, 10, 20))
+        self.assertTrue(consume)
+        self.assertAlmostEqual(wait, 0.015)
+
+    def test_plan_interpolates_across_gap(self):
+        self._prime((1.0, 0, 0), [(1.032, 40, -80)])
+        point, consume, wait = self.buffer._plan(1.0)
+        self.assertFalse(consume)
+        self.assertEqual(point[1:], (10, -20))
+        self.assertAlmostEqual(point[0], 1.008)
+        self.assertAlmostEqual(wait, 0.008)
+
+    def test_plan_skips_interpolation_for_small_gap(self):
+        self._prime((1.0, 0, 0), [(1.01, 5, 5)])
+        point, consume, _ = self.buffer._plan(1.0)
+        self.assertTrue(consume)
+        self.assertEqual(point, (1.01, 5, 5))
+
+    def test_plan_skips_interpolation_after_idle(self):
+        self._prime((1.0, 0, 0), [(1.5, 5, 5)])
+        self.assertTrue(self.buffer._plan(1.0)[1])
+
+    def test_plan_late_sample_is_injected_directly(self):
+        self._prime((1.0, 0, 0), [(1.032, 40, 40)])
+        point, consume, wait = self.buffer._plan(1.1)
+        self.assertTrue(consume)
+        self.assertEqual(point, (1.032, 40, 40))
+        self.assertLess(wait, 0)
+
+    def test_target_is_clamped_percentile(self):
+        self.buffer.variation.extend(i / 1000.0 for i in range(100))
+        self.buffer._recompute_target()
+        self.assertAlmostEqual(self.buffer.target, 0.04)
+
+        self.buffer.variation.clear()
+        self.buffer.variation.extend([0.0] * 99 + [0.03])
+        self.buffer._recompute_target()
+        self.assertEqual(self.buffer.target, 0.0)
+
+    def test_offset_tracks_minimum_transit(self):
+        now = time.perf_counter()
+        self.buffer.push(now - 0.02, 0, 0)
+        self.buffer.push(now - 0.05, 1, 1)
+        self.buffer.push(now - 0.03, 2, 2)
+        self.assertAlmostEqual(self.buffer.offset, 0.02, delta=0.005)
+
+    def test_playout_keeps_order(self):
+        for i in range(5):
+            self.buffer.push(time.perf_counter(), i, i)
+            time.sleep(0.001)
+        self.assertTrue(self.done.wait(1))
+        xs = [x for x, _ in self.injected]
+        self.assertEqual(xs, sorted(xs))
+        self.assertEqual(self.injected[-1], (4, 4))
+
+    def test_flush_injects_latest_position(self):
+        self.buffer.min_delay = self.buffer.target = 1.0
+        now = time.perf_counter()
+        for i in range(5):
+            self.buffer.push(now, i, i)
+        self.buffer.flush()
+        self.assertEqual(self.injected, [(4, 4)])
+        self.assertEqual(len(self.buffer.queue), 0)
+
+    def test_reset_discards_pending(self):
+        self.buffer.min_delay = self.buffer.target = 1.0
+        self.buffer.push(time.perf_counter(), 1, 1)
+        self.buffer.reset()
+        self.buffer.flush()
+        self.assertEqual(self.injected, [])
+        self.assertIsNone(self.buffer.last)
+
+    def test_inject_failure_is_swallowed(self):
+        def fail(x, y):
+            raise OSError("no display")
+        buffer = JitterBuffer(fail)
+        buffer.queue.append((0.0, 1, 1))
+        buffer.flush()
+        self.assertEqual(buffer.last, (0.0, 1, 1))
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from src.key_repeat import KeyHeldSender, KeyRepeater, is_repeating_key, is_text_char
+
+
+def _wait_until(predicate, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+class KeyClassificationTest(unittest.TestCase):
+    """반복 여부/문자 키 판별"""
+
+    def test_repeating_keys(self):
+        self.assertTrue(is_repeating_key('a'))
+        self.assertTrue(is_repeating_key('Key.backspace'))
+        self.assertFalse(is_repeating_key('Key.shift'))
+        self.assertFalse(is_repeating_key('Key.caps_lock'))
+        self.assertFalse(is_repeating_key(''))
+
+    def test_text_chars(self):
+        self.assertTrue(is_text_char('한'))
+        self.assertTrue(is_text_char('é'))
+        self.assertFalse(is_text_char('a'))
+        self.assertFalse(is_text_char('Key.enter'))
+        self.assertFalse(is_text_char('\u200b'))
+
+
+class KeyRepeaterTest(unittest.TestCase):
+    """지연 후 반복, key_up 이후 반복 없음, 유지 신호가 끊기면 안전 해제"""
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.pressed = []
+        self.released = []
+
+    def _repeater(self, **kwargs):
+        options = dict(delay=0.03, interval=0.01, timeout=1.0)
+        options.update(kwargs)
+        repeater = KeyRepeater(self._press, self.released.append, **options)
+        self.addCleanup(repeater.stop)
+        return repeater
+
+    def _press(self, key):
+        with self.lock:
+            self.pressed.append(key)
+
+    def test_repeats_after_delay_until_key_up(self):
+        repeater = self._repeater()
+        repeater.key_down('a', 'A')
+        time.sleep(0.015)
+        self.assertEqual(self.pressed, [])
+        self.assertTrue(_wait_until(lambda: len(self.pressed) >= 3))
+        self.assertTrue(repeater.key_up('a'))
+        with self.lock:
+            count = len(self.pressed)
+        time.sleep(0.05)
+        self.assertEqual(len(self.pressed), count)
+        self.assertEqual(set(self.pressed), {'A'})
+        self.assertFalse(repeater.key_up('a'))
+
+    def test_os_repeat_does_not_restart_delay(self):
+        repeater = self._repeater(delay=0.05)
+        repeater.key_down('a', 'A')
+        first = repeater.held['a'].next_fire
+        repeater.key_down('a', 'A')
+        self.assertEqual(repeater.held['a'].next_fire, first)
+
+    def test_missing_release_times_out(self):
+        repeater = self._repeater(delay=1.0, timeout=0.05)
+        repeater.key_down('a', 'A')
+        self.assertTrue(_wait_until(lambda: self.released == ['A']))
+        self.assertEqual(repeater.timeouts, 1)
+        self.assertNotIn('a', repeater.held)
+
+    def test_keep_alive_prevents_timeout(self):
+        repeater = self._repeater(delay=1.0, timeout=0.05)
+        repeater.key_down('a', 'A')
+        for _ in range(6):
+            time.sleep(0.02)
+            repeater.keep_alive('a')
+        self.assertEqual(self.released, [])
+        self.assertEqual(repeater.timeouts, 0)
+
+    def test_release_all(self):
+        repeater = self._repeater(delay=1.0)
+        repeater.key_down('a', 'A')
+        repeater.key_down('Key.space', 'SPACE')
+        repeater.release_all()
+        self.assertEqual(sorted(self.released), ['A', 'SPACE'])
+        self.assertEqual(repeater.held, {})
+
+
+class KeyHeldSenderTest(unittest.TestCase):
+    """눌린 키마다 주기적인 유지 신호"""
+
+    def setUp(self):
+        self.sent = []
+        self.sender = KeyHeldSender(self.sent.append, interval=0.01)
+        self.addCleanup(self.sender.stop)
+
+    def test_new_press_only_once(self):
+        self.assertTrue(self.sender.press('a'))
+        self.assertFalse(self.sender.press('a'))
+
+    def test_sends_while_held(self):
+        self.sender.press('a')
+        self.assertTrue(_wait_until(lambda: self.sent.count('a') >= 3))
+        self.sender.release('a')
+        time.sleep(0.02)
+        count = len(self.sent)
+        time.sleep(0.05)
+        self.assertEqual(len(self.sent), count)
+
+    def test_clear_forgets_keys(self):
+        self.sender.press('a')
+        self.sender.clear()
+        self.assertTrue(self.sender.press('a'))
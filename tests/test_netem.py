@@ -0,0 +1,58 @@
+import random
+import threading
+import time
+import unittest
+from src.netem import _DelayLine, load_profile
+
+
+def _profile(**overrides):
+    profile = load_profile('lan')
+    profile.update({'latency_ms': 0, 'jitter_ms': 0, 'loss': 0.0, 'reorder': 0.0}, **overrides)
+    return profile
+
+
+class DelayLineTest(unittest.TestCase):
+    """TCP 지연 큐: 순서 유지, drain, 보내기 실패 시 닫힘"""
+
+    def test_ordered_release(self):
+        sent = []
+        line = _DelayLine(_profile(latency_ms=5, jitter_ms=5), sent.append, ordered=True, rng=random.Random(1))
+        for i in range(50):
+            line.push(b'%d,' % i)
+        line.drain()
+        self.assertEqual(b''.join(sent), b''.join(b'%d,' % i for i in range(50)))
+
+    def test_drain_waits_for_delayed_data(self):
+        sent = []
+        line = _DelayLine(_profile(latency_ms=50), sent.append, ordered=True, rng=random.Random(1))
+        line.push(b'late')
+        start = time.perf_counter()
+        line.drain()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.03)
+        self.assertEqual(sent, [b'late'])
+
+    def test_close_drops_pending(self):
+        sent = []
+        line = _DelayLine(_profile(latency_ms=1000), sent.append, ordered=True, rng=random.Random(1))
+        line.push(b'never')
+        line.close()
+        line.thread.join(1)
+        self.assertFalse(line.thread.is_alive())
+        self.assertEqual(sent, [])
+
+    def test_send_failure_unblocks_full_queue(self):
+        def fail(data):
+            raise ConnectionResetError
+
+        line = _DelayLine(_profile(queue_kb=1), fail, ordered=True, rng=random.Random(1))
+        results = []
+        pusher = threading.Thread(target=lambda: results.extend(line.push(b'x' * 600) for _ in range(4)), daemon=True)
+        pusher.start()
+        pusher.join(2)
+        self.assertFalse(pusher.is_alive(), "push() stayed blocked after the send failed")
+        self.assertTrue(line.closed)
+        self.assertIn(False, results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import socket
+import unittest
+from src.paths import PeerLink, choose_path, race_connect
+
+
+def _link(rtt=None, address='10.0.0.1'):
+    a, b = socket.socketpair()
+    b.close()
+    link = PeerLink(a, None, b'', True, address)
+    link.rtt = rtt
+    return link
+
+
+class PeerLinkTest(unittest.TestCase):
+    """RTT EWMA와 pong이 끊긴 경로 처리"""
+
+    def setUp(self):
+        self.link = _link()
+        self.addCleanup(self.link.close)
+
+    def test_rtt_ewma(self):
+        self.link.observe_rtt(0.010)
+        self.assertEqual(self.link.rtt, 0.010)
+        self.link.observe_rtt(0.020)
+        self.assertAlmostEqual(self.link.rtt, 0.013)
+
+    def test_effective_rtt(self):
+        self.assertEqual(self.link.effective_rtt(0.0, 1.0), float('inf'))
+        self.link.observe_rtt(0.01)
+        self.link.ping_outstanding = 5.0
+        self.assertEqual(self.link.effective_rtt(5.5, 1.0), 0.01)
+        self.assertEqual(self.link.effective_rtt(6.5, 1.0), float('inf'))
+        self.link.observe_rtt(0.01)
+        self.assertIsNone(self.link.ping_outstanding)
+        self.link.close()
+        self.assertEqual(self.link.effective_rtt(6.5, 1.0), float('inf'))
+
+
+class ChoosePathTest(unittest.TestCase):
+    """더 빠른 경로로 전환할지 판단"""
+
+    def _links(self, *rtts):
+        links = [_link(rtt) for rtt in rtts]
+        for link in links:
+            self.addCleanup(link.close)
+        return links
+
+    def test_switches_to_clearly_faster_path(self):
+        active, fast = self._links(0.010, 0.002)
+        self.assertIs(choose_path([active, fast], active, 0.0, 1.0), fast)
+
+    def test_keeps_active_within_ratio(self):
+        active, other = self._links(0.010, 0.008)
+        self.assertIsNone(choose_path([active, other], active, 0.0, 1.0))
+
+    def test_keeps_active_below_min_gain(self):
+        active, other = self._links(0.0009, 0.0003)
+        self.assertIsNone(choose_path([active, other], active, 0.0, 1.0))
+
+    def test_leaves_dead_active_path(self):
+        active, other = self._links(0.001, 0.050)
+        active.ping_outstanding = 0.0
+        self.assertIs(choose_path([active, other], active, 2.0, 1.0), other)
+
+    def test_no_measured_alternative(self):
+        active, other = self._links(None, None)
+        self.assertIsNone(choose_path([active, other], active, 0.0, 1.0))
+
+
+class RaceConnectTest(unittest.TestCase):
+    """실패한 주소를 건너뛰고 연결된 주소마다 콜백"""
+
+    def test_connects_past_refused_address(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(listener.close)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(4)
+        port = listener.getsockname()[1]
+
+        connected = []
+
+        def on_connected(sock, address, elapsed):
+            connected.append(address)
+            sock.close()
+
+        # 127.0.0.2의 같은 포트에는 리스너가 없어 거부됨 (중복 주소는 한 번만 시도)
+        count = race_connect(['127.0.0.2', '127.0.0.1', '127.0.0.1'], port, on_connected, stagger=0.01, timeout=2.0)
+        self.assertEqual(count, 1)
+        self.assertEqual(connected, ['127.0.0.1'])
+
+    def test_should_stop(self):
+        count = race_connect(['127.0.0.1'], 9, lambda *args: None, timeout=2.0, should_stop=lambda: True)
+        self.assertEqual(count, 0)
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from src.peer_cache import PeerCache, user_data_dir
+
+
+class _Config:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class PeerCacheTest(unittest.TestCase):
+    """디스크 캐시 로드/저장, 잘못된 항목 처리, 최근 peer 선택"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, 'sub', 'peers.json')
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+
+    def _cache(self):
+        cache = PeerCache(self.path)
+        self.addCleanup(cache.flush)
+        return cache
+
+    def test_missing_file(self):
+        self.assertEqual(len(self._cache()), 0)
+
+    def test_corrupt_file(self):
+        for data in ('{not json', '[1, 2]', '"text"'):
+            with self.subTest(data=data):
+                self._write(data)
+                self.assertEqual(len(self._cache()), 0)
+
+    def test_non_dict_entries_dropped(self):
+        self._write({'10.0.0.1': 'oops', '10.0.0.2': [1], '10.0.0.3': {'name': 'ok', 'last_connected': 5}})
+        cache = self._cache()
+        self.assertEqual(list(cache.snapshot()), ['10.0.0.3'])
+        self.assertEqual(cache.last_good(), ('10.0.0.3', {'name': 'ok', 'last_connected': 5}))
+
+    def test_non_numeric_fields_dropped(self):
+        self._write({'10.0.0.1': {'rtt_ms': 'fast', 'last_seen': None, 'last_connected': True, 'name': 'a'},
+                     '10.0.0.2': {'rtt_ms': -1, 'last_connected': 'yesterday'}})
+        cache = self._cache()
+        self.assertEqual(cache.get('10.0.0.1'), {'name': 'a'})
+        self.assertEqual(cache.get('10.0.0.2'), {})
+        self.assertIsNone(cache.last_good())
+
+    def test_last_good_picks_most_recent_connection(self):
+        self._write({'10.0.0.1': {'last_connected': 100}, '10.0.0.2': {'last_connected': 200},
+                     '10.0.0.3': {'last_seen': 300}})
+        self.assertEqual(self._cache().last_good()[0], '10.0.0.2')
+
+    def test_save_round_trip(self):
+        cache = self._cache()
+        cache.remember('10.0.0.1', {'name': 'desk', 'os': 'Linux', 'addresses': ['10.0.1.1'], 'ignored': 1})
+        cache.record_connected('10.0.0.1', rtt=0.0015, addresses=['10.0.1.1', '10.0.2.1'])
+        cache.record_screen('10.0.0.1', 2560, 1440, [{'x': 0, 'y': 0, 'width': 2560, 'height': 1440}])
+        cache.flush()
+
+        entry = PeerCache(self.path).get('10.0.0.1')
+        self.assertEqual(entry['name'], 'desk')
+        self.assertNotIn('ignored', entry)
+        self.assertEqual(entry['rtt_ms'], 1.5)
+        self.assertEqual(entry['addresses'], ['10.0.1.1', '10.0.2.1'])
+        self.assertEqual(entry['screen_width'], 2560)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_saves_are_debounced(self):
+        cache = self._cache()
+        cache.SAVE_DELAY = 0.05
+        with mock.patch.object(cache, 'save', wraps=cache.save) as save:
+            for i in range(20):
+                cache.remember('10.0.0.%d' % i, {'name': str(i)})
+            self.assertFalse(os.path.exists(self.path))
+            time.sleep(0.3)
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(PeerCache(self.path)), 20)
+
+    def test_flush_without_changes_does_not_write(self):
+        self._cache().flush()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_prunes_least_recent_entries(self):
+        cache = PeerCache(self.path, max_entries=2)
+        cache.peers = {'a': {'last_seen': 1}, 'b': {'last_connected': 3}, 'c': {'last_seen': 2}}
+        cache.save()
+        self.assertEqual(sorted(PeerCache(self.path).snapshot()), ['b', 'c'])
+
+    def test_from_config(self):
+        self.assertIsNone(PeerCache.from_config(_Config({'network.peer_cache': ''})))
+        with mock.patch.dict(os.environ, {'XDG_CONFIG_HOME': self.dir.name}), \
+                mock.patch('sys.platform', 'linux'):
+            cache = PeerCache.from_config(_Config({'network.peer_cache': 'peers.json'}))
+            self.assertEqual(cache.path, os.path.join(user_data_dir(), 'peers.json'))
+            self.assertTrue(cache.path.startswith(self.dir.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
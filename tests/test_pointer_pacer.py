@@ -0,0 +1,65 @@
+import unittest
+from src.pointer_pacer import PointerPacer
+
+
+class PointerPacerTest(unittest.TestCase):
+    """지연 추정(큐 대기 + RTT 증가분)과 AIMD 전송률 조절"""
+
+    def setUp(self):
+        self.pacer = PointerPacer(target=0.03, min_rate=15.0)
+        self.link = object()
+
+    def _update(self, now, sent_total=0, queued=0, rtt=None, link=None):
+        return self.pacer.update(now, link or self.link, sent_total, queued, rtt)
+
+    def test_idle_link_is_unlimited(self):
+        self.assertEqual(self._update(1.0, rtt=0.01), 0.0)
+        self.assertEqual(self.pacer.interval, 0.0)
+        self.pacer.moved(1.0)
+        self.assertEqual(self.pacer.next_move, 0.0)
+
+    def test_due_after_sample_interval(self):
+        self._update(1.0)
+        self.assertFalse(self.pacer.due(1.0 + PointerPacer.SAMPLE_INTERVAL / 2))
+        self.assertTrue(self.pacer.due(1.0 + PointerPacer.SAMPLE_INTERVAL * 2))
+
+    def test_rtt_inflation_halves_rate(self):
+        self._update(1.0, rtt=0.01)
+        self.assertEqual(self._update(1.1, rtt=0.06), PointerPacer.START_RATE)
+        self.assertAlmostEqual(self.pacer.delay, 0.05)
+        # DECREASE_INTERVAL 안에서는 다시 줄이지 않음
+        self.assertEqual(self._update(1.12, rtt=0.06), PointerPacer.START_RATE)
+        self.assertEqual(self._update(1.2, rtt=0.06), PointerPacer.START_RATE / 2)
+
+    def test_rate_never_below_minimum(self):
+        self._update(1.0, rtt=0.01)
+        now = 1.0
+        for _ in range(10):
+            now += PointerPacer.DECREASE_INTERVAL
+            self._update(now, rtt=0.2)
+        self.assertEqual(self.pacer.rate_limit, 15.0)
+
+    def test_queue_delay_from_delivery_rate(self):
+        self._update(1.0, sent_total=1000, queued=1000)
+        # 0.1초 동안 1000바이트 전달 → 10000 B/s, 남은 1000바이트는 0.1초 대기
+        self.assertEqual(self._update(1.1, sent_total=2000, queued=1000), PointerPacer.START_RATE)
+        self.assertAlmostEqual(self.pacer.rate, 10000.0)
+        self.assertAlmostEqual(self.pacer.delay, 0.1)
+
+    def test_recovers_and_releases(self):
+        self._update(1.0, rtt=0.01)
+        self._update(1.1, rtt=0.06)
+        self.assertAlmostEqual(self._update(2.1, rtt=0.01), PointerPacer.START_RATE + PointerPacer.INCREASE_RATE)
+        self.assertEqual(self._update(3.1, rtt=0.01), 0.0)
+
+    def test_moved_spaces_sends_by_interval(self):
+        self._update(1.0, rtt=0.01)
+        self._update(1.1, rtt=0.06)
+        self.pacer.moved(2.0)
+        self.assertAlmostEqual(self.pacer.next_move, 2.0 + 1 / PointerPacer.START_RATE)
+
+    def test_link_change_resets_state(self):
+        self._update(1.0, rtt=0.01)
+        self._update(1.1, rtt=0.06)
+        self.assertEqual(self._update(1.2, rtt=0.06, link=object()), 0.0)
+        self.assertEqual(self.pacer.base_rtt, 0.06)
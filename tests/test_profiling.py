@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+import tracemalloc
+import unittest
+from src.metrics import MetricsRegistry
+from src.profiling import Instrumentation
+
+
+class InstrumentationTest(unittest.TestCase):
+    """계측 켜기/끄기와 워치독, 결과 파일 쓰기 실패"""
+
+    def setUp(self):
+        self.instrumentation = Instrumentation(MetricsRegistry())
+        self.instrumentation.threshold = 0.02
+        self.addCleanup(self.instrumentation.set_enabled, False)
+
+    def test_reenable_before_watchdog_wakes_keeps_a_watchdog(self):
+        self.instrumentation.set_enabled(True)
+        first = self.instrumentation._watchdog
+        self.instrumentation.set_enabled(False)
+        self.instrumentation.set_enabled(True)
+        time.sleep(self.instrumentation.threshold)
+        self.assertFalse(first.is_alive())
+        self.assertTrue(self.instrumentation._watchdog.is_alive())
+
+        # 새 워치독이 진행 중인 지연 호출을 스택과 함께 잡음
+        slow = self.instrumentation.wrap('slow', lambda: time.sleep(0.1))
+        slow()
+        self.assertEqual(len(self.instrumentation.stalls), 1)
+        self.assertIn('sleep', self.instrumentation.stalls[0]['stack'])
+
+    def test_disabled_wrapper_does_not_measure(self):
+        calls = []
+        wrapped = self.instrumentation.wrap('cb', lambda x: calls.append(x) or x)
+        self.assertEqual(wrapped(3), 3)
+        self.assertEqual(calls, [3])
+        self.assertEqual(self.instrumentation.m_duration.count('cb'), 0)
+        self.instrumentation.set_enabled(True)
+        wrapped(4)
+        self.assertEqual(self.instrumentation.m_duration.count('cb'), 1)
+
+    def test_profile_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.instrumentation.output_dir = directory
+            self.instrumentation.start_profiling()
+            self.instrumentation.wrap('cb', sum)([1, 2])
+            path = self.instrumentation.stop_profiling()
+            self.assertTrue(os.path.exists(path))
+
+    def test_unwritable_output_dir(self):
+        self.instrumentation.output_dir = os.path.join(tempfile.gettempdir(), 'missing', 'nested', 'dir')
+        self.instrumentation.start_profiling()
+        self.instrumentation.wrap('cb', sum)([1, 2])
+        with self.assertRaises(OSError):
+            self.instrumentation.stop_profiling()
+        self.assertFalse(self.instrumentation.profiling)
+        # 시그널 핸들러 경로는 예외 대신 로그
+        self.instrumentation.start_profiling()
+        self.instrumentation.wrap('cb', sum)([1, 2])
+        with self.assertLogs('km_share.profiling', 'WARNING'):
+            self.instrumentation.toggle_profiling()
+
+        self.instrumentation.start_tracemalloc()
+        with self.assertRaises(OSError):
+            self.instrumentation.stop_tracemalloc()
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
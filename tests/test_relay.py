@@ -0,0 +1,125 @@
+import os
+import socket
+import threading
+import time
+import unittest
+from src.metrics import MetricsRegistry
+from src.relay import RelayServer, parse_relay_address, relay_session_name, request_relay
+
+
+class RelayConfigTest(unittest.TestCase):
+    """relay 주소 파싱과 세션 이름 유도"""
+
+    def test_parse_relay_address(self):
+        self.assertEqual(parse_relay_address('relay.lan'), ('relay.lan', 24850))
+        self.assertEqual(parse_relay_address(' 10.0.0.1:9000 '), ('10.0.0.1', 9000))
+        self.assertIsNone(parse_relay_address(''))
+        self.assertIsNone(parse_relay_address('host:port'))
+
+    def test_session_name(self):
+        self.assertEqual(relay_session_name('office', b'key'), 'office')
+        derived = relay_session_name('', b'key')
+        self.assertEqual(derived, relay_session_name('', b'key'))
+        self.assertNotEqual(derived, relay_session_name('', b'other'))
+        self.assertEqual(len(derived), 32)
+        self.assertIsNone(relay_session_name('', None))
+
+
+class RelayServerTest(unittest.TestCase):
+    """같은 세션 이름끼리 짝짓기, 양방향 전달, 잘못된 요청/가득 참 거부"""
+
+    use_splice = False
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.relay = RelayServer(port=0, host='127.0.0.1', max_sessions=2, use_splice=self.use_splice,
+                                 registry=self.registry)
+        self.relay.start()
+        self.addCleanup(self.relay.stop)
+
+    def _connect(self):
+        sock = socket.create_connection(('127.0.0.1', self.relay.port), timeout=2)
+        self.addCleanup(sock.close)
+        return sock
+
+    def _join_pair(self, name='session-1'):
+        first, second = self._connect(), self._connect()
+        roles = {}
+        thread = threading.Thread(target=lambda: roles.setdefault('first', request_relay(first, name)))
+        thread.start()
+        self._wait_for(lambda: name in self.relay.waiting)
+        roles['second'] = request_relay(second, name)
+        thread.join(2)
+        return first, second, roles
+
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            self.assertLess(time.monotonic(), deadline, "condition not reached")
+            time.sleep(0.005)
+
+    @staticmethod
+    def _recv_exactly(sock, size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def test_pairs_and_forwards_both_ways(self):
+        first, second, roles = self._join_pair()
+        self.assertEqual(roles, {'first': 'accept', 'second': 'connect'})
+
+        payload = os.urandom(100000)
+        first.sendall(payload)
+        self.assertEqual(self._recv_exactly(second, len(payload)), payload)
+        second.sendall(b'pong')
+        self.assertEqual(self._recv_exactly(first, 4), b'pong')
+
+        # 전달량은 상대에게 보낸 뒤에 갱신됨
+        self._wait_for(lambda: self.relay.sessions()[0]['bytes'] == [len(payload), 4])
+        self.assertEqual(len(self.relay.sessions()), 1)
+        self.assertEqual(self.registry.metrics['km_relay_sessions_total'].get(), 1)
+
+    def test_close_ends_session(self):
+        first, second, _ = self._join_pair()
+        first.close()
+        self.assertEqual(self._recv_exactly(second, 1), b'')
+        self._wait_for(lambda: not self.relay.active)
+        self.assertFalse(self.relay.sessions()[0]['active'])
+
+    def test_bad_request_rejected(self):
+        for request in (b'HELLO x\n', b'KMRELAY bad/name\n', b'KMRELAY\n'):
+            with self.subTest(request=request):
+                sock = self._connect()
+                sock.sendall(request)
+                self.assertEqual(sock.recv(16), b'')
+        self.assertEqual(self.registry.metrics['km_relay_rejected_total'].get(), 3)
+
+    def test_dead_waiting_partner_is_replaced(self):
+        stale = socket.create_connection(('127.0.0.1', self.relay.port), timeout=2)
+        stale.sendall(b'KMRELAY session-1\n')
+        self._wait_for(lambda: 'session-1' in self.relay.waiting)
+        stale.close()
+        # 죽은 대기 연결과 짝짓지 않고 새 연결이 대기 목록에 들어감
+        fresh = self._connect()
+        fresh.sendall(b'KMRELAY session-1\n')
+        self._wait_for(lambda: self.relay.waiting.get('session-1', (stale,))[0] is not stale)
+        self.assertFalse(self.relay.active)
+
+    def test_full_relay_rejects(self):
+        for name in ('a', 'b'):
+            sock = self._connect()
+            sock.sendall(b'KMRELAY ' + name.encode() + b'\n')
+        self._wait_for(lambda: len(self.relay.waiting) == 2)
+        sock = self._connect()
+        sock.sendall(b'KMRELAY c\n')
+        self.assertEqual(sock.recv(16), b'')
+        self.assertNotIn('c', self.relay.waiting)
+
+
+@unittest.skipUnless(hasattr(os, 'splice'), "os.splice not available")
+class RelayServerSpliceTest(RelayServerTest):
+    use_splice = True
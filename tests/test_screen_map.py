@@ -0,0 +1,75 @@
+import unittest
+from src.screen_map import ScreenMap, single_monitor, validate_monitors
+
+
+def monitor(x, y, width=1920, height=1080):
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+
+SIDE_BY_SIDE = [monitor(0, 0), monitor(1920, 0)]
+WITH_GAP = [monitor(0, 0), monitor(2920, 0)]
+
+
+def on_a_monitor(monitors, point):
+    x, y = point
+    return any(m['x'] <= x < m['x'] + m['width'] and m['y'] <= y < m['y'] + m['height'] for m in monitors)
+
+
+class ScreenMapTest(unittest.TestCase):
+    """ScreenMap 원격 -> 로컬 매핑 (특히 양쪽 모니터 수가 다를 때)"""
+
+    def test_equal_counts_map_monitor_by_position(self):
+        # 목록 순서와 상관없이 왼쪽 모니터끼리, 오른쪽 모니터끼리 매핑
+        local = [monitor(1920, 0), monitor(0, 0)]
+        remote = [monitor(0, 0, 1280, 720), monitor(1280, 0, 1280, 720)]
+        screen_map = ScreenMap(local, remote)
+        self.assertEqual(screen_map.remote_to_local(640, 360), (960, 540))
+        self.assertEqual(screen_map.remote_to_local(1280 + 640, 360), (1920 + 960, 540))
+
+    def test_one_remote_to_two_local(self):
+        screen_map = ScreenMap(SIDE_BY_SIDE, single_monitor(1920, 1080))
+        self.assertEqual(screen_map.remote_to_local(0, 0), (0, 0))
+        self.assertEqual(screen_map.remote_to_local(960, 540), (1920, 540))
+        self.assertEqual(screen_map.remote_to_local(1919, 1079), (3838, 1079))
+
+    def test_two_remote_to_one_local(self):
+        screen_map = ScreenMap(single_monitor(1920, 1080), SIDE_BY_SIDE)
+        self.assertEqual(screen_map.remote_to_local(0, 0), (0, 0))
+        self.assertEqual(screen_map.remote_to_local(1920, 540), (960, 540))
+        self.assertEqual(screen_map.remote_to_local(3839, 1079), (1919, 1079))
+
+    def test_gap_between_local_monitors_snaps_to_nearest(self):
+        screen_map = ScreenMap(WITH_GAP, single_monitor(1920, 1080))
+        self.assertEqual(screen_map.remote_to_local(800, 10), (1919, 10))
+        self.assertEqual(screen_map.remote_to_local(1100, 10), (2920, 10))
+
+    def test_unequal_counts_always_land_on_a_local_monitor(self):
+        layouts = [
+            (WITH_GAP, single_monitor(2560, 1440)),
+            ([monitor(-1280, 200, 1280, 1024), monitor(0, 0), monitor(1920, -300, 1080, 1920)], SIDE_BY_SIDE),
+            (single_monitor(1366, 768), [monitor(0, 0), monitor(0, 1080), monitor(1920, 0)]),
+        ]
+        for local, remote in layouts:
+            screen_map = ScreenMap(local, remote)
+            x0, y0, x1, y1 = screen_map.remote_bounds
+            for x in range(x0 - 50, x1 + 50, 97):
+                for y in range(y0 - 50, y1 + 50, 89):
+                    point = screen_map.remote_to_local(x, y)
+                    self.assertTrue(on_a_monitor(local, point), (local, remote, (x, y), point))
+
+    def test_entry_point_with_unequal_counts(self):
+        screen_map = ScreenMap(single_monitor(1920, 1080), SIDE_BY_SIDE, position='right')
+        self.assertEqual(screen_map.local_to_remote_entry(1919, 540), (40, 540))
+        screen_map = ScreenMap(SIDE_BY_SIDE, [monitor(0, 0, 1280, 720)], position='left')
+        self.assertEqual(screen_map.local_to_remote_entry(0, 1079), (1279 - 40, 719))
+
+    def test_invalid_remote_monitors_fall_back(self):
+        self.assertIsNone(validate_monitors([monitor(0, 0, 0, 1080)]))
+        self.assertIsNone(validate_monitors([]))
+        self.assertIsNone(validate_monitors([{'x': True, 'y': 0, 'width': 10, 'height': 10}]))
+        screen_map = ScreenMap(SIDE_BY_SIDE, [{'x': 0, 'y': 0, 'width': -1, 'height': 1}])
+        self.assertEqual(screen_map.remote_bounds, (0, 0, 1920, 1080))
+
+
+if __name__ == '__main__':
+    unittest.main()
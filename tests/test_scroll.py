@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from src.scroll import ScrollAccumulator, ScrollInjector
+
+
+class ScrollAccumulatorTest(unittest.TestCase):
+    """프레임 단위 스크롤 합산: 첫 이벤트 즉시 전송, 나머지는 프레임 끝에서 합쳐 전송"""
+
+    def setUp(self):
+        self.sent = []
+        self.flushed = threading.Event()
+        self.acc = ScrollAccumulator(self._flush, frame_interval=0.05)
+        self.addCleanup(self.acc.stop)
+
+    def _flush(self, dx, dy):
+        self.sent.append((dx, dy))
+        if len(self.sent) > 1:
+            self.flushed.set()
+
+    def test_first_event_sent_immediately(self):
+        self.assertEqual(self.acc.add(0, 1), 0)
+        self.assertEqual(self.sent, [(0, 1)])
+
+    def test_events_within_frame_are_merged(self):
+        self.acc.add(0, 1)
+        self.assertEqual(self.acc.add(1, 2), 1)
+        self.assertEqual(self.acc.add(0.5, -1), 1)
+        self.assertTrue(self.flushed.wait(1))
+        self.assertEqual(self.sent, [(0, 1), (1.5, 1)])
+
+    def test_merged_flush_waits_for_frame_end(self):
+        start = time.perf_counter()
+        self.acc.add(0, 1)
+        self.acc.add(0, 1)
+        self.assertTrue(self.flushed.wait(1))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_stop_discards_pending(self):
+        self.acc.add(0, 1)
+        self.acc.add(0, 1)
+        self.acc.stop()
+        self.acc.thread.join(1)
+        self.assertFalse(self.acc.thread.is_alive())
+        self.assertEqual(self.sent, [(0, 1)])
+
+
+class ScrollInjectorTest(unittest.TestCase):
+    """수신측 주입: 고해상도는 소수 그대로, 정수 플랫폼은 잔여값을 모아 정수 단위로 주입"""
+
+    def setUp(self):
+        self.calls = []
+
+    def _injector(self, high_resolution):
+        return ScrollInjector(lambda dx, dy: self.calls.append((dx, dy)), high_resolution=high_resolution)
+
+    def test_high_resolution_passes_fractions(self):
+        injector = self._injector(True)
+        injector.inject(0, 0.25)
+        self.assertEqual(self.calls, [(0, 0.25)])
+
+    def test_fractions_accumulate_into_steps(self):
+        injector = self._injector(False)
+        for _ in range(3):
+            injector.inject(0, 0.4)
+        self.assertEqual(self.calls, [(0, 1)])
+        self.assertAlmostEqual(injector.residual_y, 0.2)
+
+    def test_float_error_does_not_lose_a_step(self):
+        injector = self._injector(False)
+        for _ in range(10):
+            injector.inject(0.1, -0.1)
+        self.assertEqual(self.calls, [(1, -1)])
+
+    def test_reset_clears_residual(self):
+        injector = self._injector(False)
+        injector.inject(0, 0.75)
+        injector.reset()
+        injector.inject(0, 0.5)
+        self.assertEqual(self.calls, [])
@@ -0,0 +1,141 @@
+import threading
+import time
+import unittest
+from src.events import KeyEvent, Message, MouseButton, MouseMove, MouseScroll, MovePool, TextEvent
+from src.send_queue import SendQueue
+
+
+class SendQueueMergeTest(unittest.TestCase):
+    """연속된 같은 종류 이벤트 병합"""
+
+    def setUp(self):
+        self.queue = SendQueue(capacity=8)
+
+    def test_moves_keep_last_position(self):
+        for x in range(5):
+            self.assertTrue(self.queue.put(MouseMove(x, x)))
+        batch = self.queue.get_batch()
+        self.assertEqual([(e.x, e.y) for e in batch], [(4, 4)])
+        self.assertEqual(self.queue.merged.get('mouse_move'), 4)
+
+    def test_scroll_deltas_add_up(self):
+        self.queue.put(MouseScroll(1, 1, 0, 1))
+        self.queue.put(MouseScroll(1, 1, 2, -3))
+        batch = self.queue.get_batch()
+        self.assertEqual([(e.dx, e.dy) for e in batch], [(2, -2)])
+
+    def test_text_concatenates(self):
+        for ch in 'abc':
+            self.queue.put(TextEvent(ch))
+        self.assertEqual([e.text for e in self.queue.get_batch()], ['abc'])
+
+    def test_only_adjacent_events_merge(self):
+        events = [MouseMove(1, 1), KeyEvent('a', True), MouseMove(2, 2), MouseMove(3, 3), KeyEvent('a', False),
+                  KeyEvent('b', True)]
+        for event in events:
+            self.queue.put(event)
+        batch = self.queue.get_batch()
+        self.assertEqual([e.name for e in batch], ['mouse_move', 'keyboard', 'mouse_move', 'keyboard', 'keyboard'])
+        self.assertEqual(batch[2].x, 3)
+
+    def test_keys_and_buttons_never_merge(self):
+        for pressed in (True, False, True):
+            self.queue.put(MouseButton(0, 0, 'Button.left', pressed))
+        self.assertEqual([e.pressed for e in self.queue.get_batch()], [True, False, True])
+
+    def test_merged_moves_return_to_pool(self):
+        pool = MovePool()
+        queue = SendQueue(capacity=8, pool=pool)
+        first = pool.acquire(1, 1)
+        queue.put(first)
+        queue.put(pool.acquire(2, 2))
+        self.assertIs(pool.free[-1], first)
+
+
+class SendQueueDropTest(unittest.TestCase):
+    """capacity/hard_limit를 넘었을 때의 버림 규칙"""
+
+    def test_oldest_move_dropped_when_full(self):
+        queue = SendQueue(capacity=3)
+        queue.put(MouseMove(1, 1))
+        queue.put(KeyEvent('a', True))
+        queue.put(MouseMove(2, 2))
+        self.assertTrue(queue.put(KeyEvent('a', False)))
+        batch = queue.get_batch()
+        self.assertEqual([e.name for e in batch], ['keyboard', 'mouse_move', 'keyboard'])
+        self.assertEqual(batch[1].x, 2)
+        self.assertEqual(queue.dropped.get('mouse_move'), 1)
+
+    def test_new_move_dropped_when_full_of_keys(self):
+        queue = SendQueue(capacity=2)
+        queue.put(KeyEvent('a', True))
+        queue.put(KeyEvent('b', True))
+        self.assertTrue(queue.put(MouseMove(1, 1)))
+        self.assertEqual([e.name for e in queue.get_batch()], ['keyboard', 'keyboard'])
+        self.assertEqual(queue.dropped.get('mouse_move'), 1)
+
+    def test_keys_kept_until_hard_limit(self):
+        queue = SendQueue(capacity=2, hard_limit=4)
+        results = [queue.put(KeyEvent(str(i), True)) for i in range(5)]
+        self.assertEqual(results, [True, True, True, True, False])
+        self.assertEqual(len(queue), 4)
+        self.assertEqual(queue.dropped.total(), 0)
+
+    def test_control_messages_not_dropped(self):
+        queue = SendQueue(capacity=1)
+        queue.put(Message('ping', {'t': 1}))
+        self.assertTrue(queue.put(Message('pong', {'t': 1})))
+        self.assertEqual([e.name for e in queue.get_batch()], ['ping', 'pong'])
+
+    def test_high_water(self):
+        queue = SendQueue(capacity=8)
+        for i in range(5):
+            queue.put(KeyEvent(str(i), True))
+        queue.get_batch()
+        queue.put(KeyEvent('x', True))
+        self.assertEqual(queue.high_water, 5)
+
+
+class SendQueueBatchTest(unittest.TestCase):
+    """get_batch/put_many/close 동작"""
+
+    def test_close_wakes_waiting_sender(self):
+        queue = SendQueue()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(queue.get_batch()))
+        thread.start()
+        time.sleep(0.05)
+        queue.close()
+        thread.join(1)
+        self.assertEqual(result, [None])
+
+    def test_hold_moves_until(self):
+        queue = SendQueue()
+        queue.put(MouseMove(1, 1))
+        start = time.perf_counter()
+        batch = queue.get_batch(hold_moves_until=start + 0.05)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+        self.assertEqual(len(batch), 1)
+
+    def test_held_move_released_by_key(self):
+        queue = SendQueue()
+        queue.put(MouseMove(1, 1))
+        threading.Timer(0.02, queue.put, args=(KeyEvent('a', True),)).start()
+        start = time.perf_counter()
+        batch = queue.get_batch(hold_moves_until=start + 5)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual([e.name for e in batch], ['mouse_move', 'keyboard'])
+
+    def test_put_many_keeps_every_move(self):
+        queue = SendQueue(capacity=2)
+        moves = [MouseMove(i, i) for i in range(4)]
+        self.assertEqual(queue.put_many(moves, limit=10), 4)
+        self.assertEqual([e.x for e in queue.get_batch()], [0, 1, 2, 3])
+
+    def test_put_many_times_out_when_full(self):
+        queue = SendQueue()
+        self.assertEqual(queue.put_many([KeyEvent(str(i), True) for i in range(3)], limit=2, timeout=0.05), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()